@@ -0,0 +1,39 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include "oneflow/api/python/of_api_registry.h"
+
+#include "oneflow/core/persistence/read_stats.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+ONEFLOW_API_PYBIND11_MODULE("persistence", m) {
+  m.def("GetReadStats", []() {
+    const ReadStats* stats = ReadStats::Get();
+    py::dict ret;
+    ret["bytes_read"] = stats->bytes_read.load();
+    ret["stall_ns"] = stats->stall_ns.load();
+    ret["buffer_pool_hit_num"] = stats->buffer_pool_hit_num.load();
+    ret["buffer_pool_miss_num"] = stats->buffer_pool_miss_num.load();
+    return ret;
+  });
+
+  m.def("ResetReadStats", []() { ReadStats::Get()->Reset(); });
+}
+
+}  // namespace oneflow
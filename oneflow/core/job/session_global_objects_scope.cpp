@@ -34,6 +34,7 @@ limitations under the License.
 #include "oneflow/core/job/runtime_buffer_managers_scope.h"
 #include "oneflow/core/framework/load_library.h"
 #include "oneflow/core/job/version.h"
+#include "oneflow/core/thread/thread_pool.h"
 #include "oneflow/core/job/global_for.h"
 
 namespace oneflow {
@@ -81,6 +82,18 @@ AvailableMemDesc GetDryRunAvailableMemDesc() {
   return ret;
 }
 
+void ResizeComputeThreadPool() {
+  // the pool is created with the env, so it is resized to the compute_thread_pool_size of the
+  // session, which bounds the intra-op parallelism of the cpu kernels
+  const int32_t thread_num = Global<ResourceDesc, ForSession>::Get()->ComputeThreadPoolSize();
+  if (Global<ThreadPool>::Get() != nullptr
+      && Global<ThreadPool>::Get()->thread_num() == thread_num) {
+    return;
+  }
+  Global<ThreadPool>::Delete();
+  Global<ThreadPool>::New(thread_num);
+}
+
 }  // namespace
 
 SessionGlobalObjectsScope::SessionGlobalObjectsScope() {}
@@ -91,6 +104,7 @@ Maybe<void> SessionGlobalObjectsScope::Init(const ConfigProto& config_proto) {
   DumpVersionInfo();
   Global<ResourceDesc, ForSession>::New(config_proto.resource(),
                                         GlobalProcessCtx::NumOfProcessPerNode());
+  ResizeComputeThreadPool();
   Global<const IOConf>::New(config_proto.io_conf());
   Global<const IOConf>::SessionNew(config_proto.session_id(), config_proto.io_conf());
   Global<const ProfilerConf>::New(config_proto.profiler_conf());
@@ -123,6 +137,7 @@ Maybe<void> SessionGlobalObjectsScope::EagerInit(const ConfigProto& config_proto
   Global<ResourceDesc, ForSession>::Delete();
   DumpVersionInfo();
   Global<ResourceDesc, ForSession>::New(config_proto.resource());
+  ResizeComputeThreadPool();
   Global<const IOConf>::New(config_proto.io_conf());
   Global<const ProfilerConf>::New(config_proto.profiler_conf());
   if (GlobalProcessCtx::IsThisProcessMaster()
@@ -15,6 +15,7 @@ limitations under the License.
 */
 #include "oneflow/core/ndarray/ndarray_apply_binary_core.h"
 #include "oneflow/core/ndarray/binary_func.h"
+#include "oneflow/core/thread/parallel_for.h"
 
 namespace oneflow {
 
@@ -23,11 +24,19 @@ struct NdarrayApplyBinaryCoreWrapper<DeviceType::kCPU, T, binary_func> final {
   static void Apply(DeviceCtx* ctx,
                     const XpuVarNdarray<typename BinaryFuncTrait<binary_func, T>::return_type>& y,
                     const XpuVarNdarray<const T>& a, const XpuVarNdarray<const T>& b) {
-    NdarrayApplyBinaryCore<T, binary_func>::Apply(y.shape().ElemNum(), y.ptr(), a.ptr(), b.ptr());
+    ParallelFor(0, y.shape().ElemNum(), kParallelForDefaultGrainSize,
+                [&](int64_t begin, int64_t end) {
+                  NdarrayApplyBinaryCore<T, binary_func>::Apply(end - begin, y.ptr() + begin,
+                                                                a.ptr() + begin, b.ptr() + begin);
+                });
   }
   static void InplaceApply(DeviceCtx* ctx, const XpuVarNdarray<T>& y,
                            const XpuVarNdarray<const T>& x) {
-    NdarrayApplyBinaryCore<T, binary_func>::InplaceApply(y.shape().ElemNum(), y.ptr(), x.ptr());
+    ParallelFor(0, y.shape().ElemNum(), kParallelForDefaultGrainSize,
+                [&](int64_t begin, int64_t end) {
+                  NdarrayApplyBinaryCore<T, binary_func>::InplaceApply(
+                      end - begin, y.ptr() + begin, x.ptr() + begin);
+                });
   }
 };
 
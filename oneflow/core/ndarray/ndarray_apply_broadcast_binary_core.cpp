@@ -14,6 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/ndarray/ndarray_apply_broadcast_binary_core.h"
+#include "oneflow/core/thread/parallel_for.h"
 
 namespace oneflow {
 
@@ -22,7 +23,13 @@ struct NdarrayApplyBroadcastBinaryCoreWrapper<DeviceType::kCPU, T, NDIMS, binary
   static void Apply(DeviceCtx* ctx,
                     const XpuVarNdarray<typename BinaryFuncTrait<binary_func, T>::return_type>& y,
                     const XpuVarNdarray<const T>& a, const XpuVarNdarray<const T>& b) {
-    NdarrayApplyBroadcastBinaryCore<T, NDIMS, binary_func>::Apply(y, a, b);
+    const auto& ret =
+        a.Broadcast(y.shape()).template BinaryFunc<binary_func>(b.Broadcast(y.shape()));
+    auto* y_ptr = y.ptr();
+    ParallelFor(0, y.shape().ElemNum(), ParallelForGrainSize(NDIMS),
+                [&](int64_t begin, int64_t end) {
+                  for (int64_t i = begin; i < end; ++i) { y_ptr[i] = ret.template Get<NDIMS>(i); }
+                });
   }
 };
 
@@ -31,7 +38,14 @@ struct NdarrayApplyBroadcastInplaceBinaryCoreWrapper<DeviceType::kCPU, T, NDIMS,
     final {
   static void InplaceApply(DeviceCtx* ctx, const XpuVarNdarray<T>& y,
                            const XpuVarNdarray<const T>& x) {
-    NdarrayApplyBroadcastBinaryCore<T, NDIMS, binary_func>::InplaceApply(y, x);
+    const auto& x_broadcast = x.Broadcast(y.shape());
+    T* y_ptr = y.ptr();
+    ParallelFor(0, y.shape().ElemNum(), ParallelForGrainSize(NDIMS),
+                [&](int64_t begin, int64_t end) {
+                  for (int64_t i = begin; i < end; ++i) {
+                    y_ptr[i] = binary_func<T>::Invoke(y_ptr[i], x_broadcast.template Get<NDIMS>(i));
+                  }
+                });
   }
 };
 
@@ -17,26 +17,165 @@ limitations under the License.
 #include "oneflow/core/common/preprocessor.h"
 #include "oneflow/core/ndarray/ndarray_reduce_impl.h"
 #include "oneflow/core/ndarray/binary_func.h"
+#include "oneflow/core/thread/parallel_for.h"
 
 namespace oneflow {
 
-#define SPECIALIZE_CPU_NDARRAY_REDUCE_IMPL(struct_name)                                            \
-  template<typename T, template<typename> class binary_func>                                       \
-  struct struct_name<DeviceType::kCPU, T, binary_func> final {                                     \
-    static bool Matched(const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x) {              \
-      return false;                                                                                \
-    }                                                                                              \
-    static void Reduce(DeviceCtx* ctx, const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x, \
-                       const XpuVarNdarray<T>& tmp_storage) {                                      \
-      UNIMPLEMENTED();                                                                             \
-    }                                                                                              \
+namespace {
+
+template<typename T, template<typename> class binary_func>
+T ReduceContiguous(const T* x, int64_t n) {
+  T reduced = UnitOfBinaryFunc<T, binary_func>::Val();
+  for (int64_t i = 0; i < n; ++i) { reduced = binary_func<T>::Invoke(reduced, x[i]); }
+  return reduced;
+}
+
+// reduces the columns [col_begin, col_end) of the (num_rows, num_cols) matrix x into y row by row,
+// so that x is read contiguously
+template<typename T, template<typename> class binary_func>
+void ReduceMatrixCols(const T* x, T* y, int64_t num_rows, int64_t num_cols, int64_t col_begin,
+                      int64_t col_end) {
+  for (int64_t j = col_begin; j < col_end; ++j) { y[j] = UnitOfBinaryFunc<T, binary_func>::Val(); }
+  for (int64_t i = 0; i < num_rows; ++i) {
+    const T* row = x + i * num_cols;
+    for (int64_t j = col_begin; j < col_end; ++j) { y[j] = binary_func<T>::Invoke(y[j], row[j]); }
+  }
+}
+
+}  // namespace
+
+template<typename T, template<typename> class binary_func>
+struct NdarrayScalarReduce<DeviceType::kCPU, T, binary_func> final {
+  static bool Matched(const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x) {
+    return y.shape().ElemNum() == 1;
+  }
+
+  static void Reduce(DeviceCtx* ctx, const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x,
+                     const XpuVarNdarray<T>& tmp_storage) {
+    CHECK(Matched(y, x));
+    const int64_t elem_cnt = x.shape().ElemNum();
+    // the blocks are independent of the thread number, so is the result
+    const int64_t block_size = kParallelForDefaultGrainSize;
+    const int64_t block_num = (elem_cnt + block_size - 1) / block_size;
+    std::vector<T> block_reduced(block_num);
+    const T* x_ptr = x.ptr();
+    ParallelFor(0, block_num, 1, [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) {
+        const int64_t offset = i * block_size;
+        block_reduced[i] = ReduceContiguous<T, binary_func>(
+            x_ptr + offset, std::min(block_size, elem_cnt - offset));
+      }
+    });
+    *y.ptr() = ReduceContiguous<T, binary_func>(block_reduced.data(), block_num);
+  }
+};
+
+template<typename T, template<typename> class binary_func>
+struct NdarrayMatrixRowReduce<DeviceType::kCPU, T, binary_func> final {
+  static bool Matched(const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x) {
+    if (x.shape().NumAxes() != 2) { return false; }
+    if (y.shape().NumAxes() != 2) { return false; }
+    return x.shape().At(0) == y.shape().At(0) && y.shape().At(1) == 1;
+  }
+
+  static void Reduce(DeviceCtx* ctx, const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x,
+                     const XpuVarNdarray<T>& tmp_storage) {
+    CHECK(Matched(y, x));
+    const int64_t num_rows = x.shape().At(0);
+    const int64_t num_cols = x.shape().At(1);
+    const T* x_ptr = x.ptr();
+    T* y_ptr = y.ptr();
+    ParallelFor(0, num_rows, ParallelForGrainSize(num_cols), [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) {
+        y_ptr[i] = ReduceContiguous<T, binary_func>(x_ptr + i * num_cols, num_cols);
+      }
+    });
+  }
+};
+
+template<typename T, template<typename> class binary_func>
+struct NdarrayMatrixColReduce<DeviceType::kCPU, T, binary_func> final {
+  static bool Matched(const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x) {
+    if (x.shape().NumAxes() != 2) { return false; }
+    if (y.shape().NumAxes() != 2) { return false; }
+    return y.shape().At(0) == 1 && x.shape().At(1) == y.shape().At(1);
+  }
+
+  static void Reduce(DeviceCtx* ctx, const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x,
+                     const XpuVarNdarray<T>& tmp_storage) {
+    CHECK(Matched(y, x));
+    const int64_t num_rows = x.shape().At(0);
+    const int64_t num_cols = x.shape().At(1);
+    const T* x_ptr = x.ptr();
+    T* y_ptr = y.ptr();
+    ParallelFor(0, num_cols, ParallelForGrainSize(num_rows), [&](int64_t begin, int64_t end) {
+      ReduceMatrixCols<T, binary_func>(x_ptr, y_ptr, num_rows, num_cols, begin, end);
+    });
+  }
+};
+
+template<typename T, template<typename> class binary_func>
+struct NdarrayXYZCubeYReduce<DeviceType::kCPU, T, binary_func> final {
+  static bool Matched(const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x) {
+    if (x.shape().NumAxes() != 3) { return false; }
+    if (y.shape().NumAxes() != 3) { return false; }
+    return x.shape().At(0) == y.shape().At(0) && y.shape().At(1) == 1
+           && x.shape().At(2) == y.shape().At(2);
+  }
+
+  static void Reduce(DeviceCtx* ctx, const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x,
+                     const XpuVarNdarray<T>& tmp_storage) {
+    CHECK(Matched(y, x));
+    const int64_t dim_y = x.shape().At(1);
+    const int64_t dim_z = x.shape().At(2);
+    const T* x_ptr = x.ptr();
+    T* y_ptr = y.ptr();
+    // the (x, z) pairs of y are split, and every range is cut into the column ranges of the
+    // (dim_y, dim_z) matrices of x
+    ParallelFor(0, y.shape().ElemNum(), ParallelForGrainSize(dim_y),
+                [&](int64_t begin, int64_t end) {
+                  int64_t i = begin;
+                  while (i < end) {
+                    const int64_t matrix_id = i / dim_z;
+                    const int64_t matrix_end = std::min(end, (matrix_id + 1) * dim_z);
+                    ReduceMatrixCols<T, binary_func>(
+                        x_ptr + matrix_id * dim_y * dim_z, y_ptr + matrix_id * dim_z, dim_y, dim_z,
+                        i - matrix_id * dim_z, matrix_end - matrix_id * dim_z);
+                    i = matrix_end;
+                  }
+                });
+  }
+};
+
+template<typename T, template<typename> class binary_func>
+struct NdarrayXYZCubeXZReduce<DeviceType::kCPU, T, binary_func> final {
+  static bool Matched(const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x) {
+    if (x.shape().NumAxes() != 3) { return false; }
+    if (y.shape().NumAxes() != 3) { return false; }
+    return y.shape().At(0) == 1 && x.shape().At(1) == y.shape().At(1) && y.shape().At(2) == 1;
   }
-SPECIALIZE_CPU_NDARRAY_REDUCE_IMPL(NdarrayScalarReduce);
-SPECIALIZE_CPU_NDARRAY_REDUCE_IMPL(NdarrayMatrixRowReduce);
-SPECIALIZE_CPU_NDARRAY_REDUCE_IMPL(NdarrayMatrixColReduce);
-SPECIALIZE_CPU_NDARRAY_REDUCE_IMPL(NdarrayXYZCubeYReduce);
-SPECIALIZE_CPU_NDARRAY_REDUCE_IMPL(NdarrayXYZCubeXZReduce);
-#undef SPECIALIZE_CPU_NDARRAY_REDUCE_IMPL
+
+  static void Reduce(DeviceCtx* ctx, const XpuVarNdarray<T>& y, const XpuVarNdarray<const T>& x,
+                     const XpuVarNdarray<T>& tmp_storage) {
+    CHECK(Matched(y, x));
+    const int64_t dim_x = x.shape().At(0);
+    const int64_t dim_y = x.shape().At(1);
+    const int64_t dim_z = x.shape().At(2);
+    const T* x_ptr = x.ptr();
+    T* y_ptr = y.ptr();
+    ParallelFor(0, dim_y, ParallelForGrainSize(dim_x * dim_z), [&](int64_t begin, int64_t end) {
+      for (int64_t j = begin; j < end; ++j) {
+        T reduced = UnitOfBinaryFunc<T, binary_func>::Val();
+        for (int64_t i = 0; i < dim_x; ++i) {
+          reduced = binary_func<T>::Invoke(
+              reduced,
+              ReduceContiguous<T, binary_func>(x_ptr + (i * dim_y + j) * dim_z, dim_z));
+        }
+        y_ptr[j] = reduced;
+      }
+    });
+  }
+};
 
 #define INSTANTIATE_NDARRAY_REDUCE_IMPL(dtype, binary_func)                                       \
   template struct NdarrayScalarReduce<DeviceType::kCPU, OF_PP_PAIR_FIRST(dtype), binary_func>;    \
@@ -16,6 +16,7 @@ limitations under the License.
 #include "oneflow/core/persistence/persistent_in_stream.h"
 #include "oneflow/core/persistence/binary_in_stream_with_local_copy.h"
 #include "oneflow/core/persistence/binary_in_stream_without_local_copy.h"
+#include "oneflow/core/persistence/read_stats.h"
 #include "oneflow/core/job/job_set.pb.h"
 #include <cstring>
 #include "oneflow/core/common/constant.h"
@@ -26,6 +27,12 @@ namespace {
 
 constexpr size_t kDefaultBufferSize = 32 * 1024;  // 32KB
 
+int64_t GetReadAheadDepth(int64_t session_id) {
+  const auto& io_conf = *Global<const IOConf>::Get(session_id);
+  CHECK_GE(io_conf.persistence_read_ahead_depth(), 0);
+  return io_conf.persistence_read_ahead_depth();
+}
+
 size_t GetBufferSize(int64_t session_id) {
   const auto& io_conf = *Global<const IOConf>::Get(session_id);
   if (io_conf.has_persistence_buf_byte()) {
@@ -61,12 +68,46 @@ PersistentInStream::PersistentInStream(int64_t session_id, fs::FileSystem* fs,
   } else {
     stream_scanner_.reset(new AcyclicStreamScanner(fs, streams, offset));
   }
-  buffer_.resize(GetBufferSize(session_id) + 1);
+  const int64_t read_ahead_depth = GetReadAheadDepth(session_id);
+  if (read_ahead_depth > 0) {
+    buffer_.resize(1);
+    StartReadAhead(read_ahead_depth, GetBufferSize(session_id) + 1);
+  } else {
+    buffer_.resize(GetBufferSize(session_id) + 1);
+  }
   cur_buf_begin_ = buffer_.data();
   cur_buf_end_ = buffer_.data();
   *cur_buf_end_ = '\0';
 }
 
+PersistentInStream::~PersistentInStream() {
+  if (read_ahead_thread_.joinable()) {
+    free_read_ahead_buffers_.Close();
+    read_ahead_blocks_.Close();
+    read_ahead_thread_.join();
+  }
+}
+
+void PersistentInStream::StartReadAhead(int64_t depth, size_t buffer_size) {
+  cur_read_ahead_buffer_ = nullptr;
+  is_read_ahead_eof_ = false;
+  // one more buffer than the depth for the block being consumed
+  FOR_RANGE(int64_t, i, 0, depth + 1) {
+    read_ahead_buffers_.emplace_back(new std::vector<char>(buffer_size));
+    free_read_ahead_buffers_.Send(read_ahead_buffers_.back().get());
+  }
+  read_ahead_thread_ = std::thread([this]() {
+    std::vector<char>* buffer = nullptr;
+    while (free_read_ahead_buffers_.Receive(&buffer) == kChannelStatusSuccess) {
+      const uint64_t n = stream_scanner_->UpdateBuffer(buffer);
+      ReadStats::Get()->bytes_read += n;
+      if (read_ahead_blocks_.Send(ReadAheadBlock(buffer, n)) != kChannelStatusSuccess || n == 0) {
+        break;
+      }
+    }
+  });
+}
+
 PersistentInStream::PersistentInStream(fs::FileSystem* fs,
                                        const std::vector<std::string>& file_paths, bool cyclic,
                                        bool with_local_copy)
@@ -122,13 +163,42 @@ int32_t PersistentInStream::ReadFully(char* s, size_t n) {
 
 void PersistentInStream::UpdateBuffer() {
   CHECK_EQ(cur_buf_begin_, cur_buf_end_);
+  if (read_ahead_thread_.joinable()) {
+    UpdateReadAheadBuffer();
+    return;
+  }
+  const double start = GetCurTime();
   uint64_t n = stream_scanner_->UpdateBuffer(&buffer_);
+  ReadStats::Get()->stall_ns += static_cast<int64_t>(GetCurTime() - start);
+  ReadStats::Get()->bytes_read += n;
   cur_buf_begin_ = buffer_.data();
   cur_buf_end_ = buffer_.data() + n;
   *cur_buf_end_ = '\0';
 }
 
-bool PersistentInStream::IsEof() const {
-  return cur_buf_begin_ == cur_buf_end_ && stream_scanner_->IsEof();
+void PersistentInStream::UpdateReadAheadBuffer() {
+  if (is_read_ahead_eof_) { return; }
+  if (cur_read_ahead_buffer_ != nullptr) {
+    CHECK_EQ(free_read_ahead_buffers_.Send(cur_read_ahead_buffer_), kChannelStatusSuccess);
+  }
+  ReadAheadBlock block;
+  const double start = GetCurTime();
+  CHECK_EQ(read_ahead_blocks_.Receive(&block), kChannelStatusSuccess);
+  ReadStats::Get()->stall_ns += static_cast<int64_t>(GetCurTime() - start);
+  cur_read_ahead_buffer_ = block.first;
+  cur_buf_begin_ = block.first->data();
+  cur_buf_end_ = block.first->data() + block.second;
+  *cur_buf_end_ = '\0';
+  is_read_ahead_eof_ = (block.second == 0);
+}
+
+bool PersistentInStream::IsEof() {
+  if (cur_buf_begin_ != cur_buf_end_) { return false; }
+  if (read_ahead_thread_.joinable()) {
+    // the scanner runs ahead of the reader, so look at the next block instead
+    UpdateReadAheadBuffer();
+    return cur_buf_begin_ == cur_buf_end_;
+  }
+  return stream_scanner_->IsEof();
 }
 }  // namespace oneflow
@@ -18,13 +18,17 @@ limitations under the License.
 
 #include "oneflow/core/persistence/file_system.h"
 #include "oneflow/core/persistence/stream_scanner.h"
+#include "oneflow/core/common/channel.h"
 
 namespace oneflow {
 
+// Reads the files as one stream in blocks of IOConf.persistence_buf_byte. If
+// IOConf.persistence_read_ahead_depth is positive, the blocks are read by a read-ahead thread
+// up to that many blocks ahead of the reader.
 class PersistentInStream {
  public:
   OF_DISALLOW_COPY_AND_MOVE(PersistentInStream);
-  virtual ~PersistentInStream() {}
+  virtual ~PersistentInStream();
   PersistentInStream(fs::FileSystem* fs, const std::vector<std::string>& file_paths,
                      uint64_t offset, bool cyclic, bool with_local_copy);
   PersistentInStream(fs::FileSystem* fs, const std::vector<std::string>& file_paths, bool cyclic,
@@ -45,14 +49,25 @@ class PersistentInStream {
   int32_t ReadFully(char* s, size_t n);
 
  private:
-  bool IsEof() const;
+  bool IsEof();
   void UpdateBuffer();
+  void StartReadAhead(int64_t depth, size_t buffer_size);
+  void UpdateReadAheadBuffer();
 
   std::unique_ptr<StreamScanner> stream_scanner_;
 
   std::vector<char> buffer_;
   char* cur_buf_begin_;
   char* cur_buf_end_;
+
+  // a read-ahead buffer and the number of bytes read into it, 0 at eof
+  using ReadAheadBlock = std::pair<std::vector<char>*, uint64_t>;
+  std::vector<std::unique_ptr<std::vector<char>>> read_ahead_buffers_;
+  Channel<std::vector<char>*> free_read_ahead_buffers_;
+  Channel<ReadAheadBlock> read_ahead_blocks_;
+  std::thread read_ahead_thread_;
+  std::vector<char>* cur_read_ahead_buffer_;
+  bool is_read_ahead_eof_;
 };
 
 }  // namespace oneflow
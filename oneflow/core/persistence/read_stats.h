@@ -0,0 +1,52 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_PERSISTENCE_READ_STATS_H_
+#define ONEFLOW_CORE_PERSISTENCE_READ_STATS_H_
+
+#include "oneflow/core/common/util.h"
+
+namespace oneflow {
+
+// Process-wide counters of the data readers, shown by flow.data.read_stats().
+struct ReadStats final {
+  OF_DISALLOW_COPY_AND_MOVE(ReadStats);
+  ReadStats() { Reset(); }
+  ~ReadStats() = default;
+
+  static ReadStats* Get() {
+    static ReadStats stats;
+    return &stats;
+  }
+
+  void Reset() {
+    bytes_read = 0;
+    stall_ns = 0;
+    buffer_pool_hit_num = 0;
+    buffer_pool_miss_num = 0;
+  }
+
+  // bytes read by the persistent in streams and the indexed datasets
+  std::atomic<int64_t> bytes_read;
+  // time the readers waited for the file system, or for the read-ahead thread
+  std::atomic<int64_t> stall_ns;
+  // records whose payload buffer was recycled or newly allocated
+  std::atomic<int64_t> buffer_pool_hit_num;
+  std::atomic<int64_t> buffer_pool_miss_num;
+};
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_PERSISTENCE_READ_STATS_H_
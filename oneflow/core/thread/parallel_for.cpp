@@ -0,0 +1,62 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/thread/parallel_for.h"
+#include "oneflow/core/thread/thread_pool.h"
+#include "oneflow/core/common/balanced_splitter.h"
+#include "oneflow/core/common/blocking_counter.h"
+
+namespace oneflow {
+
+namespace {
+
+thread_local bool in_parallel_for = false;
+
+int64_t ParallelForRangeNum(int64_t elem_cnt, int64_t grain_size) {
+  if (in_parallel_for || Global<ThreadPool>::Get() == nullptr) { return 1; }
+  const int64_t thread_num = Global<ThreadPool>::Get()->thread_num();
+  return std::max<int64_t>(std::min(thread_num, (elem_cnt + grain_size - 1) / grain_size), 1);
+}
+
+}  // namespace
+
+void ParallelFor(int64_t begin, int64_t end, int64_t grain_size,
+                 const std::function<void(int64_t begin, int64_t end)>& func) {
+  if (begin >= end) { return; }
+  CHECK_GT(grain_size, 0);
+  const int64_t range_num = ParallelForRangeNum(end - begin, grain_size);
+  if (range_num == 1) {
+    func(begin, end);
+    return;
+  }
+  BalancedSplitter bs(end - begin, range_num);
+  BlockingCounter bc(range_num - 1);
+  FOR_RANGE(int64_t, range_id, 1, range_num) {
+    const Range range = bs.At(range_id);
+    Global<ThreadPool>::Get()->AddWork([&bc, &func, begin, range] {
+      in_parallel_for = true;
+      func(begin + range.begin(), begin + range.end());
+      in_parallel_for = false;
+      bc.Decrease();
+    });
+  }
+  // the calling thread takes the first range instead of idling until the others are done
+  in_parallel_for = true;
+  func(begin + bs.At(0).begin(), begin + bs.At(0).end());
+  in_parallel_for = false;
+  bc.WaitUntilCntEqualZero();
+}
+
+}  // namespace oneflow
@@ -0,0 +1,40 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_THREAD_PARALLEL_FOR_H_
+#define ONEFLOW_CORE_THREAD_PARALLEL_FOR_H_
+
+#include "oneflow/core/common/util.h"
+
+namespace oneflow {
+
+// the number of cheap operations worth the dispatch of one range to the thread pool
+constexpr int64_t kParallelForDefaultGrainSize = 32768;
+
+// the grain size of the items which cost about item_cost cheap operations each
+inline int64_t ParallelForGrainSize(int64_t item_cost) {
+  return std::max<int64_t>(kParallelForDefaultGrainSize / std::max<int64_t>(item_cost, 1), 1);
+}
+
+// Splits [begin, end) into balanced ranges of at least grain_size items, and calls func on each
+// range, on the threads of Global<ThreadPool> and the calling thread. It returns when all the
+// ranges are done. A ParallelFor nested in func runs on the calling thread, but it must not be
+// called from the other works of Global<ThreadPool>, which would wait for their own thread.
+void ParallelFor(int64_t begin, int64_t end, int64_t grain_size,
+                 const std::function<void(int64_t begin, int64_t end)>& func);
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_THREAD_PARALLEL_FOR_H_
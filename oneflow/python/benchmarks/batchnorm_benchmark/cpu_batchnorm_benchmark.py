@@ -0,0 +1,68 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import numpy as np
+import oneflow.experimental as flow
+
+parser = argparse.ArgumentParser(
+    description="benchmark of the fused cpu BatchNorm2d against the composite of eager ops"
+)
+parser.add_argument(
+    "--shapes",
+    type=str,
+    nargs="+",
+    default=["8x64x56x56", "32x256x14x14", "64x1024x7x7"],
+    help="NCHW shapes of the input",
+)
+parser.add_argument("--iter_num", type=int, default=20)
+parser.add_argument("--warmup_iter_num", type=int, default=3)
+args = parser.parse_args()
+
+
+def _TimeMs(fn, x):
+    for _ in range(args.warmup_iter_num):
+        fn(x).numpy()
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        y = fn(x)
+    # wait for the eager ops to finish
+    y.numpy()
+    return (time.perf_counter() - start) / args.iter_num * 1000
+
+
+def main():
+    print(
+        "{:<16}{:>8}{:>18}{:>14}".format("shape", "mode", "composite(ms)", "fused(ms)")
+    )
+    for shape in args.shapes:
+        shape = tuple(int(dim) for dim in shape.split("x"))
+        x = flow.Tensor(np.random.randn(*shape).astype(np.float32))
+        m = flow.nn.BatchNorm2d(num_features=shape[1])
+        for mode in ["train", "eval"]:
+            m.train(mode == "train")
+            composite_ms = _TimeMs(m._composite_forward, x)
+            fused_ms = _TimeMs(m, x)
+            print(
+                "{:<16}{:>8}{:>18.3f}{:>14.3f}".format(
+                    "x".join(str(dim) for dim in shape), mode, composite_ms, fused_ms
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
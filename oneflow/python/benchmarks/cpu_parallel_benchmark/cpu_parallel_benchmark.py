@@ -0,0 +1,106 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+parser = argparse.ArgumentParser(
+    description="scaling of the cpu kernels with flow.config.compute_thread_pool_size"
+)
+parser.add_argument(
+    "--thread_nums",
+    type=int,
+    nargs="+",
+    default=None,
+    help="the sizes of the compute thread pool, 1 to the number of cpu cores by default",
+)
+parser.add_argument(
+    "--shape", type=str, default="256x128x256", help="shape of the input"
+)
+parser.add_argument("--iter_num", type=int, default=20)
+parser.add_argument(
+    "--thread_num", type=int, default=None, help=argparse.SUPPRESS,
+)
+args = parser.parse_args()
+
+
+def _TimeMs(fn):
+    fn().numpy()
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        y = fn()
+    y.numpy()
+    return (time.perf_counter() - start) / args.iter_num * 1000
+
+
+def _RunWithThreadNum(thread_num):
+    # the size of the pool is fixed when the session starts, so every thread number
+    # runs in a new process
+    import oneflow
+    import oneflow.experimental as flow
+
+    oneflow.config.compute_thread_pool_size(thread_num)
+    flow.enable_eager_execution()
+    shape = tuple(int(d) for d in args.shape.split("x"))
+    x = flow.Tensor(np.random.randn(*shape).astype(np.float32))
+    bias = flow.Tensor(np.random.randn(*shape[1:]).astype(np.float32))
+    layer_norm = flow.nn.LayerNorm(shape[-1])
+    cases = [
+        ("exp", lambda: flow.exp(x)),
+        ("broadcast add", lambda: x + bias),
+        ("sum rows", lambda: flow.sum(x, dim=len(shape) - 1)),
+        ("sum cols", lambda: flow.sum(x, dim=0)),
+        ("sum all", lambda: flow.sum(x)),
+        ("softmax", lambda: flow.softmax(x, dim=len(shape) - 1)),
+        ("layer_norm", lambda: layer_norm(x)),
+    ]
+    return [(name, _TimeMs(fn)) for name, fn in cases]
+
+
+def main():
+    if args.thread_num is not None:
+        print(json.dumps(_RunWithThreadNum(args.thread_num)))
+        return
+    thread_nums = args.thread_nums or list(range(1, os.cpu_count() + 1))
+    times = []
+    for thread_num in thread_nums:
+        output = subprocess.check_output(
+            [sys.executable, __file__, "--thread_num", str(thread_num)]
+            + ["--shape", args.shape, "--iter_num", str(args.iter_num)]
+        )
+        times.append(json.loads(output.decode().strip().split("\n")[-1]))
+    print("shape {}, ms and speedup over {} thread".format(args.shape, thread_nums[0]))
+    print(
+        "{:<16}".format("threads")
+        + "".join("{:>16}".format(thread_num) for thread_num in thread_nums)
+    )
+    for i, (name, baseline) in enumerate(times[0]):
+        print(
+            "{:<16}".format(name)
+            + "".join(
+                "{:>16}".format("{:.3f} ({:.2f}x)".format(t[i][1], baseline / t[i][1]))
+                for t in times
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import numpy as np
+import oneflow.experimental as flow
+
+parser = argparse.ArgumentParser(
+    description="benchmark of flow.utils.data.DataLoader with worker processes "
+    "against loading in the training thread"
+)
+parser.add_argument("--sample_num", type=int, default=2048)
+parser.add_argument("--image_size", type=int, default=224)
+parser.add_argument("--batch_size", type=int, default=64)
+parser.add_argument(
+    "--num_workers",
+    type=int,
+    nargs="+",
+    default=[0, 2, 4, 8],
+    help="0 loads the batches in the training thread",
+)
+parser.add_argument("--prefetch_factor", type=int, default=2)
+parser.add_argument(
+    "--step_ms", type=float, default=0.0, help="the time of a training step to emulate",
+)
+args = parser.parse_args()
+
+
+class _SyntheticImageDataset(flow.utils.data.Dataset):
+    r"""Random uint8 images, which are normalized and flipped like an image pipeline."""
+
+    def __init__(self, sample_num, image_size):
+        self.sample_num = sample_num
+        self.image_size = image_size
+
+    def __len__(self):
+        return self.sample_num
+
+    def __getitem__(self, index):
+        rng = np.random.RandomState(index)
+        image = rng.randint(
+            0, 256, (self.image_size, self.image_size, 3), dtype=np.uint8
+        )
+        image = (image.astype(np.float32) - 127.5) / 58.0
+        if rng.rand() < 0.5:
+            image = image[:, ::-1]
+        return np.ascontiguousarray(image.transpose(2, 0, 1)), index % 1000
+
+
+def _SamplesPerSecond(num_workers):
+    loader = flow.utils.data.DataLoader(
+        _SyntheticImageDataset(args.sample_num, args.image_size),
+        batch_size=args.batch_size,
+        shuffle=True,
+        num_workers=num_workers,
+        prefetch_factor=args.prefetch_factor,
+        persistent_workers=num_workers > 0,
+        drop_last=True,
+    )
+    # the first epoch starts the workers and sizes the shared buffers
+    for _ in loader:
+        pass
+    start = time.perf_counter()
+    sample_num = 0
+    for images, labels in loader:
+        if args.step_ms > 0:
+            time.sleep(args.step_ms / 1000)
+        sample_num += images.shape[0]
+    return sample_num / (time.perf_counter() - start)
+
+
+def main():
+    flow.enable_eager_execution()
+    print("{:>12}{:>16}{:>10}".format("num_workers", "samples/s", "speedup"))
+    baseline = None
+    for num_workers in args.num_workers:
+        throughput = _SamplesPerSecond(num_workers)
+        if baseline is None:
+            baseline = throughput
+        print(
+            "{:>12}{:>16.1f}{:>10.2f}".format(
+                num_workers, throughput, throughput / baseline
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import itertools
+import time
+
+import oneflow as flow
+import oneflow._oneflow_internal
+import oneflow._oneflow_internal.oneflow.core.job.placement as placement_cfg
+import oneflow.python.eager.boxing_util as boxing_util
+import oneflow.python.lib.core.enable_if as enable_if
+from oneflow.python.eager.boxing_hob import BoxingHobContext
+
+parser = argparse.ArgumentParser(
+    description="benchmark of choosing boxing methods from the eager boxing table"
+)
+parser.add_argument("--gpu_num", type=int, default=2)
+parser.add_argument("--iter_num", type=int, default=200)
+args = parser.parse_args()
+
+SBP_PARALLELS = {
+    "S(0)": "split_parallel { axis: 0 }",
+    "B": "broadcast_parallel { }",
+    "P": "partial_sum_parallel { }",
+}
+BLOB_DESC = "shape { dim: 64 dim: 64 } data_type: kFloat is_dynamic: false"
+
+
+def _MakeParallelDescSymbol(symbol_id, device_tag, device_num):
+    parallel_conf = placement_cfg.ParallelConf()
+    parallel_conf.set_device_tag(device_tag)
+    parallel_conf.add_device_name("@0:0-{}".format(device_num - 1))
+    parallel_conf.mutable_hierarchy().add_dim(device_num)
+    return oneflow._oneflow_internal.PlacementSymbol(symbol_id, parallel_conf)
+
+
+def _MakeOpArgParallelAttrs():
+    attrs = []
+    placements = itertools.product(["cpu", "gpu"], sorted({1, args.gpu_num}))
+    for symbol_id, (device_tag, device_num) in enumerate(placements):
+        parallel_desc_symbol = _MakeParallelDescSymbol(
+            symbol_id, device_tag, device_num
+        )
+        for sbp_name, sbp_parallel in SBP_PARALLELS.items():
+            if sbp_name == "P" and device_num == 1:
+                continue
+            attr = oneflow._oneflow_internal.OpArgParallelAttribute(
+                parallel_desc_symbol, sbp_parallel, ""
+            )
+            attrs.append(("{}:{} {}".format(device_tag, device_num, sbp_name), attr))
+    return attrs
+
+
+def _MakeBoxingPairs():
+    blob_attr = oneflow._oneflow_internal.OpArgBlobAttribute(
+        BLOB_DESC, "boxing_dispatch_benchmark/out"
+    )
+    attrs = _MakeOpArgParallelAttrs()
+    pairs = []
+    for (
+        object_id,
+        ((producer_name, producer_attr), (consumer_name, consumer_attr)),
+    ) in enumerate(itertools.product(attrs, attrs)):
+        blob_object = oneflow._oneflow_internal.BlobObject(
+            object_id, producer_attr, blob_attr
+        )
+        pairs.append(
+            (
+                "{} -> {}".format(producer_name, consumer_name),
+                blob_object,
+                consumer_attr,
+            )
+        )
+    return pairs
+
+
+def _Default(get_failed_info, *args, **kwargs):
+    raise NotImplementedError(get_failed_info())
+
+
+def _InterpretedDispatch(blob_object, consumer_attr):
+    return enable_if.unique(
+        boxing_util.conditional_function_table,
+        context=BoxingHobContext(blob_object, consumer_attr),
+        default=_Default,
+    )
+
+
+def _CompiledDispatch(blob_object, consumer_attr):
+    return boxing_util._GetCompiledConditionalFunctionTable()(
+        context=BoxingHobContext(blob_object, consumer_attr), default=_Default,
+    )
+
+
+def _TimeUs(dispatch, blob_object, consumer_attr):
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        dispatch(blob_object, consumer_attr)
+    return (time.perf_counter() - start) / args.iter_num * 1e6
+
+
+def main():
+    flow.enable_eager_execution()
+    flow.config.gpu_device_num(args.gpu_num)
+    flow.env.init()
+    pairs = _MakeBoxingPairs()
+    total_interpreted = 0
+    total_compiled = 0
+    print("{:<32}{:>18}{:>18}".format("boxing", "interpreted(us)", "compiled(us)"))
+    for name, blob_object, consumer_attr in pairs:
+        interpreted = _InterpretedDispatch(blob_object, consumer_attr)
+        compiled = _CompiledDispatch(blob_object, consumer_attr)
+        tables = boxing_util.conditional_function_table
+        # error functions are closures created per dispatch, compare matched ones only
+        if interpreted in tables or compiled in tables:
+            assert interpreted is compiled, name
+        interpreted_us = _TimeUs(_InterpretedDispatch, blob_object, consumer_attr)
+        compiled_us = _TimeUs(_CompiledDispatch, blob_object, consumer_attr)
+        total_interpreted += interpreted_us
+        total_compiled += compiled_us
+        print("{:<32}{:>18.2f}{:>18.2f}".format(name, interpreted_us, compiled_us))
+    print(
+        "{:<32}{:>18.2f}{:>18.2f}".format(
+            "average", total_interpreted / len(pairs), total_compiled / len(pairs),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import numpy as np
+import oneflow.experimental as flow
+import oneflow.python.ops.builtin_ops as builtin_ops
+
+parser = argparse.ArgumentParser(
+    description="benchmark of eager functional APIs with and without the op expr cache"
+)
+parser.add_argument("--shape", type=int, nargs="+", default=[16, 16])
+parser.add_argument("--iter_num", type=int, default=1000)
+parser.add_argument("--warmup_iter_num", type=int, default=100)
+args = parser.parse_args()
+
+
+def _MakeCases():
+    x = flow.Tensor(np.random.randn(*args.shape))
+    y = flow.Tensor(np.random.randn(*args.shape))
+    return [
+        ("add", lambda: flow.add(x, y)),
+        ("sub", lambda: flow.sub(x, y)),
+        ("mul scalar", lambda: flow.mul(x, 2.0)),
+        ("tanh", lambda: flow.tanh(x)),
+        ("sum", lambda: flow.sum(x, dim=0)),
+        ("mean", lambda: flow.mean(x, dim=0)),
+    ]
+
+
+def _TimeUs(fn):
+    for _ in range(args.warmup_iter_num):
+        fn()
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        fn()
+    return (time.perf_counter() - start) / args.iter_num * 1e6
+
+
+def main():
+    cases = _MakeCases()
+    print("{:<16}{:>18}{:>18}".format("op", "uncached(us)", "cached(us)"))
+    for name, fn in cases:
+        builtin_ops._op_expr_cache.SetEnabled(False)
+        uncached_us = _TimeUs(fn)
+        builtin_ops._op_expr_cache.SetEnabled(True)
+        cached_us = _TimeUs(fn)
+        print("{:<16}{:>18.2f}{:>18.2f}".format(name, uncached_us, cached_us))
+    print(flow.op_expr_cache_stats())
+
+
+if __name__ == "__main__":
+    main()
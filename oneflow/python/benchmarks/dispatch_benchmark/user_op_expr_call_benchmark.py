@@ -0,0 +1,94 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import numpy as np
+import oneflow.experimental as flow
+import oneflow._oneflow_internal
+from oneflow.python.framework.attr_util import convert_to_user_attr_value
+
+parser = argparse.ArgumentParser(
+    description="benchmark of calling UserOpExprs on small eager tensors"
+)
+parser.add_argument("--shape", type=int, nargs="+", default=[4, 4])
+parser.add_argument("--iter_num", type=int, default=2000)
+parser.add_argument("--warmup_iter_num", type=int, default=200)
+args = parser.parse_args()
+
+
+def _UnplannedCall(op, *inputs, **kwargs):
+    # user_op_expr_call before the call plans
+    inputs = list(inputs)
+    for i in range(len(inputs)):
+        arg = inputs[i]
+        if isinstance(arg, flow.Tensor):
+            if not arg.is_determined:
+                arg.determine()
+            inputs[i] = arg._local_or_consistent_tensor
+    attrs = oneflow._oneflow_internal.MutableCfgAttrMap()
+    for attr_name, attr_value in kwargs.items():
+        attrs[attr_name] = convert_to_user_attr_value(
+            op.op_type_name, attr_name, attr_value
+        )
+    return op.apply(inputs, attrs)
+
+
+def _PlannedCall(op, *inputs, **kwargs):
+    return op(*inputs, **kwargs)
+
+
+def _MakeCases():
+    x = flow.Tensor(np.random.randn(*args.shape))
+    y = flow.Tensor(np.random.randn(*args.shape))
+    perm = list(reversed(range(len(args.shape))))
+    add = flow.builtin_op("add_n").Input("in", 2).Output("out").Build()
+    mul = flow.builtin_op("multiply").Input("x").Input("y").Output("out").Build()
+    relu = flow.builtin_op("relu").Input("in").Output("out").Build()
+    transpose = (
+        flow.builtin_op("transpose")
+        .Input("input")
+        .Output("output")
+        .Attr("perm", [])
+        .Build()
+    )
+    return [
+        ("add", add, (x, y), {}),
+        ("mul", mul, (x, y), {}),
+        ("relu", relu, (x,), {}),
+        ("transpose", transpose, (x,), {"perm": perm}),
+    ]
+
+
+def _TimeUs(call, op, inputs, kwargs):
+    for _ in range(args.warmup_iter_num):
+        call(op, *inputs, **kwargs)
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        call(op, *inputs, **kwargs)
+    return (time.perf_counter() - start) / args.iter_num * 1e6
+
+
+def main():
+    print("{:<16}{:>18}{:>18}".format("op", "unplanned(us)", "planned(us)"))
+    for name, op, inputs, kwargs in _MakeCases():
+        unplanned_us = _TimeUs(_UnplannedCall, op, inputs, kwargs)
+        planned_us = _TimeUs(_PlannedCall, op, inputs, kwargs)
+        print("{:<16}{:>18.2f}{:>18.2f}".format(name, unplanned_us, planned_us))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import numpy as np
+import oneflow.experimental as flow
+
+parser = argparse.ArgumentParser(
+    description="benchmark of the one pass flow.var against mean(x^2) - mean(x)^2"
+)
+parser.add_argument(
+    "--shapes",
+    type=str,
+    nargs="+",
+    default=["4096x4096", "64x256x56x56"],
+    help="shapes of the input",
+)
+parser.add_argument(
+    "--dims",
+    type=str,
+    nargs="+",
+    default=["1", "0,2,3"],
+    help="the axes to reduce of every shape",
+)
+parser.add_argument("--mean", type=float, default=1000.0, help="mean of the input")
+parser.add_argument("--iter_num", type=int, default=10)
+args = parser.parse_args()
+
+
+def _CompositeVariance(x, dim):
+    # flow.var before the moments op
+    return flow.sub(flow.mean(flow.square(x), dim), flow.square(flow.mean(x, dim)))
+
+
+def _OnePassVariance(x, dim):
+    return flow.var(x, dim)
+
+
+def _TimeMs(fn, x, dim):
+    fn(x, dim).numpy()
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        y = fn(x, dim)
+    y.numpy()
+    return (time.perf_counter() - start) / args.iter_num * 1000
+
+
+def main():
+    assert len(args.shapes) == len(args.dims)
+    print(
+        "{:<16}{:>10}{:>16}{:>16}{:>16}{:>16}".format(
+            "shape",
+            "dims",
+            "composite(ms)",
+            "one pass(ms)",
+            "composite err",
+            "one pass err",
+        )
+    )
+    for shape, dims in zip(args.shapes, args.dims):
+        shape = tuple(int(d) for d in shape.split("x"))
+        dim = [int(d) for d in dims.split(",")]
+        np_x = (np.random.randn(*shape) + args.mean).astype(np.float32)
+        np_var = np.var(np_x.astype(np.float64), tuple(dim))
+        x = flow.Tensor(np_x)
+        errs = []
+        times = []
+        for fn in [_CompositeVariance, _OnePassVariance]:
+            times.append(_TimeMs(fn, x, dim))
+            errs.append(np.max(np.abs(fn(x, dim).numpy() - np_var) / np_var))
+        print(
+            "{:<16}{:>10}{:>16.3f}{:>16.3f}{:>16.2e}{:>16.2e}".format(
+                "x".join(str(d) for d in shape), dims, *times, *errs
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
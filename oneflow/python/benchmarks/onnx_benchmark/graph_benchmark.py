@@ -0,0 +1,95 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from onnx import TensorProto
+
+from oneflow.python.onnx import optimizer
+from oneflow.python.onnx.graph import Graph
+
+parser = argparse.ArgumentParser(
+    description="benchmark of the onnx export passes on a synthetic graph"
+)
+parser.add_argument("--node_num", type=int, default=50000)
+parser.add_argument(
+    "--identity_prob",
+    type=float,
+    default=0.5,
+    help="probability of a block having an Identity, which the optimizer removes",
+)
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+
+SHAPE = [8, 128, 768]
+
+
+def _MakeNode(g, op_type, inputs):
+    return g.MakeNode(op_type, inputs, shapes=[SHAPE], dtypes=[TensorProto.FLOAT])
+
+
+def _BuildGraph():
+    r"""Builds a stack of residual blocks like a transformer, every block is
+    x -> MatMul -> (Identity) -> Relu -> Add(x, .), with the nodes inserted in a
+    random order as the converted oneflow ops are.
+    """
+    g = Graph([], None, output_shapes={}, dtypes={})
+    x = _MakeNode(g, "Relu", []).output_tensor_names[0]
+    weights = [
+        g.MakeConst(
+            "weight_{}".format(i), np.zeros((1,), dtype=np.float32)
+        ).output_tensor_names[0]
+        for i in range(4)
+    ]
+    for i in range(int(args.node_num / (3 + args.identity_prob))):
+        y = _MakeNode(g, "MatMul", [x, weights[i % 4]]).output_tensor_names[0]
+        if random.random() < args.identity_prob:
+            y = _MakeNode(g, "Identity", [y]).output_tensor_names[0]
+        y = _MakeNode(g, "Relu", [y]).output_tensor_names[0]
+        x = _MakeNode(g, "Add", [x, y]).output_tensor_names[0]
+    g.AddGraphOutput(x)
+    nodes = g.get_nodes()
+    random.shuffle(nodes)
+    g.ResetNodes(nodes)
+    return g
+
+
+def _Time(name, fn):
+    start = time.perf_counter()
+    ret = fn()
+    print("{}: {:.3f}s".format(name, time.perf_counter() - start))
+    return ret
+
+
+def main():
+    random.seed(args.seed)
+    g = _Time("build", _BuildGraph)
+    print("node num: {}".format(len(g.get_nodes())))
+    _Time("topological sort", lambda: g.TopologicalSort(g.get_nodes()))
+    outputs = [out for node in g.get_nodes() for out in node.output_tensor_names]
+    _Time(
+        "find output consumers",
+        lambda: [g.FindOutputConsumers(out) for out in outputs],
+    )
+    g = _Time("optimize", lambda: optimizer.OptimizeGraph(g))
+    print("node num after optimization: {}".format(len(g.get_nodes())))
+    _Time("delete unused nodes", lambda: g.DeleteUnusedNodes(g.outputs))
+
+
+if __name__ == "__main__":
+    main()
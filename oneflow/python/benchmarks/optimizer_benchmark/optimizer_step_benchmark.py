@@ -0,0 +1,87 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import numpy as np
+import oneflow.experimental as flow
+from oneflow.python.nn.parameter import Parameter
+
+parser = argparse.ArgumentParser(
+    description="benchmark of per-parameter and multi-tensor optimizer steps"
+)
+parser.add_argument("--device", type=str, default="cuda")
+parser.add_argument("--param_num", type=int, default=200)
+parser.add_argument("--param_size", type=int, default=1024)
+parser.add_argument("--warmup_num", type=int, default=5)
+parser.add_argument("--iter_num", type=int, default=50)
+args = parser.parse_args()
+
+OPTIMIZERS = {
+    "SGD": lambda params, foreach: flow.optim.SGD(params, lr=0.1, foreach=foreach),
+    "SGD(momentum)": lambda params, foreach: flow.optim.SGD(
+        params, lr=0.1, momentum=0.9, foreach=foreach
+    ),
+    "Adam": lambda params, foreach: flow.optim.Adam(params, foreach=foreach),
+    "AdamW": lambda params, foreach: flow.optim.AdamW(params, foreach=foreach),
+    "RMSprop": lambda params, foreach: flow.optim.RMSprop(params, foreach=foreach),
+}
+
+
+def _MakeParameters():
+    device = flow.device(args.device)
+    params = []
+    for _ in range(args.param_num):
+        value = np.random.uniform(size=(args.param_size,)).astype(np.float32)
+        params.append(Parameter(flow.Tensor(value, device=device)))
+    # the gradients are kept across steps, only the update ops are timed
+    loss = flow.sum(params[0])
+    for param in params[1:]:
+        loss = loss + flow.sum(param)
+    loss.backward()
+    return params
+
+
+def _StepMs(make_optimizer, foreach):
+    params = _MakeParameters()
+    optimizer = make_optimizer((param for param in params), foreach)
+    for _ in range(args.warmup_num):
+        optimizer.step()
+    params[0].numpy()
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        optimizer.step()
+    # wait for the last update to finish
+    params[-1].numpy()
+    return (time.perf_counter() - start) / args.iter_num * 1e3
+
+
+def main():
+    flow.enable_eager_execution()
+    print(
+        "{} parameters of {} elements on {}".format(
+            args.param_num, args.param_size, args.device
+        )
+    )
+    print("{:<16}{:>20}{:>20}".format("optimizer", "per-param(ms)", "foreach(ms)"))
+    for name, make_optimizer in OPTIMIZERS.items():
+        per_param_ms = _StepMs(make_optimizer, False)
+        foreach_ms = _StepMs(make_optimizer, True)
+        print("{:<16}{:>20.3f}{:>20.3f}".format(name, per_param_ms, foreach_ms))
+
+
+if __name__ == "__main__":
+    main()
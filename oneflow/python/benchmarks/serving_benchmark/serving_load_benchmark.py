@@ -0,0 +1,250 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+CNN_BENCHMARK_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "cnn_benchmark"
+)
+IMAGE_SIZES = {"alexnet": 227, "resnet50": 224}
+
+
+def _ParseArgs():
+    parser = argparse.ArgumentParser(
+        description="load generator of flow.serving.InferenceServer"
+    )
+    parser.add_argument("--model", type=str, default="alexnet", choices=IMAGE_SIZES)
+    parser.add_argument(
+        "--saved_model_dir",
+        type=str,
+        default=None,
+        help="serve this saved model instead of a randomly initialized --model",
+    )
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--device_tag", type=str, default="cpu")
+    parser.add_argument("--max_in_flight_runs", type=int, default=4)
+    parser.add_argument(
+        "--mode",
+        type=str,
+        default="closed",
+        choices=["closed", "open"],
+        help="closed: --concurrency clients send a request once the last one "
+        "returns; open: requests arrive as a poisson process of --rate per second",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=20.0)
+    parser.add_argument("--warmup_s", type=float, default=3.0)
+    parser.add_argument("--duration_s", type=float, default=20.0)
+    return parser.parse_args()
+
+
+def _SaveRandomModel(model, batch_size, saved_model_dir):
+    import oneflow as flow
+
+    sys.path.insert(0, CNN_BENCHMARK_DIR)
+    from alexnet_model import alexnet
+    from resnet_model import resnet50
+
+    image_size = IMAGE_SIZES[model]
+    net = {"alexnet": alexnet, "resnet50": resnet50}[model]
+    input_lbns = {}
+    output_lbns = {}
+
+    func_config = flow.FunctionConfig()
+    func_config.default_logical_view(flow.scope.consistent_view())
+
+    @flow.global_function(type="predict", function_config=func_config)
+    def serving_inference(
+        image: flow.typing.Numpy.Placeholder(
+            (batch_size, 3, image_size, image_size), dtype=flow.float32
+        )
+    ) -> flow.typing.Numpy:
+        input_lbns["image"] = image.logical_blob_name
+        output = net(image, trainable=False)
+        output_lbns["output"] = output.logical_blob_name
+        return output
+
+    saved_model_builder = flow.saved_model.ModelBuilder(saved_model_dir)
+    signature_builder = (
+        saved_model_builder.ModelName(model)
+        .Version(1)
+        .AddFunction(serving_inference)
+        .AddSignature("predict")
+    )
+    for input_name, lbn in input_lbns.items():
+        signature_builder.Input(input_name, lbn)
+    for output_name, lbn in output_lbns.items():
+        signature_builder.Output(output_name, lbn)
+    saved_model_builder.Save()
+    flow.clear_default_session()
+
+
+def _ServerMain(args, conn):
+    import oneflow as flow
+    import oneflow.python.framework.dtype as dtype_util
+
+    if args.device_tag == "cpu":
+        flow.config.cpu_device_num(1)
+        flow.config.gpu_device_num(0)
+    saved_model_dir = args.saved_model_dir
+    if saved_model_dir is None:
+        saved_model_dir = os.path.join(tempfile.mkdtemp(), args.model)
+        _SaveRandomModel(args.model, args.batch_size, saved_model_dir)
+
+    option = flow.serving.SessionOption()
+    option.device_tag = args.device_tag
+    option.max_in_flight_runs = args.max_in_flight_runs
+    sess = flow.serving.InferenceSession(option)
+    sess.load_saved_model(saved_model_dir)
+    sess.launch()
+    job_name = sess.list_jobs()[0]
+    inputs = {}
+    for input_name in sess.list_inputs():
+        info = sess.input_info(input_name, job_name)
+        dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])
+        inputs[input_name] = (tuple(info["shape"]), np.dtype(dtype).str)
+    server = flow.serving.InferenceServer(sess)
+    server.start()
+    conn.send((server.port, job_name, inputs))
+    server.serve_forever()
+
+
+def _Percentile(latencies, q):
+    return np.percentile(latencies, q) * 1000 if len(latencies) > 0 else 0.0
+
+
+class _Stats(object):
+    def __init__(self, start_time, end_time):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.latencies = []
+        self.errors = 0
+
+    def Record(self, send_time, finish_time, ok):
+        if send_time < self.start_time or send_time >= self.end_time:
+            return
+        if ok:
+            self.latencies.append(finish_time - send_time)
+        else:
+            self.errors += 1
+
+
+async def _Request(client, job_name, inputs, stats, send_time):
+    try:
+        await client.run(job_name, **inputs)
+        ok = True
+    except Exception:
+        ok = False
+    stats.Record(send_time, time.perf_counter(), ok)
+
+
+async def _ClosedLoop(client, job_name, inputs, stats, args):
+    async def Worker():
+        while time.perf_counter() < stats.end_time:
+            await _Request(client, job_name, inputs, stats, time.perf_counter())
+
+    await asyncio.gather(*[Worker() for _ in range(args.concurrency)])
+
+
+async def _OpenLoop(client, job_name, inputs, stats, args):
+    # the latency of a request starts at its scheduled arrival rather than when it
+    # is actually sent, so that a slow server can't hide its queueing delay
+    tasks = []
+    next_send_time = time.perf_counter()
+    while next_send_time < stats.end_time:
+        delay = next_send_time - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(
+            asyncio.ensure_future(
+                _Request(client, job_name, inputs, stats, next_send_time)
+            )
+        )
+        next_send_time += random.expovariate(args.rate)
+    await asyncio.gather(*tasks)
+
+
+async def _RunLoad(port, job_name, input_specs, args):
+    import oneflow as flow
+
+    inputs = {
+        name: np.random.rand(*shape).astype(dtype)
+        for name, (shape, dtype) in input_specs.items()
+    }
+    client = flow.serving.InferenceClient()
+    await client.connect("127.0.0.1", port)
+    start_time = time.perf_counter() + args.warmup_s
+    stats = _Stats(start_time, start_time + args.duration_s)
+    if args.mode == "closed":
+        await _ClosedLoop(client, job_name, inputs, stats, args)
+    else:
+        await _OpenLoop(client, job_name, inputs, stats, args)
+    await client.close()
+    return stats
+
+
+def main():
+    args = _ParseArgs()
+    ctx = multiprocessing.get_context("spawn")
+    conn, child_conn = ctx.Pipe()
+    server_process = ctx.Process(target=_ServerMain, args=(args, child_conn))
+    server_process.start()
+    port, job_name, input_specs = conn.recv()
+
+    loop = asyncio.get_event_loop()
+    stats = loop.run_until_complete(_RunLoad(port, job_name, input_specs, args))
+    server_process.terminate()
+    server_process.join()
+
+    completed = len(stats.latencies)
+    print(
+        "model: {}, batch size: {}, device: {}, mode: {}".format(
+            args.saved_model_dir or args.model,
+            args.batch_size,
+            args.device_tag,
+            "closed, concurrency {}".format(args.concurrency)
+            if args.mode == "closed"
+            else "open, rate {}/s".format(args.rate),
+        )
+    )
+    print(
+        "requests: {}, errors: {}, throughput: {:.2f} req/s, {:.2f} samples/s".format(
+            completed,
+            stats.errors,
+            completed / args.duration_s,
+            completed * args.batch_size / args.duration_s,
+        )
+    )
+    print(
+        "latency(ms) mean: {:.3f}, p50: {:.3f}, p90: {:.3f}, p99: {:.3f}".format(
+            np.mean(stats.latencies) * 1000 if completed > 0 else 0.0,
+            _Percentile(stats.latencies, 50),
+            _Percentile(stats.latencies, 90),
+            _Percentile(stats.latencies, 99),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,13 @@ class ComposeHob(BoolFunctor):
             self._GetRhsContext(ctx)
         )
 
+    def _Compile(self):
+        lhs = self.lhs_hob_._Compile()
+        rhs = self.rhs_hob_._Compile()
+        return lambda ctx, memo: lhs(self._GetLhsContext(ctx), memo) and rhs(
+            self._GetRhsContext(ctx), memo
+        )
+
     def _GetLhsContext(self, ctx):
         if self not in ctx.composer2lhs_context:
             blob_object = oneflow._oneflow_internal.BlobObject(
@@ -35,12 +35,26 @@ import oneflow
 import oneflow._oneflow_internal.oneflow.core.job.placement as placement_cfg
 import oneflow._oneflow_internal.oneflow.core.common.shape as shape_proto_cfg
 import oneflow._oneflow_internal
+from oneflow.python.oneflow_export import oneflow_export
 
 
 def BoxingTo(builder, produced_blob_object, consumer_op_arg_parallel_attr):
+    if not _boxing_dispatch_cache.enabled:
+        function = _GetBoxingMethod(produced_blob_object, consumer_op_arg_parallel_attr)
+        return function(builder, produced_blob_object, consumer_op_arg_parallel_attr)
+    # device tags are part of the parallel descs in op_arg_parallel_attrs
+    key = (produced_blob_object.op_arg_parallel_attr, consumer_op_arg_parallel_attr)
+    function = _boxing_dispatch_cache.Get(key)
+    if function is None:
+        function = _GetBoxingMethod(produced_blob_object, consumer_op_arg_parallel_attr)
+        _boxing_dispatch_cache.Put(key, function)
+    return function(builder, produced_blob_object, consumer_op_arg_parallel_attr)
+
+
+def _GetBoxingMethod(produced_blob_object, consumer_op_arg_parallel_attr):
     hob_context = BoxingHobContext(produced_blob_object, consumer_op_arg_parallel_attr)
     if enable_if.get_condition_hob(NoBoxing)(hob_context):
-        return produced_blob_object
+        return _ReturnProducedBlobObject
 
     producer_opt_mirrored_parallel = (
         produced_blob_object.op_arg_parallel_attr.opt_mirrored_parallel
@@ -66,13 +80,91 @@ def BoxingTo(builder, produced_blob_object, consumer_op_arg_parallel_attr):
             )
         )
 
-    global conditional_function_table
-    function = enable_if.unique(
-        conditional_function_table,
+    return _GetCompiledConditionalFunctionTable()(
         context=BoxingHobContext(produced_blob_object, consumer_op_arg_parallel_attr),
         default=default,
     )
-    return function(builder, produced_blob_object, consumer_op_arg_parallel_attr)
+
+
+_compiled_conditional_function_table = None
+
+
+def _GetCompiledConditionalFunctionTable():
+    global _compiled_conditional_function_table
+    if _compiled_conditional_function_table is None:
+        _compiled_conditional_function_table = enable_if.compile_unique(
+            conditional_function_table
+        )
+    return _compiled_conditional_function_table
+
+
+def _ReturnProducedBlobObject(
+    builder, produced_blob_object, consumer_op_arg_parallel_attr
+):
+    return produced_blob_object
+
+
+class BoxingDispatchCache(object):
+    r"""Boxing methods chosen by BoxingTo, keyed by the producer's and the
+    consumer's op_arg_parallel_attr. Only methods in
+    conditional_function_table are cached, failures are re-evaluated every
+    time so that their error messages stay accurate.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.key2function_ = {}
+        self.hit_cnt_ = 0
+        self.miss_cnt_ = 0
+
+    def Get(self, key):
+        function = self.key2function_.get(key)
+        if function is None:
+            self.miss_cnt_ += 1
+        else:
+            self.hit_cnt_ += 1
+        return function
+
+    def Put(self, key, function):
+        if function is _ReturnProducedBlobObject or any(
+            function is f for f in conditional_function_table
+        ):
+            self.key2function_[key] = function
+
+    def Clear(self):
+        self.key2function_.clear()
+        self.hit_cnt_ = 0
+        self.miss_cnt_ = 0
+
+    def Stats(self):
+        return {
+            "enabled": self.enabled,
+            "size": len(self.key2function_),
+            "hit": self.hit_cnt_,
+            "miss": self.miss_cnt_,
+        }
+
+
+_boxing_dispatch_cache = BoxingDispatchCache()
+
+
+@oneflow_export("experimental.enable_boxing_dispatch_cache")
+def api_enable_boxing_dispatch_cache(val: bool = True) -> None:
+    r"""Whether to cache the boxing method chosen for every pair of producer
+    and consumer parallel attributes in eager mode. It is enabled by
+    default, disable it to evaluate all boxing conditions on every boxing
+    when debugging boxing methods.
+    """
+    _boxing_dispatch_cache.enabled = val
+    _boxing_dispatch_cache.Clear()
+
+
+@oneflow_export("experimental.boxing_dispatch_cache_stats")
+def api_boxing_dispatch_cache_stats() -> dict:
+    r"""Return a dict of whether the boxing dispatch cache is enabled, the
+    number of cached boxing methods and the number of cache hits and misses.
+    """
+    return _boxing_dispatch_cache.Stats()
 
 
 def boxing_condition(hob_expr, verbose=False):
@@ -0,0 +1,214 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import hashlib
+import os
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from oneflow.python.oneflow_export import oneflow_export
+
+_HASH_CHUNK_SIZE = 1 << 20
+_HASH_FILE_SUFFIX = ".sha256"
+_CACHE_DIR_SUFFIX = ".cache"
+_MANIFEST_FILE_NAME = "MANIFEST"
+
+
+def get_sha256hash(file_path, Bytes=_HASH_CHUNK_SIZE):
+    sha256hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            data = f.read(Bytes)
+            if data:
+                sha256hash.update(data)
+            else:
+                break
+    return sha256hash.hexdigest()
+
+
+def _file_stamp(file_path):
+    # a file is taken as unchanged as long as its size and mtime are
+    stat = os.stat(file_path)
+    return "{} {}".format(stat.st_size, stat.st_mtime_ns)
+
+
+def _write_file_atomically(file_path, write_fn):
+    tmp_path = "{}.tmp{}".format(file_path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as f:
+            write_fn(f)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def verify_sha256hash(file_path, sha256):
+    r"""Checks the sha256 of a file. The verified hash is recorded in the sidecar file
+    "<file_path>.sha256" with the stamp of the file, so the file is not hashed again
+    until it changes. The hash is not recorded if the sidecar file can't be written,
+    e.g. in a read-only directory.
+    """
+    hash_path = file_path + _HASH_FILE_SUFFIX
+    stamp = _file_stamp(file_path)
+    if os.path.isfile(hash_path):
+        with open(hash_path) as f:
+            if f.read().split("\n") == [stamp, sha256]:
+                return
+    if get_sha256hash(file_path) != sha256:
+        raise Exception(
+            "sha256 verification failed, remove {0} and try again".format(file_path)
+        )
+    try:
+        _write_file_atomically(
+            hash_path, lambda f: f.write("{}\n{}".format(stamp, sha256).encode())
+        )
+    except OSError:
+        pass
+
+
+def _build_npy_cache(file_path, cache_dir, stamp):
+    with np.load(file_path) as f:
+        keys = list(f.keys())
+        for key in keys:
+            array = f[key]
+            _write_file_atomically(
+                os.path.join(cache_dir, key + ".npy"),
+                lambda npy_file: np.save(npy_file, array),
+            )
+    # the manifest is written last, so a cache is complete iff its manifest is valid
+    _write_file_atomically(
+        os.path.join(cache_dir, _MANIFEST_FILE_NAME),
+        lambda f: f.write("\n".join([stamp] + keys).encode()),
+    )
+    return keys
+
+
+def _load_npy_cache_keys(cache_dir, stamp):
+    manifest_path = os.path.join(cache_dir, _MANIFEST_FILE_NAME)
+    if not os.path.isfile(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        lines = f.read().split("\n")
+    if lines[0] != stamp:
+        return None
+    return lines[1:]
+
+
+@oneflow_export("data.load_cached_dataset")
+def load_cached_dataset(
+    file_path: str, sha256: Optional[str] = None, cache_dir: Optional[str] = None
+) -> Dict[str, np.ndarray]:
+    r"""Loads the arrays of a npz or npy file as read-only memory-mapped arrays.
+
+    The arrays of a npz file are decoded to npy files in the cache directory by the
+    first call, and the later calls map the npy files, so the arrays are read from
+    disk as they are used. The cache is rebuilt when the npz file changes. A npy file
+    is mapped in place. If the cache directory can't be written, e.g. it is in a
+    read-only directory, the arrays of a npz file are loaded into memory instead.
+
+    Args:
+        file_path (str): path to the npz or npy file.
+        sha256 (str, optional): the sha256 of the file to verify. The verification is
+            recorded in "<file_path>.sha256", so the file is hashed only once. Defaults to None.
+        cache_dir (str, optional): directory of the decoded arrays of a npz file.
+            Defaults to "<file_path>.cache".
+
+    Returns:
+        Dict[str, np.ndarray]: the arrays of a npz file by their names, or the array
+        of a npy file by the name of the file without the extension.
+
+    For example:
+
+    .. code-block:: python
+
+        import oneflow as flow
+
+        arrays = flow.data.load_cached_dataset("mnist.npz")
+        train_images = flow.data.ArrayBatches(
+            arrays["x_train"], 100, transform=lambda x: x.astype("float32") / 255.0
+        )
+
+    """
+    if sha256 is not None:
+        verify_sha256hash(file_path, sha256)
+    if not file_path.endswith(".npz"):
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        return {name: np.load(file_path, mmap_mode="r")}
+    if cache_dir is None:
+        cache_dir = file_path + _CACHE_DIR_SUFFIX
+    stamp = _file_stamp(file_path)
+    keys = _load_npy_cache_keys(cache_dir, stamp)
+    if keys is None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            keys = _build_npy_cache(file_path, cache_dir, stamp)
+        except OSError:
+            with np.load(file_path) as f:
+                return {key: f[key] for key in f.keys()}
+    return {
+        key: np.load(os.path.join(cache_dir, key + ".npy"), mmap_mode="r")
+        for key in keys
+    }
+
+
+@oneflow_export("data.ArrayBatches")
+class ArrayBatches(object):
+    r"""The batches of an array along its first dimension, which are sliced and
+    transformed when they are accessed. So the transform such as the normalization
+    runs on a batch at a time, and a memory-mapped array is read batch by batch.
+
+    Args:
+        array (np.ndarray): the array to batch.
+        batch_size (int): size of the batches.
+        transform (Callable[[np.ndarray], np.ndarray], optional): applied to every
+            batch. Defaults to None.
+        drop_last (bool, optional): drop the last batch if it is smaller than
+            batch_size. Otherwise the last batch holds the remainder. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        array: np.ndarray,
+        batch_size: int,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        drop_last: bool = False,
+    ):
+        assert batch_size > 0
+        self.array = array
+        self.batch_size = batch_size
+        self.transform = transform
+        self.drop_last = drop_last
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.array) // self.batch_size
+        return (len(self.array) + self.batch_size - 1) // self.batch_size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("batch index out of range")
+        batch = self.array[index * self.batch_size : (index + 1) * self.batch_size]
+        if self.transform is not None:
+            return self.transform(batch)
+        return np.asarray(batch)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
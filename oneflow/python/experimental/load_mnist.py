@@ -14,25 +14,15 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import os
-import hashlib
 import numpy as np
 from tqdm import tqdm
 import requests
 
 from oneflow.python.oneflow_export import oneflow_export
-
-
-def get_sha256hash(file_path, Bytes=1024):
-    sha256hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        while True:
-            data = f.read(Bytes)
-            if data:
-                sha256hash.update(data)
-            else:
-                break
-    ret = sha256hash.hexdigest()
-    return ret
+from oneflow.python.experimental.dataset_cache import (
+    ArrayBatches,
+    load_cached_dataset,
+)
 
 
 def download_mnist_file(out_path, url):
@@ -47,16 +37,11 @@ def download_mnist_file(out_path, url):
         print("Done!")
 
 
-def get_mnist_file(sha256, url, out_dir):
+def get_mnist_file(url, out_dir):
     path = os.path.join(out_dir, "mnist.npz")
     if not (os.path.isfile(path)):
         download_mnist_file(path, url)
     print("File mnist.npz already exist, path:", path)
-    if not get_sha256hash(path) == sha256:
-        cheksum_fail = "sha256 verification failed, remove {0} and try again".format(
-            path
-        )
-        raise Exception(cheksum_fail)
     return path
 
 
@@ -68,10 +53,15 @@ def load_mnist(
     url="https://oneflow-public.oss-cn-beijing.aliyuncs.com/datasets/mnist.npz",
     hash_check="63d4344077849053dc3036b247fa012b2b381de53fd055a66b539dffd76cf08e",
     out_dir=".",
+    drop_last=False,
 ):
     r"""Load mnist dataset, return images and labels,
             if  dataset doesn't exist, then download it to directory that out_dir specified
 
+    The hash of mnist.npz is verified once, and its arrays are decoded to a cache
+    next to it, which is memory-mapped by the later calls. The batches are
+    normalized when they are accessed.
+
     Args:
         train_batch_size (int, optional): batch size for train. Defaults to 100.
         test_batch_size (int, optional): batch size for test or evaluate. Defaults to 100.
@@ -79,27 +69,36 @@ def load_mnist(
         url (str, optional): url to get mnist.npz. Defaults to "https://oneflow-public.oss-cn-beijing.aliyuncs.com/datasets/mnist.npz".
         hash_check (str, optional): file hash value. Defaults to "63d4344077849053dc3036b247fa012b2b381de53fd055a66b539dffd76cf08e".
         out_dir (str, optional): dir to save downloaded file. Defaults to "./".
+        drop_last (bool, optional): drop the last batch if it is smaller than the batch size, otherwise keep it. Defaults to False.
 
     Returns:
-        [type]: (train_images, train_labels), (test_images, test_labels)
+        [type]: (train_images, train_labels), (test_images, test_labels), which are
+        sequences of batches as flow.data.ArrayBatches
     """
 
-    path = get_mnist_file(hash_check, url, out_dir)
-    with np.load(path, allow_pickle=True) as f:
-        x_train, y_train = f["x_train"], f["y_train"]
-        x_test, y_test = f["x_test"], f["y_test"]
+    path = get_mnist_file(url, out_dir)
+    arrays = load_cached_dataset(path, sha256=hash_check)
 
-    def normalize(x, y, batch_size):
+    def normalize_images(x):
         x = x.astype(np.float32) / 255.0
-        y = y.astype(np.int32)
         if data_format == "NCHW":
-            images = x.reshape((-1, batch_size, 1, x.shape[1], x.shape[2]))
+            return x.reshape((-1, 1, x.shape[1], x.shape[2]))
         else:
-            images = x.reshape((-1, batch_size, x.shape[1], x.shape[2], 1))
-        labels = y.reshape((-1, batch_size))
+            return x.reshape((-1, x.shape[1], x.shape[2], 1))
+
+    def normalize_labels(y):
+        return y.astype(np.int32)
+
+    def batches(x, y, batch_size):
+        images = ArrayBatches(x, batch_size, normalize_images, drop_last)
+        labels = ArrayBatches(y, batch_size, normalize_labels, drop_last)
         return images, labels
 
-    train_images, train_labels = normalize(x_train, y_train, train_batch_size)
-    test_images, test_labels = normalize(x_test, y_test, test_batch_size)
+    train_images, train_labels = batches(
+        arrays["x_train"], arrays["y_train"], train_batch_size
+    )
+    test_images, test_labels = batches(
+        arrays["x_test"], arrays["y_test"], test_batch_size
+    )
 
     return (train_images, train_labels), (test_images, test_labels)
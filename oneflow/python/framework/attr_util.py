@@ -43,10 +43,30 @@ def SetAttrValue(attr_value, py_value, default_attr_value):
         )
 
 
+def make_attr_value_key(attr_value):
+    r"""Returns a hashable key of an attribute value, which tells True from 1 and
+    1 from 1.0 and turns lists into tuples. Raises TypeError if the value is
+    unhashable.
+    """
+    if isinstance(attr_value, (list, tuple)):
+        return (type(attr_value), tuple(make_attr_value_key(x) for x in attr_value))
+    key = (type(attr_value), attr_value)
+    hash(key)
+    return key
+
+
 def convert_to_user_attr_value(op_type_name, attr_name, attr_value):
-    attribute = user_op_attr_cfg.AttrValue()
     assert isinstance(attr_name, str)
     attr_type = oneflow._oneflow_internal.GetUserOpAttrType(op_type_name, attr_name)
+    return convert_to_user_attr_value_by_type(attr_type, attr_value)
+
+
+def convert_to_user_attr_value_by_type(attr_type, attr_value):
+    r"""Converts `attr_value` to an AttrValue of `attr_type`, which callers
+    converting the same attribute many times may resolve once by
+    GetUserOpAttrType.
+    """
+    attribute = user_op_attr_cfg.AttrValue()
     if attr_type == user_op_attr_cfg.kAtInt32:
         assert isinstance(attr_value, int)
         attribute.set_at_int32(attr_value)
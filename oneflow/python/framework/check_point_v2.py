@@ -13,7 +13,15 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import collections
+import collections.abc
+import concurrent.futures
+import fnmatch
 import os
+import shutil
+import struct
+import threading
+import time
 
 import numpy as np
 from google.protobuf import text_format
@@ -42,13 +50,40 @@ from oneflow.python.oneflow_export import oneflow_export
 import oneflow._oneflow_internal.oneflow.core.register.logical_blob_id as lbi_util
 import oneflow._oneflow_internal
 from oneflow._oneflow_internal import EagerBlobTrait
-from typing import Any, Callable, Dict, List, Union, Sequence, Optional, Iterable, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Union,
+    Sequence,
+    Optional,
+    Iterable,
+    Pattern,
+    Tuple,
+)
 
 
 META_INFO_FILENAME = "meta"
 DATA_FILENAME = "out"
 FAKE_JOB_NAME = "system_checkpoint"
 OP_PREFIX = "system_checkpoint"
+# For current implementation (transport data by grpc), SLICE_BYTES must be lower than 64M
+SLICE_BYTES = 32 * 1024 * 1024
+DEFAULT_IO_THREAD_NUM = min(8, os.cpu_count() or 1)
+# Number of slices each io thread may have queued, which bounds the extra host
+# memory of a save or load to about io_thread_num * this * SLICE_BYTES
+MAX_INFLIGHT_SLICES_PER_THREAD = 2
+# A packed checkpoint file is laid out as
+#   header | aligned variable payloads | index
+# The header records the offset and size of the index, and the index
+# records name, data type, shape, offset and size of every variable.
+PACKED_MAGIC = b"OFPACKED"
+PACKED_VERSION = 1
+# magic, version, reserved, index offset, index size
+PACKED_HEADER = struct.Struct("<8sIIQQ")
+PACKED_ALIGNMENT = 64
 
 
 blob_register = oneflow._oneflow_internal.GetDefaultBlobRegister()
@@ -63,6 +98,31 @@ def sync_default_session_if_normal():
         pass
 
 
+# meta info file path -> (mtime, size, shape, dtype)
+_meta_info_cache = {}
+
+
+def _ParseMetaInfo(meta_info_path: str,) -> Optional[Tuple[Tuple[int], oneflow.dtype]]:
+    """
+    Return (shape, dtype) recorded in the meta info file, or None if the file
+    doesn't exist. Parsed results are cached until the file is modified.
+    """
+    try:
+        st = os.stat(meta_info_path)
+    except FileNotFoundError:
+        return None
+    cached = _meta_info_cache.get(meta_info_path)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2:]
+    meta_info = variable_meta_info_pb.VariableMetaInfo()
+    with open(meta_info_path) as f:
+        text_format.Parse(f.read(), meta_info)
+    shape = tuple(meta_info.shape.dim)
+    dtype = dtype_util.convert_proto_dtype_to_oneflow_dtype(meta_info.data_type)
+    _meta_info_cache[meta_info_path] = (st.st_mtime_ns, st.st_size, shape, dtype)
+    return shape, dtype
+
+
 class FileBackendVariableBlob:
     def __init__(
         self,
@@ -73,21 +133,12 @@ class FileBackendVariableBlob:
         data_path = os.path.join(var_dir, DATA_FILENAME)
         assert os.path.isfile(data_path)
         self.var_dir_ = var_dir
-        meta_info_path = os.path.join(self.var_dir_, META_INFO_FILENAME)
-        if os.path.exists(meta_info_path):
-            meta_info = variable_meta_info_pb.VariableMetaInfo()
-            with open(meta_info_path) as f:
-                text_format.Parse(f.read(), meta_info)
-            self.has_meta_info_ = True
-        else:
-            self.has_meta_info_ = False
+        meta_info = _ParseMetaInfo(os.path.join(self.var_dir_, META_INFO_FILENAME))
+        self.has_meta_info_ = meta_info is not None
 
         if self.has_meta_info_:
             assert dtype is None and shape is None
-            self.shape_ = tuple(meta_info.shape.dim)
-            self.dtype_ = dtype_util.convert_proto_dtype_to_oneflow_dtype(
-                meta_info.data_type
-            )
+            self.shape_, self.dtype_ = meta_info
         else:
             if shape is not None and dtype is not None:
                 self.shape_ = shape
@@ -128,9 +179,90 @@ class FileBackendVariableBlob:
             dtype=dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype),
         ).reshape(self.shape)
 
+    def memmap(self) -> np.ndarray:
+        """
+        Return a read-only, flattened view of the data file. Pages are read
+        from disk lazily when the returned array is accessed.
+        """
+        if not self.has_meta_info_:
+            raise RuntimeError("This variable does not have meta info")
+        np_dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype)
+        if _ElemCnt(self.shape) == 0:
+            # mmap can not map an empty file
+            return np.empty((0,), dtype=np_dtype)
+        return np.memmap(self.file_path, dtype=np_dtype, mode="r")
+
+
+_PackedIndexEntry = collections.namedtuple(
+    "_PackedIndexEntry", ["name", "data_type", "shape", "offset", "nbytes"]
+)
+
+
+class PackedVariableBlob(FileBackendVariableBlob):
+    """
+    A variable in a packed checkpoint file. Its data is memory-mapped
+    on access, without reading the other variables in the file.
+    """
+
+    def __init__(self, packed_path: str, entry: _PackedIndexEntry):
+        self.packed_path_ = packed_path
+        self.var_dir_ = None
+        self.has_meta_info_ = True
+        self.shape_ = tuple(entry.shape)
+        self.dtype_ = dtype_util.convert_proto_dtype_to_oneflow_dtype(entry.data_type)
+        self.offset_ = entry.offset
+
+    @property
+    def file_path(self) -> str:
+        return self.packed_path_
+
+    def numpy(self) -> np.ndarray:
+        return np.array(self.memmap()).reshape(self.shape)
+
+    def memmap(self) -> np.ndarray:
+        np_dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype)
+        elem_cnt = _ElemCnt(self.shape)
+        if elem_cnt == 0:
+            return np.empty((0,), dtype=np_dtype)
+        return np.memmap(
+            self.packed_path_,
+            dtype=np_dtype,
+            mode="r",
+            offset=self.offset_,
+            shape=(elem_cnt,),
+        )
+
+
+class _HostSnapshot(object):
+    """
+    A copy of the value of a variable in host memory, which keeps the dtype
+    of the variable, because it can't be told from the numpy dtype of the
+    copy, e.g. both flow.int8 and flow.char are np.int8.
+    """
+
+    def __init__(self, array: np.ndarray, dtype: oneflow.dtype):
+        self.array_ = array
+        self.dtype_ = dtype
+
+    @property
+    def array(self) -> np.ndarray:
+        return self.array_
+
+    @property
+    def shape(self) -> Tuple[int]:
+        return self.array_.shape
+
+    @property
+    def dtype(self) -> oneflow.dtype:
+        return self.dtype_
+
 
 ValueContainer = Union[
-    EagerBlobTrait, FileBackendVariableBlob, np.ndarray, "oneflow.Tensor"
+    EagerBlobTrait,
+    FileBackendVariableBlob,
+    np.ndarray,
+    "oneflow.Tensor",
+    _HostSnapshot,
 ]
 
 
@@ -138,6 +270,86 @@ def _ElemCnt(shape):
     return np.prod(shape).astype(int).item()
 
 
+class VariableIOStat(object):
+    """
+    Bytes transferred and wall time spent on one variable during
+    a checkpoint save or load.
+    """
+
+    def __init__(self, name: str, nbytes: int):
+        self.name = name
+        self.nbytes = nbytes
+        self.start_time_ = time.perf_counter()
+        self.end_time_ = self.start_time_
+
+    def Finish(self):
+        self.end_time_ = time.perf_counter()
+
+    @property
+    def seconds(self) -> float:
+        return self.end_time_ - self.start_time_
+
+    @property
+    def bytes_per_sec(self) -> float:
+        if self.seconds <= 0:
+            return float("inf")
+        return self.nbytes / self.seconds
+
+    def __repr__(self):
+        return "{}: {} bytes in {:.3f}s ({:.2f} MB/s)".format(
+            self.name, self.nbytes, self.seconds, self.bytes_per_sec / 1024 / 1024
+        )
+
+
+_last_io_stats = []
+
+
+@oneflow_export("checkpoint.get_last_io_stats")
+def GetLastIOStats() -> List[VariableIOStat]:
+    """
+    Return the per-variable io statistics of the last `flow.checkpoint.save`
+    or `flow.load_variables` call.
+    """
+    return list(_last_io_stats)
+
+
+def _ReportIOStats(stats: List[VariableIOStat], verbose: bool) -> None:
+    global _last_io_stats
+    _last_io_stats = stats
+    if verbose:
+        for stat in stats:
+            print(stat)
+
+
+def _NbytesOf(container: ValueContainer) -> int:
+    if isinstance(container, np.ndarray):
+        return container.nbytes
+    np_dtype = np.dtype(
+        dtype_util.convert_oneflow_dtype_to_numpy_dtype(container.dtype)
+    )
+    return _ElemCnt(container.shape) * np_dtype.itemsize
+
+
+def _ProtoDtypeOf(container: ValueContainer) -> int:
+    if isinstance(container, np.ndarray):
+        dtype = dtype_util.convert_numpy_dtype_to_oneflow_dtype(container.dtype)
+    else:
+        dtype = container.dtype
+    return oneflow._oneflow_internal.deprecated.GetProtoDtype4OfDtype(dtype)
+
+
+def _MakeIOExecutor(io_thread_num: Optional[int]):
+    if io_thread_num is None:
+        io_thread_num = DEFAULT_IO_THREAD_NUM
+    assert io_thread_num > 0
+    return (
+        concurrent.futures.ThreadPoolExecutor(
+            max_workers=io_thread_num, thread_name_prefix=OP_PREFIX
+        ),
+        io_thread_num * MAX_INFLIGHT_SLICES_PER_THREAD,
+    )
+
+
 @oneflow_export("get_all_variables")
 @session_ctx.try_init_default_session
 def GetAllVariables() -> Dict[str, oneflow._oneflow_internal.EagerConsistentBlob]:
@@ -163,25 +375,108 @@ def _LoadSingleVariable(path: str) -> Optional[FileBackendVariableBlob]:
     return None
 
 
+def _IsPackedCheckpoint(path: str) -> bool:
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(PACKED_MAGIC)) == PACKED_MAGIC
+
+
+def _ReadPackedIndex(path: str) -> List[_PackedIndexEntry]:
+    with open(path, "rb") as f:
+        magic, version, _, index_offset, index_nbytes = PACKED_HEADER.unpack(
+            f.read(PACKED_HEADER.size)
+        )
+        assert magic == PACKED_MAGIC
+        if version != PACKED_VERSION:
+            raise RuntimeError(
+                "Unsupported packed checkpoint version {} of {}".format(version, path)
+            )
+        f.seek(index_offset)
+        return _DecodePackedIndex(f.read(index_nbytes))
+
+
+class LazyCheckpoint(collections.abc.Mapping):
+    """
+    A read-only mapping from variable name to FileBackendVariableBlob of
+    a checkpoint directory. Only the names of sub-directories holding a data
+    file are listed on construction, the meta info of a variable is parsed on
+    its first access.
+    """
+
+    def __init__(self, path: str):
+        self.path_ = path
+        with os.scandir(path) as it:
+            self.names_ = sorted(
+                entry.name
+                for entry in it
+                if entry.is_dir()
+                and os.path.isfile(os.path.join(entry.path, DATA_FILENAME))
+            )
+        self.vars_ = {}
+
+    @property
+    def path(self) -> str:
+        return self.path_
+
+    def __getitem__(self, name: str) -> FileBackendVariableBlob:
+        var = self.vars_.get(name)
+        if var is None:
+            if name not in self.names_:
+                raise KeyError(name)
+            var = _LoadSingleVariable(os.path.join(self.path_, name))
+            if var is None:
+                raise KeyError("{} in {} is not a variable".format(name, self.path_))
+            self.vars_[name] = var
+        return var
+
+    def __iter__(self):
+        return iter(self.names_)
+
+    def __len__(self) -> int:
+        return len(self.names_)
+
+    def copy(self) -> Dict[str, FileBackendVariableBlob]:
+        """
+        Return a mutable dict of all variables, which parses the meta info
+        of all variables.
+        """
+        return collections.OrderedDict(self.items())
+
+    def __repr__(self):
+        return "LazyCheckpoint({}, {} variables)".format(self.path_, len(self))
+
+
+def _GetCheckpoint(
+    path: str,
+) -> Union[Mapping[str, FileBackendVariableBlob], FileBackendVariableBlob]:
+    if _IsPackedCheckpoint(path):
+        return {
+            entry.name: PackedVariableBlob(path, entry)
+            for entry in _ReadPackedIndex(path)
+        }
+    assert os.path.isdir(path), "Directory {} doesn't exist!".format(path)
+    single_var = _LoadSingleVariable(path)
+    if single_var is not None:
+        return single_var
+    return LazyCheckpoint(path)
+
+
 @oneflow_export("checkpoint.get", "load")
 @session_ctx.try_init_default_session
 def GetCheckpoint(
     path: str,
-) -> Union[Dict[str, FileBackendVariableBlob], FileBackendVariableBlob]:
+) -> Union[Mapping[str, FileBackendVariableBlob], FileBackendVariableBlob]:
     """
     Load variable(s) from file system.
+
+    `path` is either a directory saved by `flow.checkpoint.save` or a file
+    saved by `flow.checkpoint.save(..., packed=True)`. For a directory, a
+    LazyCheckpoint is returned which parses the meta info of a variable only
+    when it is accessed. Variables in a packed file are memory-mapped on
+    access, only the index is read here.
     """
-    assert os.path.isdir(path), "Directory {} doesn't exist!".format(path)
-    single_var = _LoadSingleVariable(path)
-    if single_var is not None:
-        return single_var
-    var_dict = {}
-    for f in os.listdir(path):
-        var_dir = os.path.join(path, f)
-        var = _LoadSingleVariable(var_dir)
-        if var is not None:
-            var_dict[f] = var
-    return var_dict
+    return _GetCheckpoint(path)
 
 
 def _GetOpNameFromLbn(lbn):
@@ -228,19 +523,17 @@ def _ReadSlice(
 
         yield from _ForEachSlice(container, ReadFromEagerBlob)
     elif isinstance(container, FileBackendVariableBlob):
-        np_dtype = np.dtype(
-            dtype_util.convert_oneflow_dtype_to_numpy_dtype(container.dtype)
-        )
-        with open(container.file_path, "rb") as f:
+        flat_data = container.memmap()
 
-            def ReadFromFile(_, start_nd_idx, stop_nd_idx):
-                length = _ElemCnt(np.array(stop_nd_idx) - np.array(start_nd_idx))
-                slice = f.read(length * np_dtype.itemsize)
-                return np.frombuffer(slice, dtype=np_dtype,).reshape(
-                    np.array(stop_nd_idx) - np.array(start_nd_idx)
-                )
+        def ReadFromFile(_, start_nd_idx, stop_nd_idx):
+            # slices are contiguous in the flattened data, so the start index
+            # is enough to locate them without reading anything before
+            start = np.ravel_multi_index(start_nd_idx, container.shape)
+            slice_shape = np.array(stop_nd_idx) - np.array(start_nd_idx)
+            length = _ElemCnt(slice_shape)
+            return flat_data[start : start + length].reshape(slice_shape)
 
-            yield from _ForEachSlice(container, ReadFromFile)
+        yield from _ForEachSlice(container, ReadFromFile)
     elif isinstance(container, np.ndarray):
 
         def ReadFromNpArray(array, start_nd_idx, stop_nd_idx):
@@ -250,10 +543,215 @@ def _ReadSlice(
             return array[tuple(slice_objs)]
 
         yield from _ForEachSlice(container, ReadFromNpArray)
+    elif isinstance(container, _HostSnapshot):
+        yield from _ReadSlice(container.array)
     else:
         raise RuntimeError("Unknown type: {}".format(type(container).__name__))
 
 
+class _VariableFileWriter(object):
+    """
+    Write the slices of one variable at `base_offset` of `fd` by positional
+    writes, so that slices can be written by any io thread in any order.
+    If `close_fd` is True, `fd` is closed when the last pending slice
+    is written.
+    """
+
+    def __init__(self, fd: int, base_offset: int, stat: VariableIOStat, close_fd: bool):
+        self.fd_ = fd
+        self.base_offset_ = base_offset
+        self.stat_ = stat
+        self.close_fd_ = close_fd
+        self.lock_ = threading.Lock()
+        # held by the producer until all slices are submitted
+        self.pending_num_ = 1
+
+    def AddPending(self):
+        with self.lock_:
+            self.pending_num_ += 1
+
+    def DonePending(self):
+        with self.lock_:
+            self.pending_num_ -= 1
+            if self.pending_num_ > 0:
+                return
+        if self.close_fd_:
+            os.close(self.fd_)
+        self.stat_.Finish()
+
+    def Write(self, slice: np.ndarray, offset: int):
+        try:
+            _PwriteAll(
+                self.fd_, np.ascontiguousarray(slice), self.base_offset_ + offset
+            )
+        finally:
+            self.DonePending()
+
+
+def _PwriteAll(fd: int, data, offset: int) -> None:
+    """
+    Write all of `data` at `offset` of `fd`, retrying on short writes
+    """
+    data = memoryview(data).cast("B")
+    while len(data) > 0:
+        written = os.pwrite(fd, data, offset)
+        data = data[written:]
+        offset += written
+
+
+def _WriteVariables(
+    dsts: Iterable[Tuple[ValueContainer, VariableIOStat, int, int, bool]],
+    io_thread_num: Optional[int],
+) -> None:
+    """
+    For every (var, stat, fd, base_offset, close_fd) in `dsts`, write the
+    data of `var` at `base_offset` of `fd`. Slices are read from the
+    variables in the calling thread and written to disk by a pool of
+    `io_thread_num` threads, so reading the next slice overlaps with
+    writing the previous ones.
+    """
+    executor, max_inflight_slice_num = _MakeIOExecutor(io_thread_num)
+    inflight_slices = threading.BoundedSemaphore(max_inflight_slice_num)
+    futures = []
+    with executor:
+        for var, stat, fd, base_offset, close_fd in dsts:
+            writer = _VariableFileWriter(fd, base_offset, stat, close_fd)
+            offset = 0
+            try:
+                for _, _, slice in _ReadSlice(var):
+                    inflight_slices.acquire()
+                    writer.AddPending()
+                    future = executor.submit(writer.Write, slice, offset)
+                    future.add_done_callback(lambda _: inflight_slices.release())
+                    futures.append(future)
+                    offset += slice.nbytes
+            finally:
+                # also when reading a slice fails, so that the fd is closed
+                # once the submitted slices are written
+                writer.DonePending()
+    for future in futures:
+        # re-raise the exception of failed writes, if any
+        future.result()
+
+
+def _SaveVarDictToDir(
+    path: str, var_dict: Dict[str, ValueContainer], io_thread_num: Optional[int]
+) -> List[VariableIOStat]:
+    os.makedirs(path, exist_ok=True)
+    stats = []
+
+    def IterDsts():
+        for name, var in var_dict.items():
+            meta_info = variable_meta_info_pb.VariableMetaInfo()
+            meta_info.shape.dim[:] = var.shape
+            meta_info.data_type = _ProtoDtypeOf(var)
+            var_dir = os.path.join(path, name)
+            param_path = os.path.join(var_dir, DATA_FILENAME)
+            os.makedirs(os.path.dirname(param_path))
+            stat = VariableIOStat(name, _NbytesOf(var))
+            stats.append(stat)
+            fd = os.open(param_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.ftruncate(fd, stat.nbytes)
+            yield var, stat, fd, 0, True
+            with open(os.path.join(var_dir, META_INFO_FILENAME), "w") as f:
+                f.write(text_format.MessageToString(meta_info))
+
+    _WriteVariables(IterDsts(), io_thread_num)
+    # write a empty file 'snapshot_done', indicating that
+    # the save process finishes normally
+    with open(os.path.join(path, "snapshot_done"), "w"):
+        pass
+    return stats
+
+
+def _AlignUp(offset: int) -> int:
+    return (offset + PACKED_ALIGNMENT - 1) // PACKED_ALIGNMENT * PACKED_ALIGNMENT
+
+
+def _EncodePackedIndex(entries: Sequence[_PackedIndexEntry]) -> bytes:
+    buf = [struct.pack("<Q", len(entries))]
+    for entry in entries:
+        name = entry.name.encode("utf-8")
+        buf.append(struct.pack("<H", len(name)))
+        buf.append(name)
+        buf.append(struct.pack("<iB", entry.data_type, len(entry.shape)))
+        buf.append(struct.pack("<{}q".format(len(entry.shape)), *entry.shape))
+        buf.append(struct.pack("<QQ", entry.offset, entry.nbytes))
+    return b"".join(buf)
+
+
+def _DecodePackedIndex(buf: bytes) -> List[_PackedIndexEntry]:
+    (entry_num,) = struct.unpack_from("<Q", buf, 0)
+    pos = 8
+    entries = []
+    for _ in range(entry_num):
+        (name_len,) = struct.unpack_from("<H", buf, pos)
+        pos += 2
+        name = buf[pos : pos + name_len].decode("utf-8")
+        pos += name_len
+        data_type, ndim = struct.unpack_from("<iB", buf, pos)
+        pos += 5
+        shape = struct.unpack_from("<{}q".format(ndim), buf, pos)
+        pos += 8 * ndim
+        offset, nbytes = struct.unpack_from("<QQ", buf, pos)
+        pos += 16
+        entries.append(_PackedIndexEntry(name, data_type, shape, offset, nbytes))
+    return entries
+
+
+def _SaveVarDictToPackedFile(
+    path: str, var_dict: Dict[str, ValueContainer], io_thread_num: Optional[int]
+) -> List[VariableIOStat]:
+    entries = []
+    offset = _AlignUp(PACKED_HEADER.size)
+    for name, var in var_dict.items():
+        nbytes = _NbytesOf(var)
+        entries.append(
+            _PackedIndexEntry(
+                name, _ProtoDtypeOf(var), tuple(var.shape), offset, nbytes,
+            )
+        )
+        offset = _AlignUp(offset + nbytes)
+    index = _EncodePackedIndex(entries)
+    header = PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, 0, offset, len(index))
+    stats = []
+
+    def IterDsts(fd):
+        for entry in entries:
+            stat = VariableIOStat(entry.name, entry.nbytes)
+            stats.append(stat)
+            yield var_dict[entry.name], stat, fd, entry.offset, False
+
+    dirname = os.path.dirname(path)
+    if dirname != "":
+        os.makedirs(dirname, exist_ok=True)
+    # write to a temporary file and rename it at last, so that a partially
+    # written file is never taken as a packed checkpoint
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            os.ftruncate(fd, offset + len(index))
+            _WriteVariables(IterDsts(fd), io_thread_num)
+            _PwriteAll(fd, index, offset)
+            _PwriteAll(fd, header, 0)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return stats
+
+
+def _IsFileOrNonEmptyDir(path):
+    if os.path.isfile(path):
+        return True
+    if os.path.isdir(path) and len(os.listdir(path)) != 0:
+        return True
+    return False
+
+
 @oneflow_export("checkpoint.save")
 @session_ctx.try_init_default_session
 def SaveVarDict(
@@ -261,51 +759,194 @@ def SaveVarDict(
     var_dict: Optional[
         Dict[str, Union[FileBackendVariableBlob, EagerBlobTrait]]
     ] = None,
+    io_thread_num: Optional[int] = None,
+    verbose: bool = False,
+    packed: bool = False,
 ) -> None:
     """
-    Save `var_dict` to `path`
+    Save `var_dict` to `path`.
+
+    By default every variable is saved into its own sub-directory of `path`.
+    If `packed` is True, all variables are saved into the single file `path`
+    with an index of their names, dtypes, shapes and offsets, which can be
+    loaded by `flow.checkpoint.get` as well.
+
+    Slices are read from the variables in the calling thread and written
+    to disk by a pool of `io_thread_num` threads, so reading the next slice
+    overlaps with writing the previous ones. If `verbose` is True, the
+    throughput of every variable is printed. The statistics are also
+    available from `flow.checkpoint.get_last_io_stats()`.
     """
     sync_default_session_if_normal()
 
     if var_dict is None:
         var_dict = GetAllVariables()
 
-    def IsFileOrNonEmptyDir(path):
-        if os.path.isfile(path):
-            return True
-        if os.path.isdir(path) and len(os.listdir(path)) != 0:
-            return True
-        return False
+    if packed:
+        assert not os.path.exists(path), "{} already exists!".format(path)
+        stats = _SaveVarDictToPackedFile(path, var_dict, io_thread_num)
+    else:
+        assert not _IsFileOrNonEmptyDir(
+            path
+        ), "{} is a file or non-empty directory! Note that flow.save is different from torch.save. It saves each weight as a separated file so that a directory instead of a file should be given.".format(
+            path
+        )
+        stats = _SaveVarDictToDir(path, var_dict, io_thread_num)
+    _ReportIOStats(stats, verbose)
+
+
+@oneflow_export("save")
+def save(obj, save_dir, packed=False):
+    return SaveVarDict(save_dir, obj, packed=packed)
+
 
-    assert not IsFileOrNonEmptyDir(
-        path
-    ), "{} is a file or non-empty directory! Note that flow.save is different from torch.save. It saves each weight as a separated file so that a directory instead of a file should be given.".format(
-        path
+def _SnapshotToHost(container: ValueContainer) -> Union[np.ndarray, _HostSnapshot]:
+    """
+    Copy the value of `container` into a new numpy array slice by slice
+    """
+    if isinstance(container, np.ndarray):
+        return np.array(container)
+    snapshot = np.empty(
+        container.shape,
+        dtype=dtype_util.convert_oneflow_dtype_to_numpy_dtype(container.dtype),
     )
-    os.makedirs(path, exist_ok=True)
-    for name, var in var_dict.items():
-        meta_info = variable_meta_info_pb.VariableMetaInfo()
-        meta_info.shape.dim[:] = var.shape
-        meta_info.data_type = oneflow._oneflow_internal.deprecated.GetProtoDtype4OfDtype(
-            var.dtype
+    for start, stop, value in _ReadSlice(container):
+        snapshot[tuple(slice(b, e) for b, e in zip(start, stop))] = value
+    return _HostSnapshot(snapshot, container.dtype)
+
+
+@oneflow_export("checkpoint.AsyncSaver")
+class AsyncSaver(object):
+    r"""Save checkpoints in a background thread.
+
+    `save` copies the variables into host memory and returns, then the copy
+    is written to disk by a background thread while training continues.
+    At most `max_inflight_snapshots` copies are kept in host memory, `save`
+    blocks until an earlier one is written if there are already so many.
+
+    A checkpoint is written into a temporary directory and renamed to its
+    path after it is completely written (including the 'snapshot_done' file),
+    so a partially written checkpoint is never found at the path.
+
+    For example:
+
+    .. code-block:: python
+
+        saver = flow.checkpoint.AsyncSaver()
+        for step in range(steps):
+            train_job()
+            if (step + 1) % 100 == 0:
+                saver.save("./checkpoint-{}".format(step))
+        saver.wait()
+
+    """
+
+    def __init__(
+        self, max_inflight_snapshots: int = 1, io_thread_num: Optional[int] = None,
+    ):
+        assert max_inflight_snapshots > 0
+        self.io_thread_num_ = io_thread_num
+        self.inflight_snapshots_ = threading.BoundedSemaphore(max_inflight_snapshots)
+        # a single writer thread keeps checkpoints written in order
+        self.writer_ = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=OP_PREFIX + "_async_saver"
         )
-        var_dir = os.path.join(path, name)
-        param_path = os.path.join(var_dir, DATA_FILENAME)
-        os.makedirs(os.path.dirname(param_path))
-        with open(param_path, "wb") as f:
-            for _, _, slice in _ReadSlice(var):
-                f.write(slice.tobytes())
-        with open(os.path.join(var_dir, META_INFO_FILENAME), "w") as f:
-            f.write(text_format.MessageToString(meta_info))
-    # write a empty file 'snapshot_done', indicating that
-    # the save process finishes normally
-    with open(os.path.join(path, "snapshot_done"), "w"):
-        pass
+        self.futures_ = []
 
+    def save(
+        self,
+        path: str,
+        var_dict: Optional[
+            Dict[str, Union[FileBackendVariableBlob, EagerBlobTrait]]
+        ] = None,
+    ) -> concurrent.futures.Future:
+        """
+        Snapshot `var_dict` (all variables by default) and save it to `path`
+        in background. Return a future which is done when the checkpoint
+        is completely written.
+        """
+        self._ReapDone()
+        assert not _IsFileOrNonEmptyDir(
+            path
+        ), "{} is a file or non-empty directory!".format(path)
+        sync_default_session_if_normal()
+        if var_dict is None:
+            var_dict = GetAllVariables()
+        self.inflight_snapshots_.acquire()
+        try:
+            snapshot = collections.OrderedDict(
+                (name, _SnapshotToHost(var)) for name, var in var_dict.items()
+            )
+            future = self.writer_.submit(self._Write, path, snapshot)
+        except Exception:
+            self.inflight_snapshots_.release()
+            raise
+        future.add_done_callback(lambda _: self.inflight_snapshots_.release())
+        self.futures_.append(future)
+        return future
+
+    def wait(self) -> None:
+        """
+        Block until all checkpoints are written, re-raise the exception
+        of the first failed one if any.
+        """
+        futures, self.futures_ = self.futures_, []
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        self.wait()
+        self.writer_.shutdown()
+
+    def _ReapDone(self):
+        done = [future for future in self.futures_ if future.done()]
+        self.futures_ = [future for future in self.futures_ if not future.done()]
+        for future in done:
+            future.result()
+
+    def _Write(self, path: str, snapshot: Dict[str, Union[np.ndarray, _HostSnapshot]]):
+        tmp_path = path.rstrip(os.sep) + ".tmp"
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path)
+        stats = _SaveVarDictToDir(tmp_path, snapshot, self.io_thread_num_)
+        if os.path.isdir(path):
+            # an empty directory, checked before snapshotting
+            os.rmdir(path)
+        os.replace(tmp_path, path)
+        return stats
+
+
+@oneflow_export("checkpoint.pack")
+def PackCheckpoint(
+    src_dir: str, dst_path: str, io_thread_num: Optional[int] = None
+) -> None:
+    """
+    Convert the checkpoint directory `src_dir` into the packed checkpoint
+    file `dst_path`.
+    """
+    assert not _IsPackedCheckpoint(src_dir), "{} is already packed".format(src_dir)
+    assert not os.path.exists(dst_path), "{} already exists!".format(dst_path)
+    var_dict = _GetCheckpoint(src_dir)
+    assert isinstance(var_dict, Mapping)
+    _ReportIOStats(_SaveVarDictToPackedFile(dst_path, var_dict, io_thread_num), False)
 
-@oneflow_export("save")
-def save(obj, save_dir):
-    return SaveVarDict(save_dir, obj)
+
+@oneflow_export("checkpoint.unpack")
+def UnpackCheckpoint(
+    src_path: str, dst_dir: str, io_thread_num: Optional[int] = None
+) -> None:
+    """
+    Convert the packed checkpoint file `src_path` into the checkpoint
+    directory `dst_dir`, one sub-directory per variable.
+    """
+    assert _IsPackedCheckpoint(src_path), "{} is not a packed checkpoint".format(
+        src_path
+    )
+    assert not _IsFileOrNonEmptyDir(
+        dst_dir
+    ), "{} is a file or non-empty directory!".format(dst_dir)
+    var_dict = _GetCheckpoint(src_path)
+    _ReportIOStats(_SaveVarDictToDir(dst_dir, var_dict, io_thread_num), False)
 
 
 def _LogicalSlice(
@@ -447,14 +1088,10 @@ def _LogicalSliceAssign(
     oneflow._oneflow_internal.deprecated.LogicalRun(BuildAssignInstruction)
 
 
-def FeedValueToVariable(
+def _CheckAndPrepareValue(
     var_blob: Union[oneflow._oneflow_internal.EagerConsistentBlob, "oneflow.Tensor"],
     value: ValueContainer,
-    scope_symbol_id: Optional[int],
-) -> None:
-    """
-    Feed the value of `value` to the variable `var_blob`
-    """
+) -> ValueContainer:
     assert isinstance(
         value, (EagerBlobTrait, FileBackendVariableBlob, np.ndarray, oneflow.Tensor)
     ), "Unknown value type: {}".format(type(value).__name__)
@@ -472,12 +1109,28 @@ def FeedValueToVariable(
     assert var_blob.dtype == value_flow_dtype, "{} vs {}".format(
         var_blob.dtype, value_flow_dtype
     )
+    return value
+
 
+def _GetBlobObject(
+    var_blob: Union[oneflow._oneflow_internal.EagerConsistentBlob, "oneflow.Tensor"]
+) -> oneflow._oneflow_internal.BlobObject:
     if isinstance(var_blob, oneflow.Tensor):
-        var_blob_object = var_blob._blob_object
-    else:
-        assert isinstance(var_blob, EagerBlobTrait)
-        var_blob_object = var_blob.blob_object
+        return var_blob._blob_object
+    assert isinstance(var_blob, EagerBlobTrait)
+    return var_blob.blob_object
+
+
+def FeedValueToVariable(
+    var_blob: Union[oneflow._oneflow_internal.EagerConsistentBlob, "oneflow.Tensor"],
+    value: ValueContainer,
+    scope_symbol_id: Optional[int],
+) -> None:
+    """
+    Feed the value of `value` to the variable `var_blob`
+    """
+    value = _CheckAndPrepareValue(var_blob, value)
+    var_blob_object = _GetBlobObject(var_blob)
 
     for start, stop, slice in _ReadSlice(value):
         slice_value_blob = _GetCpu0VariableBlobFromNumpy(slice, var_blob.dtype)
@@ -486,10 +1139,69 @@ def FeedValueToVariable(
         )
 
 
+def FeedValueToLocalTensor(tensor: "oneflow.Tensor", value: ValueContainer) -> None:
+    """
+    Feed the value of `value` to the eager local tensor `tensor` slice by slice,
+    so that a file backed value is never materialized in host memory as a whole
+    """
+    assert tuple(tensor.shape) == tuple(value.shape), "{} vs {}".format(
+        tensor.shape, value.shape
+    )
+    for start, stop, slice_np in _ReadSlice(value):
+        slice_objs = tuple(
+            slice(int(begin), int(end)) for begin, end in zip(start, stop)
+        )
+        tensor[slice_objs] = oneflow.Tensor(
+            np.ascontiguousarray(slice_np), dtype=tensor.dtype, device=tensor.device
+        )
+
+
+def _PrefetchSlices(
+    slice_iter: Iterable[Tuple[Any, Sequence[int], Sequence[int], np.ndarray]],
+    executor: concurrent.futures.Executor,
+    depth: int,
+) -> Iterable[Tuple[Any, Sequence[int], Sequence[int], np.ndarray]]:
+    """
+    Materialize up to `depth` upcoming memory-mapped slices in `executor`
+    while the caller consumes the current one, preserving the order of
+    `slice_iter`. Slices which are not memory-mapped are passed through.
+    """
+    pending = collections.deque()
+    for key, start, stop, slice in slice_iter:
+        if isinstance(slice, np.memmap):
+            slice = executor.submit(np.array, slice)
+        pending.append((key, start, stop, slice))
+        if len(pending) > depth:
+            yield _ResolvePrefetched(pending.popleft())
+    while len(pending) > 0:
+        yield _ResolvePrefetched(pending.popleft())
+
+
+def _ResolvePrefetched(item):
+    key, start, stop, slice = item
+    if isinstance(slice, concurrent.futures.Future):
+        slice = slice.result()
+    return key, start, stop, slice
+
+
+def _MatchAnyPattern(name: str, patterns: Sequence[Union[str, Pattern]]) -> bool:
+    for pattern in patterns:
+        if isinstance(pattern, str):
+            if fnmatch.fnmatchcase(name, pattern):
+                return True
+        elif pattern.fullmatch(name) is not None:
+            return True
+    return False
+
+
 @oneflow_export("load_variables")
 @session_ctx.try_init_default_session
 def LoadVariables(
-    value_dict: Dict[str, ValueContainer], ignore_mismatch: bool = True,
+    value_dict: Mapping[str, ValueContainer],
+    ignore_mismatch: bool = True,
+    io_thread_num: Optional[int] = None,
+    verbose: bool = False,
+    name_patterns: Optional[Sequence[Union[str, Pattern]]] = None,
 ):
     """
     Load value in `value_dict` into oneflow variables.
@@ -497,19 +1209,69 @@ def LoadVariables(
     the value of variable "x" will all ones.
     If `ignore_mismatch` is False, an exception will be raised when
     there is a name in `value_dict` not belonging to any variable.
+
+    If `name_patterns` is given, only the names in `value_dict` matching
+    any of the patterns are loaded, the others are not even accessed, which
+    saves parsing their meta info for a LazyCheckpoint. A str pattern is
+    a glob pattern like "layer1-*", a compiled re.Pattern must match the
+    whole name.
+
+    Slices of file backed values are read from disk by a pool of
+    `io_thread_num` threads ahead of being assigned, across variable
+    boundaries. If `verbose` is True, the throughput of every variable
+    is printed. The statistics are also available from
+    `flow.checkpoint.get_last_io_stats()`.
     """
     sync_default_session_if_normal()
 
     all_vars = GetAllVariables()
-    for name, value in value_dict.items():
+    to_load = []
+    for name in value_dict.keys():
+        if name_patterns is not None and not _MatchAnyPattern(name, name_patterns):
+            continue
         if name in all_vars:
             var_blob = interface_op_read_and_write.GetEagerInterfaceBlob(name)
-            scope_symbol_id = _GetScopeSymbolIdFromEagerBlob(var_blob)
-            FeedValueToVariable(var_blob, value, scope_symbol_id)
+            value = _CheckAndPrepareValue(var_blob, value_dict[name])
+            to_load.append((name, var_blob, value))
         else:
             if not ignore_mismatch:
                 raise RuntimeError('"{}" is not a variable name'.format(name))
+
+    stats = []
+
+    def IterAllSlices():
+        for name, var_blob, value in to_load:
+            stat = VariableIOStat(name, _NbytesOf(value))
+            stats.append(stat)
+            # the stat is finished when the first slice of the next variable
+            # is consumed, which is after all slices of this one are assigned
+            for start, stop, slice in _ReadSlice(value):
+                yield (var_blob, stat), start, stop, slice
+
+    executor, prefetch_depth = _MakeIOExecutor(io_thread_num)
+    with executor:
+        last_stat = None
+        for (var_blob, stat), start, stop, slice in _PrefetchSlices(
+            IterAllSlices(), executor, prefetch_depth
+        ):
+            if stat is not last_stat:
+                if last_stat is not None:
+                    last_stat.Finish()
+                last_stat = stat
+                scope_symbol_id = _GetScopeSymbolIdFromEagerBlob(var_blob)
+                var_blob_object = _GetBlobObject(var_blob)
+            slice_value_blob = _GetCpu0VariableBlobFromNumpy(slice, var_blob.dtype)
+            _LogicalSliceAssign(
+                var_blob_object,
+                slice_value_blob.blob_object,
+                start,
+                stop,
+                scope_symbol_id,
+            )
     oneflow._oneflow_internal.eager.single_client.Sync()
+    if last_stat is not None:
+        last_stat.Finish()
+    _ReportIOStats(stats, verbose)
 
 
 def _ForEachSlice(
@@ -528,8 +1290,6 @@ def _ForEachSlice(
         container, (EagerBlobTrait, FileBackendVariableBlob, np.ndarray, oneflow.Tensor)
     ), "Unknown type: {}".format(type(container).__name__)
     assert container.shape is not None
-    # For current implementation (transport data by grpc), SLICE_BYTES must be lower than 64M
-    SLICE_BYTES = 32 * 1024 * 1024
     if isinstance(container, np.ndarray):
         np_dtype = container.dtype
     else:
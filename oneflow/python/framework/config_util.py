@@ -169,7 +169,9 @@ def enable_numa_aware_cuda_malloc_host(val):
 
 @oneflow_export("config.compute_thread_pool_size")
 def api_compute_thread_pool_size(val: int) -> None:
-    r"""Set up the size of compute thread pool
+    r"""Set up the size of compute thread pool, which is also the number of threads
+    that a cpu kernel such as the elementwise, broadcast, reduce, softmax and layer
+    norm kernels runs on. It defaults to the number of cpu cores.
 
     Args:
         val (int): size of  thread pool
@@ -338,6 +340,25 @@ def persistence_buf_byte(val):
     sess.config_proto.io_conf.persistence_buf_byte = val
 
 
+@oneflow_export("config.persistence_read_ahead_depth")
+def api_persistence_read_ahead_depth(val: int) -> None:
+    r"""Set up the number of buffers read ahead by a background thread when reading
+    files for persistence, e.g. the ofrecord datasets. The buffers are of the size
+    set by `flow.config.persistence_buf_byte`, and 0 reads synchronously.
+
+    Args:
+        val (int): e.g. 1 for double buffering. Defaults to 0.
+    """
+    return enable_if.unique([persistence_read_ahead_depth, do_nothing])(val)
+
+
+@enable_if.condition(hob.in_normal_mode & ~hob.session_initialized)
+def persistence_read_ahead_depth(val):
+    sess = session_ctx.GetDefaultSession()
+    assert type(val) is int and val >= 0
+    sess.config_proto.io_conf.persistence_read_ahead_depth = val
+
+
 @oneflow_export("config.legacy_model_io_enabled")
 def api_legacy_model_io_enabled():
     sess = session_ctx.GetDefaultSession()
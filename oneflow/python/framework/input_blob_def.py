@@ -16,8 +16,9 @@ limitations under the License.
 from __future__ import absolute_import
 
 import sys
+import threading
 from functools import reduce
-from typing import Any, Optional, Sequence, Union
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
@@ -25,6 +26,7 @@ import oneflow
 import oneflow.core.operator.op_conf_pb2 as op_conf_util
 import oneflow.core.operator.interface_blob_conf_pb2 as inter_face_blob_conf_util
 import oneflow.core.job.sbp_parallel_pb2 as sbp_parallel_pb
+import oneflow.python.framework.balanced_splitter as balanced_splitter
 import oneflow.python.framework.c_api_util as c_api_util
 import oneflow.python.framework.compile_context as compile_context
 import oneflow.python.framework.distribute as distribute_util
@@ -59,6 +61,7 @@ class ArgBlobDef(object):
         self.shape_ = shape
         self.dtype_ = dtype
         self.distribute_ = distribute
+        self.push_buffer_pool_ = PushBufferPool()
 
     @property
     def lbi(self):
@@ -101,13 +104,26 @@ class ArgBlobDef(object):
         raise NotImplementedError
 
     def CheckAndAsyncPush(self, session, arg_ndarray):
+        self.CheckNdarray(arg_ndarray)
+        session.AsyncPushBatch(self.MakePushCallbacks(arg_ndarray))
+
+    def CheckNdarray(self, arg_ndarray):
         self._CheckNdarray(arg_ndarray)
-        self._AsyncPush(session, arg_ndarray)
+
+    def MakePushCallbacks(self, arg_ndarray):
+        """
+        Return a list of (op_name, push_data_cb) which push `arg_ndarray`
+        into this input, so that the push jobs of all inputs of a job call
+        can be launched together. Registered input buffers are marked as
+        being pushed until their callback runs, so check `arg_ndarray` first
+        and launch the returned callbacks.
+        """
+        return self._MakePushCallbacks(arg_ndarray)
 
     def _CheckNdarray(self, ndarray):
         raise NotImplementedError
 
-    def _AsyncPush(self, session, arg_ndarray):
+    def _MakePushCallbacks(self, arg_ndarray):
         raise NotImplementedError
 
     def ToInterfaceBlobConf(self):
@@ -181,8 +197,15 @@ class FixedTensorDef(ArgBlobDef):
         assert isinstance(ndarray, np.ndarray)
         assert ndarray.shape == self.shape
 
-    def _AsyncPush(self, session: object, arg_ndarray: np.ndarray) -> None:
-        session.AsyncPush(self.op_name, _MakePushNdarrayCallback(arg_ndarray))
+    def _MakePushCallbacks(
+        self, arg_ndarray: np.ndarray
+    ) -> List[Tuple[str, Callable[[Any], None]]]:
+        return [
+            (
+                self.op_name,
+                _MakePushNdarrayCallback(arg_ndarray, self.push_buffer_pool_),
+            )
+        ]
 
 
 class MirroredTensorDef(ArgBlobDef):
@@ -222,12 +245,16 @@ class MirroredTensorDef(ArgBlobDef):
             assert len(ndarray.shape) == len(self.shape)
             assert GetElemCnt(ndarray.shape) <= GetElemCnt(self.shape)
 
-    def _AsyncPush(self, session: object, ndarray_list: Sequence[np.ndarray]) -> None:
-        for i in range(len(ndarray_list)):
-            sub_blob = self.sub_consistent_blob_list_[i]
-            session.AsyncPush(
-                sub_blob.op_name, _MakePushNdarrayCallback(ndarray_list[i])
+    def _MakePushCallbacks(
+        self, ndarray_list: Sequence[np.ndarray]
+    ) -> List[Tuple[str, Callable[[Any], None]]]:
+        return [
+            (
+                sub_blob.op_name,
+                _MakePushNdarrayCallback(ndarray, self.push_buffer_pool_),
             )
+            for sub_blob, ndarray in zip(self.sub_consistent_blob_list_, ndarray_list)
+        ]
 
 
 def _AddAndInferMirroredOp(mirrored_lbn, op_conf, sub_consistent_blob_list):
@@ -250,14 +277,136 @@ def _AddAndInferMirroredOp(mirrored_lbn, op_conf, sub_consistent_blob_list):
         )
 
 
-def _MakePushNdarrayCallback(ndarray):
-    copied = np.copy(ndarray)
+class PushBufferPool(object):
+    """
+    Host buffers holding the values to push, reused across job calls.
+    The value of a call is copied into a buffer in the calling thread, so the
+    caller may modify its ndarray right after the call, and the buffer is
+    returned once its push job has copied it into the runtime. Keeping
+    `max_free_num` buffers allows the value of the next call to be copied
+    while the push of the previous call is still in flight.
+    """
+
+    def __init__(self, max_free_num=2):
+        self.max_free_num_ = max_free_num
+        self.free_buffers_ = []
+        self.lock_ = threading.Lock()
+
+    def Copy(self, ndarray: np.ndarray) -> np.ndarray:
+        with self.lock_:
+            for i, buf in enumerate(self.free_buffers_):
+                if buf.shape == ndarray.shape and buf.dtype == ndarray.dtype:
+                    del self.free_buffers_[i]
+                    break
+            else:
+                buf = None
+        if buf is None:
+            return np.copy(ndarray)
+        np.copyto(buf, ndarray)
+        return buf
+
+    def Release(self, buf: np.ndarray) -> None:
+        with self.lock_:
+            if len(self.free_buffers_) < self.max_free_num_:
+                self.free_buffers_.append(buf)
+
+
+class InputBuffer(np.ndarray):
+    """
+    A host array allocated once for a `oneflow.typing.Numpy.Placeholder` input
+    of a global function by `oneflow.make_input_buffers`. Fill it in place and
+    pass it to the global function, then it is copied into the runtime
+    directly instead of being staged into a temporary copy first, so it must
+    not be modified before `wait_pushed()` returns.
+
+    Views of it and results of numpy operations on it are not registered
+    buffers and are fed like any other ndarray.
+    """
+
+    def __new__(cls, shape, dtype):
+        buf = np.empty(shape, dtype=dtype).view(cls)
+        buf.push_cond_ = threading.Condition()
+        return buf
+
+    def __array_finalize__(self, obj):
+        self.push_cond_ = None
+        self.pushing_cnt_ = 0
+        # (split axis, parallel_num) -> per-rank views, see RankViews
+        self.rank_views_ = {}
+
+    @property
+    def is_registered(self) -> bool:
+        return self.push_cond_ is not None
+
+    def wait_pushed(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the runtime has read the value of every call this buffer was
+        passed to, after which it is safe to refill it. Returns False on timeout.
+        """
+        assert self.is_registered
+        with self.push_cond_:
+            return self.push_cond_.wait_for(lambda: self.pushing_cnt_ == 0, timeout)
+
+    def BeginPush(self) -> None:
+        with self.push_cond_:
+            self.pushing_cnt_ += 1
+
+    def EndPush(self) -> None:
+        with self.push_cond_:
+            self.pushing_cnt_ -= 1
+            if self.pushing_cnt_ == 0:
+                self.push_cond_.notify_all()
+
+    def RankViews(self, axis: int, parallel_num: int) -> List[np.ndarray]:
+        """Returns the per-rank parts of a split input as views of this buffer.
+        The views are made once, and they are contiguous when split on axis 0,
+        which is what the input blobs of global functions use.
+        """
+        key = (axis, parallel_num)
+        views = self.rank_views_.get(key)
+        if views is None:
+            array = self.view(np.ndarray)
+            views = []
+            for start, end in balanced_splitter.BalancedRanges(
+                self.shape[axis], parallel_num
+            ):
+                slc = [slice(None)] * self.ndim
+                slc[axis] = slice(start, end)
+                views.append(array[tuple(slc)])
+            self.rank_views_[key] = views
+        return views
+
+
+def IsRegisteredInputBuffer(ndarray) -> bool:
+    return isinstance(ndarray, InputBuffer) and ndarray.is_registered
+
+
+def _MakePushNdarrayCallback(ndarray, buffer_pool=None):
+    input_buffer = None
+    if IsRegisteredInputBuffer(ndarray):
+        # registered buffers are pushed in place, their owner waits for the push
+        # by InputBuffer.wait_pushed before refilling them
+        input_buffer = ndarray
+        input_buffer.BeginPush()
+        copied = ndarray.view(np.ndarray)
+    elif buffer_pool is None:
+        copied = np.copy(ndarray)
+    else:
+        copied = buffer_pool.Copy(ndarray)
 
     def Copy(ofblob):
-        capacity = reduce(lambda x, y: x * y, ofblob.static_shape, 1)
-        elem_cnt = reduce(lambda x, y: x * y, copied.shape, 1)
-        assert elem_cnt <= capacity, "%s v.s. %s" % (copied.shape, ofblob.static_shape)
-        ofblob.CopyFromNdarray(copied)
+        try:
+            capacity = reduce(lambda x, y: x * y, ofblob.static_shape, 1)
+            elem_cnt = reduce(lambda x, y: x * y, copied.shape, 1)
+            assert elem_cnt <= capacity, "%s v.s. %s" % (
+                copied.shape,
+                ofblob.static_shape,
+            )
+            ofblob.CopyFromNdarray(copied)
+        finally:
+            if input_buffer is not None:
+                input_buffer.EndPush()
+            elif buffer_pool is not None:
+                buffer_pool.Release(copied)
 
     return Copy
 
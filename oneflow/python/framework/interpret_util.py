@@ -29,24 +29,24 @@ blob_register = oneflow._oneflow_internal.GetDefaultBlobRegister()
 def Forward(op_conf, scope_symbol=None):
     if scope_symbol is None:
         scope_symbol = oneflow.current_scope()
-    func = enable_if.unique([LazyInfer, EagerForward])
+    func = _forward_unique()
     return func(compile_ctx.CurJobAddOp, op_conf, scope_symbol)
 
 
 def OpKernelForward(op_conf, opkernel_object):
-    func = enable_if.unique([LazyOpKernelInfer, EagerOpKernelForward])
+    func = _op_kernel_forward_unique()
     return func(compile_ctx.CurJobAddOp, op_conf, opkernel_object)
 
 
 def ConsistentForward(op_conf, scope_symbol=None):
     if scope_symbol is None:
         scope_symbol = oneflow.current_scope()
-    func = enable_if.unique([LazyInfer, EagerForward])
+    func = _forward_unique()
     return func(compile_ctx.CurJobAddConsistentOp, op_conf, scope_symbol)
 
 
 def OpKernelConsistentForward(op_conf, opkernel_object):
-    func = enable_if.unique([LazyOpKernelInfer, EagerOpKernelForward])
+    func = _op_kernel_forward_unique()
     return func(compile_ctx.CurJobAddConsistentOp, op_conf, opkernel_object)
 
 
@@ -72,6 +72,9 @@ def EagerForward(add_and_infer, op_conf, scope_symbol=None):
     return op_attribute
 
 
+_forward_unique = enable_if.compile_unique([LazyInfer, EagerForward])
+
+
 @enable_if.condition(hob.in_global_mode & hob.eager_execution_enabled)
 def EagerOpKernelForward(add_and_infer, op_conf, opkernel_object):
     op_attribute = add_and_infer(op_conf, opkernel_object.scope_symbol)
@@ -81,3 +84,8 @@ def EagerOpKernelForward(add_and_infer, op_conf, opkernel_object):
         op_attribute, blob_register, bw_blob_register
     )
     return op_attribute
+
+
+_op_kernel_forward_unique = enable_if.compile_unique(
+    [LazyOpKernelInfer, EagerOpKernelForward]
+)
@@ -32,6 +32,7 @@ import inspect
 import numpy as np
 
 from oneflow.python.framework.check_point_v2 import (
+    AsyncSaver,
     LoadVariables,
     SaveVarDict,
     GetCheckpoint,
@@ -171,6 +172,8 @@ class CheckpointConfig(object):
         self.need_save = False
         self.save_dirpath = None
         self.save_step_interval = 1
+        self.async_save = False
+        self.max_inflight_snapshots = 1
         self.error_msg = ""
 
     def config_load(self, dirpath: str = None):
@@ -178,12 +181,27 @@ class CheckpointConfig(object):
         assert dirpath is not None, "dirpath should not be None"
         self.load_dirpath = dirpath
 
-    def config_save(self, dirpath: str = None, step_interval: int = 1):
+    def config_save(
+        self,
+        dirpath: str = None,
+        step_interval: int = 1,
+        async_save: bool = False,
+        max_inflight_snapshots: int = 1,
+    ):
+        r"""Save a checkpoint every `step_interval` steps.
+
+        If `async_save` is True, variables are copied into host memory at the
+        end of the step and written to disk in background while training
+        continues, with at most `max_inflight_snapshots` copies not written yet.
+        """
         self.need_save = True
         self.save_dirpath = dirpath
         assert dirpath is not None, "dirpath should not be None"
         self.save_step_interval = step_interval
         assert step_interval > 0, "step_interval should not <= 0"
+        self.async_save = async_save
+        self.max_inflight_snapshots = max_inflight_snapshots
+        assert max_inflight_snapshots > 0, "max_inflight_snapshots should not <= 0"
 
     def check_valid(self):
         # Reserved interface for future use
@@ -275,17 +293,23 @@ class Model(
 
         if self._checkpoint_model.is_valid:
             self._checkpoint_model.load()
-        for step_idx in range(0, self._max_steps):
-            for sub_model in self._sub_models:
-                try:
-                    sub_model.step(step_idx)
-                except Exception as e:
-                    print(
-                        "Model step_idx {} sub-model {} failed.".format(
-                            step_idx, sub_model.name
+        try:
+            for step_idx in range(0, self._max_steps):
+                for sub_model in self._sub_models:
+                    try:
+                        sub_model.step(step_idx)
+                    except Exception as e:
+                        print(
+                            "Model step_idx {} sub-model {} failed.".format(
+                                step_idx, sub_model.name
+                            )
                         )
-                    )
-                    raise e
+                        raise e
+        finally:
+            # also when a step fails, so that the checkpoints being written in
+            # background are completed
+            if self._checkpoint_model.is_valid:
+                self._checkpoint_model.wait()
 
     def method_overrided(self, method_name: str = None) -> bool:
         return getattr(self.__class__, method_name) != getattr(Model, method_name)
@@ -607,6 +631,7 @@ class CheckpointModel(SubModel):
         callbacks: Optional[Union[Callback, List[Callback]]] = None,
     ):
         super().__init__("checkpoint_model", cfg, model, callbacks)
+        self._async_saver = None
 
     def load(self):
         assert self.is_valid
@@ -628,12 +653,24 @@ class CheckpointModel(SubModel):
         """
         LoadVariables(GetCheckpoint(path=dirpath))
 
+    def wait(self):
+        r"""Wait for the checkpoints being saved in background.
+        """
+        if self._async_saver is not None:
+            self._async_saver.close()
+            self._async_saver = None
+
     def _save_checkpoint(
         self, dirpath: str,
     ):
         r"""Save model states as a checkpoint.
         """
-        SaveVarDict(path=dirpath)
+        if self._cfg.async_save:
+            if self._async_saver is None:
+                self._async_saver = AsyncSaver(self._cfg.max_inflight_snapshots)
+            self._async_saver.save(path=dirpath)
+        else:
+            SaveVarDict(path=dirpath)
 
 
 def _infer_job_signature(data_module, batch, optimizer_idx, job):
@@ -0,0 +1,160 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import argparse
+import os
+import struct
+from typing import List
+
+import numpy as np
+
+from oneflow.python.oneflow_export import oneflow_export
+
+# keep in sync with oneflow/user/data/ofrecord_indexed_dataset.h
+INDEX_MAGIC_CODE = b"OFRECIDX"
+INDEX_FILE_SUFFIX = ".index"
+_INDEX_HEADER = struct.Struct("<8sqq")
+_RECORD_LENGTH = struct.Struct("<q")
+
+
+def GetPartPaths(
+    ofrecord_dir: str,
+    data_part_num: int,
+    part_name_prefix: str = "part-",
+    part_name_suffix_length: int = -1,
+) -> List[str]:
+    return [
+        os.path.join(
+            ofrecord_dir, part_name_prefix + str(i).zfill(part_name_suffix_length)
+        )
+        for i in range(data_part_num)
+    ]
+
+
+def ScanRecordOffsets(part_path: str) -> np.ndarray:
+    r"""Returns the offsets of the records in an ofrecord part file, which are the
+    positions of their length prefixes.
+    """
+    offsets = []
+    part_size = os.path.getsize(part_path)
+    with open(part_path, "rb") as f:
+        offset = 0
+        while offset < part_size:
+            header = f.read(_RECORD_LENGTH.size)
+            if len(header) != _RECORD_LENGTH.size:
+                raise ValueError(
+                    "{} is truncated at offset {}".format(part_path, offset)
+                )
+            (length,) = _RECORD_LENGTH.unpack(header)
+            if length <= 0 or offset + _RECORD_LENGTH.size + length > part_size:
+                raise ValueError(
+                    "{} has a bad record length {} at offset {}".format(
+                        part_path, length, offset
+                    )
+                )
+            offsets.append(offset)
+            offset += _RECORD_LENGTH.size + length
+            f.seek(offset)
+    return np.array(offsets, dtype="<i8")
+
+
+def WriteIndex(part_path: str, offsets: np.ndarray) -> None:
+    index_path = part_path + INDEX_FILE_SUFFIX
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _INDEX_HEADER.pack(
+                INDEX_MAGIC_CODE, os.path.getsize(part_path), offsets.size
+            )
+        )
+        f.write(offsets.astype("<i8").tobytes())
+    os.replace(tmp_path, index_path)
+
+
+def ReadIndex(part_path: str) -> np.ndarray:
+    r"""Returns the record offsets in the index of an ofrecord part file."""
+    index_path = part_path + INDEX_FILE_SUFFIX
+    with open(index_path, "rb") as f:
+        magic_code, part_size, record_num = _INDEX_HEADER.unpack(
+            f.read(_INDEX_HEADER.size)
+        )
+        if magic_code != INDEX_MAGIC_CODE:
+            raise ValueError("{} is not an ofrecord index".format(index_path))
+        if part_size != os.path.getsize(part_path):
+            raise ValueError("{} is out of date".format(index_path))
+        return np.frombuffer(f.read(), dtype="<i8", count=record_num)
+
+
+@oneflow_export("data.build_ofrecord_index")
+def build_ofrecord_index(
+    ofrecord_dir: str,
+    data_part_num: int = 1,
+    part_name_prefix: str = "part-",
+    part_name_suffix_length: int = -1,
+) -> int:
+    r"""Builds the index files read by `flow.data.ofrecord_reader(..., use_index=True)`.
+
+    The index of a part file "part-x" is written to "part-x.index" next to it, and it
+    holds the offsets of the records in the part, so the records can be read in any
+    order. The indices must be rebuilt when the part files change. The arguments
+    name the part files as in `flow.data.ofrecord_reader`, and the part files must
+    be on the local file system.
+
+    It can also be run as a script:
+
+    .. code-block:: shell
+
+        python3 -m oneflow.python.framework.ofrecord_index_util ./dataset/ --data_part_num 8
+
+    Args:
+        ofrecord_dir (str): Path to ofrecord dataset.
+        data_part_num (int, optional): Number of dataset's partitions. Defaults to 1.
+        part_name_prefix (str, optional): Prefix of dataset's parition file. Defaults to "part-".
+        part_name_suffix_length (int, optional): Total length of padded suffix number , -1 means no padding. eg: 3 for `part-001`. Defaults to -1.
+
+    Returns:
+        int: The number of records in the dataset
+    """
+    record_num = 0
+    for part_path in GetPartPaths(
+        ofrecord_dir, data_part_num, part_name_prefix, part_name_suffix_length
+    ):
+        offsets = ScanRecordOffsets(part_path)
+        WriteIndex(part_path, offsets)
+        record_num += offsets.size
+    return record_num
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="build the index of an ofrecord dataset"
+    )
+    parser.add_argument("ofrecord_dir", type=str)
+    parser.add_argument("--data_part_num", type=int, default=1)
+    parser.add_argument("--part_name_prefix", type=str, default="part-")
+    parser.add_argument("--part_name_suffix_length", type=int, default=-1)
+    args = parser.parse_args()
+    print(
+        "{} records indexed".format(
+            build_ofrecord_index(
+                args.ofrecord_dir,
+                args.data_part_num,
+                args.part_name_prefix,
+                args.part_name_suffix_length,
+            )
+        )
+    )
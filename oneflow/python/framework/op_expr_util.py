@@ -15,28 +15,89 @@ limitations under the License.
 """
 import oneflow as flow
 import oneflow._oneflow_internal
-from oneflow.python.framework.attr_util import convert_to_user_attr_value
+from oneflow.python.framework.attr_util import (
+    convert_to_user_attr_value_by_type,
+    make_attr_value_key,
+)
+
+
+class _UserOpCallPlan(object):
+    r"""What user_op_expr_call needs to convert the attributes of an op type,
+    prepared on its first call. The types of the attributes are resolved once,
+    and the attr maps of the attribute values used before are reused, so that
+    only values not seen yet are converted.
+    """
+
+    # attribute values like shapes may take many values, the maps of the values
+    # beyond are converted on every call
+    max_attr_map_num = 64
+
+    def __init__(self, op_type_name):
+        self.op_type_name_ = op_type_name
+        self.attr_name2attr_type_ = {}
+        self.empty_attr_map_ = oneflow._oneflow_internal.MutableCfgAttrMap()
+        self.key2attr_map_ = {}
+
+    def GetAttrMap(self, kwargs):
+        if len(kwargs) == 0:
+            return self.empty_attr_map_
+        try:
+            key = tuple(
+                (attr_name, make_attr_value_key(attr_value))
+                for attr_name, attr_value in kwargs.items()
+            )
+            attr_map = self.key2attr_map_.get(key)
+        except TypeError:
+            # unhashable values
+            return self._MakeAttrMap(kwargs)
+        if attr_map is None:
+            attr_map = self._MakeAttrMap(kwargs)
+            if len(self.key2attr_map_) < self.max_attr_map_num:
+                self.key2attr_map_[key] = attr_map
+        return attr_map
+
+    def _MakeAttrMap(self, kwargs):
+        attrs = oneflow._oneflow_internal.MutableCfgAttrMap()
+        for attr_name, attr_value in kwargs.items():
+            attrs[attr_name] = convert_to_user_attr_value_by_type(
+                self._AttrType(attr_name), attr_value
+            )
+        return attrs
+
+    def _AttrType(self, attr_name):
+        attr_type = self.attr_name2attr_type_.get(attr_name)
+        if attr_type is None:
+            assert isinstance(attr_name, str)
+            attr_type = oneflow._oneflow_internal.GetUserOpAttrType(
+                self.op_type_name_, attr_name
+            )
+            self.attr_name2attr_type_[attr_name] = attr_type
+        return attr_type
+
+
+_op_type_name2call_plan = {}
+
+
+def _GetUserOpCallPlan(op_type_name):
+    plan = _op_type_name2call_plan.get(op_type_name)
+    if plan is None:
+        plan = _UserOpCallPlan(op_type_name)
+        _op_type_name2call_plan[op_type_name] = plan
+    return plan
+
+
+def _ToEagerTensorArg(arg):
+    if isinstance(arg, flow.Tensor):
+        if not arg.is_determined:
+            arg.determine()
+        return arg._local_or_consistent_tensor
+    return arg
 
 
 def user_op_expr_call(self, *args, **kwargs):
-    args = list(args)
-    for i in range(len(args)):
-        arg = args[i]
-        if isinstance(arg, flow.Tensor):
-            if not arg.is_determined:
-                arg.determine()
-            args[i] = arg._local_or_consistent_tensor
-
-    attrs = oneflow._oneflow_internal.MutableCfgAttrMap()
-    for attr_name, attr_value in kwargs.items():
-        assert isinstance(attr_name, str)
-        attrs[attr_name] = convert_to_user_attr_value(
-            self.op_type_name, attr_name, attr_value
-        )
-
-    results = self.apply(args, attrs)
-
-    return results
+    args = [_ToEagerTensorArg(arg) for arg in args]
+    attrs = _GetUserOpCallPlan(self.op_type_name).GetAttrMap(kwargs)
+    return self.apply(args, attrs)
 
 
 def RegisterMethod4UserOpExpr():
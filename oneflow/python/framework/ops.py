@@ -37,7 +37,7 @@ def api_repeat(
     repeat_num: int,
     name: Optional[str] = None,
 ) -> oneflow._oneflow_internal.BlobDesc:
-    func = enable_if.unique([repeat])
+    func = _repeat_unique()
     return func(input, repeat_num, name=name)
 
 
@@ -58,13 +58,16 @@ def repeat(input, repeat_num, name=None):
     )
 
 
+_repeat_unique = enable_if.compile_unique([repeat])
+
+
 @oneflow_export("acc")
 def api_acc(
     one: oneflow._oneflow_internal.BlobDesc,
     max_acc_num: int,
     name: Optional[str] = None,
 ) -> oneflow._oneflow_internal.BlobDesc:
-    func = enable_if.unique([acc])
+    func = _acc_unique()
     return func(one, max_acc_num, name=name)
 
 
@@ -83,13 +86,16 @@ def acc(one, max_acc_num, name=None):
     )
 
 
+_acc_unique = enable_if.compile_unique([acc])
+
+
 @oneflow_export("unpack")
 def api_unpack(
     input: oneflow._oneflow_internal.BlobDesc,
     unpack_num: int,
     name: Optional[str] = None,
 ) -> oneflow._oneflow_internal.BlobDesc:
-    func = enable_if.unique([unpack])
+    func = _unpack_unique()
     return func(input, unpack_num, name=name)
 
 
@@ -110,11 +116,14 @@ def unpack(input, unpack_num, name=None):
     )
 
 
+_unpack_unique = enable_if.compile_unique([unpack])
+
+
 @oneflow_export("pack")
 def api_pack(
     input: oneflow._oneflow_internal.BlobDesc, pack_num: int, name: Optional[str] = None
 ) -> oneflow._oneflow_internal.BlobDesc:
-    func = enable_if.unique([pack])
+    func = _pack_unique()
     return func(input, pack_num, name=name)
 
 
@@ -135,6 +144,9 @@ def pack(input, pack_num, name=None):
     )
 
 
+_pack_unique = enable_if.compile_unique([pack])
+
+
 @oneflow_export("parallel_cast")
 def api_parallel_cast(
     input: oneflow._oneflow_internal.BlobDesc,
@@ -144,7 +156,7 @@ def api_parallel_cast(
         oneflow._oneflow_internal.distribute.Distribute
     ] = None,
 ) -> oneflow._oneflow_internal.BlobDesc:
-    func = enable_if.unique([parallel_cast])
+    func = _parallel_cast_unique()
     return func(
         input, name=name, distribute=distribute, gradient_distribute=gradient_distribute
     )
@@ -181,6 +193,9 @@ def parallel_cast(input, name=None, distribute=None, gradient_distribute=None):
     return op.InferAndTryRun().SoleOutputBlob()
 
 
+_parallel_cast_unique = enable_if.compile_unique([parallel_cast])
+
+
 @oneflow_export("hierarchical_parallel_cast")
 def api_hierarchical_parallel_cast(
     input: oneflow._oneflow_internal.BlobDesc,
@@ -189,7 +204,7 @@ def api_hierarchical_parallel_cast(
     grad_parallel_distribution: Sequence[str] = None,
     name: Optional[str] = None,
 ) -> oneflow._oneflow_internal.BlobDesc:
-    func = enable_if.unique([hierarchical_parallel_cast])
+    func = _hierarchical_parallel_cast_unique()
     return func(
         input,
         parallel_distribution=parallel_distribution,
@@ -236,3 +251,8 @@ def hierarchical_parallel_cast(
         .Build()
     )
     return op.InferAndTryRun().SoleOutputBlob()
+
+
+_hierarchical_parallel_cast_unique = enable_if.compile_unique(
+    [hierarchical_parallel_cast]
+)
@@ -47,6 +47,7 @@ class LazyFutureRemoteBlobs(FutureRemoteBlobs):
         self.session_ = session
         self.cond_var_ = threading.Condition()
         self.out_remote_blob_pullers_ = []
+        self.pullers_cnt_ = 0
         self.finished_cnt_ = 0
         self.data_delivered_ = False
         self.async_get_callback_ = lambda: None
@@ -88,15 +89,21 @@ class LazyFutureRemoteBlobs(FutureRemoteBlobs):
         assert len(self.out_remote_blob_pullers_) == 0
         pullers = self._MakeRemoteBlobPullers(out_remote_blobs)
         self.out_remote_blob_pullers_ = pullers
-        for puller in self._FlatConsistentBlobPullers(pullers):
-            puller.AsyncPull(self._FinishCallback)
+        flat_pullers = list(self._FlatConsistentBlobPullers(pullers))
+        self.pullers_cnt_ = len(flat_pullers)
+        # launch the pull jobs of all outputs together
+        self.session_.AsyncPullBatch(
+            [puller.MakePullCallback(self._FinishCallback) for puller in flat_pullers]
+        )
         return self
 
     def _FinishCallback(self):
         self.cond_var_.acquire()
         self.finished_cnt_ += 1
-        self.cond_var_.notify()
-        self.async_get_callback_()
+        # only the last finished puller wakes up the waiter
+        if self.finished_cnt_ == self.pullers_cnt_:
+            self.cond_var_.notify_all()
+            self.async_get_callback_()
         self.cond_var_.release()
 
     def _Wait(self):
@@ -122,10 +129,7 @@ class LazyFutureRemoteBlobs(FutureRemoteBlobs):
         raise NotImplementedError
 
     def _GetPullersCnt(self):
-        cnt = 0
-        for _ in self._FlatConsistentBlobPullers(self.out_remote_blob_pullers_):
-            cnt += 1
-        return cnt
+        return self.pullers_cnt_
 
     def _FlatConsistentBlobPullers(self, pullers):
         if isinstance(pullers, _BlobPuller):
@@ -185,13 +189,21 @@ class _ConsistentBlobPuller(_BlobPuller):
         yield self
 
     def AsyncPull(self, pull_cb):
+        self.session_.AsyncPull(*self.MakePullCallback(pull_cb))
+
+    def MakePullCallback(self, pull_cb):
+        """
+        Return (op_name, pull_data_cb) to pull the blob, `pull_cb` is called
+        after the result is set
+        """
+
         def PullCallback(of_blob):
             self.result_ = local_blob_util.LocalBlob(
                 of_blob.CopyToNdarray(), self.consistent_blob_.is_dynamic
             )
             pull_cb()
 
-        self.session_.AsyncPull(self.consistent_blob_.op_name, PullCallback)
+        return self.consistent_blob_.op_name, PullCallback
 
 
 class _MirroredBlobPuller(_BlobPuller):
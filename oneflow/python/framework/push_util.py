@@ -15,6 +15,9 @@ limitations under the License.
 """
 from __future__ import absolute_import
 
+import threading
+import typing
+
 import oneflow
 import oneflow.python.framework.input_blob_def as input_blob_def
 import oneflow.python.framework.dtype as dtype_util
@@ -22,24 +25,87 @@ import oneflow.python.framework.python_callback as python_callback
 import oneflow.python.framework.balanced_splitter as balanced_splitter
 import oneflow.python.framework.remote_blob as remote_blob_util
 import oneflow.python.framework.id_util as id_util
+import oneflow.python.framework.typing as oft
 import oneflow.python.eager.boxing_util as boxing_util
 import oneflow.core.operator.op_conf_pb2 as op_conf_util
 import oneflow.core.register.logical_blob_id_pb2 as logical_blob_id_util
 import oneflow._oneflow_internal.oneflow.core.register.logical_blob_id as lbi_util
 import oneflow._oneflow_internal
+from oneflow.python.oneflow_export import oneflow_export
 import numpy
 from functools import reduce
 
 blob_register = oneflow._oneflow_internal.GetDefaultBlobRegister()
 
 
+@oneflow_export("make_input_buffers")
+def MakeInputBuffers(job_func: typing.Callable) -> typing.Tuple:
+    r"""Allocates the host buffers of the inputs of a global function once, shaped
+    like its `oneflow.typing.Numpy.Placeholder` annotations.
+
+    Fill the buffers in place and pass them to the global function. They are
+    copied into the runtime directly, without staging a temporary copy of the
+    value, and split inputs are fed to every rank from views of the buffers.
+    Because the runtime reads the buffers after the call returns, call
+    `wait_pushed()` of a buffer before refilling it, or alternate between
+    several sets of buffers.
+
+    For example:
+
+    .. code-block:: python
+
+        @flow.global_function()
+        def foo(x: flow.typing.Numpy.Placeholder((32, 3, 224, 224))):
+            ...
+
+        (x_buf,) = flow.make_input_buffers(foo)
+        for images in dataset:
+            x_buf.wait_pushed()
+            x_buf[...] = images
+            foo(x_buf)
+
+    Args:
+        job_func: the global function
+
+    Returns:
+        a tuple of buffers with the structure of the parameters of `job_func`
+    """
+    parameters = job_func.__oneflow_function_signature__.parameters
+    return tuple(_MakeInputBuffer(p.annotation) for p in parameters.values())
+
+
+def _MakeInputBuffer(cls):
+    if oft.OriginFrom(cls, oft.NumpyDef):
+        return input_blob_def.InputBuffer(
+            cls.shape, dtype_util.convert_oneflow_dtype_to_numpy_dtype(cls.dtype)
+        )
+    elif oft.OriginFrom(cls, typing.Tuple):
+        return tuple(_MakeInputBuffer(a) for a in cls.__args__)
+    else:
+        raise NotImplementedError(
+            "input buffers only support oneflow.typing.Numpy.Placeholder, %s found"
+            % cls
+        )
+
+
 def AsyncPush(session, job_func, *arg):
     assert len(arg) == len(job_func.__oneflow_input_blob_defs__)
+    # check all arguments before making any push callback, because making the
+    # callback of a registered input buffer marks it as being pushed, and a
+    # failed check would leave it marked forever. Then launch the push jobs of
+    # all arguments of this call together
+    arg_blob_def_and_ndarrays = []
     for i in range(len(arg)):
-        _AsyncPushArg(session, job_func.__oneflow_input_blob_defs__[i], arg[i])
+        _CheckArgs(
+            job_func.__oneflow_input_blob_defs__[i], arg[i], arg_blob_def_and_ndarrays
+        )
+    op_name_and_push_cbs = []
+    for arg_blob_def, arg_ndarray in arg_blob_def_and_ndarrays:
+        op_name_and_push_cbs.extend(arg_blob_def.MakePushCallbacks(arg_ndarray))
+    session.AsyncPushBatch(op_name_and_push_cbs)
 
 
-def _AsyncPushArg(session, arg_blob_def, arg_ndarray):
+def _CheckArgs(arg_blob_def, arg_ndarray, arg_blob_def_and_ndarrays):
     if isinstance(arg_blob_def, (list, tuple)):
         assert isinstance(arg_ndarray, (list, tuple)), "type(arg_ndarray): %s" % (
             type(arg_ndarray)
@@ -49,15 +115,16 @@ def _AsyncPushArg(session, arg_blob_def, arg_ndarray):
             len(arg_ndarray),
         )
         for blob_def, ndarray in zip(arg_blob_def, arg_ndarray):
-            _AsyncPushArg(session, blob_def, ndarray)
+            _CheckArgs(blob_def, ndarray, arg_blob_def_and_ndarrays)
     elif isinstance(arg_blob_def, dict):
         assert type(arg_blob_def) is type(arg_ndarray)
         assert set(arg_blob_def.keys()) == set(arg_ndarray.keys())
         for k, blob_def in arg_blob_def.items():
-            _AsyncPushArg(session, blob_def, arg_ndarray[k])
+            _CheckArgs(blob_def, arg_ndarray[k], arg_blob_def_and_ndarrays)
     else:
         assert isinstance(arg_blob_def, input_blob_def.ArgBlobDef)
-        arg_blob_def.CheckAndAsyncPush(session, arg_ndarray)
+        arg_blob_def.CheckNdarray(arg_ndarray)
+        arg_blob_def_and_ndarrays.append((arg_blob_def, arg_ndarray))
 
 
 def MakeEagerInputBlobs(arg_blob_def, arg_ndarray):
@@ -97,10 +164,25 @@ def _CheckInputArgBlobDefValueMatch(arg_blob_def, arg_value):
 
 def FeedValueToEagerBlob(blob_object, blob_def, ndarray):
     physical_blob_objects = _GetPhysicalBlobObjects(blob_object, None)
-    feed_ctx = FeedContext(blob_object.op_arg_parallel_attr, ndarray)
+    feed_ctxs = []
+    feed_blobs = []
     for i, physical_blob_object in enumerate(physical_blob_objects):
-        feed_ctx.set_rank(i)
-        _FeedValueToInputPhysicalBlob(feed_ctx, blob_def, physical_blob_object)
+        feed_ctx = FeedContext(blob_object.op_arg_parallel_attr, ndarray, rank=i)
+        feed_ctx.BeginPush()
+        feed_ctxs.append(feed_ctx)
+        feed_blobs.append(
+            (
+                physical_blob_object,
+                _MakeFeedBlobCallback(feed_ctx, blob_def, physical_blob_object),
+            )
+        )
+    try:
+        _FeedValueToInputPhysicalBlobs(blob_def, feed_blobs)
+    except Exception:
+        # the feed callbacks, which end the pushes, may never run
+        for feed_ctx in feed_ctxs:
+            feed_ctx.EndPush()
+        raise
 
 
 def _CreateEagerInputBlobAndFeedValue(arg_blob_def, arg_ndarray):
@@ -181,10 +263,29 @@ class FeedContext(object):
         self.rank_ = rank
         # balanced_range is used in split_parallel
         self.balanced_range_ = None
+        self.pushing_ = False
+        self.push_lock_ = threading.Lock()
+
+    @property
+    def arg_ndarray(self):
+        return self.arg_ndarray_
 
     def set_rank(self, rank):
         self.rank_ = rank
 
+    def BeginPush(self):
+        r"""Marks a registered input buffer as being pushed until `EndPush`"""
+        if input_blob_def.IsRegisteredInputBuffer(self.arg_ndarray_):
+            self.pushing_ = True
+            self.arg_ndarray_.BeginPush()
+
+    def EndPush(self):
+        r"""Ends the push marked by `BeginPush`, only the first call takes effect"""
+        with self.push_lock_:
+            pushing, self.pushing_ = self.pushing_, False
+        if pushing:
+            self.arg_ndarray_.EndPush()
+
     def GetFixedTensor(self, logical_shape):
         assert isinstance(self.arg_ndarray_, numpy.ndarray)
         assert self.arg_ndarray_.shape == logical_shape, "%s v.s. %s" % (
@@ -197,6 +298,9 @@ class FeedContext(object):
             return self._AsContiguousNdArray(self.arg_ndarray_)
         elif sbp_parallel.has_split_parallel():
             axis = sbp_parallel.split_parallel().axis()
+            if input_blob_def.IsRegisteredInputBuffer(self.arg_ndarray_):
+                ndarray = self.arg_ndarray_.RankViews(axis, parallel_num)[self.rank_]
+                return self._AsContiguousNdArray(ndarray)
             start, end = self._GetBalancedRanges(logical_shape[axis])[self.rank_]
             slc = [slice(None)] * len(logical_shape)
             slc[axis] = slice(start, end)
@@ -225,7 +329,9 @@ class FeedContext(object):
         return self._AsContiguousNdArray(ndarray)
 
     def _AsContiguousNdArray(self, ndarray):
-        if isinstance(ndarray, numpy.ndarray):
+        if isinstance(ndarray, input_blob_def.InputBuffer):
+            return self._AsContiguousNdArray(ndarray.view(numpy.ndarray))
+        elif isinstance(ndarray, numpy.ndarray):
             return (
                 ndarray if ndarray.data.contiguous else numpy.ascontiguousarray(ndarray)
             )
@@ -235,20 +341,22 @@ class FeedContext(object):
             raise NotImplementedError
 
 
-def _FeedValueToInputPhysicalBlob(feed_ctx, blob_def, blob_object):
+def _FeedValueToInputPhysicalBlobs(blob_def, feed_blobs):
+    """
+    Feed all physical blobs of an input by a single PhysicalRun, `feed_blobs`
+    is a list of (physical_blob_object, feed_blob_callback)
+    """
     assert isinstance(blob_def, input_blob_def.ArgBlobDef)
-    assert isinstance(blob_object, oneflow._oneflow_internal.BlobObject)
-
-    FeedBlob = _MakeFeedBlobCallback(feed_ctx, blob_def, blob_object)
-    assert callable(FeedBlob)
 
     def BuildFeedInstruction(builder):
-        builder.FeedBlob(
-            blob_object, python_callback.GetIdForRegisteredCallback(FeedBlob)
-        )
-        builder.InsertRemoveForeignCallbackInstruction(
-            blob_object.object_id, python_callback.GetIdForRegisteredCallback(FeedBlob)
-        )
+        for blob_object, FeedBlob in feed_blobs:
+            assert isinstance(blob_object, oneflow._oneflow_internal.BlobObject)
+            assert callable(FeedBlob)
+            callback_id = python_callback.GetIdForRegisteredCallback(FeedBlob)
+            builder.FeedBlob(blob_object, callback_id)
+            builder.InsertRemoveForeignCallbackInstruction(
+                blob_object.object_id, callback_id
+            )
 
     oneflow._oneflow_internal.deprecated.PhysicalRun(BuildFeedInstruction)
 
@@ -257,15 +365,18 @@ def _MakeFeedBlobCallback(feed_ctx, blob_def, blob_object):
     if isinstance(blob_def, input_blob_def.FixedTensorDef):
 
         def FeedBlob(ofblob):
-            ndarray = feed_ctx.GetFixedTensor(blob_def.shape)
-            dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(ofblob.dtype)
-            assert ndarray.dtype == dtype, "%s v.s. %s" % (ndarray.dtype, dtype)
-            assert ndarray.shape == ofblob.static_shape, "%s v.s. %s" % (
-                ndarray.shape,
-                ofblob.static_shape,
-            )
-            if ofblob.CopyFromNdarray(ndarray) is False:
-                raise ValueError
+            try:
+                ndarray = feed_ctx.GetFixedTensor(blob_def.shape)
+                dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(ofblob.dtype)
+                assert ndarray.dtype == dtype, "%s v.s. %s" % (ndarray.dtype, dtype)
+                assert ndarray.shape == ofblob.static_shape, "%s v.s. %s" % (
+                    ndarray.shape,
+                    ofblob.static_shape,
+                )
+                if ofblob.CopyFromNdarray(ndarray) is False:
+                    raise ValueError
+            finally:
+                feed_ctx.EndPush()
 
     elif isinstance(blob_def, input_blob_def.MirroredTensorDef):
 
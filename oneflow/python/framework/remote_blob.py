@@ -37,7 +37,7 @@ blob_register = oneflow._oneflow_internal.GetDefaultBlobRegister()
 
 
 def RemoteBlob(lbi, **kw):
-    api = enable_if.unique([EagerLogicalBlob, LazyRemoteBlob])
+    api = _remote_blob_unique()
     return api(lbi, **kw)
 
 
@@ -86,6 +86,9 @@ def LazyRemoteBlob(lbi, **kw):
     return blob_type(lbi, job_name, distribute)
 
 
+_remote_blob_unique = enable_if.compile_unique([EagerLogicalBlob, LazyRemoteBlob])
+
+
 @property
 def dtype(self):
     ret = convert_proto_dtype_to_oneflow_dtype(self.get_dtype())
@@ -306,27 +306,49 @@ class Session(object):
         return job_func.__oneflow_output_remote_blobs__
 
     def LaunchJob(self, job_instance):
+        self.LaunchJobs([job_instance])
+
+    def LaunchJobs(self, job_instances):
         assert self.status_ is SessionStatus.RUNNING
-        self._IncRunningJobCnt()
-        job_instance.AddPostFinishCallback(lambda _: self._DecRunningJobCnt())
-        oneflow._oneflow_internal.LaunchJob(job_instance)
+        self._IncRunningJobCnt(len(job_instances))
+        for job_instance in job_instances:
+            job_instance.AddPostFinishCallback(lambda _: self._DecRunningJobCnt())
+            oneflow._oneflow_internal.LaunchJob(job_instance)
 
     def AsyncPush(self, op_name, push_data_cb):
+        self.AsyncPushBatch([(op_name, push_data_cb)])
+
+    def AsyncPushBatch(self, op_name_and_push_data_cbs):
+        """Launch the push jobs of all (op_name, push_data_cb) pairs together"""
         assert self.status_ is SessionStatus.RUNNING
-        push_job_name = self.inter_user_job_info.input_or_var_op_name2push_job_name[
-            op_name
-        ]
-        self.LaunchJob(
-            job_instance_util.MakePushJobInstance(push_job_name, op_name, push_data_cb)
+        op_name2push_job_name = (
+            self.inter_user_job_info.input_or_var_op_name2push_job_name
+        )
+        self.LaunchJobs(
+            [
+                job_instance_util.MakePushJobInstance(
+                    op_name2push_job_name[op_name], op_name, push_data_cb
+                )
+                for op_name, push_data_cb in op_name_and_push_data_cbs
+            ]
         )
 
     def AsyncPull(self, op_name, pull_data_cb):
+        self.AsyncPullBatch([(op_name, pull_data_cb)])
+
+    def AsyncPullBatch(self, op_name_and_pull_data_cbs):
+        """Launch the pull jobs of all (op_name, pull_data_cb) pairs together"""
         assert self.status_ is SessionStatus.RUNNING
-        pull_job_name = self.inter_user_job_info.output_or_var_op_name2pull_job_name[
-            op_name
-        ]
-        self.LaunchJob(
-            job_instance_util.MakePullJobInstance(pull_job_name, op_name, pull_data_cb)
+        op_name2pull_job_name = (
+            self.inter_user_job_info.output_or_var_op_name2pull_job_name
+        )
+        self.LaunchJobs(
+            [
+                job_instance_util.MakePullJobInstance(
+                    op_name2pull_job_name[op_name], op_name, pull_data_cb
+                )
+                for op_name, pull_data_cb in op_name_and_pull_data_cbs
+            ]
         )
 
     def HasAnyCallbackAfterFunctionReturn(self):
@@ -416,10 +438,10 @@ class Session(object):
             for key in keys:
                 self.backward_blob_register.ClearObject4BlobName(key)
 
-    def _IncRunningJobCnt(self):
+    def _IncRunningJobCnt(self, cnt=1):
         assert self.status_ is SessionStatus.RUNNING
         self.cond_var_.acquire()
-        self.running_job_cnt_ += 1
+        self.running_job_cnt_ += cnt
         self.cond_var_.release()
 
     def _DecRunningJobCnt(self):
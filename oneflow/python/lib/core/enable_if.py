@@ -15,6 +15,7 @@ limitations under the License.
 """
 import inspect
 
+import oneflow.python.lib.core.high_order_bool as high_order_bool
 import oneflow.python.lib.core.traceinfo as traceinfo
 
 
@@ -36,6 +37,49 @@ def set_condition_hob(func, hob):
 
 
 def unique(arg_funcs, context=None, default=None):
+    conditional_functions = _GetConditionalFunctions(arg_funcs)
+
+    if default is None:
+        default = _DefaultFunction
+
+    matched_func = GetMatchedFunction(default, conditional_functions, context=context)
+    if matched_func is not None:
+        return matched_func
+
+    return MakeDefaultFunction(default, conditional_functions, context=context)
+
+
+def compile_unique(arg_funcs):
+    r"""Compile the conditions of `arg_funcs` once and return a function
+    `Unique(context=None, default=None)` which is equivalent to
+    `unique(arg_funcs, context, default)`, but evaluates every condition
+    shared by the candidates at most once per context.
+    """
+    conditional_functions = _GetConditionalFunctions(arg_funcs)
+    match = high_order_bool.compile_bool_functors(
+        [hob_expr for hob_expr, _, _ in conditional_functions]
+    )
+
+    def Unique(context=None, default=None):
+        if default is None:
+            default = _DefaultFunction
+        matched = match(context)
+        if len(matched) == 1:
+            return conditional_functions[matched[0]][1]
+        if len(matched) == 0:
+            return MakeDefaultFunction(default, conditional_functions, context=context)
+        return _MultiMatchedErrorFunction(
+            default, [conditional_functions[i] for i in matched], context=context
+        )
+
+    return Unique
+
+
+def _DefaultFunction(get_failed_info, *args, **kwargs):
+    raise NotImplementedError(get_failed_info())
+
+
+def _GetConditionalFunctions(arg_funcs):
     assert isinstance(arg_funcs, (list, tuple))
     conditional_functions = []
     for arg_func in arg_funcs:
@@ -51,17 +95,7 @@ def unique(arg_funcs, context=None, default=None):
         if hasattr(func, "__debug_str__"):
             debug_str = func.__debug_str__
         conditional_functions.append((hob_expr, func, debug_str))
-
-    if default is None:
-
-        def default(get_failed_info, *args, **kwargs):
-            raise NotImplementedError(get_failed_info())
-
-    matched_func = GetMatchedFunction(default, conditional_functions, context=context)
-    if matched_func is not None:
-        return matched_func
-
-    return MakeDefaultFunction(default, conditional_functions, context=context)
+    return conditional_functions
 
 
 def GetMatchedFunction(default, conditional_functions, context=None):
@@ -32,7 +32,49 @@ def hob_context_attr(attr_name):
     return Decorator
 
 
+def compile_bool_functors(bool_functors):
+    r"""Compile `bool_functors` into one function `Match(ctx, max_matched_num)`
+    which returns the indices of the first `max_matched_num` bool functors
+    evaluated to True on `ctx`.
+
+    Within one Match call, every bool functor and every hob context attr
+    is evaluated at most once per context, no matter how many candidates
+    share it. Hob context attrs are identified by their attr names, so
+    attrs with the same name must mean the same thing for one context.
+    """
+    compiled = [bool_functor._Compile() for bool_functor in bool_functors]
+
+    def Match(ctx, max_matched_num=2):
+        memo = {}
+        matched = []
+        for i, bool_functor in enumerate(compiled):
+            if bool_functor(ctx, memo):
+                matched.append(i)
+                if len(matched) >= max_matched_num:
+                    break
+        return matched
+
+    return Match
+
+
+def _Memoize(key, function):
+    def Memoized(ctx, memo):
+        memo_key = (id(ctx), key)
+        if memo_key not in memo:
+            memo[memo_key] = function(ctx, memo)
+        return memo[memo_key]
+
+    return Memoized
+
+
 class BoolFunctor(object):
+    def _Compile(self):
+        r"""Return a function (ctx, memo) -> bool evaluating self, see
+        compile_bool_functors. Bool functors composed of other bool functors
+        or hob context attrs should compile them so that they are memoized.
+        """
+        return _Memoize(("functor", id(self)), lambda ctx, memo: self(ctx))
+
     def debug_str(self, ctx, display_result=True):
         if hasattr(self, "__debug_str__"):
             if display_result:
@@ -92,6 +134,11 @@ class _AndBoolFunctor(BoolFunctor):
     def __call__(self, ctx):
         return self.lhs_(ctx) and self.rhs_(ctx)
 
+    def _Compile(self):
+        lhs = self.lhs_._Compile()
+        rhs = self.rhs_._Compile()
+        return lambda ctx, memo: lhs(ctx, memo) and rhs(ctx, memo)
+
 
 class _OrBoolFunctor(BoolFunctor):
     def __init__(self, lhs, rhs):
@@ -109,6 +156,11 @@ class _OrBoolFunctor(BoolFunctor):
     def __call__(self, ctx):
         return self.lhs_(ctx) or self.rhs_(ctx)
 
+    def _Compile(self):
+        lhs = self.lhs_._Compile()
+        rhs = self.rhs_._Compile()
+        return lambda ctx, memo: lhs(ctx, memo) or rhs(ctx, memo)
+
 
 class _NotBoolFunctor(BoolFunctor):
     def __init__(self, x):
@@ -121,6 +173,33 @@ class _NotBoolFunctor(BoolFunctor):
     def __call__(self, ctx):
         return not self.x_(ctx)
 
+    def _Compile(self):
+        x = self.x_._Compile()
+        return lambda ctx, memo: not x(ctx, memo)
+
+
+class _CompareBoolFunctor(HighOrderBool):
+    def __init__(self, lhs_getter, rhs_getter, cmp_str, cmp_func):
+        HighOrderBool.__init__(
+            self,
+            "%s %s %s" % (lhs_getter.attr_name, cmp_str, rhs_getter.attr_name),
+            lambda ctx: cmp_func(
+                lhs_getter.attr_getter(ctx), rhs_getter.attr_getter(ctx)
+            ),
+        )
+        self.lhs_getter_ = lhs_getter
+        self.rhs_getter_ = rhs_getter
+        self.cmp_func_ = cmp_func
+
+    def _Compile(self):
+        lhs = self.lhs_getter_._Compile()
+        rhs = self.rhs_getter_._Compile()
+        cmp_func = self.cmp_func_
+        return _Memoize(
+            ("functor", id(self)),
+            lambda ctx, memo: cmp_func(lhs(ctx, memo), rhs(ctx, memo)),
+        )
+
 
 class HobContextGetter(object):
     def __init__(self, attr_name, attr_getter):
@@ -135,6 +214,10 @@ class HobContextGetter(object):
     def attr_getter(self):
         return self.attr_getter_
 
+    def _Compile(self):
+        attr_getter = self.attr_getter_
+        return _Memoize(("attr", self.attr_name_), lambda ctx, memo: attr_getter(ctx))
+
     def __eq__(self, other):
         if not isinstance(other, HobContextGetter):
             other = HobContextConstant(other)
@@ -166,32 +249,24 @@ class HobContextGetter(object):
         return self._MakeHob(other, "<=", lambda a, b: a <= b)
 
     def _MakeHob(self, other, cmp_str, cmp_func):
-        @bool_functor("%s %s %s" % (self.attr_name, cmp_str, other.attr_name))
-        def HobHob(context):
-            return cmp_func(self.attr_getter(context), other.attr_getter(context))
-
-        return HobHob
+        return _CompareBoolFunctor(self, other, cmp_str, cmp_func)
 
 
 class HobContextConstant(HobContextGetter):
     def __init__(self, value):
         HobContextGetter.__init__(self, str(value), lambda ctx: value)
 
+    def _Compile(self):
+        attr_getter = self.attr_getter_
+        return lambda ctx, memo: attr_getter(ctx)
+
 
 class HobContextAttr(HobContextGetter):
     def __init__(self, attr_name, attr_getter):
         HobContextGetter.__init__(self, attr_name, attr_getter)
 
     def __getattr__(self, attr_name):
-        @hob_context_attr("%s.%s" % (self.attr_name, attr_name))
-        def HobCtxAttr(ctx):
-            obj = self.attr_getter(ctx)
-            if isinstance(obj, oneflow._oneflow_internal.CfgMessage):
-                return getattr(obj, attr_name)()
-            else:
-                return getattr(obj, attr_name)
-
-        return HobCtxAttr
+        return _HobContextSubAttr(self, attr_name)
 
     def HasField(self, attr_name):
         @bool_functor('%s.HasField("%s")' % (self.attr_name, attr_name))
@@ -206,3 +281,30 @@ class HobContextAttr(HobContextGetter):
                 return hasattr(obj, attr_name)
 
         return BoolFunctor
+
+
+def _GetSubAttr(obj, attr_name):
+    if isinstance(obj, oneflow._oneflow_internal.CfgMessage):
+        return getattr(obj, attr_name)()
+    else:
+        return getattr(obj, attr_name)
+
+
+class _HobContextSubAttr(HobContextAttr):
+    def __init__(self, parent, sub_attr_name):
+        HobContextAttr.__init__(
+            self,
+            "%s.%s" % (parent.attr_name, sub_attr_name),
+            lambda ctx: _GetSubAttr(parent.attr_getter(ctx), sub_attr_name),
+        )
+        self.parent_ = parent
+        self.sub_attr_name_ = sub_attr_name
+
+    def _Compile(self):
+        # reuse the memoized value of parent
+        parent = self.parent_._Compile()
+        sub_attr_name = self.sub_attr_name_
+        return _Memoize(
+            ("attr", self.attr_name_),
+            lambda ctx, memo: _GetSubAttr(parent(ctx, memo), sub_attr_name),
+        )
@@ -64,6 +64,8 @@ class OfrecordReader(Module):
         shuffle_buffer_size: int = 1024,
         shuffle_after_epoch: bool = False,
         random_seed: int = -1,
+        use_index: bool = False,
+        sample_offset: int = 0,
         name: Optional[str] = None,
     ):
         super().__init__()
@@ -80,6 +82,8 @@ class OfrecordReader(Module):
             .Attr("shuffle_after_epoch", shuffle_after_epoch)
             .Attr("part_name_suffix_length", part_name_suffix_length)
             .Attr("seed", seed)
+            .Attr("use_index", use_index)
+            .Attr("sample_offset", sample_offset)
             .Build()
         )
 
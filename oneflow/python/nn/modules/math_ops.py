@@ -259,31 +259,68 @@ def _mean(input_tensor, dim=None, keepdim=False):
     return Mean(axis=dim, keepdims=keepdim)(input_tensor)
 
 
+class Moments(Module):
+    r"""Computes the mean and the variance of the input over the given axes. On
+    cpu they are computed by the moments op in one pass over the input, which
+    merges the statistics of its rows stably instead of computing
+    mean(x^2) - mean(x)^2. The other devices subtract the mean before squaring.
+    """
+
+    def __init__(self, keepdim: bool = False, unbiased: bool = False) -> None:
+        super().__init__()
+        self.keepdim = keepdim
+        self.unbiased = unbiased
+        self._op = (
+            flow.builtin_op("moments")
+            .Input("x")
+            .Output("mean")
+            .Output("variance")
+            .Attr("axis", [])
+            .Attr("keepdims", keepdim)
+            .Attr("unbiased", unbiased)
+            .Build()
+        )
+
+    def forward(self, input, axis):
+        if input.device == flow.device("cpu"):
+            outputs = self._op(input, axis=axis)
+            return outputs[0], outputs[1]
+        reduce_count = 1
+        for i in axis:
+            reduce_count *= input.shape[i]
+        mean = flow.experimental.mean(input, axis, True)
+        square_sum = flow.experimental.sum(
+            flow.experimental.square(flow.experimental.sub(input, mean)),
+            axis,
+            self.keepdim,
+        )
+        if not self.keepdim:
+            mean = flow.experimental.mean(input, axis, False)
+        divisor = reduce_count - 1 if self.unbiased else reduce_count
+        return mean, flow.experimental.mul(square_sum, 1.0 / divisor)
+
+
 class Variance(Module):
-    def __init__(self, dim: int = None, keepdim: bool = False) -> None:
+    def __init__(
+        self, dim: int = None, keepdim: bool = False, unbiased: bool = False
+    ) -> None:
         super().__init__()
         self.dim = dim
         self.keepdim = keepdim
+        self._moments = Moments(keepdim, unbiased)
 
     def forward(self, input):
         axis = _check_axis(self.dim, input.shape)
         if isinstance(axis, list) and len(axis) == 0:
             return flow.experimental.zeros(size=input.shape)
         else:
-            return flow.experimental.sub(
-                flow.experimental.mean(
-                    flow.experimental.square(input), axis, self.keepdim
-                ),
-                flow.experimental.square(
-                    flow.experimental.mean(input, axis, self.keepdim)
-                ),
-            )
+            return self._moments(input, axis)[1]
 
 
 @oneflow_export("var")
 @register_tensor_op("var")
 @experimental_api
-def variance_op(input, dim=None, keepdim=False):
+def variance_op(input, dim=None, keepdim=False, unbiased=False):
     r"""Returns the variance of each row of the `input` tensor in the given dimension `dim`.
 
     If `keepdim` is `True`, the output tensor is of the same size as `input` except in the dimension(s) `dim` 
@@ -294,6 +331,7 @@ def variance_op(input, dim=None, keepdim=False):
         input (Tensor): the input tensor.
         dim (int or tuple of python:ints): the dimension or dimensions to reduce. Defaults to None.
         keepdim (bool, optional): whether the output tensor has dim retained or not. Defaults to False.
+        unbiased (bool, optional): whether to use Bessel's correction, which divides by n - 1 instead of n. Defaults to False.
 
     Returns:
         Tensor: The result of variance on the specified axis of input Tensor
@@ -311,7 +349,7 @@ def variance_op(input, dim=None, keepdim=False):
         # equal to np.var(input_arr, 1, keepdim=True)
 
     """
-    return Variance(dim, keepdim)(input)
+    return Variance(dim, keepdim, unbiased)(input)
 
 
 class ScalarSubByTensor(Module):
@@ -851,39 +889,26 @@ def square_op(input):
 
 
 class Std(Module):
-    def __init__(self, dim=None, unbiased=True, keepdim=False) -> None:
+    def __init__(self, dim=None, unbiased=False, keepdim=False) -> None:
         super().__init__()
-        assert unbiased == True, "Only support 'unbiased=True' for now!"
         self.unbiased = unbiased
         self.keepdim = keepdim
         self.dim = dim
-        self.reduce_count = 1
-        self.square_op = Square()
+        self._moments = Moments(keepdim, unbiased)
         self.sqrt_op = Sqrt()
-        self.subtract_op = Subtract()
 
     def forward(self, x):
-        self.axis = _check_axis(self.dim, x.shape)
-        if isinstance(self.axis, list) and len(self.axis) == 0:
+        axis = _check_axis(self.dim, x.shape)
+        if isinstance(axis, list) and len(axis) == 0:
             return flow.experimental.zeros(size=x.shape)
         else:
-            if len(self.axis) == 0:
-                self.reduce_count = x.nelemenet()
-            else:
-                for i in self.axis:
-                    self.reduce_count *= x.shape[i]
-
-            sum = Sum(self.axis, self.keepdim)(self.square_op(x)) / self.reduce_count
-            square = self.square_op(Sum(self.axis, self.keepdim)(x) / self.reduce_count)
-            subtract = self.subtract_op(sum, square)
-            res = self.sqrt_op(subtract)
-            return res
+            return self.sqrt_op(self._moments(x, axis)[1])
 
 
 @oneflow_export("std")
 @register_tensor_op("std")
 @experimental_api
-def std_op(tensor, dim, unbiased=True, keepdim=False):
+def std_op(tensor, dim, unbiased=False, keepdim=False):
     r"""
     Returns the standard-deviation of each row of the :attr:`input` tensor in the
     dimension :attr:`dim`. If :attr:`dim` is a list of dimensions,
@@ -899,7 +924,7 @@ def std_op(tensor, dim, unbiased=True, keepdim=False):
     Args:
         input (Tensor): the input tensor.
         dim (int or tuple of python:ints): the dimension or dimensions to reduce.
-        unbiased (bool): whether to use the unbiased estimation or not
+        unbiased (bool): whether to use the unbiased estimation or not. Defaults to False.
         keepdim (bool): whether the output tensor has `dim` retained or not.
 
     For example:
@@ -167,75 +167,27 @@ class LayerNorm(Module):
         self.begin_norm_axis = len(x.shape) - len(self.normalized_shape)
         self.begin_params_axis = len(x.shape) - len(self.normalized_shape)
 
-        if x.device == flow.device("cpu"):
-            reduce_axis = []
-            for dim in range(len(x.shape)):
-                if dim >= self.begin_norm_axis:
-                    reduce_axis.append(dim)
-
-            mean = x.mean(dim=reduce_axis, keepdim=True)
-            variance = x.var(dim=reduce_axis, keepdim=True)
-
-            axis = self.begin_norm_axis
-
-            params_shape = x.shape[self.begin_params_axis :]
-            weight = self.weight
-            bias = self.bias
-            if len(mean.shape) == 1:
-                nd_params_shape = [1] * len(x.shape)
-                nd_params_shape[self.begin_norm_axis] = params_shape[0]
-                mean = mean.reshape(shape=nd_params_shape)
-                variance = variance.reshape(shape=nd_params_shape)
-
-                if self.weight and params_shape[0] == self.weight.nelemenet():
-                    weight = self.weight.reshape(shape=nd_params_shape)
-                if self.bias and params_shape[0] == self.bias.nelemenet():
-                    bias = self.bias.reshape(shape=nd_params_shape)
-            elif len(mean.shape) == len(x.shape):
-                pass
-            else:
-                raise ValueError(
-                    "shape of mean and variance should be 1D or has number of axes and x's"
-                )
-
-            variance += self.epsilon
-            normalized = (x - mean) * variance.rsqrt()
-
-            if self.weight:
-                normalized = normalized * weight
-            if self.bias:
-                normalized = normalized + bias
-            affined = normalized
-
-            nd_params_shape = [1] * (len(x.shape) - len(params_shape)) + list(
-                params_shape
-            )
-            if self.elementwise_affine:
-                affined = affined * self.weight
-                affined = affined + self.bias
-            return affined
+        if self.elementwise_affine:
+            res = self._op(
+                x,
+                self.weight,
+                self.bias,
+                center=True,
+                scale=True,
+                begin_norm_axis=self.begin_norm_axis,
+                begin_params_axis=self.begin_params_axis,
+                epsilon=self.epsilon,
+            )[0]
         else:
-            if self.elementwise_affine:
-                res = self._op(
-                    x,
-                    self.weight,
-                    self.bias,
-                    center=True,
-                    scale=True,
-                    begin_norm_axis=self.begin_norm_axis,
-                    begin_params_axis=self.begin_params_axis,
-                    epsilon=self.epsilon,
-                )[0]
-            else:
-                res = self._op2(
-                    x,
-                    center=False,
-                    scale=False,
-                    begin_norm_axis=self.begin_norm_axis,
-                    begin_params_axis=self.begin_params_axis,
-                    epsilon=self.epsilon,
-                )[0]
-            return res
+            res = self._op2(
+                x,
+                center=False,
+                scale=False,
+                begin_norm_axis=self.begin_norm_axis,
+                begin_params_axis=self.begin_params_axis,
+                epsilon=self.epsilon,
+            )[0]
+        return res
 
     def extra_repr(self) -> str:
         return (
@@ -21,7 +21,7 @@ import oneflow as flow
 
 from oneflow.python.oneflow_export import oneflow_export, experimental_api
 from oneflow.python.nn.parameter import Parameter
-from oneflow.python.nn.optimizer.optimizer import Optimizer, ParamGroup
+from oneflow.python.nn.optimizer.optimizer import Optimizer
 
 
 @oneflow_export("optim.Adam")
@@ -57,6 +57,9 @@ class Adam(Optimizer):
             numerical stability (default: 1e-8)
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
         scale (float, optional): the scale factor of loss (default: 1.0)
+        foreach (bool, optional): update the parameters of a group that live on the
+            same device and have the same dtype with one multi-tensor update op
+            instead of one op per parameter (default: False)
 
     .. _Adam\: A Method for Stochastic Optimization:
         https://arxiv.org/abs/1412.6980
@@ -74,6 +77,7 @@ class Adam(Optimizer):
         weight_decay: float = 0,  # Adam's weight_decay actually does L2 Normalize
         amsgrad: bool = False,
         scale: float = 1.0,
+        foreach: bool = False,
     ):
         super().__init__()
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
@@ -94,20 +98,14 @@ class Adam(Optimizer):
         self._default_options["weight_decay"] = weight_decay
         self._default_options["amsgrad"] = amsgrad
         self._default_options["scale"] = scale
+        self._foreach = foreach
 
         # Add parameters
         if isinstance(parameters, GeneratorType):
-            self._param_groups.append(ParamGroup(parameters, self._default_options))
+            self.add_param_group(parameters)
         else:  # List[Dict]
             for param in parameters:
-                self._param_groups.append(ParamGroup(param, self._default_options))
-
-        for param_group in self._param_groups:
-            for param in param_group.parameters:
-                assert param.is_leaf, "parameters must be leaf tensor"
-                self._state[param] = dict()
-                self._state[param]["exp_avg"] = flow.experimental.zeros_like(param)
-                self._state[param]["exp_avg_sq"] = flow.experimental.zeros_like(param)
+                self.add_param_group(param)
 
         self._op = (
             flow.builtin_op("adam_update")
@@ -121,6 +119,10 @@ class Adam(Optimizer):
             .Build()
         )
 
+    def _init_param_state(self, param, options):
+        self._state[param]["exp_avg"] = flow.experimental.zeros_like(param)
+        self._state[param]["exp_avg_sq"] = flow.experimental.zeros_like(param)
+
     def step(self, closure: Callable = None):
         """Performs a single optimization step.
 
@@ -141,12 +143,14 @@ class Adam(Optimizer):
                     "beta2": param_group.options["betas"][1],
                     "epsilon": param_group.options["eps"],
                 }
+                if self._foreach:
+                    for params in self._bucket_parameters(param_group):
+                        self._multi_tensor_step(param_group, params, kwargs)
+                    continue
                 for param in param_group.parameters:
                     if param.grad is None:
                         continue
-                    lr_tensor = flow.Tensor(
-                        [param_group.options["lr"]], device=param.device
-                    )
+                    lr_tensor = param_group.lr_tensor(param.device)
                     m_tensor = self._state[param]["exp_avg"]
                     v_tensor = self._state[param]["exp_avg_sq"]
                     self._op(
@@ -156,3 +160,29 @@ class Adam(Optimizer):
             self._state["step"] = self._state["step"] + 1
 
             return loss
+
+    def _multi_tensor_step(self, param_group, params, kwargs):
+        num = len(params)
+
+        def build_op():
+            return (
+                flow.builtin_op("multi_adam_update")
+                .Input("model", num)
+                .Input("model_diff", num)
+                .Input("learning_rate")
+                .Input("m", num)
+                .Input("v", num)
+                .Attr("l1", 0.0)
+                .Attr("weight_decay", 0.0)
+                .Build()
+            )
+
+        op = self._get_multi_tensor_op(num, build_op)
+        op(
+            *params,
+            *[param.grad for param in params],
+            param_group.lr_tensor(params[0].device),
+            *[self._state[param]["exp_avg"] for param in params],
+            *[self._state[param]["exp_avg_sq"] for param in params],
+            **kwargs,
+        )
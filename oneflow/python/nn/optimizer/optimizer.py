@@ -14,10 +14,15 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import collections
+import json
 import warnings
-from typing import Dict, Callable, Union, Any, Iterator
+from typing import Dict, Callable, Union, Any, Iterator, Mapping
 from types import GeneratorType
 
+import numpy as np
+
+import oneflow.python.framework.check_point_v2 as check_point_v2
 from oneflow.python.nn.parameter import Parameter
 from oneflow.python.framework.tensor import Tensor
 
@@ -30,14 +35,15 @@ class ParamGroup(object):
     ):
         if isinstance(parameters, GeneratorType):
             self._parameters = list(parameters)
-            self._options = default_options
+            self._options = dict(default_options)
         else:  # Dict
             assert "params" in parameters
             self._parameters = list(parameters["params"])
-            self._options = default_options
+            self._options = dict(default_options)
             for key in self._options:
                 if key in parameters:
                     self._options[key] = parameters[key]
+        self._lr_tensors = dict()
 
     @property
     def options(self):
@@ -47,6 +53,21 @@ class ParamGroup(object):
     def parameters(self):
         return self._parameters
 
+    def lr_tensor(self, device) -> Tensor:
+        """Returns the learning rate of this group as a one-element tensor on `device`.
+
+        The tensor is cached per device and only rebuilt when ``options["lr"]``
+        changes (e.g. when an lr scheduler steps), so that the optimizer does not
+        allocate and copy a new learning rate tensor for every parameter on every step.
+        """
+        lr = self._options["lr"]
+        key = str(device)
+        cached = self._lr_tensors.get(key)
+        if cached is None or cached[0] != lr:
+            cached = (lr, Tensor([lr], device=device))
+            self._lr_tensors[key] = cached
+        return cached[1]
+
 
 class Optimizer(object):
     def __init__(self):
@@ -55,22 +76,125 @@ class Optimizer(object):
         self._state = dict()
         self._state["step"] = 0
         self._op = None
+        self._multi_tensor_ops = dict()
 
     def add_param_group(self, param_group) -> None:
-        # TODO(wyg)
-        raise NotImplementedError()
-
-    def load_state_dict(self, state_dict) -> None:
-        # TODO(wyg)
-        raise NotImplementedError()
-
-    def state_dict(self):
-        # TODO(wyg)
-        raise NotImplementedError()
+        """Adds a param group to the optimizer.
+
+        Args:
+            param_group (dict): the parameters to optimize in the "params" key and
+                the options of the group, the options not given are the defaults
+                of the optimizer
+        """
+        group = ParamGroup(param_group, self._default_options)
+        for param in group.parameters:
+            assert param.is_leaf, "parameters must be leaf tensor"
+            assert (
+                param not in self._state
+            ), "some parameters appear in more than one parameter group"
+            self._state[param] = dict()
+            self._init_param_state(param, group.options)
+        self._param_groups.append(group)
+
+    def _init_param_state(self, param: Parameter, options: Dict) -> None:
+        """Creates the per-parameter states like moments in self._state[param]."""
+        pass
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Returns the state of the optimizer as a flat dict.
+
+        Per-parameter states are returned as ``"state.<index>.<name>"`` entries which
+        refer to the state tensors themselves, where ``index`` numbers the parameters
+        over all param groups in order. The options of the param groups and the step
+        count are encoded into the numpy arrays ``"param_groups"`` and ``"step"``.
+
+        Like ``Module.state_dict()``, it can be saved by ``flow.save`` and loaded back
+        by ``flow.load``, which writes and reads the state tensors slice by slice.
+        """
+        state_dict = collections.OrderedDict()
+        param_groups = []
+        index = 0
+        for group in self._param_groups:
+            group_dict = dict(group.options)
+            group_dict["params"] = list(range(index, index + len(group.parameters)))
+            for param in group.parameters:
+                for name, value in self._state[param].items():
+                    state_dict["state.{}.{}".format(index, name)] = value
+                index += 1
+            param_groups.append(group_dict)
+        state_dict["param_groups"] = np.frombuffer(
+            json.dumps(param_groups).encode(), dtype=np.uint8
+        )
+        state_dict["step"] = np.array([self._state["step"]], dtype=np.int64)
+        return state_dict
+
+    def load_state_dict(self, state_dict: Mapping[str, Any]) -> None:
+        """Loads the optimizer state.
+
+        Args:
+            state_dict (Mapping): optimizer state returned by ``state_dict()`` or
+                loaded by ``flow.load``. The state tensors are fed slice by slice, so
+                loading a checkpoint from disk doesn't read the whole state into
+                host memory at once.
+        """
+        saved_groups = json.loads(
+            _ToNumpy(state_dict["param_groups"]).tobytes().decode()
+        )
+        if len(saved_groups) != len(self._param_groups):
+            raise ValueError(
+                "loaded state dict has a different number of parameter groups"
+            )
+        for group, saved_group in zip(self._param_groups, saved_groups):
+            if len(group.parameters) != len(saved_group["params"]):
+                raise ValueError(
+                    "loaded state dict contains a parameter group "
+                    "that doesn't match the size of optimizer's group"
+                )
+
+        for group, saved_group in zip(self._param_groups, saved_groups):
+            for key, value in saved_group.items():
+                if key == "params":
+                    continue
+                # json turns tuples like betas into lists
+                if isinstance(group.options.get(key), tuple):
+                    value = tuple(value)
+                group.options[key] = value
+            for index, param in zip(saved_group["params"], group.parameters):
+                for name, tensor in self._state[param].items():
+                    key = "state.{}.{}".format(index, name)
+                    if key not in state_dict:
+                        raise KeyError(
+                            "{} is not found in loaded state dict".format(key)
+                        )
+                    check_point_v2.FeedValueToLocalTensor(tensor, state_dict[key])
+        self._state["step"] = int(_ToNumpy(state_dict["step"]).item())
 
     def step(self, closure: Union[Callable, None] = None) -> Union[Tensor, None]:
         raise NotImplementedError()
 
+    def _bucket_parameters(self, param_group: ParamGroup):
+        """Groups the parameters which have gradients by (device, dtype), so that each
+        bucket can be updated by a single multi-tensor update op.
+        """
+        buckets = collections.OrderedDict()
+        for param in param_group.parameters:
+            if param.grad is None:
+                continue
+            key = (str(param.device), str(param.dtype))
+            buckets.setdefault(key, []).append(param)
+        return list(buckets.values())
+
+    def _get_multi_tensor_op(self, key, build_fn: Callable):
+        """Returns the multi-tensor update op cached by `key`, building it with
+        `build_fn` on first use. The number of inputs of a builtin op is fixed when it
+        is built, so `key` should contain the bucket size.
+        """
+        op = self._multi_tensor_ops.get(key)
+        if op is None:
+            op = build_fn()
+            self._multi_tensor_ops[key] = op
+        return op
+
     def zero_grad(self, set_to_none: bool = False):
         all_grad_is_none = True
         for param_group in self._param_groups:
@@ -88,3 +212,9 @@ class Optimizer(object):
                 "Please check `loss.backward()` is called or not,\n"
                 "or try to declare optimizer after calling `module.to()`"
             )
+
+
+def _ToNumpy(value) -> np.ndarray:
+    if isinstance(value, np.ndarray):
+        return value
+    return value.numpy()
@@ -21,7 +21,7 @@ import oneflow as flow
 
 from oneflow.python.oneflow_export import oneflow_export, experimental_api
 from oneflow.python.nn.parameter import Parameter
-from oneflow.python.nn.optimizer.optimizer import ParamGroup, Optimizer
+from oneflow.python.nn.optimizer.optimizer import Optimizer
 
 
 @oneflow_export("optim.RMSprop")
@@ -84,6 +84,9 @@ class RMSprop(Optimizer):
         centered (bool, optional) : if ``True``, compute the centered RMSProp,
             the gradient is normalized by an estimation of its variance
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
+        foreach (bool, optional): update the parameters of a group that live on the
+            same device and have the same dtype with one multi-tensor update op
+            instead of one op per parameter (default: False)
     """
 
     def __init__(
@@ -96,6 +99,7 @@ class RMSprop(Optimizer):
         momentum: float = 0.0,
         centered: bool = False,
         scale: float = 1.0,
+        foreach: bool = False,
     ):
         super().__init__()
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
@@ -111,21 +115,14 @@ class RMSprop(Optimizer):
         self._default_options["weight_decay"] = weight_decay
         self._default_options["centered"] = centered
         self._default_options["scale"] = scale
+        self._foreach = foreach
 
         # Add parameters
         if isinstance(parameters, GeneratorType):
-            self._param_groups.append(ParamGroup(parameters, self._default_options))
+            self.add_param_group(parameters)
         else:  # List[Dict]
             for param in parameters:
-                self._param_groups.append(ParamGroup(param, self._default_options))
-
-        for param_group in self._param_groups:
-            for param in param_group.parameters:
-                assert param.is_leaf, "parameters must be leaf tensor"
-                self._state[param] = dict()
-                self._state[param]["square_avg"] = flow.experimental.zeros_like(param)
-                if param_group.options["centered"]:
-                    self._state[param]["grad_avg"] = flow.experimental.zeros_like(param)
+                self.add_param_group(param)
 
         self._centered_rmsprop = (
             flow.builtin_op("rmsprop_update")
@@ -151,6 +148,11 @@ class RMSprop(Optimizer):
             .Build()
         )
 
+    def _init_param_state(self, param, options):
+        self._state[param]["square_avg"] = flow.experimental.zeros_like(param)
+        if options["centered"]:
+            self._state[param]["grad_avg"] = flow.experimental.zeros_like(param)
+
     def step(self, closure: Callable = None):
         """Performs a single optimization step.
 
@@ -170,12 +172,14 @@ class RMSprop(Optimizer):
                     "decay_rate": param_group.options["alpha"],
                     "weight_decay": param_group.options["weight_decay"],
                 }
+                if self._foreach:
+                    for params in self._bucket_parameters(param_group):
+                        self._multi_tensor_step(param_group, params, kwargs)
+                    continue
                 for param in param_group.parameters:
                     if param.grad is None:
                         continue
-                    lr_tensor = flow.Tensor(
-                        [param_group.options["lr"]], device=param.device
-                    )
+                    lr_tensor = param_group.lr_tensor(param.device)
                     ms_tensor = self._state[param]["square_avg"]
                     if param_group.options["centered"]:
                         mg_tensor = self._state[param]["grad_avg"]
@@ -188,3 +192,35 @@ class RMSprop(Optimizer):
             self._state["step"] = self._state["step"] + 1
 
             return loss
+
+    def _multi_tensor_step(self, param_group, params, kwargs):
+        num = len(params)
+        centered = param_group.options["centered"]
+
+        def build_op():
+            builder = (
+                flow.builtin_op("multi_rmsprop_update")
+                .Input("model", num)
+                .Input("model_diff", num)
+                .Input("learning_rate")
+                .Input("mean_square", num)
+            )
+            if centered:
+                builder = builder.Input("mean_gradient", num)
+            return (
+                builder.Attr("centered", centered)
+                .Attr("l1", 0.0)
+                .Attr("l2", 0.0)
+                .Build()
+            )
+
+        op = self._get_multi_tensor_op((num, centered), build_op)
+        inputs = [
+            *params,
+            *[param.grad for param in params],
+            param_group.lr_tensor(params[0].device),
+            *[self._state[param]["square_avg"] for param in params],
+        ]
+        if centered:
+            inputs.extend(self._state[param]["grad_avg"] for param in params)
+        op(*inputs, **kwargs)
@@ -21,7 +21,7 @@ import oneflow as flow
 
 from oneflow.python.oneflow_export import oneflow_export, experimental_api
 from oneflow.python.nn.parameter import Parameter
-from .optimizer import Optimizer, ParamGroup
+from .optimizer import Optimizer
 
 
 @oneflow_export("optim.SGD")
@@ -51,6 +51,9 @@ class SGD(Optimizer):
         lr (float, optional): learning rate (default: 1e-3)
         momentum (float, optional): Momentum factor (default: 0.0)
         scale (float, optional): the scale factor of loss (default: 1.0)
+        foreach (bool, optional): update the parameters of a group that live on the
+            same device and have the same dtype with one multi-tensor update op
+            instead of one op per parameter (default: False)
 
     """
 
@@ -60,6 +63,7 @@ class SGD(Optimizer):
         lr: float = 1e-3,
         momentum: float = 0.0,
         scale: float = 1.0,
+        foreach: bool = False,
     ):
         super().__init__()
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
@@ -69,22 +73,14 @@ class SGD(Optimizer):
         self._default_options["lr"] = lr
         self._default_options["scale"] = scale
         self._default_options["momentum"] = momentum
+        self._foreach = foreach
 
         # Add parameters
         if isinstance(parameters, GeneratorType):
-            self._param_groups.append(ParamGroup(parameters, self._default_options))
+            self.add_param_group(parameters)
         else:  # List[Dict]
             for param in parameters:
-                self._param_groups.append(ParamGroup(param, self._default_options))
-
-        for param_group in self._param_groups:
-            for param in param_group.parameters:
-                assert param.is_leaf, "parameters must be leaf tensor"
-                self._state[param] = dict()
-                if param_group.options["momentum"] != 0.0:
-                    self._state[param]["momentum_buf"] = flow.experimental.zeros_like(
-                        param
-                    )
+                self.add_param_group(param)
 
         self._momentum_sgd = (
             flow.builtin_op("momentum_update")
@@ -106,6 +102,10 @@ class SGD(Optimizer):
             .Build()
         )
 
+    def _init_param_state(self, param, options):
+        if options["momentum"] != 0.0:
+            self._state[param]["momentum_buf"] = flow.experimental.zeros_like(param)
+
     def step(self, closure: Callable = None):
         with flow.no_grad():
             loss = None
@@ -114,6 +114,10 @@ class SGD(Optimizer):
 
             for param_group in self._param_groups:
                 lr = param_group.options["lr"]
+                if self._foreach:
+                    for params in self._bucket_parameters(param_group):
+                        self._multi_tensor_step(param_group, params)
+                    continue
                 for param in param_group.parameters:
                     if param.grad is None:
                         continue
@@ -135,3 +139,48 @@ class SGD(Optimizer):
 
             self._state["step"] = self._state["step"] + 1
             return loss
+
+    def _multi_tensor_step(self, param_group, params):
+        num = len(params)
+        beta = param_group.options["momentum"]
+        kwargs = {
+            "learning_rate_val": param_group.options["lr"],
+            "scale": param_group.options["scale"],
+        }
+        if beta == 0.0:
+
+            def build_op():
+                return (
+                    flow.builtin_op("multi_sgd_update")
+                    .Input("model", num)
+                    .Input("model_diff", num)
+                    .Attr("weight_decay", 0.0)
+                    .Attr("l1", 0.0)
+                    .Attr("l2", 0.0)
+                    .Build()
+                )
+
+            op = self._get_multi_tensor_op(("sgd", num), build_op)
+            op(*params, *[param.grad for param in params], **kwargs)
+        else:
+
+            def build_op():
+                return (
+                    flow.builtin_op("multi_momentum_update")
+                    .Input("model", num)
+                    .Input("model_diff", num)
+                    .Input("momentum", num)
+                    .Attr("l1", 0.0)
+                    .Attr("l2", 0.0)
+                    .Attr("weight_decay", 0.0)
+                    .Build()
+                )
+
+            op = self._get_multi_tensor_op(("momentum", num), build_op)
+            op(
+                *params,
+                *[param.grad for param in params],
+                *[self._state[param]["momentum_buf"] for param in params],
+                beta=beta,
+                **kwargs,
+            )
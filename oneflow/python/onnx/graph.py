@@ -53,6 +53,50 @@ logger = logging.getLogger(__name__)
 # pylint: disable=broad-except,protected-access
 
 
+def _UpdateConsumerIndex(list_method):
+    """Wrap a mutating method of _NodeInputs to keep the consumer index up to date."""
+
+    def Method(self, *args, **kwargs):
+        graph = self.node_.graph
+        if graph is None or not graph._HasNode(self.node_):
+            return list_method(self, *args, **kwargs)
+        graph.MarkNeighborsChanged(self.node_)
+        graph._RemoveConsumer(self.node_)
+        try:
+            return list_method(self, *args, **kwargs)
+        finally:
+            graph._AddConsumer(self.node_)
+            graph.MarkNeighborsChanged(self.node_)
+
+    return Method
+
+
+class _NodeInputs(list):
+    """Input tensor names of a Node. Handlers and optimizers modify them in place,
+    so every modification re-indexes the node as a consumer of its inputs.
+    """
+
+    def __init__(self, node, names):
+        super(_NodeInputs, self).__init__(names)
+        self.node_ = node
+
+    def __deepcopy__(self, memo):
+        return _NodeInputs(copy.deepcopy(self.node_, memo), self)
+
+    __setitem__ = _UpdateConsumerIndex(list.__setitem__)
+    __delitem__ = _UpdateConsumerIndex(list.__delitem__)
+    __iadd__ = _UpdateConsumerIndex(list.__iadd__)
+    __imul__ = _UpdateConsumerIndex(list.__imul__)
+    append = _UpdateConsumerIndex(list.append)
+    extend = _UpdateConsumerIndex(list.extend)
+    insert = _UpdateConsumerIndex(list.insert)
+    pop = _UpdateConsumerIndex(list.pop)
+    remove = _UpdateConsumerIndex(list.remove)
+    clear = _UpdateConsumerIndex(list.clear)
+    reverse = _UpdateConsumerIndex(list.reverse)
+    sort = _UpdateConsumerIndex(list.sort)
+
+
 class Node(object):
     """A Node - wrapper around onnx nodes that we use for graph manipulations."""
 
@@ -64,7 +108,7 @@ class Node(object):
         """
         self._op = node
         self.graph = graph
-        self._input = list(node.input)
+        self._input = _NodeInputs(self, node.input)
         self._output = list(node.output)
         self.attrs = {}
 
@@ -83,7 +127,14 @@ class Node(object):
 
     @input_tensor_names.setter
     def input_tensor_names(self, val):
-        self._input = copy.deepcopy(val)
+        in_graph = self.graph is not None and self.graph._HasNode(self)
+        if in_graph:
+            self.graph.MarkNeighborsChanged(self)
+            self.graph._RemoveConsumer(self)
+        self._input = _NodeInputs(self, val)
+        if in_graph:
+            self.graph._AddConsumer(self)
+            self.graph.MarkNeighborsChanged(self)
 
     @property
     def output_tensor_names(self):
@@ -95,6 +146,7 @@ class Node(object):
         changing it would require output mapping changed.
         """
         self._GraphCheck()
+        self.graph.MarkNeighborsChanged(self)
         for o in self._output:
             del self.graph._output_to_node_name[o]
 
@@ -106,6 +158,7 @@ class Node(object):
                 o,
             )
             self.graph._output_to_node_name[o] = self.name
+        self.graph.MarkNeighborsChanged(self)
 
     @property
     def input_nodes(self):
@@ -396,9 +449,14 @@ class Graph(object):
             dtypes: dict of oneflow dtype
             input_maps: map (node_name, key) to value_names
         """
-        self._nodes = []
+        # nodes in insertion order, the values are unused
+        self._nodes = {}
         self._nodes_by_name = {}
         self._output_to_node_name = {}
+        # {output_name: {consumer_node: number of its inputs being output_name}}
+        self._output_to_consumers = {}
+        # nodes changed since the last PopChangedNodes, the values are unused
+        self._changed_nodes = {}
         self.shapes = {}
 
         self._dtypes = dtypes
@@ -455,7 +513,7 @@ class Graph(object):
                     body_graph.parent_graph = self
                     new_node.set_body_graph_as_attr(attr_name, body_graph)
 
-            self.ReplaceAllInputs(self.get_nodes(), o, new_output_name)
+            self.ReplaceAllInputs(self.FindOutputConsumers(o), o, new_output_name)
             self.MakeNode(
                 "Identity",
                 [new_output_name],
@@ -589,7 +647,9 @@ class Graph(object):
             self.UpdateNodeShapeDtype(node, override=False)
 
         logger.debug("Made node: %s\n%s", node.name, node.summary)
-        self._nodes.append(node)
+        self._nodes[node] = None
+        self._AddConsumer(node)
+        self.MarkNeighborsChanged(node)
         return node
 
     def RemoveNode(self, node_name):
@@ -615,7 +675,9 @@ class Graph(object):
             if op_output in self._dtypes:
                 del self._dtypes[op_output]
 
-        self._nodes.remove(node)
+        self.MarkNeighborsChanged(node)
+        self._RemoveConsumer(node)
+        del self._nodes[node]
         node.graph = None
 
     def ResetNodes(self, ops):
@@ -634,17 +696,23 @@ class Graph(object):
             if op.name in self.contained_graphs:
                 remained_sub_graphs[op.name] = self.contained_graphs[op.name]
 
-        self._nodes = ops
+        nodes = dict.fromkeys(ops)
+        for op in self._nodes:
+            if op not in nodes:
+                self.MarkNeighborsChanged(op)
+        self._nodes = nodes
         self.contained_graphs = remained_sub_graphs
         self._nodes_by_name = {op.name: op for op in ops}
         self._output_to_node_name = {}
-        for op in ops:
+        self._output_to_consumers = {}
+        for op in self._nodes:
             for op_output in op.output_tensor_names:
                 self._output_to_node_name[op_output] = op.name
+            self._AddConsumer(op)
 
-        for n in self._order_sensitive_inputs:
-            if n not in ops:
-                self._order_sensitive_inputs.remove(n)
+        self._order_sensitive_inputs = [
+            n for n in self._order_sensitive_inputs if n in self._nodes
+        ]
         for o in self.outputs:
             if o not in self._output_to_node_name:
                 raise ValueError("graph output " + o + " not exist")
@@ -762,7 +830,48 @@ class Graph(object):
 
     def get_nodes(self):
         """Get node list."""
-        return self._nodes
+        return list(self._nodes)
+
+    def _HasNode(self, node):
+        return node in self._nodes
+
+    def MarkNeighborsChanged(self, node):
+        """Mark node, the producers of its inputs and the consumers of its outputs
+        as changed, since a rewrite of node may let them be rewritten.
+        """
+        self._changed_nodes[node] = None
+        for inp in node.input_tensor_names:
+            producer = self.get_node_by_output_in_current_graph(inp)
+            if producer is not None:
+                self._changed_nodes[producer] = None
+        for op_output in node._output:
+            for consumer in self._output_to_consumers.get(op_output, ()):
+                self._changed_nodes[consumer] = None
+
+    def PopChangedNodes(self):
+        """Get the nodes in the graph changed since the last call, in the order they
+        are changed. Making, removing or rewiring a node changes it and its neighbors.
+        """
+        changed_nodes = [n for n in self._changed_nodes if n in self._nodes]
+        self._changed_nodes = {}
+        return changed_nodes
+
+    def _AddConsumer(self, node):
+        """Index node as a consumer of its inputs."""
+        for inp in node.input_tensor_names:
+            consumers = self._output_to_consumers.setdefault(inp, {})
+            consumers[node] = consumers.get(node, 0) + 1
+
+    def _RemoveConsumer(self, node):
+        """Remove node from the consumers of its inputs."""
+        for inp in node.input_tensor_names:
+            consumers = self._output_to_consumers[inp]
+            if consumers[node] == 1:
+                del consumers[node]
+                if not consumers:
+                    del self._output_to_consumers[inp]
+            else:
+                consumers[node] -= 1
 
     def get_node_by_output(self, output, search_in_parent_graphs=True):
         """Get node by node output id recursively going through nested graphs.
@@ -903,35 +1012,21 @@ class Graph(object):
             self.set_shape(output_name, shape)
 
     def TopologicalSort(self, ops):
-        """Topological sort of graph."""
-        # sort by name, the result will be reversed alphabeta
-        ops.sort(key=lambda op: op.name)
-
-        def _push_stack(stack, node, in_stack):
-            stack.append(node)
-            if node in in_stack:
-                raise ValueError("Graph has cycles.")
-            in_stack[node] = True
-
-        def _get_unvisited_child(g, node, not_visited):
-            for child in g[node]:
-                if child in not_visited:
-                    return child
-            return -1
-
+        """Topological sort of graph with Kahn's algorithm, in O(nodes + edges)."""
         n = len(ops)
-        g = [[] for _ in range(n)]
         op_name_to_index = {}
         for i, op in enumerate(ops):
             op_name_to_index[op.name] = i
 
+        consumers = [[] for _ in range(n)]
+        in_degree = [0] * n
         for i, op in enumerate(ops):
             all_input = set(op.input_tensor_names)
             implicit_inputs = op.get_implicit_inputs()
             all_input |= set(implicit_inputs)
             # remove those empty inputs
-            all_input = list(filter(lambda a: a != "", all_input))
-            for inp in sorted(all_input):
+            all_input.discard("")
+            for inp in all_input:
                 j = self.get_node_by_output(inp)
                 util.MakeSure(
                     j is not None, "Cannot find node with output {}".format(inp)
@@ -940,30 +1035,20 @@ class Graph(object):
                     # there might be some outer-scoped inputs for an inner Graph.
                     pass
                 else:
-                    g[op_name_to_index[j.name]].append(i)
-
-        # label for each op. highest = sink nodes.
-        label = [-1 for _ in range(n)]
-        stack = []
-        in_stack = dict()
-        not_visited = dict.fromkeys(range(n))
-        label_counter = n - 1
-
-        while not_visited:
-            node = list(not_visited.keys())[0]
-            _push_stack(stack, node, in_stack)
-            while stack:
-                node = _get_unvisited_child(g, stack[-1], not_visited)
-                if node != -1:
-                    _push_stack(stack, node, in_stack)
-                else:
-                    node = stack.pop()
-                    in_stack.pop(node)
-                    not_visited.pop(node)
-                    label[node] = label_counter
-                    label_counter -= 1
-
-        ret = [x for _, x in sorted(zip(label, ops))]
+                    consumers[op_name_to_index[j.name]].append(i)
+                    in_degree[i] += 1
+
+        ready = collections.deque(i for i in range(n) if in_degree[i] == 0)
+        ret = []
+        while ready:
+            i = ready.popleft()
+            ret.append(ops[i])
+            for consumer in consumers[i]:
+                in_degree[consumer] -= 1
+                if in_degree[consumer] == 0:
+                    ready.append(consumer)
+        if len(ret) != n:
+            raise ValueError("Graph has cycles.")
         self.ResetNodes(ret)
 
     def MakeGraph(
@@ -1218,22 +1303,18 @@ class Graph(object):
             domain=domain,
         )
 
-        to_replace = [n for n in self.get_nodes() if n != new_node]
+        to_replace = [n for n in self.FindOutputConsumers(output_name) if n != new_node]
         self.ReplaceAllInputs(to_replace, output_name, new_output)
         return new_node
 
     def FindOutputConsumers(self, output_name):
         """Find all nodes consuming a given output."""
-        nodes = []
-        for node in self.get_nodes():
-            if output_name in node.input_tensor_names:
-                nodes.append(node)
+        nodes = list(self._output_to_consumers.get(output_name, ()))
 
-            # find consumers in sub graphs
-            body_graphs = node.get_body_graphs()
-            if body_graphs:
-                for g in body_graphs.values():
-                    nodes.extend(g.FindOutputConsumers(output_name))
+        # find consumers in sub graphs
+        for body_graphs in self.contained_graphs.values():
+            for g in body_graphs.values():
+                nodes.extend(g.FindOutputConsumers(output_name))
         return nodes
 
     @staticmethod
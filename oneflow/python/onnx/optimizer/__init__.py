@@ -24,6 +24,7 @@ from __future__ import unicode_literals
 
 from collections import OrderedDict
 import copy
+import time
 
 from .const_fold_optimizer import ConstFoldOptimizer
 from .identity_optimizer import IdentityOptimizer
@@ -53,26 +54,61 @@ def _get_optimizers():
 
 
 def OptimizeGraph(graph):
-    """ Optimize graph, return optimized graph. No throw. """
+    """ Optimize graph, return optimized graph. No throw.
+
+    Every optimizer visits all nodes once, and then only the nodes changed by the
+    other optimizers since its last run, until no optimizer has a node to visit.
+    """
     logger = logging.getLogger(__name__)
     logger.info("Optimizing ONNX model")
 
     before = graph.DumpNodeStatistics()
     opts = _get_optimizers()
-    continue_flag = True
-    while continue_flag:
-        continue_flag = False
+    # changes made by the conversion are covered by visiting all nodes
+    graph.PopChangedNodes()
+    all_node_names = [node.name for node in graph.get_nodes()]
+    pending_node_names = OrderedDict(
+        (name, OrderedDict.fromkeys(all_node_names)) for name in opts
+    )
+    # {name: [run count, seconds, visited node count, node count delta]}
+    stats = OrderedDict((name, [0, 0.0, 0, 0]) for name in opts)
+    while any(pending_node_names.values()):
         for name, factory in opts.items():
+            node_names = list(pending_node_names[name])
+            if not node_names:
+                continue
+            pending_node_names[name] = OrderedDict()
             try:
-                logger.debug("Apply %s", name)
+                logger.debug("Apply %s to %d node(s)", name, len(node_names))
+                start = time.perf_counter()
+                node_num = len(graph.get_nodes())
                 current = copy.deepcopy(graph)
                 opt = factory()
-                graph = opt.Optimize(current) or graph
-                continue_flag = continue_flag or opt.graph_been_opt
-
+                graph = opt.Optimize(current, node_names) or graph
+                stat = stats[name]
+                stat[0] += 1
+                stat[1] += time.perf_counter() - start
+                stat[2] += opt.visited_node_num
+                stat[3] += len(graph.get_nodes()) - node_num
             except Exception:  # pylint: disable=broad-except
                 # if current optimizer fails, continue with other optimizers
                 logger.warning("Failed to apply %s", name, exc_info=1)
+                continue
+            for other_name, other_node_names in pending_node_names.items():
+                if other_name != name:
+                    other_node_names.update(
+                        OrderedDict.fromkeys(opt.changed_node_names)
+                    )
+
+    for name, (run_num, seconds, visited_node_num, node_num_delta) in stats.items():
+        logger.info(
+            "%s: %d run(s) in %.3fs, %d node(s) visited, %+d node(s)",
+            name,
+            run_num,
+            seconds,
+            visited_node_num,
+            node_num_delta,
+        )
 
     try:
         graph.TopologicalSort(graph.get_nodes())
@@ -44,43 +44,33 @@ class BackToBackOptimizer(GraphOptimizerBase):
     def __init__(self):  # pylint: disable=useless-super-delegation
         super(BackToBackOptimizer, self).__init__()
 
-    def _Optimize(self, graph):
-        return self._ApplyOptimization(graph, self._OptimizeAtCurrentGraphLevel)
-
-    def _OptimizeAtCurrentGraphLevel(self, g):
+    def _OptimizeNode(self, node, graph):
         for optype, handler in _func_map.items():
-            # candidate nodes for removal/optimization
-            nodes = [n for n in g.get_nodes() if n.op_type in optype]
-
-            # topological sort of candidates
+            if node.op_type not in optype:
+                continue
             # simplifying assumption for back-to-back-optimizer is
             # the op_types have 1 input, 1 output, but multiple consumers
-            has_dependencies = set()
-            consumer_node_ids = {n.output_tensor_names[0]: [] for n in nodes}
-            for n in nodes:
-                if n.input_tensor_names[0] in consumer_node_ids:
-                    consumer_node_ids[n.input_tensor_names[0]].extend([n])
-                    has_dependencies.add(n.output_tensor_names[0])
-
-            # q = starting nodes with no dependencies
-            q = list(set(consumer_node_ids.keys()) - has_dependencies)
-            while q:
-                nodeid = q.pop(0)
-                node = g.get_node_by_output(nodeid, False)
-                consumer_nodes = consumer_node_ids[nodeid]
-
-                if len(consumer_nodes) > 0:
-                    all_consumers = g.FindOutputConsumers(node.output_tensor_names[0])
-                    if len(all_consumers) != len(consumer_nodes):
-                        # if first node is used elsewhere, skip
-                        continue
-                    if set(node.output_tensor_names) & set(g.outputs):
-                        # if this node is part of graph outputs, skip
-                        continue
-                    q2 = handler(g, node, consumer_nodes)
-                    # add more nodes which can now be processed
-                    q.extend(q2)
-        return g
+            all_consumers = graph.FindOutputConsumers(node.output_tensor_names[0])
+            consumer_nodes = [
+                n
+                for n in all_consumers
+                if n.graph is graph
+                and n.op_type in optype
+                and n.input_tensor_names[0] == node.output_tensor_names[0]
+            ]
+            if len(consumer_nodes) == 0:
+                return False
+            if len(all_consumers) != len(consumer_nodes):
+                # if first node is used elsewhere, skip
+                return False
+            if set(node.output_tensor_names) & set(graph.outputs):
+                # if this node is part of graph outputs, skip
+                return False
+            # the consumers to process next are rewired by the handler, and the graph
+            # tracks them
+            handler(graph, node, consumer_nodes)
+            return True
+        return False
 
     @staticmethod
     @_register_func("Cast")
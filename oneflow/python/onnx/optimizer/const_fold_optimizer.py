@@ -43,21 +43,10 @@ class ConstFoldOptimizer(GraphOptimizerBase):
     def __init__(self):  # pylint: disable=useless-super-delegation
         super(ConstFoldOptimizer, self).__init__()
 
-    def _Optimize(self, graph):
-        return self._ApplyOptimization(graph, self._OptimizeAtCurrentGraphLevel)
-
-    def _OptimizeAtCurrentGraphLevel(self, graph):
-        graph_changed = True
-        while graph_changed:
-            graph_changed = False
-            ops = graph.get_nodes()
-            for op in ops:
-                if self._ShouldSkip(op):
-                    continue
-                if self._FoldNode(op, graph):
-                    graph_changed = True
-                    self.graph_been_opt = True
-        return graph
+    def _OptimizeNode(self, node, graph):
+        if self._ShouldSkip(node):
+            return False
+        return self._FoldNode(node, graph)
 
     @staticmethod
     def _ShouldSkip(node):
@@ -116,7 +105,9 @@ class ConstFoldOptimizer(GraphOptimizerBase):
             )
             graph.set_shape(const_node.output_tensor_names[0], val.shape)
             graph.ReplaceAllInputs(
-                graph.get_nodes(), old_input, const_node.output_tensor_names[0]
+                graph.FindOutputConsumers(old_input),
+                old_input,
+                const_node.output_tensor_names[0],
             )
         graph.RemoveNode(node.name)
 
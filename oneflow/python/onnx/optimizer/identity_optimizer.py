@@ -33,34 +33,19 @@ class IdentityOptimizer(GraphOptimizerBase):
     def __init__(self):  # pylint: disable=useless-super-delegation
         super(IdentityOptimizer, self).__init__()
 
-    def _Optimize(self, graph):
-        return self._ApplyOptimization(graph, self._OptimizeAtCurrentGraphLevel)
-
-    def _OptimizeAtCurrentGraphLevel(self, g):
-        has_update = True
-        while has_update:
-            has_update = False
-            nodes = [n for n in g.get_nodes() if n.op_type == "Identity"]
-            for n in nodes:
-                if n.graph is None:
-                    self.logger.debug("node has been removed from this graph, skip")
-                    continue
-
-                graph_outputs = set(n.output_tensor_names).intersection(g.outputs)
-                ret = False
-                if graph_outputs:
-                    ret = self._HandleGraphOutputIdentity(g, n, graph_outputs)
-                else:
-                    ret = self._HandleNonGraphOutputIdentity(g, n)
-                has_update = ret
-                if ret:
-                    self.graph_been_opt = True
-        return g
+    def _OptimizeNode(self, node, graph):
+        if node.op_type != "Identity":
+            return False
+
+        graph_outputs = set(node.output_tensor_names).intersection(graph.outputs)
+        if graph_outputs:
+            return self._HandleGraphOutputIdentity(graph, node, graph_outputs)
+        return self._HandleNonGraphOutputIdentity(graph, node)
 
     @staticmethod
     def _HandleNonGraphOutputIdentity(graph, identity):
         graph.ReplaceAllInputs(
-            graph.get_nodes(),
+            graph.FindOutputConsumers(identity.output_tensor_names[0]),
             identity.output_tensor_names[0],
             identity.input_tensor_names[0],
         )
@@ -99,5 +84,5 @@ class IdentityOptimizer(GraphOptimizerBase):
         graph.set_shape(output_id, output_shape)
         graph.set_dtype(output_id, output_dtype)
 
-        graph.ReplaceAllInputs(graph.get_nodes(), input_id, output_id)
+        graph.ReplaceAllInputs(graph.FindOutputConsumers(input_id), input_id, output_id)
         return True
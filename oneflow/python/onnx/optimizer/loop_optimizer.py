@@ -35,20 +35,10 @@ class LoopOptimizer(GraphOptimizerBase):
     def __init__(self):  # pylint: disable=useless-super-delegation
         super(LoopOptimizer, self).__init__()
 
-    def _Optimize(self, graph):
-        return self._ApplyOptimization(graph, self._OptimizeAtCurrentGraphLevel)
-
-    def _OptimizeAtCurrentGraphLevel(self, g):
-        has_update = True
-        while has_update:
-            has_update = False
-            nodes = [n for n in g.get_nodes() if n.op_type == "Loop"]
-            for n in nodes:
-                has_update_tmp = self._TryMoveTransposeOutOfBodyGraph(n)
-                if has_update_tmp:
-                    has_update = True
-                    self.graph_been_opt = True
-        return g
+    def _OptimizeNode(self, node, graph):
+        if node.op_type != "Loop":
+            return False
+        return self._TryMoveTransposeOutOfBodyGraph(node)
 
     @staticmethod
     def ConsumerNodesNum(graph, node):
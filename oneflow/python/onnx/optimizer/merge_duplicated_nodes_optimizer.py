@@ -21,7 +21,7 @@ limitations under the License.
 # example, node a is input of node b and node c, and computation of node b, c are same such as "abs" op.
 # b and c can be merged into one node to avoid duplicated computation
 
-from collections import defaultdict, namedtuple
+from collections import defaultdict, namedtuple, OrderedDict
 
 import numpy as np
 
@@ -38,55 +38,57 @@ class MergeDuplicatedNodesOptimizer(GraphOptimizerBase):
 
     def __init__(self):
         super(MergeDuplicatedNodesOptimizer, self).__init__()
-        # used internally
-        self._graph_can_be_Optimized = True
+        # {key: {node: None}} of the nodes without inputs, which can't be found by
+        # the consumers of their first input
+        self._key_to_no_input_nodes = None
 
-    def _Optimize(self, graph):
-        return self._ApplyOptimization(graph, self._OptimizeAtCurrentGraphLevel)
-
-    def _OptimizeAtCurrentGraphLevel(self, graph):
-        while self._graph_can_be_Optimized:
-            self._graph_can_be_Optimized = False
-            self._MergeDuplicatedNodes(graph)
-            if self._graph_can_be_Optimized:
-                self.graph_been_opt = True
-        return graph
-
-    def _MergeDuplicatedNodes(self, graph):
+    def _OptimizeNode(self, node, graph):
         # "duplicated" means: op_type, input and attribute are same
         # while attr is un-hashable so doesn't include it when grouping nodes
-        nodes_groups = self._GroupNodesByTypeInputs(graph)
-        for _, nodes_group in nodes_groups.items():
-            if self._skip_node_type(nodes_group[0]):
-                continue
-            self._DelNodesIfDuplicated(nodes_group, graph)
+        if self._skip_node_type(node) or node.is_graph_input_default_const():
+            return False
+        # input and op type of nodes with the same key are same,
+        # and if their attributes are also same then they are duplicated
+        nodes_to_process = [node] + [
+            n
+            for n in self._FindNodesWithSameKey(node, graph)
+            if n is not node
+            and not n.is_graph_input_default_const()
+            and self._have_equal_attr(n, node, graph)
+        ]
+        if len(nodes_to_process) == 1:
+            return False
+        return self._MergeNodesThatAreDuplicated(nodes_to_process, graph)
+
+    def _FindNodesWithSameKey(self, node, graph):
+        key = self._NodeKey(node, graph)
+        if node.input_tensor_names:
+            return [
+                n
+                for n in graph.FindOutputConsumers(node.input_tensor_names[0])
+                if n.graph is graph and self._NodeKey(n, graph) == key
+            ]
+
+        if self._key_to_no_input_nodes is None:
+            self._key_to_no_input_nodes = defaultdict(OrderedDict)
+            for n in graph.get_nodes():
+                if not n.input_tensor_names:
+                    self._key_to_no_input_nodes[self._NodeKey(n, graph)][n] = None
+        nodes = self._key_to_no_input_nodes[key]
+        nodes[node] = None
+        for n in list(nodes):
+            # removed or rewired since indexed
+            if n.graph is not graph or self._NodeKey(n, graph) != key:
+                del nodes[n]
+        return list(nodes)
 
     @staticmethod
-    def _GroupNodesByTypeInputs(graph):
-        res = defaultdict(list)
-        for node in graph.get_nodes():
-            # default const of graph input cannot be merged
-            if node.is_graph_input_default_const():
-                continue
-            res[_KeyToGroupNodes(node.op_type, tuple(node.input_tensor_names))].append(
-                node
-            )
-        return res
-
-    def _DelNodesIfDuplicated(self, nodes_group, graph):
-        # input and op type of nodes in same group are same,
-        # and if their attributes are also same then they are duplicated
-        while len(nodes_group) > 1:
-            unprocessed_node = []
-            nodes_to_process = [nodes_group[0]]
-            for node in nodes_group[1:]:
-                if self._have_equal_attr(node, nodes_to_process[0], graph):
-                    nodes_to_process.append(node)
-                else:
-                    unprocessed_node.append(node)
-
-            self._MergeNodesThatAreDuplicated(nodes_to_process, graph)
-            nodes_group = unprocessed_node
+    def _NodeKey(node, graph):
+        if node.is_const():
+            # consts of different shapes are never duplicated
+            shape = graph.get_shape(node.output_tensor_names[0])
+            return _KeyToGroupNodes(node.op_type, tuple(shape or ()))
+        return _KeyToGroupNodes(node.op_type, tuple(node.input_tensor_names))
 
     def _have_equal_attr(self, node_1, node_2, graph):
         # above check guarantees consts here are able to be merged
@@ -109,6 +111,7 @@ class MergeDuplicatedNodesOptimizer(GraphOptimizerBase):
         # node's output may not all be used, so have to select the one that uses most of node's outputs
         nodes_to_process.sort(key=self._len_of_node_output, reverse=True)
         node_to_retain = nodes_to_process[0]
+        merged = False
         for node_to_delete in nodes_to_process[1:]:
             # if one of the output is graph's output then it can't be deleted
             if set(node_to_delete.output_tensor_names).intersection(set(graph.outputs)):
@@ -116,9 +119,12 @@ class MergeDuplicatedNodesOptimizer(GraphOptimizerBase):
             for old_input, new_input in zip(
                 node_to_delete.output_tensor_names, node_to_retain.output_tensor_names
             ):
-                graph.ReplaceAllInputs(graph.get_nodes(), old_input, new_input)
+                graph.ReplaceAllInputs(
+                    graph.FindOutputConsumers(old_input), old_input, new_input
+                )
             graph.RemoveNode(node_to_delete.name)
-            self._graph_can_be_Optimized = True
+            merged = True
+        return merged
 
     @staticmethod
     def _skip_node_type(node):
@@ -20,6 +20,7 @@ limitations under the License.
 
 from __future__ import unicode_literals
 
+from collections import OrderedDict
 import copy
 import logging
 
@@ -28,6 +29,10 @@ from .. import util
 
 class GraphOptimizerBase(object):
     """optimizer graph to improve performance
+
+    Derived classes rewrite one node at a time in _OptimizeNode. The nodes are
+    visited from a worklist, and the nodes changed by a rewrite together with their
+    neighbors are put back to it, until it is empty.
     """
 
     def __init__(self):
@@ -35,6 +40,8 @@ class GraphOptimizerBase(object):
             ".".join(__name__.split(".")[:-1] + [self.__class__.__name__])
         )
         self._graph_been_opt = False
+        self._changed_node_names = OrderedDict()
+        self._visited_node_num = 0
 
     @property
     def logger(self):
@@ -48,38 +55,106 @@ class GraphOptimizerBase(object):
     def graph_been_opt(self, value):
         self._graph_been_opt = value
 
-    def Optimize(self, graph):
-        """ optimize graph, return optimized graph. """
-        before = graph.DumpNodeStatistics()
+    @property
+    def changed_node_names(self):
+        """Names of the nodes of the top level graph changed by the optimizer."""
+        return list(self._changed_node_names)
+
+    @property
+    def visited_node_num(self):
+        return self._visited_node_num
+
+    def Optimize(self, graph, node_names=None):
+        """ optimize graph, return optimized graph.
+        Args:
+            graph: the graph to optimize
+            node_names: names of the nodes to start from, all nodes if None
+        """
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            before = graph.DumpNodeStatistics()
 
-        graph = self._Optimize(graph)
-        graph.UpdateProto()
-        graph.DeleteUnusedNodes(graph.outputs)
+        graph = self._Optimize(graph, node_names)
+        # changes made out of the worklist, e.g. by the pre or post actions
+        self._RecordChangedNodes(graph.PopChangedNodes())
 
-        after = graph.DumpNodeStatistics()
-        self._PrintStatDiff(before, after)
+        if debug:
+            after = graph.DumpNodeStatistics()
+            self._PrintStatDiff(before, after)
         return graph
 
-    def _Optimize(self, graph):
-        """ Derived class should override this function. """
+    def _Optimize(self, graph, node_names):
+        return self._ApplyOptimization(
+            graph, node_names, self._OptimizeAtCurrentGraphLevel
+        )
+
+    def _OptimizeNode(self, node, graph):
+        """ Derived class should override this function, to rewrite node if possible
+        and return True if it does. The nodes to visit again are tracked by the graph.
+        """
         raise NotImplementedError
 
+    def _OptimizeAtCurrentGraphLevel(self, graph, node_names):
+        if node_names is None:
+            nodes = graph.get_nodes()
+        else:
+            nodes = [graph.get_node_by_name(name) for name in node_names]
+        worklist = OrderedDict.fromkeys(n for n in nodes if n is not None)
+        worklist.update(OrderedDict.fromkeys(graph.PopChangedNodes()))
+        while worklist:
+            node, _ = worklist.popitem(last=False)
+            if node.graph is not graph:
+                # removed by a previous rewrite
+                continue
+            self._visited_node_num += 1
+            if not self._RemoveIfUnused(node, graph):
+                self._OptimizeNode(node, graph)
+            changed_nodes = graph.PopChangedNodes()
+            if not changed_nodes:
+                continue
+            self.graph_been_opt = True
+            if node.graph is graph:
+                # attributes of node may be changed as well
+                graph.MarkNeighborsChanged(node)
+                changed_nodes += graph.PopChangedNodes()
+            for n in changed_nodes:
+                worklist[n] = None
+            self._RecordChangedNodes(changed_nodes)
+        return graph
+
+    def _RecordChangedNodes(self, nodes):
+        for n in nodes:
+            if n.graph.parent_graph is None:
+                self._changed_node_names[n.name] = None
+
     @staticmethod
-    def _ApplyOptimization(graph, optimize_func):
+    def _RemoveIfUnused(node, graph):
+        """Remove node if neither a graph output nor a node uses its outputs, which
+        is what DeleteUnusedNodes does for the whole graph.
+        """
+        if not graph.outputs or node.is_graph_input():
+            return False
+        for output in node.output_tensor_names:
+            if output in graph.outputs or graph.FindOutputConsumers(output):
+                return False
+        graph.RemoveNode(node.name)
+        return True
+
+    def _ApplyOptimization(self, graph, node_names, optimize_func):
         """
         optimize graph
         will also optimize graph of nodes'
         Args:
             graph: the top level graph to be optimized
+            node_names: names of the nodes to start from, all nodes if None
             optimize_func: function to optimize graph
         """
-        graph = optimize_func(graph)
-        for node in graph.get_nodes():
-            body_graphs = node.get_body_graphs()
-            if body_graphs:
-                for attr, b_g in body_graphs.items():
-                    b_g = GraphOptimizerBase._ApplyOptimization(b_g, optimize_func)
-                    node.set_body_graph_as_attr(attr, b_g)
+        graph = optimize_func(graph, node_names)
+        for node_name, body_graphs in list(graph.contained_graphs.items()):
+            node = graph.get_node_by_name(node_name)
+            for attr, b_g in list(body_graphs.items()):
+                b_g = self._ApplyOptimization(b_g, None, optimize_func)
+                node.set_body_graph_as_attr(attr, b_g)
         return graph
 
     def _PrintStatDiff(self, before, after):
@@ -19,7 +19,7 @@ limitations under the License.
 # Transpose Optimizer
 
 from __future__ import unicode_literals
-from collections import defaultdict
+from collections import OrderedDict
 
 import numpy as np
 import onnx
@@ -60,23 +60,23 @@ class TransposeOptimizer(GraphOptimizerBase):
         super(TransposeOptimizer, self).__init__()
 
         self._handler_map = {}
-        self._force_stop = {}
 
         self._InitializeHandlers()
         self._g = None
         self._output_names = None
+        # transposes visited, for the post actions
+        self._transposes = OrderedDict()
 
     @property
     def nodes(self):
         return self._g.get_nodes()
 
-    def PreOptimizeAction(self):
+    def PreOptimizeAction(self, nodes):
         # make Reshape into a const, which then can be fused into Conv's weight for mobilenet_v1_75_192
         self._output_names = [name.split(":")[0] for name in self._g.outputs]
-        ops = self.nodes
         constable_reshape_ops = [
             n
-            for n in ops
+            for n in nodes
             if (
                 n.op_type == "Reshape"
                 and n.input_nodes[0].is_const()
@@ -93,13 +93,11 @@ class TransposeOptimizer(GraphOptimizerBase):
 
             # point all children nodes inputs to the new node
             for output_name in reshape_op.output_tensor_names:
-                for child in ops:
+                for child in self._g.FindOutputConsumers(output_name):
                     for i, name in enumerate(child.input_tensor_names):
                         if name == output_name:
                             child.input_tensor_names[i] = const_name
 
-            self._g.TopologicalSort(self._g.get_nodes())
-
     def PoseOptimizeAction(self):
         def _CalculateNewShape(graph, op):
             input_shape = graph.get_shape(op.input_tensor_names[0])
@@ -139,11 +137,10 @@ class TransposeOptimizer(GraphOptimizerBase):
                 0
             ]
 
-        nodes = self.nodes
         # if channel==1 or height==width==1, replace transpose with reshape
         # replacing trans with reshape is because transpose will copy data even if this transpose doesn't nothing
-        for op in nodes:
-            if op.op_type == "Transpose":
+        for op in self._transposes:
+            if op.graph is self._g and op.op_type == "Transpose":
                 input_shape = self._g.get_shape(op.input_tensor_names[0])
                 if not input_shape:
                     continue
@@ -164,68 +161,64 @@ class TransposeOptimizer(GraphOptimizerBase):
                         name=op.name,
                         outputs=op.output_tensor_names,
                     )
-                    self._g.TopologicalSort(self._g.get_nodes())
 
     def MergeDuplicatedTransposes(self):
         # strategy used in previous procedure is to move transpose nodes down if possible,
         # and it means that when a node has n outputs then n transpose will be generated,
         # so we should merge them back to one if they can't be eliminated in previous procedure.
         graph = self._g
-        input_transposes_map = defaultdict(list)
-        for node in graph.get_nodes():
-            if node.op_type == "Transpose" and node.attrs.get("perm"):
-                key = (node.input_tensor_names[0], str(node.attrs["perm"]))
-                input_transposes_map[key].append(node)
-
-        for transposes in input_transposes_map.values():
-            # merge transpose nodes into one: make nodes use the output of the first transpose node
-            transpose_out = transposes[0].output_tensor_names[0]
-            for node in transposes[1:]:
+        for trans in self._transposes:
+            if (
+                trans.graph is not graph
+                or trans.op_type != "Transpose"
+                or not trans.attrs.get("perm")
+            ):
+                continue
+            # merge transpose nodes into one: make nodes use the output of this transpose node
+            transpose_out = trans.output_tensor_names[0]
+            for node in graph.FindOutputConsumers(trans.input_tensor_names[0]):
+                if (
+                    node is trans
+                    or node.graph is not graph
+                    or node.op_type != "Transpose"
+                    or node.input_tensor_names[0] != trans.input_tensor_names[0]
+                    or node.attrs.get("perm") != trans.attrs["perm"]
+                ):
+                    continue
                 old_transpose_out = node.output_tensor_names[0]
                 graph.ReplaceAllInputs(
-                    graph.get_nodes(), old_transpose_out, transpose_out
+                    graph.FindOutputConsumers(old_transpose_out),
+                    old_transpose_out,
+                    transpose_out,
                 )
+                # dangling transpose nodes can be deleted
+                self._RemoveIfUnused(node, graph)
 
-        # dangling transpose nodes can be deleted
-        graph.DeleteUnusedNodes(graph.outputs)
-
-    def _Optimize(self, graph):
-        return self._ApplyOptimization(graph, self._OptimizeAtCurrentGraphLevel)
-
-    def _OptimizeAtCurrentGraphLevel(self, graph):
+    def _OptimizeAtCurrentGraphLevel(self, graph, node_names):
         self._g = graph
-        self.PreOptimizeAction()
-        no_action = False
-        iteration_cnt = 0
-        while not no_action:
-            no_action = True
-            nodes = self.nodes
-            self._force_stop = {}
-            for n in nodes:
-                if IsNhwcTranspose(n):
-                    if self._HandleNhwcTranspose(n):
-                        no_action = False
-                        self.graph_been_opt = True
-                        iteration_cnt += 1
-                        # need break, because handler may change nodes set, making the n stale object
-                        # referencing already deleted elements
-                        break
-
-                if IsUselessTranspose(n):
-                    no_action = False
-                    iteration_cnt += 1
-                    self._RemoveUselessTranpose(n)
-                    break
-            # for debugging purpose
-            if "stop" in self._force_stop and self._force_stop["stop"] == 1:
-                break
-
-        self.logger.debug("finish after " + str(iteration_cnt) + " iteration(s)")
+        self._transposes = OrderedDict()
+        if node_names is None:
+            nodes = graph.get_nodes()
+        else:
+            nodes = [graph.get_node_by_name(name) for name in node_names]
+        self.PreOptimizeAction([n for n in nodes if n is not None and n.graph is graph])
+        super(TransposeOptimizer, self)._OptimizeAtCurrentGraphLevel(graph, node_names)
+        self.logger.debug("finish after visiting %d node(s)", self.visited_node_num)
 
         self.MergeDuplicatedTransposes()
         self.PoseOptimizeAction()
         return self._g
 
+    def _OptimizeNode(self, node, graph):
+        if node.op_type == "Transpose":
+            self._transposes[node] = None
+        if IsNhwcTranspose(node) and self._HandleNhwcTranspose(node):
+            return True
+        if node.graph is graph and IsUselessTranspose(node):
+            self._RemoveUselessTranpose(node)
+            return True
+        return False
+
     def _InitializeHandlers(self):
         self._handler_map = {
             "Add": self._AddHandler,
@@ -267,7 +260,9 @@ class TransposeOptimizer(GraphOptimizerBase):
                     len(n.output_tensor_names) == 1, "only expect single output"
                 )
                 self._g.ReplaceAllInputs(
-                    self._g.get_nodes(), n.output_tensor_names[0], n_input
+                    self._g.FindOutputConsumers(n.output_tensor_names[0]),
+                    n.output_tensor_names[0],
+                    n_input,
                 )
                 self._g.RemoveNode(n.name)
 
@@ -284,7 +279,9 @@ class TransposeOptimizer(GraphOptimizerBase):
                     len(n.output_tensor_names) == 1, "only expect single output"
                 )
                 self._g.ReplaceAllInputs(
-                    self._g.get_nodes(), n.output_tensor_names[0], n_input
+                    self._g.FindOutputConsumers(n.output_tensor_names[0]),
+                    n.output_tensor_names[0],
+                    n_input,
                 )
                 self._g.RemoveNode(n.name)
 
@@ -314,7 +311,7 @@ class TransposeOptimizer(GraphOptimizerBase):
 
         input_index = self._GetInputIndexForTrans(node, trans)
 
-        ops = self._g.get_nodes()
+        ops = self._g.FindOutputConsumers(node.output_tensor_names[0])
         self._g.ReplaceAllInputs(
             ops, node.output_tensor_names[0], trans.output_tensor_names[0]
         )
@@ -365,7 +362,7 @@ class TransposeOptimizer(GraphOptimizerBase):
 
     def _RemoveUselessTranpose(self, trans):
         self._g.ReplaceAllInputs(
-            self._g.get_nodes(),
+            self._g.FindOutputConsumers(trans.output_tensor_names[0]),
             trans.output_tensor_names[0],
             trans.input_tensor_names[0],
         )
@@ -540,7 +537,7 @@ class TransposeOptimizer(GraphOptimizerBase):
                     node.input_tensor_names[1],
                 ]
                 conv_node = self._g.MakeNode(t_p.op_type, conv_inputs, attr=t_p.attrs)
-                ops = self._g.get_nodes()
+                ops = self._g.FindOutputConsumers(node.output_tensor_names[0])
                 trans.input_tensor_names[0] = id_util.UniqueStr(conv_node.name)
                 self._g.ReplaceAllInputs(
                     ops, node.output_tensor_names[0], trans.output_tensor_names[0]
@@ -553,7 +550,7 @@ class TransposeOptimizer(GraphOptimizerBase):
     def _TransposeHandler(self, trans, node):
         if IsNchwTranspose(node):
             for g in {self._g, node.graph}:
-                ops = g.get_nodes()
+                ops = g.FindOutputConsumers(node.output_tensor_names[0])
                 g.ReplaceAllInputs(
                     ops, node.output_tensor_names[0], trans.input_tensor_names[0]
                 )
@@ -604,7 +601,7 @@ class TransposeOptimizer(GraphOptimizerBase):
                 result = np.multiply(transposed_val, mul_val)
                 conv.input_nodes[1].set_tensor_value(np.transpose(result, (3, 2, 0, 1)))
 
-                ops = self._g.get_nodes()
+                ops = self._g.FindOutputConsumers(node.output_tensor_names[0])
                 self._g.ReplaceAllInputs(
                     ops, node.output_tensor_names[0], trans.output_tensor_names[0]
                 )
@@ -623,7 +620,7 @@ class TransposeOptimizer(GraphOptimizerBase):
         if node.output_tensor_names[0] in node.graph.outputs:
             return False
         for g in {self._g, node.graph}:
-            ops = g.get_nodes()
+            ops = g.FindOutputConsumers(node.output_tensor_names[0])
             g.ReplaceAllInputs(
                 ops, node.output_tensor_names[0], trans.output_tensor_names[0]
             )
@@ -670,7 +667,7 @@ class TransposeOptimizer(GraphOptimizerBase):
         if "axes" in node.attrs:
             # switch tran and squeeze
             # 1 switch
-            ops = self._g.get_nodes()
+            ops = self._g.FindOutputConsumers(node.output_tensor_names[0])
             self._g.ReplaceAllInputs(
                 ops, node.output_tensor_names[0], trans.output_tensor_names[0]
             )
@@ -50,9 +50,7 @@ def InputOpByArgBlobDef(blob_def):
 
 
 def ReturnRemoteBlob(remote_blob, allow_cpu_return_op=True):
-    return enable_if.unique([LazyReturnRemoteBlob, EagerReturnRemoteBlob])(
-        remote_blob, allow_cpu_return_op
-    )
+    return _return_remote_blob_unique()(remote_blob, allow_cpu_return_op)
 
 
 @enable_if.condition(hob.in_global_mode & ~hob.eager_execution_enabled)
@@ -101,6 +99,11 @@ def EagerReturnRemoteBlob(remote_blob, allow_cpu_return_op=True):
     return remote_blob_util.RemoteBlob(lbi)
 
 
+_return_remote_blob_unique = enable_if.compile_unique(
+    [LazyReturnRemoteBlob, EagerReturnRemoteBlob]
+)
+
+
 def _GetReturnOpConfAndOutLbiAndScope(remote_blob, allow_cpu_return_op=True):
     op_conf = op_conf_util.OperatorConf()
     op_conf.name = id_util.UniqueStr("Return_")
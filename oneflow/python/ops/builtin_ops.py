@@ -15,22 +15,182 @@ limitations under the License.
 """
 from __future__ import absolute_import
 
+import collections
+import traceback
 
 import oneflow
 import oneflow._oneflow_internal
 import oneflow.python.framework.id_util as id_util
-from oneflow.python.framework.attr_util import convert_to_user_attr_value
+from oneflow.python.framework.attr_util import (
+    convert_to_user_attr_value,
+    make_attr_value_key,
+)
 from oneflow.python.oneflow_export import oneflow_export
 
 
+# Ops whose kernels create an OpKernelState, i.e. override CreateOpKernelState.
+# The state lives on the built op and is created on its first run, so it may
+# change across calls, like the position of a reader or the generator of a
+# random op, or be filled only once, like the output of "constant", and ops
+# built by different modules must not share it even though their attributes
+# are the same. Keep this in sync with the kernels in oneflow/user/kernels.
+_STATEFUL_OP_TYPE_NAMES = frozenset(
+    [
+        "COCOReader",
+        "OFRecordReader",
+        "OneRecReader",
+        "TestRandomSource",
+        "_nccl_logical_2D_same_dim0_all2all",
+        "_nccl_logical_2D_same_dim0_all_gather",
+        "_nccl_logical_2D_same_dim0_all_gather_noncontinuous",
+        "_nccl_logical_2D_same_dim0_all_reduce",
+        "_nccl_logical_2D_same_dim1_all_reduce",
+        "_nccl_logical_all_gather",
+        "_nccl_logical_all_gather_noncontinuous",
+        "_nccl_logical_all_reduce",
+        "_nccl_logical_reduce_scatter",
+        "_nccl_logical_s2s",
+        "avg_pool_1d",
+        "avg_pool_1d_grad",
+        "avg_pool_2d",
+        "avg_pool_2d_grad",
+        "avg_pool_3d",
+        "avg_pool_3d_grad",
+        "bernoulli",
+        "coin_flip",
+        "combined_margin_loss",
+        "combined_margin_loss_grad",
+        "constant",
+        "conv1d",
+        "conv2d",
+        "conv3d",
+        "conv_bias_grad",
+        "conv_data_grad",
+        "conv_filter_grad",
+        "crop_mirror_normalize_from_tensorbuffer",
+        "crop_mirror_normalize_from_uint8",
+        "distributed_partial_fc_sample",
+        "distributed_partial_fc_sample_disable_boxing",
+        "dropout",
+        "gather",
+        "generate_random_batch_permutation_indices",
+        "image_random_crop",
+        "indexed_slices_adam_update",
+        "indexed_slices_momentum_update",
+        "indexed_slices_sgd_update",
+        "logical_slice",
+        "logical_slice_assign",
+        "max_pool_1d",
+        "max_pool_1d_grad",
+        "max_pool_2d",
+        "max_pool_2d_grad",
+        "max_pool_3d",
+        "max_pool_3d_grad",
+        "megatron_gpt_mmap_data_loader",
+        "nvtx_end",
+        "nvtx_start",
+        "ofrecord_image_classification_reader",
+        "ofrecord_image_decoder_random_crop",
+        "pack",
+        "random_mask_like",
+        "sparse_cross_entropy_ms",
+        "sparse_softmax_cross_entropy_ms_grad",
+        "unpack",
+        "unsorted_segment_sum",
+        "unsorted_segment_sum_like",
+    ]
+)
+
+
+class OpExprCache(object):
+    r"""Process-wide cache of the UserOpExprs built by BuiltinOp, keyed by the op
+    type, the names and numbers of the inputs and outputs, and the attributes.
+    Modules and functional APIs constructed on every call then reuse the built op
+    instead of generating an op name and converting the attributes again. The
+    least recently used ops are evicted beyond `capacity`, since attributes like
+    shapes may take many values.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity_ = capacity
+        self.enabled_ = True
+        self.key2op_expr_ = collections.OrderedDict()
+        self.hit_cnt_ = 0
+        self.miss_cnt_ = 0
+        self.uncacheable_cnt_ = 0
+
+    @property
+    def enabled(self):
+        return self.enabled_
+
+    def SetEnabled(self, enabled):
+        self.enabled_ = enabled
+
+    def GetOrBuild(self, key, build_fn):
+        if key is None or not self.enabled_:
+            self.uncacheable_cnt_ += 1
+            return build_fn()
+        op_expr = self.key2op_expr_.get(key)
+        if op_expr is None:
+            self.miss_cnt_ += 1
+            op_expr = build_fn()
+            self.key2op_expr_[key] = op_expr
+            if len(self.key2op_expr_) > self.capacity_:
+                self.key2op_expr_.popitem(last=False)
+        else:
+            self.hit_cnt_ += 1
+            self.key2op_expr_.move_to_end(key)
+        return op_expr
+
+    def Stats(self):
+        cacheable_cnt = self.hit_cnt_ + self.miss_cnt_
+        return dict(
+            size=len(self.key2op_expr_),
+            hits=self.hit_cnt_,
+            misses=self.miss_cnt_,
+            uncacheable=self.uncacheable_cnt_,
+            hit_rate=self.hit_cnt_ / cacheable_cnt if cacheable_cnt > 0 else 0.0,
+        )
+
+    def Clear(self):
+        self.key2op_expr_.clear()
+        self.hit_cnt_ = 0
+        self.miss_cnt_ = 0
+        self.uncacheable_cnt_ = 0
+
+
+_op_expr_cache = OpExprCache()
+
+
+@oneflow_export("op_expr_cache_stats")
+def api_op_expr_cache_stats():
+    r"""Returns the statistics of the cache of the ops built by `flow.builtin_op`,
+    as a dict of the number of cached ops (size), hits, misses, uncacheable builds
+    and the hit rate.
+    """
+    return _op_expr_cache.Stats()
+
+
+@oneflow_export("clear_op_expr_cache")
+def api_clear_op_expr_cache():
+    r"""Clears the cache of the ops built by `flow.builtin_op` and its statistics."""
+    _op_expr_cache.Clear()
+
+
 @oneflow_export("builtin_op")
 class BuiltinOp(object):
+    r"""Builds a user op, which is recorded by the builder methods and built on
+    `Build()`. When no op name is given and the op is stateless, an op built
+    before with the same inputs, outputs and attributes is reused.
+    """
+
     def __init__(self, op_type_name, op_name=None):
-        if op_name is None:
-            op_name = id_util.UniqueStr(op_type_name)
-        self._builder = oneflow._oneflow_internal.one.OpBuilder(op_type_name, op_name)
-        self._op = None
         self._op_type_name = op_type_name
+        self._op_name = op_name
+        self._inputs = []
+        self._outputs = []
+        self._attrs = []
+        self._op = None
 
     @property
     def op(self):
@@ -40,9 +200,7 @@ class BuiltinOp(object):
             the builtin op
         """
         # TODO: Check for op completeness.
-        if self._op is None:
-            self._op = self._builder.build()
-        return self._op
+        return self.Build()
 
     def Input(self, input_name, num=1):
         r"""Set input blob of op
@@ -55,7 +213,7 @@ class BuiltinOp(object):
             self
         """
         assert isinstance(num, int) and num >= 1
-        self._builder.input(input_name, num)
+        self._inputs.append((input_name, num))
         return self
 
     def Output(self, output_name, num=1):
@@ -69,7 +227,7 @@ class BuiltinOp(object):
             self
         """
         assert isinstance(num, int) and num >= 1
-        self._builder.output(output_name, num)
+        self._outputs.append((output_name, num))
         return self
 
     def Attr(self, attr_name, attr_value, attr_type_name=None):
@@ -97,10 +255,7 @@ class BuiltinOp(object):
             print(traceback.format_stack()[-2])
 
         assert self._op_type_name is not None
-        self._builder.attr(
-            attr_name,
-            convert_to_user_attr_value(self._op_type_name, attr_name, attr_value),
-        )
+        self._attrs.append((attr_name, attr_value))
         return self
 
     def Build(self):
@@ -110,5 +265,45 @@ class BuiltinOp(object):
             the completed builtin op
         """
         if self._op is None:
-            self._op = self._builder.build()
+            self._op = _op_expr_cache.GetOrBuild(self._CacheKey(), self._BuildOpExpr)
         return self._op
+
+    def _CacheKey(self):
+        if self._op_name is not None:
+            return None
+        # the lazy interpreter adds an op named after the op expr for every call
+        if not oneflow._oneflow_internal.EagerExecutionEnabled():
+            return None
+        if self._op_type_name in _STATEFUL_OP_TYPE_NAMES:
+            return None
+        attrs = []
+        for attr_name, attr_value in self._attrs:
+            # ops with a seed are random ops
+            if attr_name == "seed":
+                return None
+            try:
+                attrs.append((attr_name, make_attr_value_key(attr_value)))
+            except TypeError:
+                return None
+        return (
+            self._op_type_name,
+            tuple(self._inputs),
+            tuple(self._outputs),
+            tuple(attrs),
+        )
+
+    def _BuildOpExpr(self):
+        op_name = self._op_name
+        if op_name is None:
+            op_name = id_util.UniqueStr(self._op_type_name)
+        builder = oneflow._oneflow_internal.one.OpBuilder(self._op_type_name, op_name)
+        for input_name, num in self._inputs:
+            builder.input(input_name, num)
+        for output_name, num in self._outputs:
+            builder.output(output_name, num)
+        for attr_name, attr_value in self._attrs:
+            builder.attr(
+                attr_name,
+                convert_to_user_attr_value(self._op_type_name, attr_name, attr_value),
+            )
+        return builder.build()
@@ -273,6 +273,8 @@ def ofrecord_reader(
     random_shuffle: bool = False,
     shuffle_buffer_size: int = 1024,
     shuffle_after_epoch: bool = False,
+    use_index: bool = False,
+    sample_offset: int = 0,
     name: Optional[str] = None,
 ) -> oneflow._oneflow_internal.BlobDesc:
     r"""Get ofrecord object from ofrecord dataset.
@@ -286,6 +288,8 @@ def ofrecord_reader(
         random_shuffle (bool, optional): Determines records shuffled or not. Defaults to False.
         shuffle_buffer_size (int, optional): Shuffle buffer size. Defaults to 1024.
         shuffle_after_epoch (bool, optional): Shuffled or not after each epoch. Defaults to False.
+        use_index (bool, optional): Read the records by the index files built by `flow.data.build_ofrecord_index`, so that the records rather than the part files are sharded across the devices, and `shuffle_after_epoch` shuffles all the records in every epoch. Defaults to False.
+        sample_offset (int, optional): Number of samples to skip, e.g. `iteration * batch_size` to resume from the middle of an epoch, requires `use_index`. Defaults to 0.
         name (Optional[str], optional): Optional name. Defaults to None.
 
     Returns:
@@ -349,12 +353,50 @@ def ofrecord_reader(
         .Attr("shuffle_buffer_size", shuffle_buffer_size)
         .Attr("shuffle_after_epoch", shuffle_after_epoch)
         .Attr("part_name_suffix_length", part_name_suffix_length)
+        .Attr("use_index", use_index)
+        .Attr("sample_offset", sample_offset)
         .Build()
         .InferAndTryRun()
         .RemoteBlobList()[0]
     )
 
 
+@oneflow_export("data.read_stats")
+def read_stats() -> dict:
+    r"""Returns the counters of the data readers of this process since it started or
+    since the last `flow.data.reset_read_stats()`:
+
+    - bytes_read: bytes read from the ofrecord datasets and other persistent files
+    - stall_time: seconds the readers waited for the file system, or for the
+      read-ahead thread if `flow.config.persistence_read_ahead_depth` is set
+    - buffer_pool_hit_rate: fraction of the records read into recycled buffers
+
+    For example:
+
+    .. code-block:: python
+
+        flow.data.reset_read_stats()
+        for _ in range(100):
+            train_job()
+        print(flow.data.read_stats())
+
+    """
+    stats = oneflow._oneflow_internal.persistence.GetReadStats()
+    buffer_num = stats["buffer_pool_hit_num"] + stats["buffer_pool_miss_num"]
+    return {
+        "bytes_read": stats["bytes_read"],
+        "stall_time": stats["stall_ns"] / 1e9,
+        "buffer_pool_hit_rate": stats["buffer_pool_hit_num"] / buffer_num
+        if buffer_num > 0
+        else 0.0,
+    }
+
+
+@oneflow_export("data.reset_read_stats")
+def reset_read_stats() -> None:
+    oneflow._oneflow_internal.persistence.ResetReadStats()
+
+
 @oneflow_export("data.decode_random")
 def decode_random(
     shape: Sequence[int],
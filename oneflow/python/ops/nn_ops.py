@@ -1243,69 +1243,34 @@ def layer_norm(
         # out.shape (1, 64, 128, 128)
 
     """
-    param_shape = inputs.shape[begin_params_axis:]
-
     if name is None:
         name = id_util.UniqueStr("LayerNorm_")
 
-    if flow.current_scope().device_parallel_desc_symbol.device_tag == "cpu":
-        if begin_norm_axis < 0:
-            begin_norm_axis = begin_norm_axis + len(inputs.shape)
-
-        reduce_axis = []
-        for dim in range(len(inputs.shape)):
-            if dim >= begin_norm_axis:
-                reduce_axis.append(dim)
-        mean, variance = flow.nn.moments(inputs, reduce_axis, keepdims=True)
-
-        axis = begin_norm_axis
-        normalized = flow.nn.batch_normalization(
-            x=inputs,
-            mean=mean,
-            variance=variance,
-            variance_epsilon=epsilon,
-            axis=axis,
-            name=name,
-        )
-        nd_params_shape = [1] * (len(inputs.shape) - len(param_shape)) + list(
-            param_shape
-        )
-        affined = normalized
-        if gamma:
-            gamma = flow.reshape(gamma, nd_params_shape)
-            affined *= gamma
-        if beta:
-            beta = flow.reshape(beta, nd_params_shape)
-            affined += beta
-        return affined
-    elif flow.current_scope().device_parallel_desc_symbol.device_tag == "gpu":
-        op_builder = (
-            flow.user_op_builder(name)
-            .Op("layer_norm")
-            .Input("x", [inputs])
-            .Output("y")
-            .Output("mean")
-            .Output("inv_variance")
-        )
-        scale = False
-        center = False
-        if beta is not None:
-            center = True
-            op_builder.Input("beta", [beta])
-        if gamma is not None:
-            scale = True
-            op_builder.Input("gamma", [gamma])
-            op_builder.Output("normalized")
-        op_builder.Attr("center", center)
-        op_builder.Attr("scale", scale)
-        op_builder.Attr("begin_norm_axis", begin_norm_axis)
-        op_builder.Attr("begin_params_axis", begin_params_axis)
-        op_builder.Attr("epsilon", epsilon)
-
-        y = op_builder.Build().InferAndTryRun().RemoteBlobList()[0]
-        return y
-    else:
-        raise NotImplementedError
+    op_builder = (
+        flow.user_op_builder(name)
+        .Op("layer_norm")
+        .Input("x", [inputs])
+        .Output("y")
+        .Output("mean")
+        .Output("inv_variance")
+    )
+    scale = False
+    center = False
+    if beta is not None:
+        center = True
+        op_builder.Input("beta", [beta])
+    if gamma is not None:
+        scale = True
+        op_builder.Input("gamma", [gamma])
+        op_builder.Output("normalized")
+    op_builder.Attr("center", center)
+    op_builder.Attr("scale", scale)
+    op_builder.Attr("begin_norm_axis", begin_norm_axis)
+    op_builder.Attr("begin_params_axis", begin_params_axis)
+    op_builder.Attr("epsilon", epsilon)
+
+    y = op_builder.Build().InferAndTryRun().RemoteBlobList()[0]
+    return y
 
 
 @oneflow_export("nn.compat_conv2d")
@@ -154,7 +154,7 @@ def api_user_op_builder(op_name):
     Returns:
         UserOpConfBuilder: `UserOpConfBuilder` object used to build a wrapper of user op.
     """
-    api = enable_if.unique([lazy_user_op_builder, eager_user_op_builder])
+    api = _user_op_builder_unique()
     return api(op_name)
 
 
@@ -184,6 +184,11 @@ def eager_user_op_builder(op_name):
     return UserOpConfBuilder(EagerUserOp, op_name, None)
 
 
+_user_op_builder_unique = enable_if.compile_unique(
+    [lazy_user_op_builder, eager_user_op_builder]
+)
+
+
 class EagerUserOp(UserOp):
     def __init__(self, op_name, op_type_name):
         UserOp.__init__(self, op_name, op_type_name)
@@ -422,9 +427,7 @@ class UserOpConfBuilder(object):
 
 @oneflow_export("user_op_module_builder")
 def api_user_op_module_builder(op_type_name):
-    api = enable_if.unique(
-        [lazy_user_op_module_builder, eager_logical_user_op_module_builder]
-    )
+    api = _user_op_module_builder_unique()
     return api(op_type_name)
 
 
@@ -459,6 +462,11 @@ def eager_logical_user_op_module_builder(op_type_name):
     return UserOpModuleBuilder(EagerLogicalUserOpModule, op_name, op_type_name)
 
 
+_user_op_module_builder_unique = enable_if.compile_unique(
+    [lazy_user_op_module_builder, eager_logical_user_op_module_builder]
+)
+
+
 class LazyUserOpModule(UserOpModule, UserOp):
     def __init__(self, op_name, op_type_name):
         UserOp.__init__(self, op_name, op_type_name)
@@ -503,12 +511,7 @@ class EagerLogicalUserOpModule(UserOpModule, UserOp):
 
 @oneflow_export("consistent_user_op_module_builder")
 def api_consistent_user_op_module_builder(op_type_name):
-    api = enable_if.unique(
-        [
-            lazy_consistent_user_op_module_builder,
-            eager_consistent_user_op_module_builder,
-        ]
-    )
+    api = _consistent_user_op_module_builder_unique()
     return api(op_type_name)
 
 
@@ -526,6 +529,11 @@ def eager_consistent_user_op_module_builder(op_type_name):
     return UserOpModuleBuilder(EagerConsistentUserOpModule, op_name, op_type_name)
 
 
+_consistent_user_op_module_builder_unique = enable_if.compile_unique(
+    [lazy_consistent_user_op_module_builder, eager_consistent_user_op_module_builder]
+)
+
+
 class LazyConsistentUserOpModule(UserOpModule, UserOp):
     def __init__(self, op_name, op_type_name):
         UserOp.__init__(self, op_name, op_type_name)
@@ -0,0 +1,275 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import numpy as np
+
+import oneflow.python.framework.dtype as dtype_util
+from oneflow.python.oneflow_export import oneflow_export
+
+
+class _PendingRequest(object):
+    def __init__(self, inputs, batch_size, future):
+        self.inputs = inputs
+        self.batch_size = batch_size
+        self.future = future
+
+
+@oneflow_export("serving.DynamicBatcher")
+class DynamicBatcher(object):
+    r"""Coalesces concurrent requests to a job of a running InferenceSession into
+    batches of the batch size the job is compiled with.
+
+    A request is a set of inputs whose first dimension is the batch dimension of
+    the request, which must not exceed the compiled batch size. The inputs are
+    cast to the data types of the job, and a request whose inputs can't be cast
+    without changing their kind (e.g. float to int) is rejected. Pending requests
+    are sent to the job together once they fill a batch, or once the oldest one
+    has waited for `max_delay_ms` milliseconds. The rows of a batch which are not
+    filled by requests are padded with zeros. Every output of the job is split
+    back to the requests along its first dimension, except the ones named in
+    `unbatched_outputs`, which are returned to every request as a whole.
+
+    For example:
+
+    .. code-block:: python
+
+        sess.launch()
+        batcher = flow.serving.DynamicBatcher(sess, job_name, max_delay_ms=2)
+
+        async def handle(image):
+            (output,) = await batcher.async_run(image=image)
+            return output
+
+    Args:
+        session: a launched InferenceSession
+        job_name: the name of the job to run
+        max_batch_size: the max number of rows of a batch, defaults to the
+            compiled batch size of the job
+        max_delay_ms: the max time in milliseconds a request waits for other
+            requests to batch with
+        unbatched_outputs: the names of the outputs of the job which don't have
+            a batch dimension
+    """
+
+    def __init__(
+        self,
+        session,
+        job_name,
+        max_batch_size=None,
+        max_delay_ms=5.0,
+        unbatched_outputs=(),
+    ):
+        self.session_ = session
+        self.job_name_ = job_name
+        self.event_loop_ = session.event_loop
+        self.input_names_ = session.list_inputs(job_name)
+        self.input_name2info_ = {
+            name: session.input_info(name, job_name) for name in self.input_names_
+        }
+        batch_sizes = set(info["shape"][0] for info in self.input_name2info_.values())
+        if len(batch_sizes) != 1:
+            raise ValueError(
+                "inputs of job {} have different batch sizes {}".format(
+                    job_name, batch_sizes
+                )
+            )
+        self.job_batch_size_ = batch_sizes.pop()
+        if max_batch_size is None:
+            max_batch_size = self.job_batch_size_
+        if max_batch_size < 1 or max_batch_size > self.job_batch_size_:
+            raise ValueError(
+                "max_batch_size should be in [1, {}], got {}".format(
+                    self.job_batch_size_, max_batch_size
+                )
+            )
+        self.max_batch_size_ = max_batch_size
+        self.max_delay_ = max_delay_ms / 1000.0
+        self.output_names_ = session.list_outputs(job_name)
+        for output_name in unbatched_outputs:
+            if output_name not in self.output_names_:
+                raise ValueError(
+                    'job {} has no output "{}"'.format(job_name, output_name)
+                )
+        self.batched_output_names_ = set()
+        for output_name in self.output_names_:
+            if output_name in unbatched_outputs:
+                continue
+            shape = session.output_info(output_name, job_name)["shape"]
+            if len(shape) == 0 or shape[0] != self.job_batch_size_:
+                raise ValueError(
+                    'output "{}" of shape {} has no batch dimension of size {}, '
+                    "it should be in unbatched_outputs".format(
+                        output_name, tuple(shape), self.job_batch_size_
+                    )
+                )
+            self.batched_output_names_.add(output_name)
+        # async_run of the session returns the outputs of all jobs
+        self.session_output_names_ = session.list_outputs()
+
+        self.pending_requests_ = []
+        self.pending_rows_ = 0
+        self.flush_timer_ = None
+        self.running_batches_ = set()
+
+        self.request_cnt_ = 0
+        self.batch_cnt_ = 0
+        self.batched_row_cnt_ = 0
+        self.max_queue_depth_ = 0
+
+    @property
+    def max_batch_size(self):
+        return self.max_batch_size_
+
+    def metrics(self):
+        r"""Returns the metrics of the batcher as a dict:
+
+        - queue_depth: the number of requests waiting to be batched
+        - max_queue_depth: the max queue_depth so far
+        - queued_rows: the number of rows of the waiting requests
+        - running_batches: the number of batches sent but not finished
+        - request_cnt, batch_cnt: the number of requests and batches so far
+        - avg_batch_size: the average number of request rows of a batch
+        - avg_batch_fill: avg_batch_size over the compiled batch size
+        """
+        avg_batch_size = (
+            self.batched_row_cnt_ / self.batch_cnt_ if self.batch_cnt_ > 0 else 0.0
+        )
+        return dict(
+            queue_depth=len(self.pending_requests_),
+            max_queue_depth=self.max_queue_depth_,
+            queued_rows=self.pending_rows_,
+            running_batches=len(self.running_batches_),
+            request_cnt=self.request_cnt_,
+            batch_cnt=self.batch_cnt_,
+            avg_batch_size=avg_batch_size,
+            avg_batch_fill=avg_batch_size / self.job_batch_size_,
+        )
+
+    async def async_run(self, **kwargs):
+        r"""Runs a request, and returns the outputs of the job in the order of
+        `InferenceSession.list_outputs(job_name)`.
+        """
+        batch_size = self._check_request(kwargs)
+        future = self.event_loop_.create_future()
+        request = _PendingRequest(kwargs, batch_size, future)
+        if self.pending_rows_ + batch_size > self.max_batch_size_:
+            self._flush()
+        self.pending_requests_.append(request)
+        self.pending_rows_ += batch_size
+        self.request_cnt_ += 1
+        self.max_queue_depth_ = max(self.max_queue_depth_, len(self.pending_requests_))
+        if self.pending_rows_ == self.max_batch_size_:
+            self._flush()
+        elif self.flush_timer_ is None:
+            self.flush_timer_ = self.event_loop_.call_later(
+                self.max_delay_, self._flush
+            )
+        return await future
+
+    async def flush(self):
+        r"""Sends the pending requests without waiting for more, and waits until
+        all the batches sent are finished.
+        """
+        self._flush()
+        if len(self.running_batches_) > 0:
+            await asyncio.wait(self.running_batches_)
+
+    def _check_request(self, kwargs):
+        batch_size = None
+        for input_name in self.input_names_:
+            if input_name not in kwargs:
+                raise ValueError('input "{}" is absent'.format(input_name))
+            value = kwargs[input_name]
+            if not isinstance(value, np.ndarray):
+                raise ValueError('input "{}" requires numpy.ndarray'.format(input_name))
+            info = self.input_name2info_[input_name]
+            dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])
+            if not np.can_cast(value.dtype, dtype, casting="same_kind"):
+                raise ValueError(
+                    'input "{}" requires {}, got {}'.format(
+                        input_name, np.dtype(dtype), value.dtype
+                    )
+                )
+            if value.ndim != len(info["shape"]) or value.shape[1:] != tuple(
+                info["shape"][1:]
+            ):
+                raise ValueError(
+                    'input "{}" requires shape (n,) + {}, got {}'.format(
+                        input_name, tuple(info["shape"][1:]), value.shape
+                    )
+                )
+            if batch_size is None:
+                batch_size = value.shape[0]
+            elif value.shape[0] != batch_size:
+                raise ValueError("inputs of a request have different batch sizes")
+        if batch_size is None or batch_size < 1 or batch_size > self.max_batch_size_:
+            raise ValueError(
+                "batch size of a request should be in [1, {}], got {}".format(
+                    self.max_batch_size_, batch_size
+                )
+            )
+        return batch_size
+
+    def _flush(self):
+        if self.flush_timer_ is not None:
+            self.flush_timer_.cancel()
+            self.flush_timer_ = None
+        if len(self.pending_requests_) == 0:
+            return
+        requests = self.pending_requests_
+        rows = self.pending_rows_
+        self.pending_requests_ = []
+        self.pending_rows_ = 0
+        self.batch_cnt_ += 1
+        self.batched_row_cnt_ += rows
+
+        batch = {}
+        for input_name in self.input_names_:
+            info = self.input_name2info_[input_name]
+            dtype = dtype_util.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])
+            value = np.zeros(tuple(info["shape"]), dtype=dtype)
+            offset = 0
+            for request in requests:
+                # casts the request to the dtype of the job
+                value[offset : offset + request.batch_size] = request.inputs[input_name]
+                offset += request.batch_size
+            batch[input_name] = value
+
+        task = self.event_loop_.create_task(self._run_batch(requests, batch))
+        self.running_batches_.add(task)
+        task.add_done_callback(self.running_batches_.discard)
+
+    async def _run_batch(self, requests, batch):
+        try:
+            outputs = await self.session_.async_run(self.job_name_, **batch)
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        output_name2value = dict(zip(self.session_output_names_, outputs))
+        offset = 0
+        for request in requests:
+            request_outputs = []
+            for output_name in self.output_names_:
+                output = output_name2value[output_name]
+                if output_name in self.batched_output_names_:
+                    output = output[offset : offset + request.batch_size]
+                request_outputs.append(output)
+            offset += request.batch_size
+            if not request.future.done():
+                request.future.set_result(tuple(request_outputs))
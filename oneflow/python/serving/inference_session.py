@@ -14,11 +14,13 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 import asyncio
+import collections
 import contextlib
 import inspect
 import numpy as np
 import os
 import enum
+import time
 import google.protobuf.text_format as text_format
 
 import oneflow as flow
@@ -52,14 +54,18 @@ def _is_int(val):
     return True
 
 
-def _find_model_latest_version(saved_model_dir):
+def _find_model_version_dirs(saved_model_dir):
     version_dirs = []
     for f in os.listdir(saved_model_dir):
         if os.path.isdir(os.path.join(saved_model_dir, f)) and _is_int(f):
             version_dirs.append(f)
 
-    version_dirs.sort(reverse=True, key=lambda x: int(x))
-    return version_dirs[0]
+    version_dirs.sort(key=lambda x: int(x))
+    return version_dirs
+
+
+def _find_model_latest_version(saved_model_dir):
+    return _find_model_version_dirs(saved_model_dir)[-1]
 
 
 def _need_check_device_tag(op_conf):
@@ -133,6 +139,37 @@ class SessionOption(object):
         self.device_tag = "gpu"
         self.device_num = 1
         self.is_mirrored_view = False
+        # max number of runs whose push, user and pull jobs are in flight at the
+        # same time, later runs wait for a slot, None means unlimited
+        self.max_in_flight_runs = None
+        # number of recent runs kept to compute the stage latency percentiles
+        self.latency_window_size = 1024
+
+
+class _StageLatency(object):
+    def __init__(self, window_size):
+        self.samples_ = collections.deque(maxlen=window_size)
+        self.count_ = 0
+        self.total_ = 0.0
+        self.max_ = 0.0
+
+    def add(self, seconds):
+        self.samples_.append(seconds)
+        self.count_ += 1
+        self.total_ += seconds
+        self.max_ = max(self.max_, seconds)
+
+    def summary(self):
+        if self.count_ == 0:
+            return dict(count=0, avg_ms=0.0, max_ms=0.0, p50_ms=0.0, p99_ms=0.0)
+        p50, p99 = np.percentile(np.array(self.samples_), [50, 99])
+        return dict(
+            count=self.count_,
+            avg_ms=self.total_ / self.count_ * 1000,
+            max_ms=self.max_ * 1000,
+            p50_ms=p50 * 1000,
+            p99_ms=p99 * 1000,
+        )
 
 
 @oneflow_export("serving.InferenceSession")
@@ -153,14 +190,23 @@ class InferenceSession(object):
         self.checkpoint_path_ = None
         self.config_proto_ = None
         self.job_name2job_conf_ = {}
+        self.job_name2op_names_ = {}
         self.inter_user_job_info_ = None
         self.cur_job_name_ = None
         self.inferface_name2info_ = {}
         self.output_name2future_ = {}
-        self.job_futures_ = []
+        # futures of the jobs not finished yet, a future removes itself once done
+        self.job_futures_ = set()
         self.status_ = None
 
         self._init_event_loop()
+        if self.option_.max_in_flight_runs is None:
+            self.run_semaphore_ = None
+        else:
+            assert self.option_.max_in_flight_runs > 0
+            self.run_semaphore_ = asyncio.Semaphore(self.option_.max_in_flight_runs)
+        self.in_flight_runs_ = 0
+        self.reset_stage_latency()
         self.init()
 
     def __del__(self):
@@ -399,26 +445,48 @@ class InferenceSession(object):
         self._check_status(self.SessionStatus.RUNNING)
         return list(self.job_name2job_conf_.keys())
 
-    def list_inputs(self):
+    def list_inputs(self, job_name=None):
+        r"""Returns the names of the inputs of the job `job_name`, or of all jobs if
+        it is None.
+        """
         self._check_status(self.SessionStatus.RUNNING)
         input_names = []
         for (
             input_name,
             _,
         ) in self.inter_user_job_info_.input_or_var_op_name2push_job_name.items():
-            input_names.append(input_name)
+            if job_name is None or input_name in self._get_job_op_names(job_name):
+                input_names.append(input_name)
         return tuple(input_names)
 
-    def list_outputs(self):
+    def list_outputs(self, job_name=None):
+        r"""Returns the names of the outputs of the job `job_name`, or of all jobs if
+        it is None.
+        """
         self._check_status(self.SessionStatus.RUNNING)
         output_names = []
         for (
             output_name,
             _,
         ) in self.inter_user_job_info_.output_or_var_op_name2pull_job_name.items():
-            output_names.append(output_name)
+            if job_name is None or output_name in self._get_job_op_names(job_name):
+                output_names.append(output_name)
         return tuple(output_names)
 
+    def _get_job_op_names(self, job_name):
+        if job_name not in self.job_name2op_names_:
+            if job_name not in self.job_name2job_conf_:
+                raise ValueError("job {} does not exist".format(job_name))
+            for job in c_api_util.GetJobSet().job:
+                if job.job_conf.job_name == job_name:
+                    self.job_name2op_names_[job_name] = frozenset(
+                        op_conf.name for op_conf in job.net.op
+                    )
+                    break
+            else:
+                raise ValueError("job {} is not compiled".format(job_name))
+        return self.job_name2op_names_[job_name]
+
     def input_info(self, input_name, job_name=None):
         return self._get_op_blob_info(job_name, input_name, "out")
 
@@ -451,23 +519,75 @@ class InferenceSession(object):
 
     async def async_run(self, job_name, **kwargs):
         self._check_status(self.SessionStatus.RUNNING)
-        self._run_push_jobs(**kwargs)
-        job_inst = job_instance_util.MakeUserJobInstance(job_name)
-        self._run_job(job_inst)
-        output_futures = tuple(self._run_pull_jobs(job_name).values())
-        return await asyncio.gather(*output_futures)
+        if self.run_semaphore_ is None:
+            return await self._async_run(job_name, **kwargs)
+        async with self.run_semaphore_:
+            return await self._async_run(job_name, **kwargs)
+
+    async def _async_run(self, job_name, **kwargs):
+        self.in_flight_runs_ += 1
+        try:
+            start_time = time.perf_counter()
+            push_job_futures = self._run_push_jobs(**kwargs)
+            job_inst = job_instance_util.MakeUserJobInstance(job_name)
+            user_job_future = self._run_job(job_inst)
+            output_futures, pull_job_futures = self._run_pull_jobs(job_name)
+            outputs = await asyncio.gather(*output_futures.values())
+            push_finish_time = max(
+                await asyncio.gather(*push_job_futures), default=start_time
+            )
+            user_job_finish_time = await user_job_future
+            pull_finish_time = max(await asyncio.gather(*pull_job_futures))
+        finally:
+            self.in_flight_runs_ -= 1
+        self.stage_latency_["push"].add(push_finish_time - start_time)
+        self.stage_latency_["compute"].add(user_job_finish_time - push_finish_time)
+        self.stage_latency_["pull"].add(pull_finish_time - user_job_finish_time)
+        self.stage_latency_["total"].add(pull_finish_time - start_time)
+        return outputs
+
+    @property
+    def in_flight_runs(self):
+        return self.in_flight_runs_
+
+    @property
+    def event_loop(self):
+        r"""The event loop which runs the futures of `async_run`."""
+        return self.event_loop_
+
+    def stage_latency(self):
+        r"""Returns the latency of the stages of the recent runs, as a dict from
+        "push", "compute", "pull" and "total" to dicts of count, avg_ms, max_ms,
+        p50_ms and p99_ms. A stage lasts until its last job finishes, so "compute"
+        includes the time the user job waits for the runtime after the pushes.
+        """
+        return {
+            stage: latency.summary() for stage, latency in self.stage_latency_.items()
+        }
+
+    def reset_stage_latency(self):
+        self.stage_latency_ = {
+            stage: _StageLatency(self.option_.latency_window_size)
+            for stage in ("push", "compute", "pull", "total")
+        }
 
     def _run_job(self, job_inst):
+        r"""Launches a job, and returns a future of the time it finishes."""
         future = self.event_loop_.create_future()
 
         def job_finish_cb(_):
-            self.event_loop_.call_soon_threadsafe(future.set_result, None)
+            self.event_loop_.call_soon_threadsafe(
+                future.set_result, time.perf_counter()
+            )
 
         job_inst.AddPostFinishCallback(job_finish_cb)
         oneflow._oneflow_internal.LaunchJob(job_inst)
-        self.job_futures_.append(future)
+        self.job_futures_.add(future)
+        future.add_done_callback(self.job_futures_.discard)
+        return future
 
     def _run_push_jobs(self, **kwargs):
+        push_job_futures = []
         for (
             input_name,
             push_job_name,
@@ -483,10 +603,13 @@ class InferenceSession(object):
             push_job_inst = job_instance_util.MakePushJobInstance(
                 push_job_name, input_name, push_fn
             )
-            self._run_job(push_job_inst)
+            push_job_futures.append(self._run_job(push_job_inst))
+
+        return push_job_futures
 
     def _run_pull_jobs(self, user_job_name):
         output_futures = {}
+        pull_job_futures = []
         for (
             output_name,
             pull_job_name,
@@ -496,10 +619,10 @@ class InferenceSession(object):
             pull_job_inst = job_instance_util.MakePullJobInstance(
                 pull_job_name, output_name, pull_fn
             )
-            self._run_job(pull_job_inst)
+            pull_job_futures.append(self._run_job(pull_job_inst))
             output_futures[output_name] = future
 
-        return output_futures
+        return output_futures, pull_job_futures
 
     def _make_pull_job_cb(self, output_name, user_job_name, future):
         output_lbn = oneflow._oneflow_internal.JobBuildAndInferCtx_GetOpBlobLbn(
@@ -532,4 +655,3 @@ class InferenceSession(object):
 
     async def wait_for_all_jobs_finished(self):
         await asyncio.gather(*self.job_futures_)
-        self.job_futures_ = []
@@ -0,0 +1,430 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import threading
+import traceback
+
+import numpy as np
+
+import oneflow.python.framework.dtype as dtype_util
+import oneflow.python.serving.inference_session as inference_session_util
+from oneflow.python.oneflow_export import oneflow_export
+
+
+def _has_saved_model_meta(version_path, saved_model_meta_file_basename):
+    return any(
+        os.path.isfile(os.path.join(version_path, saved_model_meta_file_basename + ext))
+        for ext in (".pb", ".prototxt")
+    )
+
+
+def _saved_model_meta_stamp(version_path, saved_model_meta_file_basename):
+    r"""Returns the sizes and modification times of the saved model meta files of
+    a version, which change when the files are written again.
+    """
+    stamp = []
+    for ext in (".pb", ".prototxt"):
+        path = os.path.join(version_path, saved_model_meta_file_basename + ext)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            stamp.append((ext, stat.st_size, stat.st_mtime_ns))
+    return tuple(stamp)
+
+
+def _get_numpy_input_infos(sess, job_name):
+    input_infos = {}
+    for input_name in sess.list_inputs(job_name):
+        info = sess.input_info(input_name, job_name)
+        input_infos[input_name] = dict(
+            shape=tuple(info["shape"]),
+            dtype=dtype_util.convert_oneflow_dtype_to_numpy_dtype(info["dtype"]),
+        )
+    return input_infos
+
+
+class _ModelWorkerClosedError(RuntimeError):
+    pass
+
+
+def _model_worker_main(conn, saved_model_dir, version, option, warmup_iters):
+    r"""Entry of a worker process serving one version of a model.
+
+    The lazy global session is process wide, so every loaded version lives in its
+    own process. The worker loads and warms up the version, reports its jobs and
+    inputs, then runs the requests received from `conn` concurrently on the event
+    loop of its InferenceSession until it receives None.
+    """
+    try:
+        sess = inference_session_util.InferenceSession(option)
+        sess.load_saved_model(saved_model_dir, model_version=version)
+        sess.launch()
+        job_names = sess.list_jobs()
+        input_infos = {}
+        for job_name in job_names:
+            input_infos[job_name] = _get_numpy_input_infos(sess, job_name)
+            warmup_inputs = {
+                name: np.zeros(info["shape"], dtype=info["dtype"])
+                for name, info in input_infos[job_name].items()
+            }
+            for _ in range(warmup_iters):
+                sess.run(job_name, **warmup_inputs)
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+        return
+    conn.send(("ready", dict(jobs=job_names, inputs=input_infos)))
+
+    loop = sess.event_loop_
+
+    async def run(request_id, job_name, inputs):
+        try:
+            outputs = await sess.async_run(job_name, **inputs)
+        except Exception:
+            conn.send((request_id, None, traceback.format_exc()))
+        else:
+            conn.send((request_id, tuple(outputs), None))
+
+    def recv_requests():
+        while True:
+            request = conn.recv()
+            if request is None:
+                loop.call_soon_threadsafe(loop.stop)
+                return
+            loop.call_soon_threadsafe(loop.create_task, run(*request))
+
+    threading.Thread(target=recv_requests, daemon=True).start()
+    loop.run_forever()
+    sess.close()
+
+
+class _ModelWorker(object):
+    def __init__(self, model_name, saved_model_dir, version, option, warmup_iters):
+        self.model_name_ = model_name
+        self.version_ = version
+        ctx = multiprocessing.get_context("spawn")
+        self.conn_, self.child_conn_ = ctx.Pipe()
+        self.process_ = ctx.Process(
+            target=_model_worker_main,
+            args=(self.child_conn_, saved_model_dir, version, option, warmup_iters),
+            daemon=True,
+        )
+        self.request_ids_ = itertools.count()
+        self.request_id2future_ = {}
+        self.lock_ = threading.Lock()
+        self.send_lock_ = threading.Lock()
+        self.meta_ = None
+        self.closed_ = False
+
+    @property
+    def version(self):
+        return self.version_
+
+    @property
+    def job_names(self):
+        return self.meta_["jobs"]
+
+    def input_info(self, job_name):
+        return self.meta_["inputs"][job_name]
+
+    def start(self):
+        r"""Starts the worker, and blocks until the version is loaded and warmed up."""
+        self.process_.start()
+        # so that conn_ raises EOFError once the worker exits
+        self.child_conn_.close()
+        try:
+            status, payload = self.conn_.recv()
+        except EOFError:
+            status, payload = (
+                "error",
+                "worker exited with code {}".format(self.process_.exitcode),
+            )
+        if status != "ready":
+            self.process_.join()
+            raise RuntimeError(
+                "failed to load version {} of model {}:\n{}".format(
+                    self.version_, self.model_name_, payload
+                )
+            )
+        self.meta_ = payload
+        threading.Thread(target=self._recv_responses, daemon=True).start()
+
+    def submit(self, job_name, inputs):
+        future = concurrent.futures.Future()
+        # the request can't be withdrawn once sent, and a cancelled future
+        # couldn't be resolved by _recv_responses, so it is never cancelled
+        future.set_running_or_notify_cancel()
+        with self.lock_:
+            if self.closed_:
+                raise _ModelWorkerClosedError(
+                    "version {} of model {} is unloaded".format(
+                        self.version_, self.model_name_
+                    )
+                )
+            request_id = next(self.request_ids_)
+            self.request_id2future_[request_id] = future
+        with self.send_lock_:
+            self.conn_.send((request_id, job_name, inputs))
+        return future
+
+    def close(self):
+        r"""Stops accepting requests, waits for the pending ones and stops the worker."""
+        with self.lock_:
+            self.closed_ = True
+            pending_futures = list(self.request_id2future_.values())
+        concurrent.futures.wait(pending_futures)
+        with self.send_lock_:
+            self.conn_.send(None)
+        self.process_.join()
+
+    def _recv_responses(self):
+        while True:
+            try:
+                request_id, outputs, error = self.conn_.recv()
+            except EOFError:
+                break
+            with self.lock_:
+                future = self.request_id2future_.pop(request_id)
+            if error is None:
+                future.set_result(outputs)
+            else:
+                future.set_exception(RuntimeError(error))
+        with self.lock_:
+            futures = list(self.request_id2future_.values())
+            self.request_id2future_.clear()
+        for future in futures:
+            future.set_exception(
+                RuntimeError(
+                    "worker of version {} of model {} exited".format(
+                        self.version_, self.model_name_
+                    )
+                )
+            )
+
+
+@oneflow_export("serving.ModelRepository")
+class ModelRepository(object):
+    r"""Serves the saved models in a repository directory, and hot reloads them
+    when new versions are saved.
+
+    The repository holds a directory per model, which is the `save_path` of the
+    `flow.saved_model.ModelBuilder` saving it, so a version of a model is in
+    `<repository_dir>/<model_name>/<version>`. A background thread polls the
+    repository, and when a new version appears it loads the version in a worker
+    process, warms up every job of it with zero inputs shaped like its
+    `input_info`, then switches the requests not specifying a version to it at
+    once. The versions older than the latest `max_versions` ones are unloaded
+    after their pending requests finish.
+
+    For example:
+
+    .. code-block:: python
+
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        repo = flow.serving.ModelRepository("models", option)
+        repo.start()
+        (output,) = repo.run("resnet50", image=image)
+        ...
+        repo.close()
+
+    Args:
+        repository_dir: the repository directory
+        option: the SessionOption of the InferenceSession of every version
+        poll_interval_s: the interval in seconds to poll the repository
+        max_versions: the number of the latest versions of a model kept loaded
+        warmup_iters: the number of warm up runs of every job of a new version
+        saved_model_meta_file_basename: the basename of the saved model meta files
+    """
+
+    def __init__(
+        self,
+        repository_dir,
+        option=None,
+        poll_interval_s=1.0,
+        max_versions=1,
+        warmup_iters=1,
+        saved_model_meta_file_basename="saved_model",
+    ):
+        if not os.path.isdir(repository_dir):
+            raise ValueError("{} is not a valid directory".format(repository_dir))
+        assert max_versions > 0
+        self.repository_dir_ = repository_dir
+        self.option_ = option or inference_session_util.SessionOption()
+        self.poll_interval_s_ = poll_interval_s
+        self.max_versions_ = max_versions
+        self.warmup_iters_ = warmup_iters
+        self.saved_model_meta_file_basename_ = saved_model_meta_file_basename
+
+        self.lock_ = threading.Lock()
+        # model name -> {version -> _ModelWorker}
+        self.model_name2workers_ = {}
+        # model name -> the version serving requests not specifying a version
+        self.model_name2serving_version_ = {}
+        # (model name, version) -> the stamp of its meta files when it failed to
+        # load, it is loaded again once the meta files change
+        self.failed_versions_ = {}
+        self.stop_event_ = threading.Event()
+        self.poll_thread_ = None
+
+    def start(self):
+        r"""Loads the latest versions of all models, then starts watching the
+        repository in the background.
+        """
+        self.poll()
+        self.poll_thread_ = threading.Thread(target=self._poll_loop, daemon=True)
+        self.poll_thread_.start()
+
+    def close(self):
+        self.stop_event_.set()
+        if self.poll_thread_ is not None:
+            self.poll_thread_.join()
+        for model_name in list(self.model_name2workers_.keys()):
+            self.unload(model_name)
+
+    def model_versions(self):
+        r"""Returns a dict from model names to their serving versions."""
+        with self.lock_:
+            return dict(self.model_name2serving_version_)
+
+    def loaded_versions(self, model_name):
+        with self.lock_:
+            return sorted(self.model_name2workers_.get(model_name, {}).keys())
+
+    def list_jobs(self, model_name, version=None):
+        return self._get_worker(model_name, version).job_names
+
+    def input_info(self, model_name, input_name, job_name=None, version=None):
+        r"""Returns the shape and numpy dtype of an input of a loaded version."""
+        worker = self._get_worker(model_name, version)
+        return worker.input_info(self._get_job_name(worker, job_name))[input_name]
+
+    def run(self, model_name, job_name=None, version=None, **kwargs):
+        return self.submit(model_name, job_name, version, **kwargs).result()
+
+    async def async_run(self, model_name, job_name=None, version=None, **kwargs):
+        return await asyncio.wrap_future(
+            self.submit(model_name, job_name, version, **kwargs)
+        )
+
+    def submit(self, model_name, job_name=None, version=None, **kwargs):
+        r"""Sends a request to a version of a model, the serving version by default,
+        and returns a concurrent.futures.Future of its outputs.
+        """
+        while True:
+            worker = self._get_worker(model_name, version)
+            try:
+                return worker.submit(self._get_job_name(worker, job_name), kwargs)
+            except _ModelWorkerClosedError:
+                # the serving version was swapped after the worker was got
+                if version is not None:
+                    raise
+
+    def poll(self):
+        r"""Loads the new versions in the repository and unloads the outdated ones."""
+        for model_name in sorted(os.listdir(self.repository_dir_)):
+            saved_model_dir = os.path.join(self.repository_dir_, model_name)
+            if not os.path.isdir(saved_model_dir):
+                continue
+            version_dirs = [
+                v
+                for v in inference_session_util._find_model_version_dirs(
+                    saved_model_dir
+                )
+                if _has_saved_model_meta(
+                    os.path.join(saved_model_dir, v),
+                    self.saved_model_meta_file_basename_,
+                )
+            ]
+            for version_dir in version_dirs[-self.max_versions_ :]:
+                version = int(version_dir)
+                if version in self.model_name2workers_.get(model_name, {}):
+                    continue
+                stamp = _saved_model_meta_stamp(
+                    os.path.join(saved_model_dir, version_dir),
+                    self.saved_model_meta_file_basename_,
+                )
+                if self.failed_versions_.get((model_name, version)) == stamp:
+                    continue
+                self._load(model_name, saved_model_dir, version, stamp)
+
+    def unload(self, model_name, version=None):
+        r"""Unloads a version of a model, or all versions if `version` is None."""
+        with self.lock_:
+            workers = self.model_name2workers_.get(model_name, {})
+            versions = list(workers.keys()) if version is None else [version]
+            unloaded = [workers.pop(v) for v in versions if v in workers]
+            if len(workers) == 0:
+                self.model_name2workers_.pop(model_name, None)
+                self.model_name2serving_version_.pop(model_name, None)
+            elif self.model_name2serving_version_[model_name] not in workers:
+                self.model_name2serving_version_[model_name] = max(workers.keys())
+        for worker in unloaded:
+            worker.close()
+
+    def _load(self, model_name, saved_model_dir, version, stamp):
+        worker = _ModelWorker(
+            model_name, saved_model_dir, version, self.option_, self.warmup_iters_
+        )
+        try:
+            worker.start()
+        except RuntimeError:
+            traceback.print_exc()
+            self.failed_versions_[(model_name, version)] = stamp
+            return
+        self.failed_versions_.pop((model_name, version), None)
+
+        with self.lock_:
+            workers = self.model_name2workers_.setdefault(model_name, {})
+            workers[version] = worker
+            serving_version = self.model_name2serving_version_.get(model_name)
+            if serving_version is None or version > serving_version:
+                self.model_name2serving_version_[model_name] = version
+            outdated_versions = sorted(workers.keys())[: -self.max_versions_]
+            outdated_workers = [workers.pop(v) for v in outdated_versions]
+        for outdated_worker in outdated_workers:
+            outdated_worker.close()
+
+    def _poll_loop(self):
+        while not self.stop_event_.wait(self.poll_interval_s_):
+            try:
+                self.poll()
+            except Exception:
+                traceback.print_exc()
+
+    def _get_worker(self, model_name, version):
+        with self.lock_:
+            if model_name not in self.model_name2serving_version_:
+                raise ValueError("model {} is not loaded".format(model_name))
+            if version is None:
+                version = self.model_name2serving_version_[model_name]
+            workers = self.model_name2workers_[model_name]
+            if version not in workers:
+                raise ValueError(
+                    "version {} of model {} is not loaded".format(version, model_name)
+                )
+            return workers[version]
+
+    def _get_job_name(self, worker, job_name):
+        if job_name is not None:
+            return job_name
+        if len(worker.job_names) != 1:
+            raise ValueError(
+                "please specify job_name, candidates: {}".format(worker.job_names)
+            )
+        return worker.job_names[0]
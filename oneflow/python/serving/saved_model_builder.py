@@ -136,15 +136,21 @@ class ModelBuilder(object):
         flow.checkpoint.save(checkpoint_path)
         self.proto.checkpoint_dir = self.checkpoint_dir_
 
+        # the meta files are written at last and atomically, so that a version
+        # is never found with a partially written one, e.g. by a ModelRepository
         saved_model_pb_path = os.path.join(version_dir, self.saved_model_pb_filename_)
-        with open(saved_model_pb_path, "wb") as writer:
-            writer.write(self.saved_model_proto_.SerializeToString())
+        _WriteFileAtomically(
+            saved_model_pb_path, "wb", self.saved_model_proto_.SerializeToString()
+        )
 
         saved_model_pbtxt_path = os.path.join(
             version_dir, self.saved_model_pbtxt_filename_
         )
-        with open(saved_model_pbtxt_path, "wt") as writer:
-            writer.write(text_format.MessageToString(self.saved_model_proto_))
+        _WriteFileAtomically(
+            saved_model_pbtxt_path,
+            "wt",
+            text_format.MessageToString(self.saved_model_proto_),
+        )
 
 
 @oneflow_export("saved_model.GraphBuilder")
@@ -344,3 +350,15 @@ def Lbn2Lbi(lbn, lbi=None):
 def Lbi2Lbn(lbi):
     assert isinstance(lbi, logical_blob_id_pb.LogicalBlobId)
     return "{}/{}".format(lbi.op_name, lbi.blob_name)
+
+
+def _WriteFileAtomically(path, mode, data):
+    tmp_path = "{}.tmp{}".format(path, os.getpid())
+    try:
+        with open(tmp_path, mode) as writer:
+            writer.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,288 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import itertools
+import struct
+import traceback
+
+import numpy as np
+
+from oneflow.python.oneflow_export import oneflow_export
+
+# A frame is a little-endian u32 length of the body followed by the body.
+# The body of a request is
+#   u32 request_id | u16 len | job name | tensors
+# and the body of a response is
+#   u32 request_id | u8 status | tensors, or utf-8 error message if status != 0
+# where tensors are
+#   u16 count | count * (u16 len | name | u8 len | dtype.str | u8 ndim |
+#                        ndim * i64 dims | u64 nbytes | data)
+_FRAME_HEADER = struct.Struct("<I")
+_REQUEST_HEADER = struct.Struct("<IH")
+_RESPONSE_HEADER = struct.Struct("<IB")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_NBYTES = struct.Struct("<Q")
+
+_STATUS_OK = 0
+_STATUS_ERROR = 1
+
+
+def _pack_str(s, len_struct):
+    encoded = s.encode()
+    return len_struct.pack(len(encoded)) + encoded
+
+
+def _pack_tensors(name2tensor):
+    r"""Returns the encoding of the tensors as a list of buffers, the data of the
+    contiguous tensors are not copied.
+    """
+    buffers = [_U16.pack(len(name2tensor))]
+    for name, tensor in name2tensor.items():
+        tensor = np.ascontiguousarray(tensor)
+        header = (
+            _pack_str(name, _U16)
+            + _pack_str(tensor.dtype.str, _U8)
+            + struct.pack("<B%dq" % tensor.ndim, tensor.ndim, *tensor.shape)
+            + _NBYTES.pack(tensor.nbytes)
+        )
+        buffers.append(header)
+        buffers.append(memoryview(tensor.reshape(-1).view(np.uint8)))
+    return buffers
+
+
+def _unpack_str(buf, offset, len_struct):
+    (length,) = len_struct.unpack_from(buf, offset)
+    offset += len_struct.size
+    return bytes(buf[offset : offset + length]).decode(), offset + length
+
+
+def _unpack_tensors(buf, offset):
+    r"""Decodes the tensors in `buf` from `offset`. The tensors are read-only views
+    of `buf` made by np.frombuffer, their data are not copied.
+    """
+    (count,) = _U16.unpack_from(buf, offset)
+    offset += _U16.size
+    name2tensor = {}
+    for _ in range(count):
+        name, offset = _unpack_str(buf, offset, _U16)
+        dtype, offset = _unpack_str(buf, offset, _U8)
+        (ndim,) = _U8.unpack_from(buf, offset)
+        offset += _U8.size
+        shape = struct.unpack_from("<%dq" % ndim, buf, offset)
+        offset += 8 * ndim
+        (nbytes,) = _NBYTES.unpack_from(buf, offset)
+        offset += _NBYTES.size
+        dtype = np.dtype(dtype)
+        tensor = np.frombuffer(
+            buf, dtype=dtype, count=nbytes // dtype.itemsize, offset=offset
+        )
+        name2tensor[name] = tensor.reshape(shape)
+        offset += nbytes
+    return name2tensor, offset
+
+
+async def _read_frame(reader):
+    header = await reader.readexactly(_FRAME_HEADER.size)
+    (length,) = _FRAME_HEADER.unpack(header)
+    return await reader.readexactly(length)
+
+
+def _write_frame(writer, buffers):
+    length = sum(memoryview(b).nbytes for b in buffers)
+    writer.writelines([_FRAME_HEADER.pack(length)] + buffers)
+
+
+@oneflow_export("serving.InferenceServer")
+class InferenceServer(object):
+    r"""Serves an InferenceSession over TCP with asyncio streams.
+
+    Every request names a job and carries its inputs as binary tensors, and it is
+    run by `handler(job_name, **inputs)`, which is `session.async_run` by default.
+    A connection may send requests without waiting for their responses, the
+    requests run concurrently and the responses are sent as they finish, so a
+    client must match them by request id. The server runs on the event loop of
+    the session.
+
+    For example:
+
+    .. code-block:: python
+
+        sess.launch()
+        server = flow.serving.InferenceServer(sess, port=8000)
+        server.start()
+        server.serve_forever()
+
+    Args:
+        session: a launched InferenceSession
+        host: the host to listen on
+        port: the port to listen on, 0 picks a free port
+        handler: a coroutine function to run the requests instead of
+            `session.async_run`, e.g. a wrapper of a DynamicBatcher
+    """
+
+    def __init__(self, session, host="127.0.0.1", port=0, handler=None):
+        self.event_loop_ = session.event_loop_
+        self.handler_ = handler or session.async_run
+        self.host_ = host
+        self.port_ = port
+        self.server_ = None
+
+    @property
+    def port(self):
+        return self.port_
+
+    def start(self):
+        self.server_ = self.event_loop_.run_until_complete(
+            asyncio.start_server(self._handle_connection, self.host_, self.port_)
+        )
+        self.port_ = self.server_.sockets[0].getsockname()[1]
+
+    def serve_forever(self):
+        try:
+            self.event_loop_.run_forever()
+        except KeyboardInterrupt:
+            pass
+
+    def close(self):
+        if self.server_ is not None:
+            self.server_.close()
+            self.event_loop_.run_until_complete(self.server_.wait_closed())
+            self.server_ = None
+
+    async def _handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    body = await _read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                task = self.event_loop_.create_task(
+                    self._handle_request(body, writer, write_lock)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if len(tasks) > 0:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def _handle_request(self, body, writer, write_lock):
+        try:
+            request_id, length = _REQUEST_HEADER.unpack_from(body, 0)
+        except struct.error:
+            # the error can't be sent back without a request id, close the
+            # connection so that the calls of the client fail instead of hanging
+            writer.close()
+            return
+        try:
+            offset = _REQUEST_HEADER.size
+            job_name = bytes(body[offset : offset + length]).decode()
+            inputs, _ = _unpack_tensors(body, offset + length)
+            outputs = await self.handler_(job_name, **inputs)
+            buffers = [_RESPONSE_HEADER.pack(request_id, _STATUS_OK)]
+            buffers += _pack_tensors(
+                {"output_{}".format(i): output for i, output in enumerate(outputs)}
+            )
+        except Exception:
+            buffers = [
+                _RESPONSE_HEADER.pack(request_id, _STATUS_ERROR),
+                traceback.format_exc().encode(),
+            ]
+        async with write_lock:
+            _write_frame(writer, buffers)
+            await writer.drain()
+
+
+@oneflow_export("serving.InferenceClient")
+class InferenceClient(object):
+    r"""An asyncio client of InferenceServer. Concurrent calls of `run` share the
+    connection, and are matched with their responses by request id.
+
+    For example:
+
+    .. code-block:: python
+
+        client = flow.serving.InferenceClient()
+        await client.connect("127.0.0.1", 8000)
+        outputs = await client.run("alexnet_inference", image=image)
+        await client.close()
+    """
+
+    def __init__(self):
+        self.reader_ = None
+        self.writer_ = None
+        self.request_ids_ = itertools.count()
+        self.request_id2future_ = {}
+        self.recv_task_ = None
+        self.write_lock_ = None
+
+    async def connect(self, host, port):
+        self.reader_, self.writer_ = await asyncio.open_connection(host, port)
+        self.write_lock_ = asyncio.Lock()
+        self.recv_task_ = asyncio.ensure_future(self._recv_responses())
+
+    async def close(self):
+        self.writer_.close()
+        await self.recv_task_
+
+    async def run(self, job_name, **kwargs):
+        r"""Runs a job on the server, and returns its outputs as a tuple."""
+        request_id = next(self.request_ids_) & 0xFFFFFFFF
+        future = asyncio.get_event_loop().create_future()
+        self.request_id2future_[request_id] = future
+        encoded_job_name = job_name.encode()
+        buffers = [
+            _REQUEST_HEADER.pack(request_id, len(encoded_job_name)),
+            encoded_job_name,
+        ]
+        buffers += _pack_tensors(kwargs)
+        try:
+            async with self.write_lock_:
+                _write_frame(self.writer_, buffers)
+                await self.writer_.drain()
+            return await future
+        finally:
+            # the response of a cancelled call is dropped when it arrives
+            self.request_id2future_.pop(request_id, None)
+
+    async def _recv_responses(self):
+        try:
+            while True:
+                body = await _read_frame(self.reader_)
+                request_id, status = _RESPONSE_HEADER.unpack_from(body, 0)
+                future = self.request_id2future_.pop(request_id, None)
+                if future is None or future.done():
+                    # the call was cancelled
+                    continue
+                if status == _STATUS_OK:
+                    outputs, _ = _unpack_tensors(body, _RESPONSE_HEADER.size)
+                    future.set_result(
+                        tuple(
+                            outputs["output_{}".format(i)] for i in range(len(outputs))
+                        )
+                    )
+                else:
+                    message = bytes(body[_RESPONSE_HEADER.size :]).decode()
+                    future.set_exception(RuntimeError(message))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        for future in self.request_id2future_.values():
+            if not future.done():
+                future.set_exception(ConnectionError("connection closed"))
+        self.request_id2future_.clear()
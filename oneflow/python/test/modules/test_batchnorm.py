@@ -358,6 +358,60 @@ class TestBatchNormModule(flow.unittest.TestCase):
         y = m(x)
         test_case.assertTrue(np.allclose(y.numpy(), output_arr, 1e-04, 1e-04))
 
+    def test_batchnorm2d_running_stats(test_case):
+        # a large offset loses precision if the variance is mean(x^2) - mean(x)^2
+        input_arr = (np.random.randn(4, 3, 5, 6) + 1000).astype(np.float32)
+        m = flow.nn.BatchNorm2d(num_features=3, eps=1e-5, momentum=0.1)
+        running_mean = m.running_mean
+        x = flow.Tensor(input_arr)
+        np_running_mean = np.zeros(3)
+        np_running_var = np.ones(3)
+        for _ in range(2):
+            y = m(x)
+            mean = input_arr.mean(axis=(0, 2, 3), dtype=np.float64)
+            var = input_arr.var(axis=(0, 2, 3), dtype=np.float64)
+            output = (input_arr - mean.reshape(1, 3, 1, 1)) / np.sqrt(
+                var.reshape(1, 3, 1, 1) + 1e-5
+            )
+            test_case.assertTrue(np.allclose(y.numpy(), output, 1e-03, 1e-03))
+            n = input_arr.size / 3
+            np_running_mean = 0.1 * np_running_mean + 0.9 * mean
+            np_running_var = 0.1 * np_running_var + 0.9 * var * n / (n - 1)
+        # the running statistics are updated in place
+        test_case.assertTrue(m.running_mean is running_mean)
+        test_case.assertTrue(
+            np.allclose(m.running_mean.numpy(), np_running_mean, 1e-04, 1e-04)
+        )
+        test_case.assertTrue(
+            np.allclose(m.running_var.numpy(), np_running_var, 1e-04, 1e-04)
+        )
+
+    def test_batchnorm2d_backward(test_case):
+        input_arr = np.random.randn(2, 3, 4, 5).astype(np.float32)
+        dy = np.random.randn(2, 3, 4, 5).astype(np.float32)
+        m = flow.nn.BatchNorm2d(num_features=3)
+        x = flow.Tensor(input_arr, requires_grad=True)
+        y = (m(x) * flow.Tensor(dy)).sum()
+        y.backward()
+        axis = (0, 2, 3)
+        mean = input_arr.mean(axis=axis, keepdims=True)
+        inv_std = 1 / np.sqrt(input_arr.var(axis=axis, keepdims=True) + 1e-5)
+        x_hat = (input_arr - mean) * inv_std
+        x_grad = inv_std * (
+            dy
+            - dy.mean(axis=axis, keepdims=True)
+            - x_hat * (dy * x_hat).mean(axis=axis, keepdims=True)
+        )
+        test_case.assertTrue(np.allclose(x.grad.numpy(), x_grad, 1e-04, 1e-04))
+        test_case.assertTrue(
+            np.allclose(
+                m.weight.grad.numpy(), (dy * x_hat).sum(axis=axis), 1e-04, 1e-04
+            )
+        )
+        test_case.assertTrue(
+            np.allclose(m.bias.grad.numpy(), dy.sum(axis=axis), 1e-04, 1e-04)
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
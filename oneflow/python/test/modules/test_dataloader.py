@@ -0,0 +1,117 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+
+import oneflow.experimental as flow
+
+
+class _RandomDataset(flow.utils.data.Dataset):
+    r"""The sample i holds i, a large array and a number drawn in the worker."""
+
+    def __len__(self):
+        return 23
+
+    def __getitem__(self, index):
+        return {
+            "index": np.float32(index),
+            "large": np.full((2, 65536), index, dtype=np.int64),
+            "random": np.random.rand(),
+        }
+
+
+class _FailedDataset(flow.utils.data.Dataset):
+    def __len__(self):
+        return 8
+
+    def __getitem__(self, index):
+        if index == 5:
+            raise ValueError("bad sample {}".format(index))
+        return np.zeros(2, dtype=np.float32)
+
+
+def _test_dataloader(test_case, num_workers, persistent_workers):
+    dataset = _RandomDataset()
+    loader = flow.utils.data.DataLoader(
+        dataset,
+        batch_size=4,
+        num_workers=num_workers,
+        persistent_workers=persistent_workers,
+        seed=0,
+    )
+    test_case.assertEqual(len(loader), 6)
+    for _ in range(2):
+        ids = []
+        for batch in loader:
+            test_case.assertTrue(isinstance(batch["index"], flow.Tensor))
+            test_case.assertEqual(batch["index"].dtype, flow.float32)
+            test_case.assertEqual(batch["large"].dtype, flow.int64)
+            test_case.assertEqual(batch["random"].dtype, flow.float32)
+            large = batch["large"].numpy()
+            test_case.assertEqual(large.shape[1:], (2, 65536))
+            test_case.assertTrue(np.all(large == batch["index"].numpy()[:, None, None]))
+            ids.append(batch["index"].numpy())
+        test_case.assertTrue(np.array_equal(np.concatenate(ids), np.arange(23)))
+    # an epoch stopped early does not leak into the next one
+    next(iter(loader))
+    ids = np.concatenate([batch["index"].numpy() for batch in loader])
+    test_case.assertTrue(np.array_equal(ids, np.arange(23)))
+
+
+def _test_dataloader_seed(test_case, num_workers):
+    def _Load(seed):
+        loader = flow.utils.data.DataLoader(
+            _RandomDataset(), batch_size=4, num_workers=num_workers, seed=seed
+        )
+        return np.concatenate([batch["random"].numpy() for batch in loader])
+
+    test_case.assertTrue(np.array_equal(_Load(1), _Load(1)))
+    test_case.assertFalse(np.array_equal(_Load(1), _Load(2)))
+
+
+@unittest.skipIf(
+    not flow.unittest.env.eager_execution_enabled(),
+    ".numpy() doesn't work in lazy mode",
+)
+class TestDataLoader(flow.unittest.TestCase):
+    def test_dataloader(test_case):
+        for num_workers, persistent_workers in [(0, False), (2, False), (3, True)]:
+            _test_dataloader(test_case, num_workers, persistent_workers)
+
+    def test_dataloader_seed(test_case):
+        for num_workers in [1, 3]:
+            _test_dataloader_seed(test_case, num_workers)
+
+    def test_shuffle(test_case):
+        dataset = flow.utils.data.TensorDataset(np.arange(20, dtype=np.int32))
+        loader = flow.utils.data.DataLoader(
+            dataset, batch_size=3, shuffle=True, drop_last=True, num_workers=2
+        )
+        ids = np.concatenate([batch[0].numpy() for batch in loader])
+        test_case.assertEqual(ids.size, 18)
+        test_case.assertEqual(np.unique(ids).size, 18)
+
+    def test_worker_error(test_case):
+        loader = flow.utils.data.DataLoader(
+            _FailedDataset(), batch_size=2, num_workers=2
+        )
+        with test_case.assertRaisesRegex(RuntimeError, "bad sample 5"):
+            list(loader)
+
+
+if __name__ == "__main__":
+    unittest.main()
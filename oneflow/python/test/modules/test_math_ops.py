@@ -35,6 +35,28 @@ class TestVariance(flow.unittest.TestCase):
         np_out = np.var(input_arr, 2, keepdims=False)
         test_case.assertTrue(np.allclose(of_out.numpy(), np_out, 1e-5, 1e-5))
 
+    def test_variance_unbiased(test_case):
+        input_arr = np.random.randn(3, 4, 5, 6)
+        of_out = flow.var(flow.Tensor(input_arr), (0, 2), True, unbiased=True)
+        np_out = np.var(input_arr, (0, 2), keepdims=True, ddof=1)
+        test_case.assertTrue(np.allclose(of_out.numpy(), np_out, 1e-5, 1e-5))
+
+    def test_variance_large_mean(test_case):
+        # mean(x^2) - mean(x)^2 cancels catastrophically in float32 here
+        input_arr = (np.random.randn(64, 1000) * 0.01 + 10000).astype(np.float32)
+        of_out = flow.var(flow.Tensor(input_arr), 1)
+        np_out = np.var(input_arr.astype(np.float64), 1)
+        test_case.assertTrue(np.allclose(of_out.numpy(), np_out, 1e-2, 1e-6))
+
+    def test_variance_backward(test_case):
+        input_arr = np.random.randn(2, 3, 4)
+        x = flow.Tensor(input_arr, requires_grad=True)
+        y = flow.var(x, (0, 2), unbiased=True).sum()
+        y.backward()
+        n = 2 * 4
+        np_grad = 2 * (input_arr - input_arr.mean(axis=(0, 2), keepdims=True)) / (n - 1)
+        test_case.assertTrue(np.allclose(x.grad.numpy(), np_grad, 1e-5, 1e-5))
+
 
 @unittest.skipIf(
     not flow.unittest.env.eager_execution_enabled(),
@@ -124,6 +146,13 @@ class TestStd(flow.unittest.TestCase):
         np_out = np.std(np_arr, axis=(-2, -1, -3))
         test_case.assertTrue(np.allclose(of_out.numpy(), np_out, 1e-5, 1e-5))
 
+    def test_std_unbiased(test_case):
+        np_arr = np.random.randn(4, 2, 3, 5)
+        input = flow.Tensor(np_arr)
+        of_out = flow.std(input, dim=(0, 3), unbiased=True, keepdim=True)
+        np_out = np.std(np_arr, axis=(0, 3), ddof=1, keepdims=True)
+        test_case.assertTrue(np.allclose(of_out.numpy(), np_out, 1e-5, 1e-5))
+
 
 @unittest.skipIf(
     not flow.unittest.env.eager_execution_enabled(),
@@ -0,0 +1,100 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+import oneflow.experimental as flow
+
+
+@unittest.skipIf(
+    not flow.unittest.env.eager_execution_enabled(),
+    ".numpy() doesn't work in lazy mode",
+)
+class TestOpExprCache(flow.unittest.TestCase):
+    def test_functional_api_reuses_ops(test_case):
+        flow.clear_op_expr_cache()
+        x = flow.Tensor(np.random.randn(2, 3))
+        y = flow.Tensor(np.random.randn(2, 3))
+        for _ in range(3):
+            of_out = flow.sub(x, y)
+            test_case.assertTrue(
+                np.allclose(of_out.numpy(), x.numpy() - y.numpy(), 1e-4, 1e-4)
+            )
+        stats = flow.op_expr_cache_stats()
+        test_case.assertGreater(stats["hits"], 0)
+        test_case.assertEqual(stats["size"], stats["misses"])
+        test_case.assertGreater(stats["hit_rate"], 0.5)
+
+    def test_different_attrs(test_case):
+        flow.clear_op_expr_cache()
+        x = flow.Tensor(np.random.randn(2, 3, 4))
+        for dim in [1, 2, 1, 2]:
+            of_out = flow.sum(x, dim=dim)
+            test_case.assertTrue(
+                np.allclose(of_out.numpy(), np.sum(x.numpy(), axis=dim), 1e-4, 1e-4)
+            )
+        # scalar operands are attributes, int and float operands are different ops
+        for operand in [2, 2.0, 3, 2]:
+            of_out = flow.mul(x, operand)
+            test_case.assertTrue(
+                np.allclose(of_out.numpy(), x.numpy() * operand, 1e-4, 1e-4)
+            )
+
+    def test_builtin_op(test_case):
+        flow.clear_op_expr_cache()
+        op_a = flow.builtin_op("relu").Input("in").Output("out").Build()
+        op_b = flow.builtin_op("relu").Input("in").Output("out").Build()
+        test_case.assertTrue(op_a is op_b)
+        # ops with explicit names are never shared
+        op_c = flow.builtin_op("relu", "my_relu").Input("in").Output("out").Build()
+        test_case.assertTrue(op_c is not op_a)
+        # stateful ops are never shared
+        dropout_a = (
+            flow.builtin_op("dropout")
+            .Input("in")
+            .Input("mask")
+            .Output("out")
+            .Attr("scale", 2.0)
+            .Build()
+        )
+        dropout_b = (
+            flow.builtin_op("dropout")
+            .Input("in")
+            .Input("mask")
+            .Output("out")
+            .Attr("scale", 2.0)
+            .Build()
+        )
+        test_case.assertTrue(dropout_a is not dropout_b)
+        stats = flow.op_expr_cache_stats()
+        test_case.assertEqual(stats["hits"], 1)
+        test_case.assertEqual(stats["uncacheable"], 3)
+
+    def test_init_once_kernels(test_case):
+        # the kernel of "constant" fills its output on the first run only, so
+        # the calls with the same attributes must not share the op
+        flow.clear_op_expr_cache()
+        for _ in range(2):
+            test_case.assertTrue(
+                np.array_equal(flow.ones((2, 3)).numpy(), np.ones((2, 3)))
+            )
+            test_case.assertTrue(
+                np.array_equal(flow.zeros((2, 3)).numpy(), np.zeros((2, 3)))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,7 +19,7 @@ from collections import OrderedDict
 import numpy as np
 import oneflow.experimental as flow
 
-from test_util import GenArgList
+from test_util import GenArgList, CompareForeachWithForLoopOptimizer
 from oneflow.python.nn.parameter import Parameter
 
 
@@ -33,6 +33,7 @@ def compare_with_numpy_adam(
     betas,
     weight_decay,
     eps,
+    foreach,
 ):
     # generate random number sequences
     random_grad_seq = []
@@ -53,7 +54,8 @@ def compare_with_numpy_adam(
                     "weight_decay": weight_decay,
                     "scale": scale,
                 }
-            ]
+            ],
+            foreach=foreach,
         )
 
         def train_one_iter(grad):
@@ -95,6 +97,24 @@ def compare_with_numpy_adam(
     )
 
 
+def compare_foreach_with_for_loop_adam(
+    test_case, device, scale, learning_rate, betas, weight_decay, eps, train_iters
+):
+    CompareForeachWithForLoopOptimizer(
+        test_case,
+        device,
+        flow.optim.Adam,
+        dict(
+            scale=scale,
+            lr=learning_rate,
+            betas=betas,
+            weight_decay=weight_decay,
+            eps=eps,
+        ),
+        train_iters,
+    )
+
+
 @unittest.skipIf(
     not flow.unittest.env.eager_execution_enabled(),
     ".numpy() doesn't work in lazy mode",
@@ -110,9 +130,22 @@ class TestAdam(flow.unittest.TestCase):
         arg_dict["betas"] = [(0.99, 0.9), (0.8, 0.7)]
         arg_dict["weight_decay"] = [0.0, 0.1]
         arg_dict["eps"] = [1e-8, 1e-7]
+        arg_dict["foreach"] = [False, True]
         for arg in GenArgList(arg_dict):
             compare_with_numpy_adam(test_case, *arg)
 
+    def test_adam_foreach_multi_params(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["scale"] = [1.0, 0.8]
+        arg_dict["learning_rate"] = [1]
+        arg_dict["betas"] = [(0.99, 0.9)]
+        arg_dict["weight_decay"] = [0.0, 0.1]
+        arg_dict["eps"] = [1e-8]
+        arg_dict["train_iters"] = [3]
+        for arg in GenArgList(arg_dict):
+            compare_foreach_with_for_loop_adam(test_case, *arg)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -18,12 +18,12 @@ from collections import OrderedDict
 
 import numpy as np
 import oneflow.experimental as flow
-from test_util import GenArgList
+from test_util import GenArgList, CompareForeachWithForLoopOptimizer
 from oneflow.python.nn.parameter import Parameter
 
 
 def compare_with_numpy_adamw(
-    test_case, device, x_shape, scale, learning_rate, train_iters, weight_decay
+    test_case, device, x_shape, scale, learning_rate, train_iters, weight_decay, foreach
 ):
     # generate random number sequences
     random_grad_seq = []
@@ -42,7 +42,8 @@ def compare_with_numpy_adamw(
                     "weight_decay": weight_decay,
                     "scale": scale,
                 }
-            ]
+            ],
+            foreach=foreach,
         )
 
         def train_one_iter(grad):
@@ -88,6 +89,18 @@ def compare_with_numpy_adamw(
     )
 
 
+def compare_foreach_with_for_loop_adamw(
+    test_case, device, scale, learning_rate, weight_decay, train_iters
+):
+    CompareForeachWithForLoopOptimizer(
+        test_case,
+        device,
+        flow.optim.AdamW,
+        dict(scale=scale, lr=learning_rate, weight_decay=weight_decay),
+        train_iters,
+    )
+
+
 @unittest.skipIf(
     not flow.unittest.env.eager_execution_enabled(),
     ".numpy() doesn't work in lazy mode",
@@ -101,9 +114,20 @@ class TestAdamW(flow.unittest.TestCase):
         arg_dict["learning_rate"] = [1]
         arg_dict["train_iters"] = [10]
         arg_dict["weight_decay"] = [1e-3, 0.0]
+        arg_dict["foreach"] = [False, True]
         for arg in GenArgList(arg_dict):
             compare_with_numpy_adamw(test_case, *arg)
 
+    def test_adamw_foreach_multi_params(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["scale"] = [1.0, 0.9]
+        arg_dict["learning_rate"] = [1]
+        arg_dict["weight_decay"] = [1e-3, 0.0]
+        arg_dict["train_iters"] = [3]
+        for arg in GenArgList(arg_dict):
+            compare_foreach_with_for_loop_adamw(test_case, *arg)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -18,7 +18,7 @@ from collections import OrderedDict
 
 import numpy as np
 import oneflow.experimental as flow
-from test_util import GenArgList
+from test_util import GenArgList, CompareForeachWithForLoopOptimizer
 from oneflow.python.nn.parameter import Parameter
 
 
@@ -34,6 +34,7 @@ def compare_with_numpy_rmsprop(
     eps,
     weight_decay,
     centered,
+    foreach,
 ):
     # generate random number sequences
     random_grad_seq = []
@@ -58,7 +59,8 @@ def compare_with_numpy_rmsprop(
                     "centered": centered,
                     "scale": scale,
                 }
-            ]
+            ],
+            foreach=foreach,
         )
 
         def train_one_iter(grad):
@@ -108,6 +110,33 @@ def compare_with_numpy_rmsprop(
     )
 
 
+def compare_foreach_with_for_loop_rmsprop(
+    test_case,
+    device,
+    scale,
+    learning_rate,
+    alpha,
+    eps,
+    weight_decay,
+    centered,
+    train_iters,
+):
+    CompareForeachWithForLoopOptimizer(
+        test_case,
+        device,
+        flow.optim.RMSprop,
+        dict(
+            scale=scale,
+            lr=learning_rate,
+            alpha=alpha,
+            eps=eps,
+            weight_decay=weight_decay,
+            centered=centered,
+        ),
+        train_iters,
+    )
+
+
 @unittest.skipIf(
     not flow.unittest.env.eager_execution_enabled(),
     ".numpy() doesn't work in lazy mode",
@@ -125,9 +154,23 @@ class TestRMSProp(flow.unittest.TestCase):
         arg_dict["eps"] = [1e-8, 1e-5]
         arg_dict["weight_decay"] = [0.1, 0.99]
         arg_dict["centered"] = [False, True]
+        arg_dict["foreach"] = [False, True]
         for arg in GenArgList(arg_dict):
             compare_with_numpy_rmsprop(test_case, *arg)
 
+    def test_rmsprop_foreach_multi_params(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["scale"] = [1.0, 0.9]
+        arg_dict["learning_rate"] = [1]
+        arg_dict["alpha"] = [0.9]
+        arg_dict["eps"] = [1e-8]
+        arg_dict["weight_decay"] = [0.1]
+        arg_dict["centered"] = [False, True]
+        arg_dict["train_iters"] = [3]
+        for arg in GenArgList(arg_dict):
+            compare_foreach_with_for_loop_rmsprop(test_case, *arg)
+
 
 if __name__ == "__main__":
     unittest.main()
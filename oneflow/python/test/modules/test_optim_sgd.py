@@ -19,12 +19,12 @@ from collections import OrderedDict
 
 import numpy as np
 import oneflow.experimental as flow
-from test_util import GenArgList
+from test_util import GenArgList, CompareForeachWithForLoopOptimizer
 from oneflow.python.nn.parameter import Parameter
 
 
 def compare_with_numpy_sgd(
-    test_case, device, x_shape, scale, momentum, learning_rate, train_iters,
+    test_case, device, x_shape, scale, momentum, learning_rate, train_iters, foreach,
 ):
     # generate random number sequences
     random_grad_seq = []
@@ -36,7 +36,15 @@ def compare_with_numpy_sgd(
     def train_by_oneflow():
         x = Parameter(flow.Tensor(init_value, device=flow.device(device)))
         sgd = flow.optim.SGD(
-            [{"params": [x], "lr": learning_rate, "momentum": momentum, "scale": scale}]
+            [
+                {
+                    "params": [x],
+                    "lr": learning_rate,
+                    "momentum": momentum,
+                    "scale": scale,
+                }
+            ],
+            foreach=foreach,
         )
 
         def train_one_iter(grad):
@@ -72,6 +80,18 @@ def compare_with_numpy_sgd(
     )
 
 
+def compare_foreach_with_for_loop_sgd(
+    test_case, device, scale, momentum, learning_rate, train_iters
+):
+    CompareForeachWithForLoopOptimizer(
+        test_case,
+        device,
+        flow.optim.SGD,
+        dict(scale=scale, momentum=momentum, lr=learning_rate),
+        train_iters,
+    )
+
+
 @unittest.skipIf(
     not flow.unittest.env.eager_execution_enabled(),
     ".numpy() doesn't work in lazy mode",
@@ -85,9 +105,20 @@ class TestOptimizers(flow.unittest.TestCase):
         arg_dict["momentum"] = [0.0, 0.9]
         arg_dict["learning_rate"] = [1]
         arg_dict["train_iters"] = [10]
+        arg_dict["foreach"] = [False, True]
         for arg in GenArgList(arg_dict):
             compare_with_numpy_sgd(test_case, *arg)
 
+    def test_sgd_foreach_multi_params(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["scale"] = [1.0, 0.9]
+        arg_dict["momentum"] = [0.0, 0.9]
+        arg_dict["learning_rate"] = [1]
+        arg_dict["train_iters"] = [3]
+        for arg in GenArgList(arg_dict):
+            compare_foreach_with_for_loop_sgd(test_case, *arg)
+
 
 if __name__ == "__main__":
     unittest.main()
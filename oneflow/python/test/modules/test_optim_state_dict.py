@@ -0,0 +1,118 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import oneflow.experimental as flow
+
+from test_util import GenArgList
+from oneflow.python.nn.parameter import Parameter
+
+OPTIMIZERS = {
+    "sgd": lambda params: flow.optim.SGD(params, lr=0.1, momentum=0.9),
+    "adam": lambda params: flow.optim.Adam(params, lr=0.1, betas=(0.8, 0.7)),
+    "adamw": lambda params: flow.optim.AdamW(params, lr=0.1, weight_decay=0.1),
+    "rmsprop": lambda params: flow.optim.RMSprop(params, lr=0.1, centered=True),
+}
+
+
+def _make_params(init_values, device):
+    return [
+        Parameter(flow.Tensor(value, device=flow.device(device)))
+        for value in init_values
+    ]
+
+
+def _train(params, optimizer, grads_seq, device):
+    for grads in grads_seq:
+        loss = None
+        for param, grad in zip(params, grads):
+            grad_tensor = flow.Tensor(
+                grad, requires_grad=False, device=flow.device(device)
+            )
+            param_loss = flow.sum(param * grad_tensor)
+            loss = param_loss if loss is None else loss + param_loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+
+
+def compare_resumed_training(test_case, optimizer_name, device, save_to_disk):
+    shapes = [(10,), (4, 5)]
+    init_values = [np.random.uniform(size=shape).astype(np.float32) for shape in shapes]
+    grads_seq = [
+        [np.random.uniform(size=shape).astype(np.float32) for shape in shapes]
+        for _ in range(6)
+    ]
+    make_optimizer = OPTIMIZERS[optimizer_name]
+
+    params = _make_params(init_values, device)
+    optimizer = make_optimizer(
+        [{"params": params[:1]}, {"params": params[1:], "lr": 0.05}]
+    )
+    _train(params, optimizer, grads_seq[:3], device)
+
+    resumed_params = _make_params([param.numpy() for param in params], device)
+    resumed_optimizer = make_optimizer(
+        [{"params": resumed_params[:1]}, {"params": resumed_params[1:]}]
+    )
+    if save_to_disk:
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save(optimizer.state_dict(), save_dir)
+            resumed_optimizer.load_state_dict(flow.load(save_dir))
+    else:
+        resumed_optimizer.load_state_dict(optimizer.state_dict())
+    test_case.assertEqual(resumed_optimizer._state["step"], 3)
+    test_case.assertEqual(resumed_optimizer._param_groups[1].options["lr"], 0.05)
+
+    _train(params, optimizer, grads_seq[3:], device)
+    _train(resumed_params, resumed_optimizer, grads_seq[3:], device)
+    for param, resumed_param in zip(params, resumed_params):
+        test_case.assertTrue(
+            np.allclose(param.numpy(), resumed_param.numpy(), rtol=1e-5, atol=1e-5)
+        )
+
+
+@unittest.skipIf(
+    not flow.unittest.env.eager_execution_enabled(),
+    ".numpy() doesn't work in lazy mode",
+)
+class TestOptimizerStateDict(flow.unittest.TestCase):
+    def test_resume_training(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["optimizer_name"] = list(OPTIMIZERS.keys())
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["save_to_disk"] = [False, True]
+        for arg in GenArgList(arg_dict):
+            compare_resumed_training(test_case, *arg)
+
+    def test_add_param_group(test_case):
+        x = Parameter(flow.Tensor(np.ones((3,), dtype=np.float32)))
+        y = Parameter(flow.Tensor(np.ones((3,), dtype=np.float32)))
+        adam = flow.optim.Adam([{"params": [x]}], lr=0.1)
+        adam.add_param_group({"params": [y], "lr": 0.01})
+        test_case.assertEqual(len(adam._param_groups), 2)
+        test_case.assertEqual(adam._param_groups[0].options["lr"], 0.1)
+        test_case.assertEqual(adam._param_groups[1].options["lr"], 0.01)
+        test_case.assertEqual(set(adam._state[y].keys()), {"exp_avg", "exp_avg_sq"})
+        with test_case.assertRaises(AssertionError):
+            adam.add_param_group({"params": [x]})
+
+
+if __name__ == "__main__":
+    unittest.main()
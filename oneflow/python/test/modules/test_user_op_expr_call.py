@@ -0,0 +1,59 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+import oneflow.experimental as flow
+import oneflow.python.framework.op_expr_util as op_expr_util
+
+
+@unittest.skipIf(
+    not flow.unittest.env.eager_execution_enabled(),
+    ".numpy() doesn't work in lazy mode",
+)
+class TestUserOpExprCall(flow.unittest.TestCase):
+    def test_call_attrs(test_case):
+        op_expr_util._op_type_name2call_plan.pop("transpose", None)
+        op = (
+            flow.builtin_op("transpose")
+            .Input("input")
+            .Output("output")
+            .Attr("perm", [])
+            .Build()
+        )
+        x = flow.Tensor(np.random.randn(2, 3, 4))
+        # the attr maps of repeated values are reused, list and tuple alike
+        for perm in [(0, 2, 1), [0, 2, 1], (2, 1, 0), (0, 2, 1), [2, 1, 0]]:
+            of_out = op(x, perm=perm)[0]
+            test_case.assertTrue(
+                np.array_equal(of_out.numpy(), np.transpose(x.numpy(), perm))
+            )
+        plan = op_expr_util._GetUserOpCallPlan("transpose")
+        test_case.assertEqual(len(plan.key2attr_map_), 4)
+        test_case.assertEqual(list(plan.attr_name2attr_type_.keys()), ["perm"])
+
+    def test_call_without_attrs(test_case):
+        op = flow.builtin_op("relu").Input("in").Output("out").Build()
+        x = flow.Tensor(np.random.randn(2, 3))
+        for _ in range(2):
+            of_out = op(x)[0]
+            test_case.assertTrue(
+                np.array_equal(of_out.numpy(), np.maximum(x.numpy(), 0))
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,7 @@ from collections.abc import Iterable
 
 import numpy as np
 import oneflow as flow
+from oneflow.python.nn.parameter import Parameter
 
 
 def GenCartesianProduct(sets):
@@ -43,6 +44,66 @@ def GenArgDict(arg_dict):
     return [dict(zip(arg_dict.keys(), x)) for x in GenArgList(arg_dict)]
 
 
+def CompareForeachWithForLoopOptimizer(
+    test_case, device, optimizer_class, param_group_options, train_iters
+):
+    # every bucket of the foreach update holds several parameters of different
+    # shapes and dtypes, the for loop update is the reference
+    shapes = [(10,), (4, 3), (2, 3, 5), (7,)]
+    dtypes = [
+        (np.float32, flow.float32),
+        (np.float64, flow.float64),
+        (np.float32, flow.float32),
+        (np.float64, flow.float64),
+    ]
+    init_values = [
+        np.random.uniform(size=shape).astype(np_dtype)
+        for shape, (np_dtype, _) in zip(shapes, dtypes)
+    ]
+    random_grad_seq = []
+    for _ in range(train_iters):
+        random_grad_seq.append(
+            [
+                np.random.uniform(size=shape).astype(np_dtype)
+                for shape, (np_dtype, _) in zip(shapes, dtypes)
+            ]
+        )
+
+    def train_by_oneflow(foreach):
+        params = [
+            Parameter(
+                flow.experimental.Tensor(
+                    init_value, device=flow.experimental.device(device), dtype=dtype
+                )
+            )
+            for init_value, (_, dtype) in zip(init_values, dtypes)
+        ]
+        param_group = dict(param_group_options, params=params)
+        optimizer = optimizer_class([param_group], foreach=foreach)
+
+        def train_one_iter(grads):
+            for param, grad, (_, dtype) in zip(params, grads, dtypes):
+                grad_tensor = flow.experimental.Tensor(
+                    grad,
+                    requires_grad=False,
+                    device=flow.experimental.device(device),
+                    dtype=dtype,
+                )
+                flow.experimental.sum(param * grad_tensor).backward()
+            optimizer.step()
+            optimizer.zero_grad()
+
+        for i in range(train_iters):
+            train_one_iter(random_grad_seq[i])
+        return [param.numpy() for param in params]
+
+    foreach_res = train_by_oneflow(True)
+    for_loop_res = train_by_oneflow(False)
+    for x, y, (np_dtype, _) in zip(foreach_res, for_loop_res, dtypes):
+        test_case.assertEqual(x.dtype, np_dtype)
+        test_case.assertTrue(np.allclose(x, y, rtol=1e-5, atol=1e-5))
+
+
 class Args:
     def __init__(self, flow_args, tf_args=None):
         super().__init__()
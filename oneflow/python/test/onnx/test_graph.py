@@ -0,0 +1,116 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+from onnx import TensorProto
+
+from oneflow.python.onnx import optimizer
+from oneflow.python.onnx.graph import Graph
+
+
+def _MakeNode(g, op_type, inputs, output):
+    return g.MakeNode(
+        op_type,
+        inputs,
+        outputs=[output],
+        name=output,
+        shapes=[[2, 3]],
+        dtypes=[TensorProto.FLOAT],
+    )
+
+
+def _ScanOutputConsumers(g, output_name):
+    return [n for n in g.get_nodes() if output_name in n.input_tensor_names]
+
+
+class TestGraph(unittest.TestCase):
+    def test_find_output_consumers(self):
+        g = Graph([], None, output_shapes={}, dtypes={})
+        x = _MakeNode(g, "Relu", [], "x")
+        y = _MakeNode(g, "Relu", ["x"], "y")
+        z = _MakeNode(g, "Add", ["x", "x"], "z")
+        self.assertEqual(g.FindOutputConsumers("x"), [y, z])
+
+        z.input_tensor_names[1] = "y"
+        self.assertEqual(g.FindOutputConsumers("x"), [y, z])
+        self.assertEqual(g.FindOutputConsumers("y"), [z])
+        z.input_tensor_names[0] = "y"
+        self.assertEqual(g.FindOutputConsumers("x"), [y])
+        del z.input_tensor_names[0]
+        z.input_tensor_names.append("x")
+        self.assertEqual(set(g.FindOutputConsumers("x")), {y, z})
+        Graph.ReplaceAllInputs(g.get_nodes(), "x", "w")
+        self.assertEqual(g.FindOutputConsumers("x"), [])
+        self.assertEqual(set(g.FindOutputConsumers("w")), {y, z})
+        y.input_tensor_names = ["x"]
+        self.assertEqual(g.FindOutputConsumers("x"), [y])
+
+        g.RemoveNode(z.name)
+        self.assertEqual(g.FindOutputConsumers("y"), [])
+        self.assertEqual(g.get_nodes(), [x, y])
+        for name in ["w", "x", "y", "z"]:
+            self.assertEqual(
+                set(g.FindOutputConsumers(name)), set(_ScanOutputConsumers(g, name))
+            )
+
+    def test_topological_sort(self):
+        g = Graph([], None, output_shapes={}, dtypes={})
+        _MakeNode(g, "Relu", ["b"], "c")
+        _MakeNode(g, "Add", ["a", "c"], "d")
+        _MakeNode(g, "Relu", ["a"], "b")
+        _MakeNode(g, "Relu", [], "a")
+        g.TopologicalSort(g.get_nodes())
+        self.assertEqual([n.name for n in g.get_nodes()], ["a", "b", "c", "d"])
+        self.assertEqual([n.name for n in g.FindOutputConsumers("a")], ["b", "d"])
+
+    def test_topological_sort_with_cycle(self):
+        g = Graph([], None, output_shapes={}, dtypes={})
+        _MakeNode(g, "Relu", ["q"], "p")
+        _MakeNode(g, "Relu", ["p"], "q")
+        with self.assertRaises(ValueError):
+            g.TopologicalSort(g.get_nodes())
+
+    def test_pop_changed_nodes(self):
+        g = Graph([], None, output_shapes={}, dtypes={})
+        x = _MakeNode(g, "Relu", [], "x")
+        w = _MakeNode(g, "Relu", [], "w")
+        y = _MakeNode(g, "Relu", ["x"], "y")
+        z = _MakeNode(g, "Relu", ["y"], "z")
+        self.assertEqual(g.PopChangedNodes(), [x, w, y, z])
+        self.assertEqual(g.PopChangedNodes(), [])
+
+        y.input_tensor_names[0] = "w"
+        self.assertEqual(set(g.PopChangedNodes()), {x, w, y, z})
+        g.RemoveNode(z.name)
+        self.assertEqual(g.PopChangedNodes(), [y])
+
+    def test_optimize_graph(self):
+        g = Graph([], None, output_shapes={}, dtypes={})
+        _MakeNode(g, "input", [], "x")
+        _MakeNode(g, "Identity", ["x"], "y")
+        _MakeNode(g, "Identity", ["y"], "z")
+        _MakeNode(g, "Relu", ["x"], "unused")
+        out = _MakeNode(g, "Relu", ["z"], "out")
+        g.AddGraphOutput("out")
+        g = optimizer.OptimizeGraph(g)
+        self.assertEqual(
+            sorted(n.op_type for n in g.get_nodes()), ["Relu", "input"],
+        )
+        self.assertEqual(g.get_node_by_name("out").input_tensor_names, ["x"])
+
+
+if __name__ == "__main__":
+    unittest.main()
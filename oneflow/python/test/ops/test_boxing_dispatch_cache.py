@@ -0,0 +1,72 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.typing as oft
+
+
+def _make_split_to_broadcast_job():
+    func_config = flow.FunctionConfig()
+    func_config.default_data_type(flow.float)
+    func_config.default_logical_view(flow.scope.consistent_view())
+
+    @flow.global_function(function_config=func_config)
+    def split_to_broadcast_job(x: oft.Numpy.Placeholder((16, 8))):
+        with flow.scope.placement("gpu", "0:0-1"):
+            src = flow.identity(x.with_distribute(flow.distribute.split(0)))
+        with flow.scope.placement("cpu", "0:0"):
+            dst = flow.identity(src.with_distribute(flow.distribute.broadcast()))
+        return dst
+
+    return split_to_broadcast_job
+
+
+def _run_split_to_broadcast(x, cache_enabled):
+    flow.clear_default_session()
+    flow.config.gpu_device_num(2)
+    flow.experimental.enable_boxing_dispatch_cache(cache_enabled)
+    job = _make_split_to_broadcast_job()
+    results = [job(x).get().numpy() for _ in range(3)]
+    return results, flow.experimental.boxing_dispatch_cache_stats()
+
+
+@flow.unittest.skip_unless_1n2d()
+@unittest.skipIf(
+    not flow.unittest.env.eager_execution_enabled(),
+    "boxing dispatch cache is only used in eager mode",
+)
+class TestBoxingDispatchCache(flow.unittest.TestCase):
+    def test_cache_hit(test_case):
+        x = np.random.rand(16, 8).astype(np.float32)
+        cached_results, stats = _run_split_to_broadcast(x, True)
+        test_case.assertTrue(stats["enabled"])
+        test_case.assertGreater(stats["size"], 0)
+        test_case.assertGreater(stats["hit"], 0)
+        for result in cached_results:
+            test_case.assertTrue(np.array_equal(result, x))
+
+        uncached_results, stats = _run_split_to_broadcast(x, False)
+        test_case.assertFalse(stats["enabled"])
+        test_case.assertEqual(stats["hit"], 0)
+        for cached, uncached in zip(cached_results, uncached_results):
+            test_case.assertTrue(np.array_equal(cached, uncached))
+        flow.experimental.enable_boxing_dispatch_cache(True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ limitations under the License.
 """
 import unittest
 import os
+import re
 import shutil
 import tempfile
 
@@ -194,6 +195,202 @@ def _TestRoundTrip(test_case, model_getter, dtype):
         test_case.assertTrue(np.array_equal(res1, res2))
 
 
+def _TestParallelIO(test_case, model_getter, dtype):
+    """
+    Save and load weights with multiple io threads, check the equality
+    and the reported io statistics.
+    """
+    with tempfile.TemporaryDirectory() as save_dir:
+        refresh_session()
+
+        large1 = get_checkpoint_ready_model(model_getter, dtype)
+
+        flow.checkpoint.save(save_dir, io_thread_num=4)
+        save_stats = flow.checkpoint.get_last_io_stats()
+        all_vars = flow.get_all_variables()
+        test_case.assertEqual(
+            sorted([stat.name for stat in save_stats]), sorted(all_vars.keys())
+        )
+        for stat in save_stats:
+            test_case.assertEqual(stat.nbytes, all_vars[stat.name].numpy().nbytes)
+        res1 = large1()
+
+        refresh_session()
+
+        large2 = get_checkpoint_ready_model(model_getter, dtype)
+
+        vars_in_file = flow.checkpoint.get(save_dir)
+        for name, var in vars_in_file.items():
+            test_case.assertTrue(
+                np.array_equal(var.memmap().reshape(var.shape), var.numpy())
+            )
+        flow.load_variables(vars_in_file, io_thread_num=2)
+        load_stats = flow.checkpoint.get_last_io_stats()
+        test_case.assertEqual(
+            sorted([stat.name for stat in load_stats]), sorted(vars_in_file.keys())
+        )
+        res2 = large2()
+
+        test_case.assertTrue(np.array_equal(res1, res2))
+
+
+def _TestPackedRoundTrip(test_case, model_getter, dtype):
+    """
+    Save weights into a packed file, convert it between the packed and
+    the directory format, load weights from each of them and check the equality.
+    """
+    with tempfile.TemporaryDirectory() as save_dir:
+        packed_path = os.path.join(save_dir, "packed")
+        unpacked_dir = os.path.join(save_dir, "unpacked")
+        repacked_path = os.path.join(save_dir, "repacked")
+        refresh_session()
+
+        large1 = get_checkpoint_ready_model(model_getter, dtype)
+
+        flow.checkpoint.save(packed_path, packed=True)
+        test_case.assertTrue(os.path.isfile(packed_path))
+        res1 = large1()
+
+        flow.checkpoint.unpack(packed_path, unpacked_dir)
+        flow.checkpoint.pack(unpacked_dir, repacked_path)
+
+        for path in [packed_path, unpacked_dir, repacked_path]:
+            refresh_session()
+
+            large2 = get_checkpoint_ready_model(model_getter, dtype)
+
+            flow.load_variables(flow.checkpoint.get(path))
+            res2 = large2()
+
+            test_case.assertTrue(np.array_equal(res1, res2))
+
+
+def _TestPartiallyLoadByPattern(test_case, dtype):
+    """
+    Load only the variables matching the given patterns from a checkpoint
+    and check that the others are untouched.
+    """
+    with tempfile.TemporaryDirectory() as save_dir:
+        refresh_session()
+
+        get_checkpoint_ready_model(get_simple_model, dtype)
+        flow.checkpoint.save(save_dir)
+        saved_vars = {k: v.numpy() for k, v in flow.get_all_variables().items()}
+
+        for patterns, loaded_names in [
+            (["x"], ["x"]),
+            (["[xy]"], ["x", "y"]),
+            ([re.compile("x|z")], ["x", "z"]),
+        ]:
+            refresh_session()
+
+            get_checkpoint_ready_model(get_simple_model, dtype)
+            vars_before_loading = {
+                k: v.numpy() for k, v in flow.get_all_variables().items()
+            }
+            vars_in_file = flow.checkpoint.get(save_dir)
+            test_case.assertEqual(sorted(vars_in_file.keys()), ["x", "y", "z"])
+            flow.load_variables(vars_in_file, name_patterns=patterns)
+            for name, var in flow.get_all_variables().items():
+                if name in loaded_names:
+                    expected = saved_vars[name]
+                else:
+                    expected = vars_before_loading[name]
+                test_case.assertTrue(np.array_equal(var.numpy(), expected))
+
+
+def _TestAsyncSave(test_case):
+    """
+    Save weights in background while training continues, check that the
+    saved weights are the ones at the time of saving.
+    """
+    with tempfile.TemporaryDirectory() as save_dir:
+        refresh_session()
+        model = get_checkpoint_ready_model(
+            get_simple_momentum_training_model, flow.float32
+        )
+        model()
+        w1 = flow.get_all_variables()["w"].numpy()
+        saver = flow.checkpoint.AsyncSaver(max_inflight_snapshots=2)
+        paths = [os.path.join(save_dir, str(i)) for i in range(3)]
+        futures = []
+        for path in paths:
+            futures.append(saver.save(path))
+            model()
+        saver.close()
+        for future in futures:
+            test_case.assertTrue(future.done())
+        for path in paths:
+            test_case.assertTrue(os.path.isfile(os.path.join(path, "snapshot_done")))
+            test_case.assertFalse(os.path.exists(path + ".tmp"))
+        test_case.assertTrue(
+            np.array_equal(flow.checkpoint.get(paths[0])["w"].numpy(), w1)
+        )
+
+
+def _TestAsyncSaveInt8(test_case):
+    """
+    Save an int8 variable in background and load it, the saved dtype is the
+    one of the variable rather than one worked out from the host copy.
+    """
+
+    def get_int8_model():
+        @flow.global_function()
+        def model() -> tp.Numpy:
+            with get_placement():
+                x = flow.get_variable(
+                    name="x",
+                    shape=(4, 5),
+                    dtype=flow.int8,
+                    initializer=flow.constant_initializer(3, dtype=flow.int8),
+                )
+                return flow.identity(x)
+
+        return model
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        refresh_session()
+        model = get_checkpoint_ready_model(lambda _: get_int8_model(), flow.int8)
+        res1 = model()
+        path = os.path.join(save_dir, "int8")
+        saver = flow.checkpoint.AsyncSaver()
+        saver.save(path)
+        saver.close()
+        vars_in_file = flow.checkpoint.get(path)
+        test_case.assertEqual(vars_in_file["x"].dtype, flow.int8)
+
+        refresh_session()
+        model = get_checkpoint_ready_model(lambda _: get_int8_model(), flow.int8)
+        flow.load_variables(vars_in_file)
+        test_case.assertTrue(np.array_equal(model(), res1))
+
+
+def _TestLoadWithNonVariableDirectory(test_case, dtype):
+    """
+    Sub-directories of a checkpoint without a data file are not variables,
+    so they are neither listed nor loaded.
+    """
+    with tempfile.TemporaryDirectory() as save_dir:
+        refresh_session()
+
+        get_checkpoint_ready_model(get_simple_model, dtype)
+        flow.checkpoint.save(save_dir)
+        saved_vars = {k: v.numpy() for k, v in flow.get_all_variables().items()}
+        os.makedirs(os.path.join(save_dir, "not_a_variable"))
+
+        refresh_session()
+
+        get_checkpoint_ready_model(get_simple_model, dtype)
+        vars_in_file = flow.checkpoint.get(save_dir)
+        test_case.assertEqual(sorted(vars_in_file.keys()), ["x", "y", "z"])
+        test_case.assertEqual(len(vars_in_file), 3)
+        test_case.assertNotIn("not_a_variable", vars_in_file)
+        test_case.assertEqual(sorted(vars_in_file.copy().keys()), ["x", "y", "z"])
+        flow.load_variables(vars_in_file)
+        for name, var in flow.get_all_variables().items():
+            test_case.assertTrue(np.array_equal(var.numpy(), saved_vars[name]))
+
+
 def _TestLoadCorrectness(test_case, model_getter, dtype, legacy_api):
     """
     Save weights by legacy model io, load weights by new model io,
@@ -403,6 +600,22 @@ class TestCheckpoint(flow.unittest.TestCase):
     def test_round_trip(test_case):
         _TestRoundTrip(test_case, get_large_model, flow.float)
 
+    @flow.unittest.skip_unless_1n4d()
+    def test_parallel_io(test_case):
+        _TestParallelIO(test_case, get_add_and_reduce_mean_model, flow.float)
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_packed_round_trip(test_case):
+        _TestPackedRoundTrip(test_case, get_add_and_reduce_mean_model, flow.float)
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_partially_load_by_pattern(test_case):
+        _TestPartiallyLoadByPattern(test_case, flow.float)
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_load_with_non_variable_directory(test_case):
+        _TestLoadWithNonVariableDirectory(test_case, flow.float)
+
     @flow.unittest.skip_unless_1n4d()
     def test_partially_load_numpy(test_case):
         _TestPartiallyLoadNumpy(test_case, flow.float)
@@ -411,6 +624,14 @@ class TestCheckpoint(flow.unittest.TestCase):
     def test_mixed_model(test_case):
         _TestMixedModel(test_case, flow.float)
 
+    @flow.unittest.skip_unless_1n2d()
+    def test_async_save(test_case):
+        _TestAsyncSave(test_case)
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_async_save_int8(test_case):
+        _TestAsyncSaveInt8(test_case)
+
     @flow.unittest.skip_unless_1n2d()
     def test_resume_training(test_case):
         _TestResumeTraining(test_case)
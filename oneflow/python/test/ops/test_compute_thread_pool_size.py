@@ -0,0 +1,87 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.typing as oft
+
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def _layer_norm(x, epsilon):
+    mean = np.mean(x, axis=-1, keepdims=True)
+    variance = np.var(x, axis=-1, keepdims=True)
+    return (x - mean) / np.sqrt(variance + epsilon)
+
+
+def _run_cpu_ops(x, thread_num):
+    flow.clear_default_session()
+    flow.config.compute_thread_pool_size(thread_num)
+    func_config = flow.FunctionConfig()
+    func_config.default_data_type(flow.float)
+
+    @flow.global_function(function_config=func_config)
+    def CpuOpsJob(x: oft.Numpy.Placeholder(x.shape)):
+        with flow.scope.placement("cpu", "0:0"):
+            return (
+                flow.math.reduce_sum(x),
+                flow.math.reduce_sum(x, axis=2, keepdims=True),
+                flow.math.reduce_sum(x, axis=[0, 1], keepdims=True),
+                flow.math.reduce_max(x, axis=1, keepdims=True),
+                flow.math.reduce_sum(x, axis=[0, 2], keepdims=True),
+                flow.math.exp(x),
+                x + flow.math.reduce_mean(x, axis=0, keepdims=True),
+                flow.nn.softmax(x),
+                flow.nn.layer_norm(x, begin_norm_axis=-1, begin_params_axis=-1),
+            )
+
+    return [out.numpy() for out in CpuOpsJob(x).get()]
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestComputeThreadPoolSize(flow.unittest.TestCase):
+    def test_cpu_ops_with_thread_pool_sizes(test_case):
+        x = np.random.uniform(low=-1, high=1, size=(16, 300, 40)).astype(np.float32)
+        expected = [
+            np.sum(x),
+            np.sum(x, axis=2, keepdims=True),
+            np.sum(x, axis=(0, 1), keepdims=True),
+            np.max(x, axis=1, keepdims=True),
+            np.sum(x, axis=(0, 2), keepdims=True),
+            np.exp(x),
+            x + np.mean(x, axis=0, keepdims=True),
+            _softmax(x),
+            _layer_norm(x, 1e-5),
+        ]
+        results = [_run_cpu_ops(x, thread_num) for thread_num in [1, 4]]
+        for outs in results:
+            for out, expected_out in zip(outs, expected):
+                test_case.assertTrue(
+                    np.allclose(
+                        out.reshape(expected_out.shape), expected_out, 1e-4, 1e-4
+                    )
+                )
+        # the reductions are split independently of the number of threads
+        for out_1, out_4 in zip(*results):
+            test_case.assertTrue(np.array_equal(out_1, out_4))
+
+
+if __name__ == "__main__":
+    unittest.main()
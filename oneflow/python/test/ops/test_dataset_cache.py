@@ -0,0 +1,94 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.python.experimental.dataset_cache as dataset_cache
+
+
+class TestDatasetCache(flow.unittest.TestCase):
+    def test_load_cached_npz(test_case):
+        x = np.random.randint(0, 256, (10, 4, 4)).astype(np.uint8)
+        y = np.arange(10)
+        with tempfile.TemporaryDirectory() as data_dir:
+            npz_path = os.path.join(data_dir, "data.npz")
+            np.savez_compressed(npz_path, x=x, y=y)
+            sha256 = dataset_cache.get_sha256hash(npz_path)
+            for _ in range(2):
+                arrays = flow.data.load_cached_dataset(npz_path, sha256=sha256)
+                test_case.assertEqual(sorted(arrays.keys()), ["x", "y"])
+                test_case.assertTrue(isinstance(arrays["x"], np.memmap))
+                test_case.assertTrue(np.array_equal(arrays["x"], x))
+                test_case.assertTrue(np.array_equal(arrays["y"], y))
+            test_case.assertTrue(os.path.isfile(npz_path + ".sha256"))
+            with test_case.assertRaises(Exception):
+                flow.data.load_cached_dataset(npz_path, sha256="0" * 64)
+
+            # a changed npz file is verified and decoded again
+            np.savez(npz_path, x=x[:5], y=y[:5])
+            with test_case.assertRaises(Exception):
+                flow.data.load_cached_dataset(npz_path, sha256=sha256)
+            arrays = flow.data.load_cached_dataset(npz_path)
+            test_case.assertTrue(np.array_equal(arrays["x"], x[:5]))
+
+    def test_unwritable_cache(test_case):
+        x = np.arange(12).reshape(3, 4)
+        with tempfile.TemporaryDirectory() as data_dir:
+            npz_path = os.path.join(data_dir, "data.npz")
+            np.savez(npz_path, x=x)
+            sha256 = dataset_cache.get_sha256hash(npz_path)
+            # neither the sidecar file nor the cache directory can be written
+            os.mkdir(npz_path + ".sha256")
+            cache_dir = os.path.join(npz_path, "cache")
+            for _ in range(2):
+                arrays = flow.data.load_cached_dataset(
+                    npz_path, sha256=sha256, cache_dir=cache_dir
+                )
+                test_case.assertFalse(isinstance(arrays["x"], np.memmap))
+                test_case.assertTrue(np.array_equal(arrays["x"], x))
+            with test_case.assertRaises(Exception):
+                flow.data.load_cached_dataset(npz_path, sha256="0" * 64)
+            test_case.assertEqual(
+                sorted(os.listdir(data_dir)), ["data.npz", "data.npz.sha256"]
+            )
+
+    def test_load_cached_npy(test_case):
+        x = np.random.rand(6, 3).astype(np.float32)
+        with tempfile.TemporaryDirectory() as data_dir:
+            npy_path = os.path.join(data_dir, "features.npy")
+            np.save(npy_path, x)
+            arrays = flow.data.load_cached_dataset(npy_path)
+            test_case.assertTrue(isinstance(arrays["features"], np.memmap))
+            test_case.assertTrue(np.array_equal(arrays["features"], x))
+
+    def test_array_batches(test_case):
+        x = np.arange(10)
+        batches = flow.data.ArrayBatches(x, 4, transform=lambda b: b * 2)
+        test_case.assertEqual(len(batches), 3)
+        test_case.assertEqual(batches[-1].tolist(), [16, 18])
+        test_case.assertTrue(np.array_equal(np.concatenate(list(batches)), x * 2))
+        batches = flow.data.ArrayBatches(x, 4, drop_last=True)
+        test_case.assertEqual(len(batches), 2)
+        test_case.assertEqual(batches[-1].tolist(), [4, 5, 6, 7])
+        with test_case.assertRaises(IndexError):
+            batches[2]
+
+
+if __name__ == "__main__":
+    unittest.main()
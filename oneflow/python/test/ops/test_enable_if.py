@@ -0,0 +1,126 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import collections
+import unittest
+
+import oneflow as flow
+import oneflow.python.lib.core.enable_if as enable_if
+import oneflow.python.lib.core.high_order_bool as high_order_bool
+
+_Context = collections.namedtuple("_Context", ["x", "y"])
+
+_attr_calls = collections.Counter()
+
+
+@high_order_bool.hob_context_attr("x")
+def _x(ctx):
+    _attr_calls["x"] += 1
+    return ctx.x
+
+
+@high_order_bool.hob_context_attr("y")
+def _y(ctx):
+    _attr_calls["y"] += 1
+    return ctx.y
+
+
+@high_order_bool.bool_functor("x is even")
+def _x_is_even(ctx):
+    _attr_calls["x is even"] += 1
+    return ctx.x % 2 == 0
+
+
+@enable_if.condition(_x_is_even & (_x < 10))
+def _SmallEven(ctx):
+    return "small even"
+
+
+@enable_if.condition(_x_is_even & (_x >= 10))
+def _LargeEven(ctx):
+    return "large even"
+
+
+@enable_if.condition(~_x_is_even & (_x == _y))
+def _OddEqual(ctx):
+    return "odd equal"
+
+
+@enable_if.condition(_y > 0)
+def _PositiveY(ctx):
+    return "positive y"
+
+
+def _FailedInfo(unique_func, *args):
+    try:
+        unique_func(*args)
+    except NotImplementedError as e:
+        return str(e)
+    raise AssertionError("{} didn't fail".format(unique_func))
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestEnableIf(flow.unittest.TestCase):
+    def test_compile_unique_matches_unique(test_case):
+        candidates = [_SmallEven, _LargeEven, _OddEqual]
+        compiled = enable_if.compile_unique(candidates)
+        for ctx, expected in [
+            (_Context(2, 0), "small even"),
+            (_Context(12, 0), "large even"),
+            (_Context(3, 3), "odd equal"),
+        ]:
+            test_case.assertIs(
+                compiled(context=ctx), enable_if.unique(candidates, context=ctx)
+            )
+            test_case.assertEqual(compiled(context=ctx)(ctx), expected)
+
+    def test_compile_unique_evaluates_shared_conditions_once(test_case):
+        compiled = enable_if.compile_unique([_SmallEven, _LargeEven, _OddEqual])
+        _attr_calls.clear()
+        compiled(context=_Context(12, 0))
+        test_case.assertEqual(_attr_calls["x is even"], 1)
+        test_case.assertEqual(_attr_calls["x"], 1)
+        _attr_calls.clear()
+        enable_if.unique([_SmallEven, _LargeEven, _OddEqual], context=_Context(12, 0))
+        test_case.assertEqual(_attr_calls["x is even"], 3)
+
+    def test_compile_unique_no_match(test_case):
+        candidates = [_SmallEven, _LargeEven, _OddEqual]
+        compiled = enable_if.compile_unique(candidates)
+        ctx = _Context(3, 4)
+        compiled_info = _FailedInfo(compiled(context=ctx), ctx)
+        test_case.assertIn("no avaliable function found", compiled_info)
+        test_case.assertEqual(
+            compiled_info, _FailedInfo(enable_if.unique(candidates, context=ctx), ctx)
+        )
+        default_results = []
+        compiled(
+            context=ctx, default=lambda get_failed_info: default_results.append(1)
+        )()
+        test_case.assertEqual(default_results, [1])
+
+    def test_compile_unique_multi_match(test_case):
+        candidates = [_SmallEven, _LargeEven, _PositiveY]
+        compiled = enable_if.compile_unique(candidates)
+        ctx = _Context(2, 1)
+        compiled_info = _FailedInfo(compiled(context=ctx), ctx)
+        test_case.assertIn("at least two conditional functions matched", compiled_info)
+        test_case.assertEqual(
+            compiled_info, _FailedInfo(enable_if.unique(candidates, context=ctx), ctx)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
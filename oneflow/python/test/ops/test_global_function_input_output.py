@@ -242,6 +242,101 @@ class TestGlobalFunctionInputOutput(flow.unittest.TestCase):
     def test_input_ndarray_contiguous(test_case):
         _test_input_ndarray_contiguous(test_case, (10, 20, 30))
 
+    def test_lazy_multi_input_output_pipelined(test_case):
+        flow.clear_default_session()
+        flow.enable_eager_execution(False)
+
+        @flow.global_function()
+        def foo_job(
+            x_def: oft.Numpy.Placeholder(shape=(2, 5)),
+            y_def: oft.Numpy.Placeholder(shape=(2, 5)),
+        ):
+            return x_def + y_def, x_def * y_def
+
+        inputs = [
+            (
+                np.random.rand(2, 5).astype(np.single),
+                np.random.rand(2, 5).astype(np.single),
+            )
+            for _ in range(4)
+        ]
+        expected = [(x + y, x * y) for x, y in inputs]
+        # launch all calls before fetching any result, and modify the inputs
+        # right after every call, which must not affect the pushed values
+        futures = []
+        for x, y in inputs:
+            futures.append(foo_job(x, y))
+            x.fill(0)
+            y.fill(0)
+        for future, (expected_sum, expected_prod) in zip(futures, expected):
+            out_sum, out_prod = future.get()
+            test_case.assertTrue(np.allclose(out_sum.numpy(), expected_sum))
+            test_case.assertTrue(np.allclose(out_prod.numpy(), expected_prod))
+
+    def test_lazy_input_buffers(test_case):
+        flow.clear_default_session()
+        flow.enable_eager_execution(False)
+
+        @flow.global_function()
+        def foo_job(
+            x_def: oft.Numpy.Placeholder(shape=(2, 5)),
+            y_def: oft.Numpy.Placeholder(shape=(2, 5), dtype=flow.int32),
+        ):
+            return x_def + flow.cast(y_def, flow.float)
+
+        x_buf, y_buf = flow.make_input_buffers(foo_job)
+        test_case.assertEqual(x_buf.shape, (2, 5))
+        test_case.assertEqual(x_buf.dtype, np.float32)
+        test_case.assertEqual(y_buf.dtype, np.int32)
+        for i in range(3):
+            x_buf.wait_pushed()
+            y_buf.wait_pushed()
+            x = np.random.rand(2, 5).astype(np.single)
+            y = np.full((2, 5), i, dtype=np.int32)
+            x_buf[...] = x
+            y_buf[...] = y
+            ret = foo_job(x_buf, y_buf).get()
+            test_case.assertTrue(np.allclose(ret.numpy(), x + y))
+        test_case.assertTrue(x_buf.wait_pushed(timeout=10))
+        # views of a buffer are not registered and are copied as usual
+        test_case.assertFalse(x_buf[:1].is_registered)
+
+    def test_lazy_input_buffers_with_invalid_argument(test_case):
+        flow.clear_default_session()
+        flow.enable_eager_execution(False)
+
+        @flow.global_function()
+        def foo_job(
+            x_def: oft.Numpy.Placeholder(shape=(2, 5)),
+            y_def: oft.Numpy.Placeholder(shape=(2, 5)),
+        ):
+            return x_def + y_def
+
+        x_buf, _ = flow.make_input_buffers(foo_job)
+        x_buf[...] = np.random.rand(2, 5)
+        y = np.random.rand(3, 5).astype(np.single)
+        with test_case.assertRaises(AssertionError):
+            foo_job(x_buf, y)
+        # the failed call must not leave the buffer marked as being pushed
+        test_case.assertTrue(x_buf.wait_pushed(timeout=0))
+        ret = foo_job(x_buf, y[:2]).get()
+        test_case.assertTrue(np.allclose(ret.numpy(), x_buf + y[:2]))
+        test_case.assertTrue(x_buf.wait_pushed(timeout=10))
+
+    def test_eager_input_buffers(test_case):
+        flow.clear_default_session()
+        flow.enable_eager_execution()
+
+        @flow.global_function()
+        def foo_job(x_def: oft.Numpy.Placeholder(shape=(4, 3), dtype=flow.float)):
+            y = x_def * flow.constant(2.0, shape=(1,), dtype=flow.float)
+            test_case.assertTrue(np.allclose(y.numpy(0), x_buf * 2.0))
+
+        (x_buf,) = flow.make_input_buffers(foo_job)
+        x_buf[...] = np.random.rand(4, 3)
+        foo_job(x_buf)
+        test_case.assertTrue(x_buf.wait_pushed(timeout=10))
+
 
 if __name__ == "__main__":
     unittest.main()
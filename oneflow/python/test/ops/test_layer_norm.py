@@ -60,8 +60,6 @@ class TestLayerNorm(flow.unittest.TestCase):
             ) = case
             if device_type == "cpu" and data_type == "float16":
                 continue
-            if device_type == "cpu" and fuse_add_to_output == True:
-                continue
             x_shape = confs["x_shape"]
             begin_norm_axis = confs["begin_norm_axis"]
             begin_params_axis = confs["begin_params_axis"]
@@ -0,0 +1,215 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.core.record.record_pb2 as record_pb
+import oneflow.python.framework.ofrecord_index_util as ofrecord_index_util
+
+PART_RECORD_NUMS = [5, 7, 4]
+
+
+def _WriteDataset(ofrecord_dir):
+    r"""Writes records with ids 0, 1, 2, ... and payloads of random sizes, and
+    returns the offsets of the records in every part.
+    """
+    part_offsets = []
+    record_id = 0
+    for i, record_num in enumerate(PART_RECORD_NUMS):
+        offsets = []
+        with open(os.path.join(ofrecord_dir, "part-{}".format(i)), "wb") as f:
+            for _ in range(record_num):
+                record = record_pb.OFRecord()
+                record.feature["id"].int64_list.value.append(record_id)
+                record.feature["payload"].bytes_list.value.append(
+                    os.urandom(np.random.randint(1, 100))
+                )
+                serialized = record.SerializeToString()
+                offsets.append(f.tell())
+                f.write(struct.pack("<q", len(serialized)))
+                f.write(serialized)
+                record_id += 1
+        part_offsets.append(offsets)
+    return part_offsets
+
+
+def _MakeReaderFunc(
+    ofrecord_dir,
+    batch_size,
+    sample_offset,
+    read_ahead_depth=0,
+    device_num=1,
+    shuffle_after_epoch=False,
+):
+    flow.clear_default_session()
+    if device_num > 1:
+        flow.config.cpu_device_num(device_num)
+    if read_ahead_depth > 0:
+        # blocks smaller than the records so that they straddle the blocks
+        flow.config.persistence_buf_byte(64)
+        flow.config.persistence_read_ahead_depth(read_ahead_depth)
+
+    if device_num > 1:
+        device_ids = "0:0-{}".format(device_num - 1)
+    else:
+        device_ids = "0:0"
+
+    @flow.global_function(type="predict")
+    def ReaderJob() -> flow.typing.Numpy:
+        with flow.scope.placement("cpu", device_ids):
+            ofrecord = flow.data.ofrecord_reader(
+                ofrecord_dir,
+                batch_size=batch_size,
+                data_part_num=len(PART_RECORD_NUMS),
+                shuffle_after_epoch=shuffle_after_epoch,
+                use_index=read_ahead_depth == 0,
+                sample_offset=sample_offset,
+            )
+            return flow.data.OFRecordRawDecoder(
+                ofrecord, "id", shape=(1,), dtype=flow.int64
+            )
+
+    return ReaderJob
+
+
+class TestOFRecordIndex(flow.unittest.TestCase):
+    def test_build_index(test_case):
+        with tempfile.TemporaryDirectory() as ofrecord_dir:
+            part_offsets = _WriteDataset(ofrecord_dir)
+            record_num = flow.data.build_ofrecord_index(
+                ofrecord_dir, data_part_num=len(PART_RECORD_NUMS)
+            )
+            test_case.assertEqual(record_num, sum(PART_RECORD_NUMS))
+            for i, offsets in enumerate(part_offsets):
+                part_path = os.path.join(ofrecord_dir, "part-{}".format(i))
+                test_case.assertEqual(
+                    ofrecord_index_util.ReadIndex(part_path).tolist(), offsets
+                )
+
+            with open(os.path.join(ofrecord_dir, "part-0"), "ab") as f:
+                f.write(struct.pack("<q", 1) + b"x")
+            with test_case.assertRaises(ValueError):
+                ofrecord_index_util.ReadIndex(os.path.join(ofrecord_dir, "part-0"))
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_read_by_index(test_case):
+        record_num = sum(PART_RECORD_NUMS)
+        batch_size = 3
+        with tempfile.TemporaryDirectory() as ofrecord_dir:
+            _WriteDataset(ofrecord_dir)
+            flow.data.build_ofrecord_index(
+                ofrecord_dir, data_part_num=len(PART_RECORD_NUMS)
+            )
+            for sample_offset in [0, 7, record_num + 2]:
+                reader = _MakeReaderFunc(ofrecord_dir, batch_size, sample_offset)
+                ids = np.concatenate([reader().flatten() for _ in range(8)])
+                expected = (
+                    np.arange(sample_offset, sample_offset + 8 * batch_size)
+                    % record_num
+                )
+                test_case.assertTrue(np.array_equal(ids, expected))
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_shuffle_after_epoch(test_case):
+        record_num = sum(PART_RECORD_NUMS)
+        batch_size = 4
+        epoch_num = 3
+        with tempfile.TemporaryDirectory() as ofrecord_dir:
+            _WriteDataset(ofrecord_dir)
+            flow.data.build_ofrecord_index(
+                ofrecord_dir, data_part_num=len(PART_RECORD_NUMS)
+            )
+            reader = _MakeReaderFunc(
+                ofrecord_dir, batch_size, 0, shuffle_after_epoch=True
+            )
+            ids = np.concatenate(
+                [
+                    reader().flatten()
+                    for _ in range(epoch_num * record_num // batch_size)
+                ]
+            )
+            epochs = ids.reshape(epoch_num, record_num)
+            for epoch in epochs:
+                test_case.assertTrue(
+                    np.array_equal(np.sort(epoch), np.arange(record_num))
+                )
+            # all the records are shuffled, and differently in every epoch
+            test_case.assertFalse(np.array_equal(epochs[0], np.arange(record_num)))
+            test_case.assertFalse(np.array_equal(epochs[0], epochs[1]))
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_shard_records(test_case):
+        # more ranks than part files, so that the records rather than the part
+        # files are split across the ranks
+        device_num = 4
+        record_num = sum(PART_RECORD_NUMS)
+        assert device_num > len(PART_RECORD_NUMS)
+        assert record_num % device_num == 0
+        batch_size = 2 * device_num
+        steps_per_epoch = record_num // batch_size
+        epoch_num = 2
+        with tempfile.TemporaryDirectory() as ofrecord_dir:
+            _WriteDataset(ofrecord_dir)
+            flow.data.build_ofrecord_index(
+                ofrecord_dir, data_part_num=len(PART_RECORD_NUMS)
+            )
+            for shuffle_after_epoch in [False, True]:
+                reader = _MakeReaderFunc(
+                    ofrecord_dir,
+                    batch_size,
+                    0,
+                    device_num=device_num,
+                    shuffle_after_epoch=shuffle_after_epoch,
+                )
+                for _ in range(epoch_num):
+                    # the batches are concatenated in the order of the ranks
+                    rank_ids = np.concatenate(
+                        [
+                            reader().reshape(device_num, -1)
+                            for _ in range(steps_per_epoch)
+                        ],
+                        axis=1,
+                    )
+                    shards = [set(ids.tolist()) for ids in rank_ids]
+                    # every rank reads its share of distinct records, and the
+                    # ranks together read every record, so the shards are disjoint
+                    for shard in shards:
+                        test_case.assertEqual(len(shard), record_num // device_num)
+                    test_case.assertEqual(set.union(*shards), set(range(record_num)))
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_read_ahead(test_case):
+        record_num = sum(PART_RECORD_NUMS)
+        batch_size = 4
+        with tempfile.TemporaryDirectory() as ofrecord_dir:
+            _WriteDataset(ofrecord_dir)
+            flow.data.reset_read_stats()
+            reader = _MakeReaderFunc(ofrecord_dir, batch_size, 0, read_ahead_depth=2)
+            ids = np.concatenate(
+                [reader().flatten() for _ in range(record_num // batch_size)]
+            )
+            test_case.assertTrue(np.array_equal(ids, np.arange(record_num)))
+            stats = flow.data.read_stats()
+            test_case.assertGreater(stats["bytes_read"], 0)
+            test_case.assertGreaterEqual(stats["stall_time"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
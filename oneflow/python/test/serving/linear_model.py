@@ -0,0 +1,70 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import oneflow as flow
+
+
+def make_linear_infer_func(batch_size, in_features, out_features, weight_value):
+    input_lbns = {}
+    output_lbns = {}
+
+    func_config = flow.FunctionConfig()
+    func_config.default_logical_view(flow.scope.consistent_view())
+    func_config.default_placement_scope(flow.scope.placement("cpu", "0:0"))
+
+    @flow.global_function(type="predict", function_config=func_config)
+    def linear_inference(
+        x: flow.typing.Numpy.Placeholder((batch_size, in_features), dtype=flow.float32),
+    ) -> flow.typing.Numpy:
+        input_lbns["x"] = x.logical_blob_name
+        weight = flow.get_variable(
+            name="weight",
+            shape=(in_features, out_features),
+            dtype=flow.float32,
+            initializer=flow.constant_initializer(weight_value),
+        )
+        y = flow.matmul(x, weight)
+        output_lbns["y"] = y.logical_blob_name
+        return y
+
+    return linear_inference, input_lbns, output_lbns
+
+
+def save_linear_model(
+    saved_model_dir, version, batch_size, in_features, out_features, weight_value
+):
+    r"""Saves a model computing `y = matmul(x, weight)` where every element of
+    `weight` is `weight_value`, with input "x" and output "y".
+    """
+    flow.clear_default_session()
+    flow.config.cpu_device_num(1)
+    flow.config.gpu_device_num(0)
+    linear_infer, input_lbns, output_lbns = make_linear_infer_func(
+        batch_size, in_features, out_features, weight_value
+    )
+    saved_model_builder = flow.saved_model.ModelBuilder(saved_model_dir)
+    signature_builder = (
+        saved_model_builder.ModelName("linear")
+        .Version(version)
+        .AddFunction(linear_infer)
+        .AddSignature("regress")
+    )
+    for input_name, lbn in input_lbns.items():
+        signature_builder.Input(input_name, lbn)
+    for output_name, lbn in output_lbns.items():
+        signature_builder.Output(output_name, lbn)
+    saved_model_builder.Save()
+    flow.clear_default_session()
+    return linear_infer.__name__
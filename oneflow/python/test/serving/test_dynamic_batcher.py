@@ -0,0 +1,140 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import oneflow as flow
+
+from linear_model import save_linear_model
+
+BATCH_SIZE = 8
+IN_FEATURES = 4
+OUT_FEATURES = 3
+WEIGHT_VALUE = 0.5
+
+
+def make_session(saved_model_dir):
+    option = flow.serving.SessionOption()
+    option.device_tag = "cpu"
+    option.device_num = 1
+    sess = flow.serving.InferenceSession(option)
+    sess.load_saved_model(saved_model_dir)
+    sess.launch()
+    return sess
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDynamicBatcher(flow.unittest.TestCase):
+    def setUp(self):
+        self.saved_model_dir = os.path.join(tempfile.mkdtemp(), "linear_models")
+        self.job_name = save_linear_model(
+            self.saved_model_dir,
+            1,
+            BATCH_SIZE,
+            IN_FEATURES,
+            OUT_FEATURES,
+            WEIGHT_VALUE,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.saved_model_dir))
+
+    def test_coalesce_requests(test_case):
+        sess = make_session(test_case.saved_model_dir)
+        batcher = flow.serving.DynamicBatcher(sess, test_case.job_name)
+        test_case.assertEqual(batcher.max_batch_size, BATCH_SIZE)
+
+        request_sizes = [1, 3, 2, 1, 4, 1, 5, 2]
+        inputs = [
+            np.random.rand(n, IN_FEATURES).astype(np.float32) for n in request_sizes
+        ]
+
+        async def run_all():
+            return await asyncio.gather(*[batcher.async_run(x=x) for x in inputs])
+
+        outputs = sess.event_loop.run_until_complete(run_all())
+        weight = np.full((IN_FEATURES, OUT_FEATURES), WEIGHT_VALUE, np.float32)
+        for x, (y,) in zip(inputs, outputs):
+            test_case.assertEqual(y.shape, (x.shape[0], OUT_FEATURES))
+            test_case.assertTrue(np.allclose(y, np.matmul(x, weight), atol=1e-5))
+
+        metrics = batcher.metrics()
+        test_case.assertEqual(metrics["request_cnt"], len(request_sizes))
+        test_case.assertEqual(metrics["queue_depth"], 0)
+        test_case.assertEqual(metrics["running_batches"], 0)
+        # 19 rows can't be sent in less than 3 batches of 8
+        test_case.assertGreaterEqual(metrics["batch_cnt"], 3)
+        test_case.assertLess(metrics["batch_cnt"], len(request_sizes))
+        test_case.assertAlmostEqual(
+            metrics["avg_batch_size"] * metrics["batch_cnt"], sum(request_sizes)
+        )
+        sess.close()
+
+    def test_max_delay(test_case):
+        sess = make_session(test_case.saved_model_dir)
+        batcher = flow.serving.DynamicBatcher(
+            sess, test_case.job_name, max_batch_size=4, max_delay_ms=1
+        )
+        x = np.random.rand(1, IN_FEATURES).astype(np.float32)
+        # a single request is sent once the deadline passes
+        (y,) = sess.event_loop.run_until_complete(batcher.async_run(x=x))
+        test_case.assertEqual(y.shape, (1, OUT_FEATURES))
+        test_case.assertEqual(batcher.metrics()["batch_cnt"], 1)
+        test_case.assertAlmostEqual(batcher.metrics()["avg_batch_fill"], 1 / BATCH_SIZE)
+        with test_case.assertRaises(ValueError):
+            sess.event_loop.run_until_complete(
+                batcher.async_run(x=np.zeros((5, IN_FEATURES), np.float32))
+            )
+        sess.close()
+
+    def test_request_dtype(test_case):
+        sess = make_session(test_case.saved_model_dir)
+        batcher = flow.serving.DynamicBatcher(sess, test_case.job_name)
+        # float64 requests are cast to the float32 input of the job
+        x = np.random.rand(2, IN_FEATURES)
+        (y,) = sess.event_loop.run_until_complete(batcher.async_run(x=x))
+        weight = np.full((IN_FEATURES, OUT_FEATURES), WEIGHT_VALUE, np.float32)
+        test_case.assertEqual(y.dtype, np.float32)
+        test_case.assertTrue(np.allclose(y, np.matmul(x, weight), atol=1e-5))
+        with test_case.assertRaises(ValueError):
+            sess.event_loop.run_until_complete(
+                batcher.async_run(x=np.zeros((2, IN_FEATURES), np.complex64))
+            )
+        sess.close()
+
+    def test_unbatched_outputs(test_case):
+        sess = make_session(test_case.saved_model_dir)
+        with test_case.assertRaises(ValueError):
+            flow.serving.DynamicBatcher(
+                sess, test_case.job_name, unbatched_outputs=("z",)
+            )
+        batcher = flow.serving.DynamicBatcher(
+            sess, test_case.job_name, max_delay_ms=1, unbatched_outputs=("y",)
+        )
+        x = np.random.rand(3, IN_FEATURES).astype(np.float32)
+        # an unbatched output is returned as a whole, padded rows included
+        (y,) = sess.event_loop.run_until_complete(batcher.async_run(x=x))
+        test_case.assertEqual(y.shape, (BATCH_SIZE, OUT_FEATURES))
+        test_case.assertTrue(np.allclose(y[3:], 0))
+        sess.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
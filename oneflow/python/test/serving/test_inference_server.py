@@ -0,0 +1,156 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.python.serving.server as server_util
+
+from linear_model import save_linear_model
+
+BATCH_SIZE = 2
+IN_FEATURES = 4
+OUT_FEATURES = 3
+WEIGHT_VALUE = 1.5
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestInferenceServer(flow.unittest.TestCase):
+    def test_tensor_framing(test_case):
+        tensors = {
+            "f": np.random.rand(2, 3, 4).astype(np.float32),
+            "i": np.arange(6, dtype=np.int64).reshape(3, 2)[:, ::-1],
+            "b": np.array(True),
+            "empty": np.zeros((0, 5), np.float16),
+        }
+        buf = b"".join(bytes(b) for b in server_util._pack_tensors(tensors))
+        decoded, offset = server_util._unpack_tensors(buf, 0)
+        test_case.assertEqual(offset, len(buf))
+        test_case.assertEqual(set(decoded.keys()), set(tensors.keys()))
+        for name, tensor in tensors.items():
+            test_case.assertEqual(decoded[name].dtype, tensor.dtype)
+            test_case.assertTrue(np.array_equal(decoded[name], tensor))
+
+    def test_malformed_requests(test_case):
+        async def handler(job_name, **inputs):
+            return (inputs["x"],)
+
+        event_loop = asyncio.new_event_loop()
+        session = types.SimpleNamespace(event_loop_=event_loop)
+        server = flow.serving.InferenceServer(session, handler=handler)
+        server.start()
+
+        async def send_malformed_requests():
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            # a job name which is not utf-8 gets an error response
+            server_util._write_frame(
+                writer,
+                [server_util._REQUEST_HEADER.pack(7, 2), b"\xff\xfe"]
+                + server_util._pack_tensors({"x": np.zeros(3)}),
+            )
+            body = await server_util._read_frame(reader)
+            request_id, status = server_util._RESPONSE_HEADER.unpack_from(body, 0)
+            test_case.assertEqual(request_id, 7)
+            test_case.assertEqual(status, server_util._STATUS_ERROR)
+            # a frame too short for the request header closes the connection
+            server_util._write_frame(writer, [b"\x01"])
+            with test_case.assertRaises(asyncio.IncompleteReadError):
+                await server_util._read_frame(reader)
+            writer.close()
+
+        event_loop.run_until_complete(
+            asyncio.wait_for(send_malformed_requests(), timeout=10)
+        )
+        server.close()
+        event_loop.close()
+
+    def test_cancelled_call(test_case):
+        async def handler(job_name, **inputs):
+            if job_name == "slow":
+                await asyncio.sleep(0.5)
+            return (inputs["x"],)
+
+        event_loop = asyncio.new_event_loop()
+        session = types.SimpleNamespace(event_loop_=event_loop)
+        server = flow.serving.InferenceServer(session, handler=handler)
+        server.start()
+        x = np.random.rand(2, 3).astype(np.float32)
+
+        async def cancel_and_run():
+            client = flow.serving.InferenceClient()
+            await client.connect("127.0.0.1", server.port)
+            slow_call = asyncio.ensure_future(client.run("slow", x=x))
+            pending_call = asyncio.ensure_future(client.run("slow", x=x + 1))
+            await asyncio.sleep(0.1)
+            slow_call.cancel()
+            with test_case.assertRaises(asyncio.CancelledError):
+                await slow_call
+            # the response of the cancelled call doesn't break the connection
+            (y,) = await pending_call
+            test_case.assertTrue(np.array_equal(y, x + 1))
+            (y,) = await client.run("fast", x=x)
+            test_case.assertTrue(np.array_equal(y, x))
+            await client.close()
+
+        event_loop.run_until_complete(asyncio.wait_for(cancel_and_run(), timeout=10))
+        server.close()
+        event_loop.close()
+
+    def test_serve_session(test_case):
+        saved_model_dir = os.path.join(tempfile.mkdtemp(), "linear_models")
+        job_name = save_linear_model(
+            saved_model_dir, 1, BATCH_SIZE, IN_FEATURES, OUT_FEATURES, WEIGHT_VALUE
+        )
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        sess = flow.serving.InferenceSession(option)
+        sess.load_saved_model(saved_model_dir)
+        sess.launch()
+        server = flow.serving.InferenceServer(sess)
+        server.start()
+
+        inputs = [
+            np.random.rand(BATCH_SIZE, IN_FEATURES).astype(np.float32)
+            for _ in range(16)
+        ]
+
+        async def run_all():
+            client = flow.serving.InferenceClient()
+            await client.connect("127.0.0.1", server.port)
+            outputs = await asyncio.gather(*[client.run(job_name, x=x) for x in inputs])
+            # errors of a request are sent back to the client
+            with test_case.assertRaises(RuntimeError):
+                await client.run(job_name, not_an_input=inputs[0])
+            await client.close()
+            return outputs
+
+        outputs = sess.event_loop_.run_until_complete(run_all())
+        weight = np.full((IN_FEATURES, OUT_FEATURES), WEIGHT_VALUE, np.float32)
+        for x, (y,) in zip(inputs, outputs):
+            test_case.assertTrue(np.allclose(y, np.matmul(x, weight), atol=1e-5))
+
+        server.close()
+        sess.close()
+        shutil.rmtree(os.path.dirname(saved_model_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import oneflow as flow
+
+from linear_model import save_linear_model
+
+BATCH_SIZE = 2
+IN_FEATURES = 4
+OUT_FEATURES = 3
+WEIGHT_VALUE = 2.0
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestInferenceSessionInFlight(flow.unittest.TestCase):
+    def test_bounded_in_flight_runs(test_case):
+        saved_model_dir = os.path.join(tempfile.mkdtemp(), "linear_models")
+        job_name = save_linear_model(
+            saved_model_dir, 1, BATCH_SIZE, IN_FEATURES, OUT_FEATURES, WEIGHT_VALUE
+        )
+
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        option.max_in_flight_runs = 2
+        option.latency_window_size = 16
+        sess = flow.serving.InferenceSession(option)
+        sess.load_saved_model(saved_model_dir)
+        sess.launch()
+
+        max_in_flight_runs = 0
+
+        async def run(x):
+            nonlocal max_in_flight_runs
+            future = asyncio.ensure_future(sess.async_run(job_name, x=x))
+            await asyncio.sleep(0)
+            max_in_flight_runs = max(max_in_flight_runs, sess.in_flight_runs)
+            return await future
+
+        inputs = [
+            np.random.rand(BATCH_SIZE, IN_FEATURES).astype(np.float32)
+            for _ in range(32)
+        ]
+
+        async def run_all():
+            return await asyncio.gather(*[run(x) for x in inputs])
+
+        outputs = sess.event_loop_.run_until_complete(run_all())
+        weight = np.full((IN_FEATURES, OUT_FEATURES), WEIGHT_VALUE, np.float32)
+        for x, (y,) in zip(inputs, outputs):
+            test_case.assertTrue(np.allclose(y, np.matmul(x, weight), atol=1e-5))
+
+        test_case.assertLessEqual(max_in_flight_runs, 2)
+        test_case.assertEqual(sess.in_flight_runs, 0)
+        # finished job futures are reaped without waiting for close
+        test_case.assertEqual(len(sess.job_futures_), 0)
+
+        latency = sess.stage_latency()
+        for stage in ("push", "compute", "pull", "total"):
+            test_case.assertEqual(latency[stage]["count"], len(inputs))
+            test_case.assertGreaterEqual(latency[stage]["avg_ms"], 0)
+            test_case.assertLessEqual(
+                latency[stage]["p50_ms"], latency[stage]["max_ms"] + 1e-6
+            )
+        test_case.assertLessEqual(
+            latency["compute"]["avg_ms"], latency["total"]["avg_ms"] + 1e-6
+        )
+        sess.reset_stage_latency()
+        test_case.assertEqual(sess.stage_latency()["total"]["count"], 0)
+
+        sess.close()
+        shutil.rmtree(os.path.dirname(saved_model_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import oneflow as flow
+
+from linear_model import save_linear_model
+
+BATCH_SIZE = 2
+IN_FEATURES = 4
+OUT_FEATURES = 3
+
+
+def expected_output(x, weight_value):
+    weight = np.full((IN_FEATURES, OUT_FEATURES), weight_value, np.float32)
+    return np.matmul(x, weight)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestModelRepository(flow.unittest.TestCase):
+    def test_hot_reload(test_case):
+        repository_dir = tempfile.mkdtemp()
+        model_dir = os.path.join(repository_dir, "linear")
+        save_linear_model(model_dir, 1, BATCH_SIZE, IN_FEATURES, OUT_FEATURES, 1.0)
+
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        repo = flow.serving.ModelRepository(repository_dir, option, poll_interval_s=0.1)
+        repo.start()
+        test_case.assertEqual(repo.model_versions(), {"linear": 1})
+        info = repo.input_info("linear", "x")
+        test_case.assertEqual(info["shape"], (BATCH_SIZE, IN_FEATURES))
+        test_case.assertEqual(info["dtype"], np.float32)
+
+        x = np.random.rand(BATCH_SIZE, IN_FEATURES).astype(np.float32)
+        (y,) = repo.run("linear", x=x)
+        test_case.assertTrue(np.allclose(y, expected_output(x, 1.0), atol=1e-5))
+
+        # a new version is loaded in the background, and replaces version 1
+        save_linear_model(model_dir, 2, BATCH_SIZE, IN_FEATURES, OUT_FEATURES, 2.0)
+        deadline = time.time() + 120
+        while repo.model_versions()["linear"] != 2:
+            test_case.assertLess(time.time(), deadline)
+            # requests keep being served while version 2 is loading
+            (y,) = repo.run("linear", x=x)
+            test_case.assertTrue(
+                np.allclose(y, expected_output(x, 1.0), atol=1e-5)
+                or np.allclose(y, expected_output(x, 2.0), atol=1e-5)
+            )
+            time.sleep(0.1)
+        (y,) = repo.run("linear", x=x)
+        test_case.assertTrue(np.allclose(y, expected_output(x, 2.0), atol=1e-5))
+        test_case.assertEqual(repo.loaded_versions("linear"), [2])
+        with test_case.assertRaises(ValueError):
+            repo.run("linear", version=1, x=x)
+
+        repo.close()
+        test_case.assertEqual(repo.model_versions(), {})
+        shutil.rmtree(repository_dir)
+
+    def test_reload_failed_version(test_case):
+        saved_model_dir = os.path.join(tempfile.mkdtemp(), "linear")
+        save_linear_model(
+            saved_model_dir, 1, BATCH_SIZE, IN_FEATURES, OUT_FEATURES, 1.0
+        )
+        saved_model_pb_path = os.path.join(saved_model_dir, "1", "saved_model.pb")
+        with open(saved_model_pb_path, "rb") as f:
+            saved_model_pb = f.read()
+        # a version found while its meta file is being written fails to load
+        repository_dir = tempfile.mkdtemp()
+        model_dir = os.path.join(repository_dir, "linear")
+        shutil.copytree(saved_model_dir, model_dir)
+        os.remove(os.path.join(model_dir, "1", "saved_model.prototxt"))
+        with open(os.path.join(model_dir, "1", "saved_model.pb"), "wb") as f:
+            f.write(saved_model_pb[: len(saved_model_pb) // 2])
+
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        repo = flow.serving.ModelRepository(repository_dir, option, poll_interval_s=0.1)
+        repo.start()
+        test_case.assertEqual(repo.model_versions(), {})
+
+        # and it is loaded once the meta file is completely written
+        with open(os.path.join(model_dir, "1", "saved_model.pb"), "wb") as f:
+            f.write(saved_model_pb)
+        deadline = time.time() + 120
+        while repo.model_versions() != {"linear": 1}:
+            test_case.assertLess(time.time(), deadline)
+            time.sleep(0.1)
+        x = np.random.rand(BATCH_SIZE, IN_FEATURES).astype(np.float32)
+        (y,) = repo.run("linear", x=x)
+        test_case.assertTrue(np.allclose(y, expected_output(x, 1.0), atol=1e-5))
+
+        repo.close()
+        shutil.rmtree(repository_dir)
+        shutil.rmtree(os.path.dirname(saved_model_dir))
+
+    def test_cancelled_request(test_case):
+        repository_dir = tempfile.mkdtemp()
+        model_dir = os.path.join(repository_dir, "linear")
+        save_linear_model(model_dir, 1, BATCH_SIZE, IN_FEATURES, OUT_FEATURES, 1.0)
+
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        repo = flow.serving.ModelRepository(repository_dir, option)
+        repo.start()
+        x = np.random.rand(BATCH_SIZE, IN_FEATURES).astype(np.float32)
+
+        async def cancel_and_run():
+            task = asyncio.ensure_future(repo.async_run("linear", x=x))
+            # let the request be sent before cancelling it
+            await asyncio.sleep(0)
+            task.cancel()
+            with test_case.assertRaises(asyncio.CancelledError):
+                await task
+            return await asyncio.wait_for(repo.async_run("linear", x=x), timeout=60)
+
+        event_loop = asyncio.new_event_loop()
+        (y,) = event_loop.run_until_complete(cancel_and_run())
+        event_loop.close()
+        test_case.assertTrue(np.allclose(y, expected_output(x, 1.0), atol=1e-5))
+        # the requests after a cancelled one are still served
+        (y,) = repo.run("linear", x=x)
+        test_case.assertTrue(np.allclose(y, expected_output(x, 1.0), atol=1e-5))
+
+        repo.close()
+        shutil.rmtree(repository_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
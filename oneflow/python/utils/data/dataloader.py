@@ -0,0 +1,607 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import collections
+import collections.abc
+import itertools
+import mmap
+import multiprocessing
+import os
+import queue
+import random
+import tempfile
+import traceback
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+import oneflow as flow
+import oneflow._oneflow_internal
+import oneflow.python.framework.dtype as dtype_util
+from oneflow.python.oneflow_export import oneflow_export
+from oneflow.python.utils.data.dataset import Dataset
+from oneflow.python.utils.data.sampler import (
+    Sampler,
+    SequentialSampler,
+    RandomSampler,
+    BatchSampler,
+)
+
+# seconds between the checks of the liveness of the workers or of the main process
+_MP_STATUS_CHECK_INTERVAL = 5.0
+# the arrays in a shared buffer are aligned to it
+_SHARED_ARRAY_ALIGNMENT = 64
+# a shared buffer grows to this times the size of the batch which overflowed it
+_SHARED_BUFFER_GROWTH = 1.25
+_SHARED_BUFFER_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+@oneflow_export("utils.data.get_worker_info")
+def get_worker_info():
+    r"""Returns the information of the current DataLoader worker process.
+
+    In a worker process it returns a WorkerInfo with the attributes:
+
+    * :attr:`id`: the id of the worker, in [0, num_workers).
+    * :attr:`num_workers`: the number of the workers.
+    * :attr:`seed`: the seed of the random generators of the worker, which is the
+      base seed of the DataLoader iterator plus the id of the worker.
+    * :attr:`dataset`: the copy of the dataset in the worker.
+
+    In the main process it returns ``None``.
+    """
+    return _worker_info
+
+
+WorkerInfo = collections.namedtuple(
+    "WorkerInfo", ["id", "num_workers", "seed", "dataset"]
+)
+_worker_info = None
+
+
+@oneflow_export("utils.data.default_collate")
+def default_collate(batch):
+    r"""Puts each data field into a numpy array with an outer dimension of the batch size.
+
+    numpy arrays are stacked, python numbers become int64 or float32 arrays and
+    tuples, lists and dicts are collated field by field. Other samples such as
+    strings are returned as a list. The arrays become flow.Tensor in the main process.
+    """
+    elem = batch[0]
+    if isinstance(elem, np.ndarray):
+        return np.stack(batch)
+    elif isinstance(elem, np.generic):
+        return np.array(batch)
+    elif isinstance(elem, bool):
+        return np.array(batch, dtype=np.int8)
+    elif isinstance(elem, int):
+        return np.array(batch, dtype=np.int64)
+    elif isinstance(elem, float):
+        return np.array(batch, dtype=np.float32)
+    elif isinstance(elem, collections.abc.Mapping):
+        return {key: default_collate([d[key] for d in batch]) for key in elem}
+    elif isinstance(elem, tuple) and hasattr(elem, "_fields"):  # namedtuple
+        return type(elem)(*(default_collate(samples) for samples in zip(*batch)))
+    elif isinstance(elem, collections.abc.Sequence) and not isinstance(
+        elem, (str, bytes)
+    ):
+        if not all(len(sample) == len(elem) for sample in batch):
+            raise RuntimeError("each element in list of batch should be of equal size")
+        return [default_collate(samples) for samples in zip(*batch)]
+    return batch
+
+
+# the placeholder of an array which is written to a shared buffer
+_SharedArray = collections.namedtuple("_SharedArray", ["offset", "dtype", "shape"])
+
+
+def _map_arrays(fn, data):
+    if isinstance(data, (np.ndarray, _SharedArray)):
+        return fn(data)
+    elif isinstance(data, collections.abc.Mapping):
+        return {key: _map_arrays(fn, value) for key, value in data.items()}
+    elif isinstance(data, tuple) and hasattr(data, "_fields"):  # namedtuple
+        return type(data)(*(_map_arrays(fn, value) for value in data))
+    elif isinstance(data, (tuple, list)):
+        return type(data)(_map_arrays(fn, value) for value in data)
+    return data
+
+
+def _tensor_dtype(array):
+    try:
+        return dtype_util.convert_numpy_dtype_to_oneflow_dtype(array.dtype)
+    except NotImplementedError:
+        return None
+
+
+def _numpy_to_tensor(array):
+    dtype = _tensor_dtype(array)
+    if dtype is None:
+        # such as strings, which stay numpy arrays
+        return array
+    if array.ndim == 0:
+        array = array.reshape(1)
+    local_tensor = oneflow._oneflow_internal.LocalTensor(
+        oneflow._oneflow_internal.Size(array.shape),
+        dtype,
+        oneflow._oneflow_internal.device("cpu"),
+        False,
+        False,
+        True,
+    )
+    # the only copy of the batch in the main process, which is synchronous
+    local_tensor.copy_(np.ascontiguousarray(array))
+    return flow.Tensor(local_tensor)
+
+
+class _SharedBuffer(object):
+    r"""A file in shared memory, which is mapped by the main process and the workers
+    by its path. The main process creates and unlinks it.
+    """
+
+    def __init__(self, size, path=None):
+        if path is None:
+            fd, path = tempfile.mkstemp(
+                prefix="oneflow_dataloader_", dir=_SHARED_BUFFER_DIR
+            )
+            os.ftruncate(fd, size)
+        else:
+            fd = os.open(path, os.O_RDWR)
+        self.size = size
+        self.path = path
+        try:
+            self.buf = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def array(self, offset, dtype, shape):
+        return np.ndarray(shape, dtype=dtype, buffer=self.buf, offset=offset)
+
+    def close(self):
+        self.buf.close()
+
+    def unlink(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_batch(batch, buffer):
+    r"""Writes the arrays of the batch to the shared buffer if they fit, and returns
+    (whether they are written, the batch or its placeholders, the size they need).
+    """
+    offsets = {}
+    size = 0
+
+    def _plan(array):
+        nonlocal size
+        if _tensor_dtype(array) is None:
+            return array
+        offsets[id(array)] = size
+        size += -(-array.nbytes // _SHARED_ARRAY_ALIGNMENT) * _SHARED_ARRAY_ALIGNMENT
+        return array
+
+    _map_arrays(_plan, batch)
+    if buffer is None or size > buffer.size:
+        return False, batch, size
+
+    def _write(array):
+        if id(array) not in offsets:
+            return array
+        offset = offsets[id(array)]
+        buffer.array(offset, array.dtype, array.shape)[...] = array
+        return _SharedArray(offset, array.dtype.str, array.shape)
+
+    return True, _map_arrays(_write, batch), size
+
+
+def _read_batch(data, buffer):
+    def _read(array):
+        if isinstance(array, _SharedArray):
+            array = buffer.array(*array)
+        return _numpy_to_tensor(array)
+
+    return _map_arrays(_read, data)
+
+
+def _worker_loop(
+    dataset,
+    index_queue,
+    result_queue,
+    collate_fn,
+    seed,
+    worker_init_fn,
+    worker_id,
+    num_workers,
+):
+    global _worker_info
+    parent_pid = os.getppid()
+    # slot id -> the shared buffer of the slot mapped by the worker
+    buffers = {}
+    try:
+        random.seed(seed)
+        np.random.seed(seed % 2 ** 32)
+        _worker_info = WorkerInfo(worker_id, num_workers, seed, dataset)
+        init_error = None
+        if worker_init_fn is not None:
+            try:
+                worker_init_fn(worker_id)
+            except Exception:
+                init_error = "Caught an exception in worker_init_fn of DataLoader worker {}:\n{}".format(
+                    worker_id, traceback.format_exc()
+                )
+        while True:
+            try:
+                task = index_queue.get(timeout=_MP_STATUS_CHECK_INTERVAL)
+            except queue.Empty:
+                if os.getppid() != parent_pid:
+                    break
+                continue
+            if task is None:
+                break
+            slot_id, epoch, batch_idx, indices, path, size = task
+            if init_error is not None:
+                result_queue.put((slot_id, epoch, batch_idx, None, init_error))
+                continue
+            try:
+                if path is not None and (
+                    slot_id not in buffers or buffers[slot_id].path != path
+                ):
+                    if slot_id in buffers:
+                        buffers.pop(slot_id).close()
+                    buffers[slot_id] = _SharedBuffer(size, path)
+                batch = collate_fn([dataset[i] for i in indices])
+                data = _write_batch(batch, buffers.get(slot_id))
+                del batch
+                result = (slot_id, epoch, batch_idx, data, None)
+            except Exception:
+                error = "Caught an exception in DataLoader worker {}:\n{}".format(
+                    worker_id, traceback.format_exc()
+                )
+                result = (slot_id, epoch, batch_idx, None, error)
+            result_queue.put(result)
+            del result
+    except KeyboardInterrupt:
+        pass
+    for buffer in buffers.values():
+        buffer.close()
+    # do not block the exit on the results nobody reads any more
+    result_queue.cancel_join_thread()
+    result_queue.close()
+
+
+class _SingleProcessDataLoaderIter(object):
+    def __init__(self, loader):
+        self._dataset = loader.dataset
+        self._collate_fn = loader.collate_fn
+        self._sampler_iter = iter(loader._index_sampler)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        indices = next(self._sampler_iter)
+        batch = self._collate_fn([self._dataset[i] for i in indices])
+        return _map_arrays(_numpy_to_tensor, batch)
+
+
+class _MultiProcessingDataLoaderIter(object):
+    r"""Loads the batches in the worker processes.
+
+    Every batch in flight holds one of the num_workers * prefetch_factor slots, which
+    are shared buffers owned by the main process. A worker writes the arrays of the
+    batch to the slot of its task, and the main process copies them to tensors and
+    then releases the slot. A batch which overflows its slot is sent through the
+    result queue instead, and the slot grows for the batches after it.
+    """
+
+    def __init__(self, loader):
+        self._shutdown = False
+        self._index_queues = []
+        self._workers = []
+        self._slots = []
+        self._num_workers = loader.num_workers
+        self._persistent_workers = loader.persistent_workers
+        ctx = loader.multiprocessing_context
+        if ctx is None:
+            ctx = multiprocessing
+        elif isinstance(ctx, str):
+            ctx = multiprocessing.get_context(ctx)
+        self._base_seed = loader._get_base_seed()
+        self._result_queue = ctx.Queue()
+        for worker_id in range(self._num_workers):
+            index_queue = ctx.Queue()
+            # the main process never waits for the index queues to flush
+            index_queue.cancel_join_thread()
+            worker = ctx.Process(
+                target=_worker_loop,
+                args=(
+                    loader.dataset,
+                    index_queue,
+                    self._result_queue,
+                    loader.collate_fn,
+                    self._base_seed + worker_id,
+                    loader.worker_init_fn,
+                    worker_id,
+                    self._num_workers,
+                ),
+            )
+            worker.daemon = True
+            worker.start()
+            self._index_queues.append(index_queue)
+            self._workers.append(worker)
+        self._worker_cycle = itertools.cycle(range(self._num_workers))
+        # the buffers are created by the first batches, which tell their sizes
+        self._slots = [None] * (self._num_workers * loader.prefetch_factor)
+        self._free_slots = list(range(len(self._slots)))
+        self._epoch = -1
+        # batch idx -> (slot id, data) of the batches received ahead of their turn
+        self._reorder_dict = {}
+        self._reset(loader, first_iter=True)
+
+    def _reset(self, loader, first_iter=False):
+        # the tasks of the last epoch still in flight are dropped once received
+        self._epoch += 1
+        for slot_id, _ in self._reorder_dict.values():
+            self._free_slots.append(slot_id)
+        self._reorder_dict = {}
+        self._sampler_iter = iter(loader._index_sampler)
+        self._sampler_exhausted = False
+        self._send_idx = 0
+        self._rcvd_idx = 0
+        self._try_put_indices()
+
+    def _try_put_indices(self):
+        while self._free_slots and not self._sampler_exhausted:
+            try:
+                indices = next(self._sampler_iter)
+            except StopIteration:
+                self._sampler_exhausted = True
+                break
+            slot_id = self._free_slots.pop()
+            buffer = self._slots[slot_id]
+            self._index_queues[next(self._worker_cycle)].put(
+                (
+                    slot_id,
+                    self._epoch,
+                    self._send_idx,
+                    indices,
+                    None if buffer is None else buffer.path,
+                    0 if buffer is None else buffer.size,
+                )
+            )
+            self._send_idx += 1
+
+    def _get_result(self):
+        while True:
+            try:
+                return self._result_queue.get(timeout=_MP_STATUS_CHECK_INTERVAL)
+            except queue.Empty:
+                for worker in self._workers:
+                    if not worker.is_alive():
+                        pid = worker.pid
+                        self._shutdown_workers()
+                        raise RuntimeError(
+                            "DataLoader worker (pid {}) exited unexpectedly".format(pid)
+                        )
+
+    def _process_data(self, slot_id, data):
+        in_buffer, batch, size = data
+        if in_buffer:
+            batch = _read_batch(batch, self._slots[slot_id])
+        else:
+            batch = _map_arrays(_numpy_to_tensor, batch)
+            if size > 0:
+                self._grow_slot(slot_id, size)
+        self._free_slots.append(slot_id)
+        self._try_put_indices()
+        return batch
+
+    def _grow_slot(self, slot_id, size):
+        old_buffer = self._slots[slot_id]
+        if old_buffer is not None:
+            old_buffer.close()
+            old_buffer.unlink()
+        self._slots[slot_id] = _SharedBuffer(int(size * _SHARED_BUFFER_GROWTH))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            if self._rcvd_idx in self._reorder_dict:
+                slot_id, data = self._reorder_dict.pop(self._rcvd_idx)
+                self._rcvd_idx += 1
+                return self._process_data(slot_id, data)
+            if self._rcvd_idx == self._send_idx:
+                self._try_put_indices()
+                if self._sampler_exhausted and self._rcvd_idx == self._send_idx:
+                    if not self._persistent_workers:
+                        self._shutdown_workers()
+                    raise StopIteration
+            slot_id, epoch, batch_idx, data, error = self._get_result()
+            if epoch != self._epoch:
+                self._free_slots.append(slot_id)
+                self._try_put_indices()
+                continue
+            if error is not None:
+                self._shutdown_workers()
+                raise RuntimeError(error)
+            self._reorder_dict[batch_idx] = (slot_id, data)
+
+    def _shutdown_workers(self):
+        if self._shutdown:
+            return
+        self._shutdown = True
+        for index_queue in self._index_queues:
+            index_queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=_MP_STATUS_CHECK_INTERVAL)
+            if worker.is_alive():
+                worker.terminate()
+        for index_queue in self._index_queues:
+            index_queue.close()
+        if self._workers:
+            self._result_queue.close()
+        for buffer in self._slots:
+            if buffer is not None:
+                buffer.close()
+                buffer.unlink()
+        self._slots = []
+
+    def __del__(self):
+        self._shutdown_workers()
+
+
+@oneflow_export("utils.data.DataLoader")
+class DataLoader(object):
+    r"""Combines a dataset and a sampler, and provides an iterable over the dataset.
+
+    With num_workers > 0 the samples are loaded and collated in worker processes, so
+    the preprocessing of the dataset runs beside the training. The workers write
+    the arrays of the batches to buffers in shared memory, from which they are
+    copied to flow.Tensor once, without pickling them.
+
+    Args:
+        dataset (Dataset): dataset from which to load the data.
+        batch_size (int, optional): how many samples per batch to load (default: ``1``).
+        shuffle (bool, optional): set to ``True`` to have the data reshuffled
+            at every epoch (default: ``False``).
+        sampler (Sampler or Iterable, optional): defines the strategy to draw
+            samples from the dataset. If specified, :attr:`shuffle` must not be specified.
+        batch_sampler (Sampler or Iterable, optional): like :attr:`sampler`, but
+            returns a batch of indices at a time. Mutually exclusive with
+            :attr:`batch_size`, :attr:`shuffle`, :attr:`sampler`, and :attr:`drop_last`.
+        num_workers (int, optional): how many subprocesses to use for data
+            loading. ``0`` means that the data will be loaded in the main process.
+            (default: ``0``)
+        collate_fn (callable, optional): merges a list of samples to form a
+            mini-batch of numpy arrays (default: :func:`default_collate`).
+        drop_last (bool, optional): set to ``True`` to drop the last incomplete batch,
+            if the dataset size is not divisible by the batch size. (default: ``False``)
+        prefetch_factor (int, optional): number of batches loaded in advance by each
+            worker. (default: ``2``)
+        persistent_workers (bool, optional): if ``True``, the workers are kept alive
+            across the epochs instead of being restarted by every epoch. (default: ``False``)
+        worker_init_fn (callable, optional): if not ``None``, this will be called on
+            each worker subprocess with the worker id as input, after seeding and
+            before data loading. (default: ``None``)
+        seed (int, optional): the base seed of the workers. The worker ``i`` seeds
+            the ``random`` and ``numpy.random`` generators with ``seed + i``. If
+            ``None``, the base seed is drawn from ``numpy.random`` in the main process
+            by every iterator. (default: ``None``)
+        multiprocessing_context (str or multiprocessing context, optional): the
+            context to start the workers, the default one of the platform if ``None``.
+            (default: ``None``)
+
+    For example:
+
+    .. code-block:: python
+
+        import oneflow.experimental as flow
+        import numpy as np
+
+        dataset = flow.utils.data.TensorDataset(
+            np.arange(10, dtype=np.float32).reshape(5, 2), np.arange(5)
+        )
+        loader = flow.utils.data.DataLoader(dataset, batch_size=2, num_workers=2)
+        [y.numpy().tolist() for x, y in loader]
+        # [[0, 1], [2, 3], [4]]
+
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_size: Optional[int] = 1,
+        shuffle: bool = False,
+        sampler: Optional[Sampler] = None,
+        batch_sampler: Optional[Sampler] = None,
+        num_workers: int = 0,
+        collate_fn: Optional[Callable[[list], Any]] = None,
+        drop_last: bool = False,
+        prefetch_factor: int = 2,
+        persistent_workers: bool = False,
+        worker_init_fn: Optional[Callable[[int], None]] = None,
+        seed: Optional[int] = None,
+        multiprocessing_context=None,
+    ):
+        if num_workers < 0:
+            raise ValueError(
+                "num_workers option should be non-negative; "
+                "use num_workers=0 to disable multiprocessing."
+            )
+        if prefetch_factor <= 0:
+            raise ValueError("prefetch_factor option should be positive")
+        if persistent_workers and num_workers == 0:
+            raise ValueError("persistent_workers option needs num_workers > 0")
+        if sampler is not None and shuffle:
+            raise ValueError("sampler option is mutually exclusive with shuffle")
+        if batch_sampler is not None:
+            if batch_size != 1 or shuffle or sampler is not None or drop_last:
+                raise ValueError(
+                    "batch_sampler option is mutually exclusive "
+                    "with batch_size, shuffle, sampler, and drop_last"
+                )
+            batch_size = None
+            drop_last = False
+        elif batch_size is None:
+            raise ValueError("batch_size should be a positive integer value")
+
+        if sampler is None:
+            if shuffle:
+                sampler = RandomSampler(dataset)
+            else:
+                sampler = SequentialSampler(dataset)
+        if batch_sampler is None:
+            batch_sampler = BatchSampler(sampler, batch_size, drop_last)
+
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.drop_last = drop_last
+        self.sampler = sampler
+        self.batch_sampler = batch_sampler
+        self.num_workers = num_workers
+        self.collate_fn = default_collate if collate_fn is None else collate_fn
+        self.prefetch_factor = prefetch_factor
+        self.persistent_workers = persistent_workers
+        self.worker_init_fn = worker_init_fn
+        self.seed = seed
+        self.multiprocessing_context = multiprocessing_context
+        self._iterator = None
+
+    @property
+    def _index_sampler(self):
+        return self.batch_sampler
+
+    def _get_base_seed(self):
+        if self.seed is not None:
+            return self.seed
+        return int(np.random.randint(0, 2 ** 31))
+
+    def __iter__(self):
+        if self.num_workers == 0:
+            return _SingleProcessDataLoaderIter(self)
+        if not self.persistent_workers:
+            return _MultiProcessingDataLoaderIter(self)
+        if self._iterator is None or self._iterator._shutdown:
+            self._iterator = _MultiProcessingDataLoaderIter(self)
+        else:
+            self._iterator._reset(self)
+        return self._iterator
+
+    def __len__(self):
+        return len(self._index_sampler)
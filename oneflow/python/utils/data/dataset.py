@@ -0,0 +1,75 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from oneflow.python.oneflow_export import oneflow_export
+
+
+@oneflow_export("utils.data.Dataset")
+class Dataset(object):
+    r"""An abstract class representing a map-style dataset.
+
+    Subclasses implement :meth:`__getitem__`, which fetches the sample of a key,
+    and :meth:`__len__`, which is used by the samplers of
+    :class:`~oneflow.utils.data.DataLoader`.
+
+    The samples are loaded in the worker processes of the DataLoader when its
+    num_workers > 0, so they should be made of numpy arrays, python numbers and
+    containers of them rather than of flow.Tensor.
+    """
+
+    def __getitem__(self, index):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+@oneflow_export("utils.data.TensorDataset")
+class TensorDataset(Dataset):
+    r"""Dataset wrapping numpy arrays.
+
+    The sample i is the tuple of the i-th slices of the arrays along their first
+    dimension.
+
+    Args:
+        *arrays (numpy.ndarray): arrays that have the same size of the first dimension.
+
+    For example:
+
+    .. code-block:: python
+
+        import oneflow.experimental as flow
+        import numpy as np
+
+        dataset = flow.utils.data.TensorDataset(np.arange(6).reshape(3, 2), np.arange(3))
+        len(dataset)
+        # 3
+        dataset[1]
+        # (array([2, 3]), 1)
+
+    """
+
+    def __init__(self, *arrays):
+        assert len(arrays) > 0
+        assert all(
+            len(array) == len(arrays[0]) for array in arrays
+        ), "Size mismatch between arrays"
+        self.arrays = arrays
+
+    def __getitem__(self, index):
+        return tuple(array[index] for array in self.arrays)
+
+    def __len__(self):
+        return len(self.arrays[0])
@@ -0,0 +1,174 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from typing import Optional, Sized
+
+import numpy as np
+
+from oneflow.python.oneflow_export import oneflow_export
+
+
+@oneflow_export("utils.data.Sampler")
+class Sampler(object):
+    r"""Base class for all samplers.
+
+    Subclasses implement :meth:`__iter__`, which iterates over the keys of the
+    samples of a dataset, and optionally :meth:`__len__`.
+    """
+
+    def __init__(self, data_source: Optional[Sized] = None):
+        pass
+
+    def __iter__(self):
+        raise NotImplementedError
+
+
+@oneflow_export("utils.data.SequentialSampler")
+class SequentialSampler(Sampler):
+    r"""Samples the elements sequentially, always in the same order.
+
+    Args:
+        data_source (Dataset): dataset to sample from
+    """
+
+    def __init__(self, data_source: Sized):
+        self.data_source = data_source
+
+    def __iter__(self):
+        return iter(range(len(self.data_source)))
+
+    def __len__(self):
+        return len(self.data_source)
+
+
+@oneflow_export("utils.data.RandomSampler")
+class RandomSampler(Sampler):
+    r"""Samples the elements randomly. If without replacement, then sample from a
+    shuffled dataset. If with replacement, then user can specify :attr:`num_samples`
+    to draw.
+
+    The order is drawn from the global numpy random generator in the main process,
+    so `np.random.seed` makes it reproducible.
+
+    Args:
+        data_source (Dataset): dataset to sample from
+        replacement (bool): samples are drawn on-demand with replacement if ``True``, default=``False``
+        num_samples (int): number of samples to draw, default=`len(dataset)`. This argument
+            is supposed to be specified only when `replacement` is ``True``.
+    """
+
+    def __init__(
+        self,
+        data_source: Sized,
+        replacement: bool = False,
+        num_samples: Optional[int] = None,
+    ):
+        self.data_source = data_source
+        self.replacement = replacement
+        self._num_samples = num_samples
+        if not isinstance(self.replacement, bool):
+            raise TypeError(
+                "replacement should be a boolean value, but got replacement={}".format(
+                    self.replacement
+                )
+            )
+        if self._num_samples is not None and not replacement:
+            raise ValueError(
+                "With replacement=False, num_samples should not be specified, "
+                "since a random permute will be performed."
+            )
+        if not isinstance(self.num_samples, int) or self.num_samples <= 0:
+            raise ValueError(
+                "num_samples should be a positive integer value, but got num_samples={}".format(
+                    self.num_samples
+                )
+            )
+
+    @property
+    def num_samples(self) -> int:
+        # dataset size might change at runtime
+        if self._num_samples is None:
+            return len(self.data_source)
+        return self._num_samples
+
+    def __iter__(self):
+        n = len(self.data_source)
+        if self.replacement:
+            return iter(np.random.randint(0, n, size=self.num_samples).tolist())
+        return iter(np.random.permutation(n).tolist())
+
+    def __len__(self):
+        return self.num_samples
+
+
+@oneflow_export("utils.data.BatchSampler")
+class BatchSampler(Sampler):
+    r"""Wraps another sampler to yield a mini-batch of indices.
+
+    Args:
+        sampler (Sampler or Iterable): Base sampler. Can be any iterable object
+        batch_size (int): Size of mini-batch.
+        drop_last (bool): If ``True``, the sampler will drop the last batch if
+            its size would be less than ``batch_size``
+
+    For example:
+
+    .. code-block:: python
+
+        import oneflow.experimental as flow
+
+        list(flow.utils.data.BatchSampler(range(10), batch_size=3, drop_last=False))
+        # [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+        list(flow.utils.data.BatchSampler(range(10), batch_size=3, drop_last=True))
+        # [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+
+    """
+
+    def __init__(self, sampler, batch_size: int, drop_last: bool):
+        if (
+            not isinstance(batch_size, int)
+            or isinstance(batch_size, bool)
+            or batch_size <= 0
+        ):
+            raise ValueError(
+                "batch_size should be a positive integer value, but got batch_size={}".format(
+                    batch_size
+                )
+            )
+        if not isinstance(drop_last, bool):
+            raise ValueError(
+                "drop_last should be a boolean value, but got drop_last={}".format(
+                    drop_last
+                )
+            )
+        self.sampler = sampler
+        self.batch_size = batch_size
+        self.drop_last = drop_last
+
+    def __iter__(self):
+        batch = []
+        for idx in self.sampler:
+            batch.append(idx)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if len(batch) > 0 and not self.drop_last:
+            yield batch
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.sampler) // self.batch_size
+        else:
+            return (len(self.sampler) + self.batch_size - 1) // self.batch_size
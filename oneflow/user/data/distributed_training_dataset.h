@@ -77,6 +77,30 @@ class DistributedTrainingDataset final : public Dataset<LoadTarget> {
     return ret;
   }
 
+  // Moves forward as if Next had been called num_samples times, without loading the samples,
+  // e.g. to resume from the progress saved in the last run.
+  void Skip(int64_t num_samples) {
+    CHECK_GE(num_samples, 0);
+    const int64_t size = index_seq_.size();
+    while (num_samples > 0) {
+      if (stride_partition_) {
+        const int64_t steps = std::min(num_samples, (size - pos_ + num_shards_ - 1) / num_shards_);
+        pos_ += steps * num_shards_;
+        num_samples -= steps;
+      } else {
+        const int64_t steps = std::min({num_samples, shard_size_ - pos_in_shard_, size - pos_});
+        pos_ += steps;
+        pos_in_shard_ += steps;
+        num_samples -= steps;
+        if (pos_in_shard_ == shard_size_) {
+          pos_ += (num_shards_ - 1) * shard_size_;
+          pos_in_shard_ = 0;
+        }
+      }
+      CheckRanOutOfSize();
+    }
+  }
+
  private:
   void CheckRanOutOfSize() {
     if (pos_ >= index_seq_.size()) {
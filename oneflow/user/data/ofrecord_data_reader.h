@@ -18,6 +18,8 @@ limitations under the License.
 
 #include "oneflow/user/data/data_reader.h"
 #include "oneflow/user/data/ofrecord_dataset.h"
+#include "oneflow/user/data/ofrecord_indexed_dataset.h"
+#include "oneflow/user/data/distributed_training_dataset.h"
 #include "oneflow/user/data/ofrecord_parser.h"
 #include "oneflow/user/data/random_shuffle_dataset.h"
 #include "oneflow/user/data/batch_dataset.h"
@@ -29,7 +31,22 @@ namespace data {
 class OFRecordDataReader final : public DataReader<TensorBuffer> {
  public:
   OFRecordDataReader(user_op::KernelInitContext* ctx) : DataReader<TensorBuffer>(ctx) {
-    loader_.reset(new OFRecordDataset(ctx));
+    if (ctx->Attr<bool>("use_index")) {
+      // records are sharded and shuffled one by one instead of by part files
+      std::unique_ptr<RandomAccessDataset<TensorBuffer>> indexed_dataset(
+          new OFRecordIndexedDataset(GetOFRecordDataPartPaths(ctx)));
+      const int64_t parallel_num = ctx->parallel_ctx().parallel_num();
+      const int64_t sample_offset = ctx->Attr<int64_t>("sample_offset");
+      CHECK_EQ(sample_offset % parallel_num, 0);
+      auto* dataset = new DistributedTrainingDataset<TensorBuffer>(
+          parallel_num, ctx->parallel_ctx().parallel_id(), false,
+          ctx->Attr<bool>("shuffle_after_epoch"), kOneflowDatasetSeed, std::move(indexed_dataset));
+      dataset->Skip(sample_offset / parallel_num);
+      loader_.reset(dataset);
+    } else {
+      CHECK_EQ(ctx->Attr<int64_t>("sample_offset"), 0) << "sample_offset requires use_index";
+      loader_.reset(new OFRecordDataset(ctx));
+    }
     parser_.reset(new OFRecordParser());
     if (ctx->Attr<bool>("random_shuffle")) {
       loader_.reset(new RandomShuffleDataset<TensorBuffer>(ctx, std::move(loader_)));
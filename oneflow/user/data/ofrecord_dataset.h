@@ -17,6 +17,7 @@ limitations under the License.
 #define ONEFLOW_USER_DATA_OFRECORD_DATASET_H_
 
 #include "oneflow/user/data/dataset.h"
+#include "oneflow/user/data/tensor_buffer_pool.h"
 #include "oneflow/core/common/balanced_splitter.h"
 #include "oneflow/core/common/str_util.h"
 #include "oneflow/core/framework/op_kernel.h"
@@ -26,6 +27,20 @@ limitations under the License.
 namespace oneflow {
 namespace data {
 
+inline std::vector<std::string> GetOFRecordDataPartPaths(user_op::KernelInitContext* ctx) {
+  const int32_t data_part_num = ctx->Attr<int32_t>("data_part_num");
+  const std::string& data_dir = ctx->Attr<std::string>("data_dir");
+  const std::string& part_name_prefix = ctx->Attr<std::string>("part_name_prefix");
+  const int32_t part_name_suffix_length = ctx->Attr<int32_t>("part_name_suffix_length");
+  std::vector<std::string> ret;
+  for (int i = 0; i < data_part_num; ++i) {
+    std::string num = std::to_string(i);
+    int32_t zero_count = std::max(part_name_suffix_length - static_cast<int32_t>(num.length()), 0);
+    ret.push_back(JoinPath(data_dir, part_name_prefix + std::string(zero_count, '0') + num));
+  }
+  return ret;
+}
+
 class OFRecordDataset final : public Dataset<TensorBuffer> {
  public:
   using LoadTargetPtr = std::shared_ptr<TensorBuffer>;
@@ -37,17 +52,7 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
 
     // in stream
     data_part_num_ = ctx->Attr<int32_t>("data_part_num");
-    std::string data_dir = ctx->Attr<std::string>("data_dir");
-    std::string part_name_prefix = ctx->Attr<std::string>("part_name_prefix");
-    int32_t part_name_suffix_length = ctx->Attr<int32_t>("part_name_suffix_length");
-
-    for (int i = 0; i < data_part_num_; ++i) {
-      std::string num = std::to_string(i);
-      int32_t zero_count =
-          std::max(part_name_suffix_length - static_cast<int32_t>(num.length()), 0);
-      data_file_paths_.push_back(
-          JoinPath(data_dir, part_name_prefix + std::string(zero_count, '0') + num));
-    }
+    data_file_paths_ = GetOFRecordDataPartPaths(ctx);
 
     parallel_id_ = ctx->parallel_ctx().parallel_id();
     parallel_num_ = ctx->parallel_ctx().parallel_num();
@@ -58,19 +63,18 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
     save_to_local_ = Global<const IOConf>::Get()->save_downloaded_file_to_local_fs();
     in_stream_.reset(
         new PersistentInStream(DataFS(), local_file_paths, !shuffle_after_epoch_, save_to_local_));
+    buffer_pool_ = std::make_shared<TensorBufferPool>();
   }
   ~OFRecordDataset() = default;
 
   LoadTargetPtrList Next() override {
     LoadTargetPtrList ret;
-    LoadTargetPtr sample_ptr(new TensorBuffer());
-    ReadSample(*sample_ptr);
-    ret.push_back(std::move(sample_ptr));
+    ret.push_back(ReadSample());
     return ret;
   }
 
  private:
-  void ReadSample(TensorBuffer& tensor) {
+  LoadTargetPtr ReadSample() {
     int64_t OFRecord_size = -1;
     char* size_ptr = reinterpret_cast<char*>(&OFRecord_size);
     if (in_stream_->ReadFully(size_ptr, sizeof(int64_t)) != 0) {
@@ -78,8 +82,9 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
       CHECK_EQ(in_stream_->ReadFully(size_ptr, sizeof(int64_t)), 0);
     }
     CHECK_GT(OFRecord_size, 0);
-    tensor.Resize(Shape({OFRecord_size}), DataType::kChar);
-    CHECK_EQ(in_stream_->ReadFully(tensor.mut_data<char>(), OFRecord_size), 0);
+    LoadTargetPtr tensor = buffer_pool_->Get(OFRecord_size);
+    CHECK_EQ(in_stream_->ReadFully(tensor->mut_data<char>(), OFRecord_size), 0);
+    return tensor;
   }
 
   void ShuffleAfterEpoch() {
@@ -107,6 +112,7 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
   std::vector<std::string> data_file_paths_;
   bool save_to_local_;
   std::unique_ptr<PersistentInStream> in_stream_;
+  std::shared_ptr<TensorBufferPool> buffer_pool_;
 };
 
 }  // namespace data
@@ -0,0 +1,96 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/user/data/ofrecord_indexed_dataset.h"
+
+namespace oneflow {
+
+namespace data {
+
+namespace {
+
+// the records are prefixed by their lengths as i64
+constexpr int64_t kLengthPrefixSize = sizeof(int64_t);
+
+}  // namespace
+
+constexpr char OFRecordIndexedDataset::kMagicCode[];
+constexpr char OFRecordIndexedDataset::kIndexFileSuffix[];
+
+OFRecordIndexedDataset::OFRecordIndexedDataset(const std::vector<std::string>& data_file_paths)
+    : buffer_pool_(std::make_shared<TensorBufferPool>()) {
+  part_record_begins_.push_back(0);
+  for (const auto& data_file_path : data_file_paths) { LoadIndex(data_file_path); }
+  CHECK_GT(Size(), 0);
+}
+
+void OFRecordIndexedDataset::LoadIndex(const std::string& data_file_path) {
+  const std::string index_file_path = data_file_path + kIndexFileSuffix;
+  CHECK(DataFS()->FileExists(index_file_path))
+      << "the index of " << data_file_path
+      << " is not found, build it with flow.data.build_ofrecord_index";
+  std::unique_ptr<fs::RandomAccessFile> index_file;
+  DataFS()->NewRandomAccessFile(index_file_path, &index_file);
+  const uint64_t index_file_size = DataFS()->GetFileSize(index_file_path);
+  constexpr size_t kHeaderSize = kMagicCodeLen + 2 * sizeof(int64_t);
+  CHECK_GE(index_file_size, kHeaderSize) << index_file_path;
+  char header[kHeaderSize];
+  index_file->Read(0, kHeaderSize, header);
+  CHECK_EQ(std::string(header, kMagicCodeLen), std::string(kMagicCode, kMagicCodeLen))
+      << index_file_path << " is not an ofrecord index";
+  int64_t part_size = 0;
+  int64_t record_num = 0;
+  std::memcpy(&part_size, header + kMagicCodeLen, sizeof(int64_t));
+  std::memcpy(&record_num, header + kMagicCodeLen + sizeof(int64_t), sizeof(int64_t));
+  CHECK_EQ(index_file_size, kHeaderSize + record_num * sizeof(int64_t)) << index_file_path;
+  CHECK_EQ(DataFS()->GetFileSize(data_file_path), part_size)
+      << index_file_path << " is out of date, rebuild it with flow.data.build_ofrecord_index";
+
+  const size_t begin = record_offsets_.size();
+  record_offsets_.resize(begin + record_num + 1);
+  index_file->Read(kHeaderSize, record_num * sizeof(int64_t),
+                   reinterpret_cast<char*>(record_offsets_.data() + begin));
+  record_offsets_.back() = part_size;
+  FOR_RANGE(size_t, i, begin, record_offsets_.size() - 1) {
+    CHECK_GT(record_offsets_.at(i + 1) - record_offsets_.at(i), kLengthPrefixSize)
+        << index_file_path;
+  }
+  std::unique_ptr<fs::RandomAccessFile> part_file;
+  DataFS()->NewRandomAccessFile(data_file_path, &part_file);
+  part_files_.push_back(std::move(part_file));
+  part_record_begins_.push_back(part_record_begins_.back() + record_num);
+}
+
+OFRecordIndexedDataset::LoadTargetShdPtrVec OFRecordIndexedDataset::At(int64_t index) const {
+  CHECK_GE(index, 0);
+  CHECK_LT(index, Size());
+  const int64_t part_id =
+      std::upper_bound(part_record_begins_.begin(), part_record_begins_.end(), index)
+      - part_record_begins_.begin() - 1;
+  const int64_t offset = record_offsets_.at(index + part_id);
+  const int64_t record_size = record_offsets_.at(index + part_id + 1) - offset - kLengthPrefixSize;
+  LoadTargetShdPtr record = buffer_pool_->Get(record_size);
+  const double start = GetCurTime();
+  part_files_.at(part_id)->Read(offset + kLengthPrefixSize, record_size, record->mut_data<char>());
+  ReadStats::Get()->stall_ns += static_cast<int64_t>(GetCurTime() - start);
+  ReadStats::Get()->bytes_read += record_size;
+  LoadTargetShdPtrVec ret;
+  ret.push_back(std::move(record));
+  return ret;
+}
+
+}  // namespace data
+
+}  // namespace oneflow
@@ -0,0 +1,61 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_DATA_OFRECORD_INDEXED_DATASET_H_
+#define ONEFLOW_USER_DATA_OFRECORD_INDEXED_DATASET_H_
+
+#include "oneflow/user/data/dataset.h"
+#include "oneflow/user/data/tensor_buffer_pool.h"
+#include "oneflow/core/persistence/file_system.h"
+
+namespace oneflow {
+namespace data {
+
+// The index of a part file "part-x" is the sidecar file "part-x.index", which is
+//   8 bytes magic code | i64 part file size | i64 record num | record num * i64 offsets
+// in little endian, where the offsets are the positions of the length prefixes of the records.
+// It is built by flow.data.build_ofrecord_index.
+class OFRecordIndexedDataset final : public RandomAccessDataset<TensorBuffer> {
+ public:
+  using LoadTargetShdPtr = std::shared_ptr<TensorBuffer>;
+  using LoadTargetShdPtrVec = std::vector<LoadTargetShdPtr>;
+  OF_DISALLOW_COPY_AND_MOVE(OFRecordIndexedDataset);
+
+  static constexpr char kMagicCode[] = "OFRECIDX";
+  static constexpr size_t kMagicCodeLen = sizeof(kMagicCode) - 1;
+  static constexpr char kIndexFileSuffix[] = ".index";
+
+  explicit OFRecordIndexedDataset(const std::vector<std::string>& data_file_paths);
+  ~OFRecordIndexedDataset() = default;
+
+  LoadTargetShdPtrVec At(int64_t index) const override;
+  size_t Size() const override { return part_record_begins_.back(); }
+
+ private:
+  void LoadIndex(const std::string& data_file_path);
+
+  std::vector<std::unique_ptr<fs::RandomAccessFile>> part_files_;
+  // the records of part i are [part_record_begins_[i], part_record_begins_[i + 1])
+  std::vector<int64_t> part_record_begins_;
+  // the offsets of the records of every part followed by the size of the part, so record k
+  // in part i spans [record_offsets_[k + i], record_offsets_[k + i + 1])
+  std::vector<int64_t> record_offsets_;
+  std::shared_ptr<TensorBufferPool> buffer_pool_;
+};
+
+}  // namespace data
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_DATA_OFRECORD_INDEXED_DATASET_H_
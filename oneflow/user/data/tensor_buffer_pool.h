@@ -0,0 +1,79 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_DATA_TENSOR_BUFFER_POOL_H_
+#define ONEFLOW_USER_DATA_TENSOR_BUFFER_POOL_H_
+
+#include "oneflow/core/common/tensor_buffer.h"
+#include "oneflow/core/persistence/read_stats.h"
+
+namespace oneflow {
+namespace data {
+
+// Recycles the TensorBuffers of the record payloads. A buffer from the pool goes back to the
+// pool when its last shared_ptr is released, which keeps the pool alive until then. The pool
+// holds at most as many buffers as were in flight at the same time.
+class TensorBufferPool final : public std::enable_shared_from_this<TensorBufferPool> {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(TensorBufferPool);
+  TensorBufferPool() = default;
+  ~TensorBufferPool() = default;
+
+  // Returns a buffer of `size` chars.
+  std::shared_ptr<TensorBuffer> Get(int64_t size) {
+    std::unique_ptr<TensorBuffer> buffer;
+    {
+      std::unique_lock<std::mutex> lock(mutex_);
+      if (!capacity2free_buffer_.empty()) {
+        // the smallest buffer which holds the chars, or the largest one to grow
+        auto it = capacity2free_buffer_.lower_bound(size);
+        if (it == capacity2free_buffer_.end()) { it = std::prev(it); }
+        buffer = std::move(it->second);
+        capacity2free_buffer_.erase(it);
+      }
+    }
+    if (buffer) {
+      const void* data = buffer->data();
+      buffer->Resize(Shape({size}), DataType::kChar);
+      // TensorBuffer::Resize also reallocates a buffer much larger than the size
+      if (buffer->data() == data) {
+        ReadStats::Get()->buffer_pool_hit_num += 1;
+      } else {
+        ReadStats::Get()->buffer_pool_miss_num += 1;
+      }
+    } else {
+      buffer.reset(new TensorBuffer());
+      buffer->Resize(Shape({size}), DataType::kChar);
+      ReadStats::Get()->buffer_pool_miss_num += 1;
+    }
+    std::shared_ptr<TensorBufferPool> pool = shared_from_this();
+    return std::shared_ptr<TensorBuffer>(buffer.release(),
+                                         [pool](TensorBuffer* released) { pool->Put(released); });
+  }
+
+ private:
+  void Put(TensorBuffer* buffer) {
+    std::unique_lock<std::mutex> lock(mutex_);
+    capacity2free_buffer_.emplace(buffer->capacity(), std::unique_ptr<TensorBuffer>(buffer));
+  }
+
+  std::mutex mutex_;
+  std::multimap<size_t, std::unique_ptr<TensorBuffer>> capacity2free_buffer_;
+};
+
+}  // namespace data
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_DATA_TENSOR_BUFFER_POOL_H_
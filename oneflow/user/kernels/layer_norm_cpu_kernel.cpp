@@ -14,6 +14,8 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/framework/framework.h"
+#include "oneflow/core/kernel/new_kernel_util.h"
+#include "oneflow/core/thread/parallel_for.h"
 
 namespace oneflow {
 
@@ -25,7 +27,75 @@ class LayerNormCpuKernel final : public user_op::OpKernel {
 
  private:
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
-  void Compute(user_op::KernelComputeContext* ctx) const override { TODO(); };
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    user_op::Tensor* y = ctx->Tensor4ArgNameAndIndex("y", 0);
+    user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    const bool scale = ctx->Attr<bool>("scale");
+    const bool center = ctx->Attr<bool>("center");
+    user_op::Tensor* normalized = scale ? ctx->Tensor4ArgNameAndIndex("normalized", 0) : y;
+    const T epsilon = static_cast<T>(ctx->Attr<double>("epsilon"));
+    const int64_t num_instances = mean->shape().elem_cnt();
+    const int64_t norm_size = x->shape().elem_cnt() / num_instances;
+    int64_t instance_size = 0;
+    const T* gamma_ptr = nullptr;
+    const T* beta_ptr = nullptr;
+    if (scale || center) {
+      if (scale) {
+        const user_op::Tensor* gamma = ctx->Tensor4ArgNameAndIndex("gamma", 0);
+        instance_size = gamma->shape().elem_cnt();
+        gamma_ptr = gamma->dptr<T>();
+      }
+      if (center) {
+        const user_op::Tensor* beta = ctx->Tensor4ArgNameAndIndex("beta", 0);
+        if (gamma_ptr) {
+          CHECK_EQ(beta->shape().elem_cnt(), instance_size);
+        } else {
+          instance_size = beta->shape().elem_cnt();
+        }
+        beta_ptr = beta->dptr<T>();
+      }
+      CHECK_EQ(y->shape().elem_cnt() % instance_size, 0);
+    }
+    const T* x_ptr = x->dptr<T>();
+    T* y_ptr = y->mut_dptr<T>();
+    T* normalized_ptr = normalized->mut_dptr<T>();
+    T* mean_ptr = mean->mut_dptr<T>();
+    T* inv_variance_ptr = inv_variance->mut_dptr<T>();
+    const int64_t grain_size = ParallelForGrainSize(4 * norm_size);
+    ParallelFor(0, num_instances, grain_size, [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) {
+        const int64_t offset = i * norm_size;
+        const T* x_row = x_ptr + offset;
+        T* normalized_row = normalized_ptr + offset;
+        T sum = GetZeroVal<T>();
+        for (int64_t j = 0; j < norm_size; ++j) { sum += x_row[j]; }
+        const T row_mean = sum / norm_size;
+        T square_sum = GetZeroVal<T>();
+        for (int64_t j = 0; j < norm_size; ++j) {
+          const T diff = x_row[j] - row_mean;
+          square_sum += diff * diff;
+        }
+        const T row_inv_variance = GetOneVal<T>() / std::sqrt(square_sum / norm_size + epsilon);
+        mean_ptr[i] = row_mean;
+        inv_variance_ptr[i] = row_inv_variance;
+        for (int64_t j = 0; j < norm_size; ++j) {
+          normalized_row[j] = (x_row[j] - row_mean) * row_inv_variance;
+        }
+        if (scale || center) {
+          T* y_row = y_ptr + offset;
+          for (int64_t j = 0; j < norm_size; ++j) {
+            const int64_t elem_id = (offset + j) % instance_size;
+            T val = normalized_row[j];
+            if (gamma_ptr) { val *= gamma_ptr[elem_id]; }
+            if (beta_ptr) { val += beta_ptr[elem_id]; }
+            y_row[j] = val;
+          }
+        }
+      }
+    });
+  };
 };
 
 #define REGISTER_LAYER_NORM_CPU_KERNEL(dtype)             \
@@ -45,14 +115,68 @@ class LayerNormGradCpuKernel final : public user_op::OpKernel {
 
  private:
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
-  void Compute(user_op::KernelComputeContext* ctx) const override { TODO(); };
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    const user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    user_op::Tensor* dx = ctx->Tensor4ArgNameAndIndex("dx", 0);
+    const T* add_to_output_ptr = nullptr;
+    if (ctx->has_input("_add_to_output", 0)) {
+      const user_op::Tensor* add_to_output = ctx->Tensor4ArgNameAndIndex("_add_to_output", 0);
+      CHECK_EQ(add_to_output->data_type(), dx->data_type());
+      CHECK_EQ(add_to_output->shape(), dx->shape());
+      add_to_output_ptr = add_to_output->dptr<T>();
+    }
+    const int64_t num_instances = mean->shape().elem_cnt();
+    const int64_t norm_size = x->shape().elem_cnt() / num_instances;
+    const T* dy_ptr = dy->dptr<T>();
+    const T* x_ptr = x->dptr<T>();
+    const T* mean_ptr = mean->dptr<T>();
+    const T* inv_variance_ptr = inv_variance->dptr<T>();
+    T* dx_ptr = dx->mut_dptr<T>();
+    // dx = inv_variance * (dy - mean(dy) - normalized * mean(dy * normalized))
+    const int64_t grain_size = ParallelForGrainSize(4 * norm_size);
+    ParallelFor(0, num_instances, grain_size, [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) {
+        const int64_t offset = i * norm_size;
+        const T* dy_row = dy_ptr + offset;
+        const T* x_row = x_ptr + offset;
+        T* dx_row = dx_ptr + offset;
+        const T row_mean = mean_ptr[i];
+        const T row_inv_variance = inv_variance_ptr[i];
+        T dy_sum = GetZeroVal<T>();
+        T dy_normalized_sum = GetZeroVal<T>();
+        for (int64_t j = 0; j < norm_size; ++j) {
+          dy_sum += dy_row[j];
+          dy_normalized_sum += dy_row[j] * (x_row[j] - row_mean) * row_inv_variance;
+        }
+        const T dy_mean = dy_sum / norm_size;
+        const T dy_normalized_mean = dy_normalized_sum / norm_size;
+        for (int64_t j = 0; j < norm_size; ++j) {
+          const T normalized = (x_row[j] - row_mean) * row_inv_variance;
+          T val = row_inv_variance * (dy_row[j] - dy_mean - normalized * dy_normalized_mean);
+          // dx may share the memory of _add_to_output, which is read before dx is written
+          if (add_to_output_ptr) { val += add_to_output_ptr[offset + j]; }
+          dx_row[j] = val;
+        }
+      }
+    });
+  };
 };
 
-#define REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(dtype)        \
-  REGISTER_USER_KERNEL("layer_norm_grad")                 \
-      .SetCreateFn<LayerNormGradCpuKernel<dtype>>()       \
-      .SetIsMatchedHob((user_op::HobDeviceTag() == "cpu") \
-                       & (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value));
+#define REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(dtype)                                              \
+  REGISTER_USER_KERNEL("layer_norm_grad")                                                       \
+      .SetCreateFn<LayerNormGradCpuKernel<dtype>>()                                             \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == "cpu")                                       \
+                       & (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value))          \
+      .SetInplaceProposalFn([](const user_op::InferContext& ctx,                                \
+                               user_op::AddInplaceArgPair AddInplaceArgPairFn) -> Maybe<void> { \
+        if (ctx.has_input("_add_to_output", 0)) {                                               \
+          OF_RETURN_IF_ERROR(AddInplaceArgPairFn("dx", 0, "_add_to_output", 0, true));          \
+        }                                                                                       \
+        return Maybe<void>::Ok();                                                               \
+      });
 
 REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(float)
 REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(double)
@@ -65,7 +189,69 @@ class LayerNormParamGradCpuKernel final : public user_op::OpKernel {
 
  private:
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
-  void Compute(user_op::KernelComputeContext* ctx) const override { TODO(); };
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    user_op::Tensor* beta_diff = ctx->Tensor4ArgNameAndIndex("beta_diff", 0);
+    user_op::Tensor* gamma_diff = ctx->Tensor4ArgNameAndIndex("gamma_diff", 0);
+    user_op::Tensor* normalized_diff = ctx->Tensor4ArgNameAndIndex("normalized_diff", 0);
+    const user_op::Tensor* gamma = ctx->Tensor4ArgNameAndIndex("gamma", 0);
+    const int64_t begin_params_axis = ctx->Attr<int64_t>("begin_params_axis");
+    const int64_t m = dy->shape().Count(begin_params_axis);
+    CHECK_EQ(dy->shape().elem_cnt() % m, 0);
+    const int64_t n = dy->shape().elem_cnt() / m;
+    const T* dy_ptr = dy->dptr<T>();
+    if (beta_diff != nullptr || gamma_diff != nullptr) {
+      T* beta_diff_ptr = nullptr;
+      T* gamma_diff_ptr = nullptr;
+      const T* normalized_ptr = nullptr;
+      if (beta_diff != nullptr) {
+        CHECK_EQ(m, beta_diff->shape().elem_cnt());
+        beta_diff_ptr = beta_diff->mut_dptr<T>();
+      }
+      if (gamma_diff != nullptr) {
+        CHECK_EQ(m, gamma_diff->shape().elem_cnt());
+        gamma_diff_ptr = gamma_diff->mut_dptr<T>();
+        normalized_ptr = ctx->Tensor4ArgNameAndIndex("normalized", 0)->dptr<T>();
+      }
+      // the columns are split, and every part is summed row by row to read dy contiguously
+      ParallelFor(0, m, ParallelForGrainSize(2 * n), [&](int64_t begin, int64_t end) {
+        for (int64_t j = begin; j < end; ++j) {
+          if (beta_diff_ptr) { beta_diff_ptr[j] = GetZeroVal<T>(); }
+          if (gamma_diff_ptr) { gamma_diff_ptr[j] = GetZeroVal<T>(); }
+        }
+        for (int64_t i = 0; i < n; ++i) {
+          const T* dy_row = dy_ptr + i * m;
+          if (beta_diff_ptr) {
+            for (int64_t j = begin; j < end; ++j) { beta_diff_ptr[j] += dy_row[j]; }
+          }
+          if (gamma_diff_ptr) {
+            const T* normalized_row = normalized_ptr + i * m;
+            for (int64_t j = begin; j < end; ++j) {
+              gamma_diff_ptr[j] += dy_row[j] * normalized_row[j];
+            }
+          }
+        }
+      });
+    }
+    if (normalized_diff != nullptr) {
+      T* normalized_diff_ptr = normalized_diff->mut_dptr<T>();
+      if (gamma != nullptr) {
+        CHECK_EQ(m, gamma->shape().elem_cnt());
+        const T* gamma_ptr = gamma->dptr<T>();
+        ParallelFor(0, n, ParallelForGrainSize(m), [&](int64_t begin, int64_t end) {
+          for (int64_t i = begin; i < end; ++i) {
+            for (int64_t j = 0; j < m; ++j) {
+              normalized_diff_ptr[i * m + j] = dy_ptr[i * m + j] * gamma_ptr[j];
+            }
+          }
+        });
+      } else {
+        Memcpy<DeviceType::kCPU>(ctx->device_ctx(), normalized_diff->mut_dptr<void>(),
+                                 dy->dptr<void>(),
+                                 dy->shape().elem_cnt() * GetSizeOfDataType(dy->data_type()));
+      }
+    }
+  };
 };
 
 #define REGISTER_LAYER_NORM_PARAM_GRAD_CPU_KERNEL(dtype)  \
@@ -15,6 +15,7 @@ limitations under the License.
 */
 #include "oneflow/core/framework/framework.h"
 #include "oneflow/user/kernels/math_unary_elementwise_func.h"
+#include "oneflow/core/thread/parallel_for.h"
 
 namespace oneflow {
 
@@ -32,7 +33,9 @@ class MathUnaryElementwiseCpuKernel final : public user_op::OpKernel {
     T* y = tensor_y->mut_dptr<T>();
     int64_t n = tensor_x->shape().elem_cnt();
     CHECK_LE(n, GetMaxVal<int32_t>() / 2);
-    for (int32_t i = 0; i < n; ++i) { y[i] = UnaryFunctor<T>::Forward(x[i]); }
+    ParallelFor(0, n, ParallelForGrainSize(8), [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) { y[i] = UnaryFunctor<T>::Forward(x[i]); }
+    });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -54,7 +57,9 @@ class MathUnaryElementwiseGradCpuKernel final : public user_op::OpKernel {
     T* dx = tensor_dx->mut_dptr<T>();
     int64_t n = tensor_x->shape().elem_cnt();
     CHECK_LE(n, GetMaxVal<int32_t>() / 2);
-    for (int32_t i = 0; i < n; ++i) { dx[i] = UnaryFunctor<T>::Backward(x[i], dy[i]); }
+    ParallelFor(0, n, ParallelForGrainSize(8), [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) { dx[i] = UnaryFunctor<T>::Backward(x[i], dy[i]); }
+    });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
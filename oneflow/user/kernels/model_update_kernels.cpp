@@ -818,6 +818,193 @@ REGISTER_LARS_UPDATE_KERNEL(DeviceType::kGPU, float, float);
 REGISTER_LARS_UPDATE_KERNEL(DeviceType::kGPU, double, double);
 #endif  // WITH_CUDA
 
+template<DeviceType device_type, typename T, typename G>
+class MultiSGDUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiSGDUpdateKernel() = default;
+  ~MultiSGDUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    const float* learning_rate_ptr = nullptr;
+    if (ctx->has_input("learning_rate", 0)) {
+      const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+      learning_rate_ptr = learning_rate->dptr<float>();
+    }
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      SGDUpdateKernelUtil<device_type, T, G>::Update(
+          ctx->device_ctx(), model->shape().elem_cnt(), static_cast<T>(scale), l1, l2,
+          weight_decay, learning_rate_val, learning_rate_ptr, nullptr, nullptr,
+          model_diff->dptr<G>(), model->mut_dptr<T>());
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_SGD_UPDATE_KERNEL(device, dtype, gtype)                           \
+  REGISTER_USER_KERNEL("multi_sgd_update")                                               \
+      .SetCreateFn<MultiSGDUpdateKernel<device, dtype, gtype>>()                         \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_SGD_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_SGD_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_SGD_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_SGD_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_SGD_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
+template<DeviceType device_type, typename T, typename G>
+class MultiMomentumUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiMomentumUpdateKernel() = default;
+  ~MultiMomentumUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto beta = ctx->Attr<float>("beta");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    const float* learning_rate_ptr = nullptr;
+    if (ctx->has_input("learning_rate", 0)) {
+      const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+      learning_rate_ptr = learning_rate->dptr<float>();
+    }
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      user_op::Tensor* momentum = ctx->Tensor4ArgNameAndIndex("momentum", i);
+      MomentumUpdateKernelUtil<device_type, T, G>::Update(
+          ctx->device_ctx(), model->shape().elem_cnt(), static_cast<T>(scale), l1, l2, beta,
+          weight_decay, learning_rate_val, learning_rate_ptr, nullptr, nullptr,
+          model_diff->dptr<G>(), model->mut_dptr<T>(), momentum->mut_dptr<T>());
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_MOMENTUM_UPDATE_KERNEL(device, dtype, gtype)                      \
+  REGISTER_USER_KERNEL("multi_momentum_update")                                          \
+      .SetCreateFn<MultiMomentumUpdateKernel<device, dtype, gtype>>()                    \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_MOMENTUM_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_MOMENTUM_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_MOMENTUM_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_MOMENTUM_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_MOMENTUM_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
+template<DeviceType device_type, typename T, typename G>
+class MultiAdamUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiAdamUpdateKernel() = default;
+  ~MultiAdamUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto beta1 = ctx->Attr<float>("beta1");
+    const auto beta2 = ctx->Attr<float>("beta2");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      user_op::Tensor* m = ctx->Tensor4ArgNameAndIndex("m", i);
+      user_op::Tensor* v = ctx->Tensor4ArgNameAndIndex("v", i);
+      AdamUpdateKernelUtil<device_type, T, G>::Update(
+          ctx->device_ctx(), model->shape().elem_cnt(), static_cast<T>(scale), l1, l2, beta1,
+          beta2, epsilon, weight_decay, learning_rate->dptr<float>(), nullptr, nullptr,
+          model_diff->dptr<G>(), model->mut_dptr<T>(), m->mut_dptr<T>(), v->mut_dptr<T>());
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_ADAM_UPDATE_KERNEL(device, dtype, gtype)                          \
+  REGISTER_USER_KERNEL("multi_adam_update")                                              \
+      .SetCreateFn<MultiAdamUpdateKernel<device, dtype, gtype>>()                        \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_ADAM_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_ADAM_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_ADAM_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_ADAM_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_ADAM_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
+template<DeviceType device_type, typename T, typename G>
+class MultiRmsPropUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiRmsPropUpdateKernel() = default;
+  ~MultiRmsPropUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto decay_rate = ctx->Attr<float>("decay_rate");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    const auto centered = ctx->Attr<bool>("centered");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      user_op::Tensor* mean_square = ctx->Tensor4ArgNameAndIndex("mean_square", i);
+      T* mean_gradient_ptr = nullptr;
+      if (centered) {
+        user_op::Tensor* mean_gradient = ctx->Tensor4ArgNameAndIndex("mean_gradient", i);
+        mean_gradient_ptr = mean_gradient->mut_dptr<T>();
+      }
+      RmsPropUpdateKernelUtil<device_type, T, G>::Update(
+          ctx->device_ctx(), model->shape().elem_cnt(), static_cast<T>(scale), l1, l2, centered,
+          epsilon, weight_decay, decay_rate, learning_rate->dptr<float>(), nullptr, nullptr,
+          model_diff->dptr<G>(), model->mut_dptr<T>(), mean_square->mut_dptr<T>(),
+          mean_gradient_ptr);
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_RMSPROP_UPDATE_KERNEL(device, dtype, gtype)                       \
+  REGISTER_USER_KERNEL("multi_rmsprop_update")                                           \
+      .SetCreateFn<MultiRmsPropUpdateKernel<device, dtype, gtype>>()                     \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_RMSPROP_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_RMSPROP_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_RMSPROP_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_RMSPROP_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_RMSPROP_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
 }  // namespace
 
 }  // namespace oneflow
@@ -0,0 +1,217 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+
+namespace oneflow {
+
+namespace {
+
+// x is viewed as segments of adjacent axes which are all reduced or all kept, the last segment
+// is iterated contiguously and the others are iterated as rows.
+class MomentsLayout final {
+ public:
+  MomentsLayout(const ShapeView& x_shape, const std::vector<int32_t>& axis) {
+    std::vector<bool> is_reduced(x_shape.NumAxes(), false);
+    for (int32_t a : axis) {
+      if (a < 0) { a += x_shape.NumAxes(); }
+      CHECK_GE(a, 0);
+      CHECK_LT(a, x_shape.NumAxes());
+      is_reduced.at(a) = true;
+    }
+    FOR_RANGE(int64_t, i, 0, x_shape.NumAxes()) {
+      if (!dims_.empty() && is_reduced.at(i) == is_reduced_.back()) {
+        dims_.back() *= x_shape.At(i);
+      } else {
+        dims_.push_back(x_shape.At(i));
+        is_reduced_.push_back(is_reduced.at(i));
+      }
+    }
+    if (dims_.empty()) {
+      dims_.push_back(1);
+      is_reduced_.push_back(true);
+    }
+    reduce_count_ = 1;
+    FOR_RANGE(int64_t, i, 0, dims_.size()) {
+      if (is_reduced_.at(i)) { reduce_count_ *= dims_.at(i); }
+    }
+    // out strides of the row segments
+    out_strides_.resize(dims_.size() - 1);
+    int64_t out_stride = is_reduced_.back() ? 1 : dims_.back();
+    for (int64_t i = static_cast<int64_t>(dims_.size()) - 2; i >= 0; --i) {
+      out_strides_.at(i) = is_reduced_.at(i) ? 0 : out_stride;
+      if (!is_reduced_.at(i)) { out_stride *= dims_.at(i); }
+    }
+    row_num_ = 1;
+    FOR_RANGE(int64_t, i, 0, dims_.size() - 1) { row_num_ *= dims_.at(i); }
+  }
+
+  int64_t reduce_count() const { return reduce_count_; }
+  int64_t row_size() const { return dims_.back(); }
+  bool is_row_reduced() const { return is_reduced_.back(); }
+
+  // Calls fn(x_offset, out_offset) for every row, in the order of the rows in memory.
+  template<typename F>
+  void ForEachRow(const F& fn) const {
+    const int64_t num_row_dims = dims_.size() - 1;
+    std::vector<int64_t> index(num_row_dims, 0);
+    int64_t out_offset = 0;
+    FOR_RANGE(int64_t, row, 0, row_num_) {
+      fn(row * row_size(), out_offset);
+      for (int64_t i = num_row_dims - 1; i >= 0; --i) {
+        index.at(i) += 1;
+        out_offset += out_strides_.at(i);
+        if (index.at(i) < dims_.at(i)) { break; }
+        out_offset -= out_strides_.at(i) * dims_.at(i);
+        index.at(i) = 0;
+      }
+    }
+  }
+
+ private:
+  std::vector<int64_t> dims_;
+  std::vector<bool> is_reduced_;
+  std::vector<int64_t> out_strides_;
+  int64_t reduce_count_;
+  int64_t row_num_;
+};
+
+}  // namespace
+
+// Computes the mean and the variance by merging the statistics of the rows with the parallel
+// algorithm of Chan et al., which is stable for data with a large mean unlike
+// mean(x^2) - mean(x)^2, and reads x once.
+template<typename T>
+class MomentsCpuKernel final : public user_op::OpKernel {
+ public:
+  MomentsCpuKernel() = default;
+  ~MomentsCpuKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    user_op::Tensor* variance = ctx->Tensor4ArgNameAndIndex("variance", 0);
+    const MomentsLayout layout(x->shape(), ctx->Attr<std::vector<int32_t>>("axis"));
+    const int64_t out_size = mean->shape().elem_cnt();
+    CHECK_EQ(out_size * layout.reduce_count(), x->shape().elem_cnt());
+    std::vector<int64_t> counts(out_size, 0);
+    std::vector<double> means(out_size, 0);
+    std::vector<double> m2s(out_size, 0);
+    const T* x_ptr = x->dptr<T>();
+    const int64_t row_size = layout.row_size();
+    if (layout.is_row_reduced()) {
+      layout.ForEachRow([&](int64_t x_offset, int64_t out_offset) {
+        const T* row = x_ptr + x_offset;
+        double sum = 0;
+        for (int64_t i = 0; i < row_size; ++i) { sum += row[i]; }
+        const double row_mean = sum / row_size;
+        double row_m2 = 0;
+        for (int64_t i = 0; i < row_size; ++i) {
+          const double diff = row[i] - row_mean;
+          row_m2 += diff * diff;
+        }
+        const int64_t count = counts[out_offset] + row_size;
+        const double delta = row_mean - means[out_offset];
+        const double row_ratio = static_cast<double>(row_size) / count;
+        means[out_offset] += delta * row_ratio;
+        m2s[out_offset] += row_m2 + delta * delta * counts[out_offset] * row_ratio;
+        counts[out_offset] = count;
+      });
+    } else {
+      // every output of a kept row gets one more element, so they share the count
+      layout.ForEachRow([&](int64_t x_offset, int64_t out_offset) {
+        const T* row = x_ptr + x_offset;
+        const double inv_count = 1.0 / (counts[out_offset] + 1);
+        for (int64_t i = 0; i < row_size; ++i) {
+          const double delta = row[i] - means[out_offset + i];
+          means[out_offset + i] += delta * inv_count;
+          m2s[out_offset + i] += delta * (row[i] - means[out_offset + i]);
+        }
+        counts[out_offset] += 1;
+      });
+    }
+    const int64_t ddof = ctx->Attr<bool>("unbiased") ? 1 : 0;
+    const double inv_divisor = 1.0 / (layout.reduce_count() - ddof);
+    FOR_RANGE(int64_t, i, 0, out_size) {
+      mean->mut_dptr<T>()[i] = static_cast<T>(means[i]);
+      variance->mut_dptr<T>()[i] = static_cast<T>(m2s[i] * inv_divisor);
+    }
+  }
+
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_MOMENTS_CPU_KERNEL(dtype)                \
+  REGISTER_USER_KERNEL("moments")                         \
+      .SetCreateFn<MomentsCpuKernel<dtype>>()             \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == "cpu") \
+                       & (user_op::HobDataType("mean", 0) == GetDataType<dtype>::value));
+
+REGISTER_MOMENTS_CPU_KERNEL(float)
+REGISTER_MOMENTS_CPU_KERNEL(double)
+
+#undef REGISTER_MOMENTS_CPU_KERNEL
+
+// dx = mean_diff / n + variance_diff * 2 * (x - mean) / (n - ddof)
+template<typename T>
+class MomentsGradCpuKernel final : public user_op::OpKernel {
+ public:
+  MomentsGradCpuKernel() = default;
+  ~MomentsGradCpuKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    const user_op::Tensor* mean_diff = ctx->Tensor4ArgNameAndIndex("mean_diff", 0);
+    const user_op::Tensor* variance_diff = ctx->Tensor4ArgNameAndIndex("variance_diff", 0);
+    user_op::Tensor* dx = ctx->Tensor4ArgNameAndIndex("dx", 0);
+    const MomentsLayout layout(x->shape(), ctx->Attr<std::vector<int32_t>>("axis"));
+    const int64_t ddof = ctx->Attr<bool>("unbiased") ? 1 : 0;
+    const T mean_scale = static_cast<T>(1.0 / layout.reduce_count());
+    const T variance_scale = static_cast<T>(2.0 / (layout.reduce_count() - ddof));
+    const T* x_ptr = x->dptr<T>();
+    const T* mean_ptr = mean->dptr<T>();
+    const T* mean_diff_ptr = mean_diff->dptr<T>();
+    const T* variance_diff_ptr = variance_diff->dptr<T>();
+    T* dx_ptr = dx->mut_dptr<T>();
+    const int64_t row_size = layout.row_size();
+    const int64_t out_step = layout.is_row_reduced() ? 0 : 1;
+    layout.ForEachRow([&](int64_t x_offset, int64_t out_offset) {
+      for (int64_t i = 0; i < row_size; ++i) {
+        const int64_t o = out_offset + i * out_step;
+        dx_ptr[x_offset + i] = mean_diff_ptr[o] * mean_scale
+                               + variance_diff_ptr[o] * variance_scale
+                                     * (x_ptr[x_offset + i] - mean_ptr[o]);
+      }
+    });
+  }
+
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_MOMENTS_GRAD_CPU_KERNEL(dtype)           \
+  REGISTER_USER_KERNEL("moments_grad")                    \
+      .SetCreateFn<MomentsGradCpuKernel<dtype>>()         \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == "cpu") \
+                       & (user_op::HobDataType("dx", 0) == GetDataType<dtype>::value));
+
+REGISTER_MOMENTS_GRAD_CPU_KERNEL(float)
+REGISTER_MOMENTS_GRAD_CPU_KERNEL(double)
+
+#undef REGISTER_MOMENTS_GRAD_CPU_KERNEL
+
+}  // namespace oneflow
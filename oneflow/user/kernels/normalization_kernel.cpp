@@ -0,0 +1,307 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+
+namespace oneflow {
+
+namespace {
+
+// x is viewed as (outer_size, channel_size, inner_size), where channel_size is the size of axis
+struct NormalizationShape {
+  NormalizationShape(const ShapeView& x_shape, int32_t axis)
+      : outer_size(x_shape.Count(0, axis)),
+        channel_size(x_shape.At(axis)),
+        inner_size(x_shape.Count(axis + 1)) {}
+
+  int64_t outer_size;
+  int64_t channel_size;
+  int64_t inner_size;
+};
+
+// Statistics of the elements of a channel, merged by the parallel algorithm of Chan et al.
+struct WelfordStats {
+  int64_t count = 0;
+  double mean = 0;
+  double m2 = 0;
+
+  void Merge(int64_t other_count, double other_mean, double other_m2) {
+    if (other_count == 0) { return; }
+    const int64_t merged_count = count + other_count;
+    const double delta = other_mean - mean;
+    const double other_ratio = static_cast<double>(other_count) / merged_count;
+    mean += delta * other_ratio;
+    m2 += other_m2 + delta * delta * count * other_ratio;
+    count = merged_count;
+  }
+};
+
+// The inner_size elements of a channel in a row are contiguous, their statistics are computed
+// while they stay in cache and then merged, so that x is read from memory once.
+template<typename T>
+WelfordStats ComputeChannelStats(const T* x, const NormalizationShape& shape, int64_t channel) {
+  WelfordStats stats;
+  for (int64_t o = 0; o < shape.outer_size; ++o) {
+    const T* row = x + (o * shape.channel_size + channel) * shape.inner_size;
+    double sum = 0;
+    for (int64_t i = 0; i < shape.inner_size; ++i) { sum += row[i]; }
+    const double row_mean = sum / shape.inner_size;
+    double row_m2 = 0;
+    for (int64_t i = 0; i < shape.inner_size; ++i) {
+      const double diff = row[i] - row_mean;
+      row_m2 += diff * diff;
+    }
+    stats.Merge(shape.inner_size, row_mean, row_m2);
+  }
+  return stats;
+}
+
+// y = x * scale + shift, where scale and shift fold the normalization and the affine transform
+template<typename T>
+void ApplyChannelScaleShift(const T* x, const T* add_to_output, T* y,
+                            const NormalizationShape& shape, int64_t channel, T scale, T shift) {
+  for (int64_t o = 0; o < shape.outer_size; ++o) {
+    const int64_t offset = (o * shape.channel_size + channel) * shape.inner_size;
+    const T* x_row = x + offset;
+    T* y_row = y + offset;
+    if (add_to_output != nullptr) {
+      const T* add_to_output_row = add_to_output + offset;
+      for (int64_t i = 0; i < shape.inner_size; ++i) {
+        y_row[i] = x_row[i] * scale + shift + add_to_output_row[i];
+      }
+    } else {
+      for (int64_t i = 0; i < shape.inner_size; ++i) { y_row[i] = x_row[i] * scale + shift; }
+    }
+  }
+}
+
+template<typename T>
+const T* GetAddToOutputPtr(user_op::KernelComputeContext* ctx, const user_op::Tensor* y) {
+  if (!ctx->has_input("_add_to_output", 0)) { return nullptr; }
+  const user_op::Tensor* add_to_output = ctx->Tensor4ArgNameAndIndex("_add_to_output", 0);
+  CHECK_EQ(add_to_output->data_type(), y->data_type());
+  CHECK_EQ(add_to_output->shape(), y->shape());
+  return add_to_output->dptr<T>();
+}
+
+void CheckParamTensor(const user_op::Tensor* tensor, int64_t channel_size, DataType data_type) {
+  CHECK_EQ(tensor->shape().NumAxes(), 1);
+  CHECK_EQ(tensor->shape().At(0), channel_size);
+  CHECK_EQ(tensor->data_type(), data_type);
+}
+
+}  // namespace
+
+template<typename T>
+class NormalizationInferenceCpuKernel final : public user_op::OpKernel {
+ public:
+  NormalizationInferenceCpuKernel() = default;
+  ~NormalizationInferenceCpuKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    CHECK(!ctx->Attr<bool>("training"));
+    const auto* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    auto* y = ctx->Tensor4ArgNameAndIndex("y", 0);
+    const auto* gamma = ctx->Tensor4ArgNameAndIndex("gamma", 0);
+    const auto* beta = ctx->Tensor4ArgNameAndIndex("beta", 0);
+    const auto* moving_mean = ctx->Tensor4ArgNameAndIndex("moving_mean", 0);
+    const auto* moving_variance = ctx->Tensor4ArgNameAndIndex("moving_variance", 0);
+    const auto axis = ctx->Attr<int32_t>("axis");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    CHECK_EQ(x->shape(), y->shape());
+    CHECK_GE(axis, 0);
+    CHECK_LT(axis, x->shape().NumAxes());
+    const NormalizationShape shape(x->shape(), axis);
+    CheckParamTensor(gamma, shape.channel_size, x->data_type());
+    CheckParamTensor(beta, shape.channel_size, x->data_type());
+    CheckParamTensor(moving_mean, shape.channel_size, x->data_type());
+    CheckParamTensor(moving_variance, shape.channel_size, x->data_type());
+
+    const T* add_to_output = GetAddToOutputPtr<T>(ctx, y);
+    FOR_RANGE(int64_t, c, 0, shape.channel_size) {
+      const double inv_std = 1.0 / std::sqrt(moving_variance->dptr<T>()[c] + epsilon);
+      const double scale = gamma->dptr<T>()[c] * inv_std;
+      const double shift = beta->dptr<T>()[c] - moving_mean->dptr<T>()[c] * scale;
+      ApplyChannelScaleShift<T>(x->dptr<T>(), add_to_output, y->mut_dptr<T>(), shape, c,
+                                static_cast<T>(scale), static_cast<T>(shift));
+    }
+  }
+
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_BN_INFERENCE_CPU_KERNEL(dtype)                                     \
+  REGISTER_USER_KERNEL("normalization")                                             \
+      .SetCreateFn<NormalizationInferenceCpuKernel<dtype>>()                        \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == "cpu")                           \
+                       & (user_op::HobDataType("y", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobAttr<bool>("training") == false));
+
+REGISTER_BN_INFERENCE_CPU_KERNEL(float)
+REGISTER_BN_INFERENCE_CPU_KERNEL(double)
+
+#undef REGISTER_BN_INFERENCE_CPU_KERNEL
+
+// Computes the mean and the variance of every channel in one sweep over x, updates the moving
+// statistics in place, and normalizes x with the affine transform in another sweep.
+template<typename T>
+class NormalizationTrainCpuKernel final : public user_op::OpKernel {
+ public:
+  NormalizationTrainCpuKernel() = default;
+  ~NormalizationTrainCpuKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    CHECK(ctx->Attr<bool>("training"));
+    const auto* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    auto* y = ctx->Tensor4ArgNameAndIndex("y", 0);
+    const auto* gamma = ctx->Tensor4ArgNameAndIndex("gamma", 0);
+    const auto* beta = ctx->Tensor4ArgNameAndIndex("beta", 0);
+    auto* moving_mean = ctx->Tensor4ArgNameAndIndex("moving_mean", 0);
+    auto* moving_variance = ctx->Tensor4ArgNameAndIndex("moving_variance", 0);
+    auto* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    auto* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    const auto axis = ctx->Attr<int32_t>("axis");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    const auto momentum = ctx->Attr<float>("momentum");
+    CHECK_EQ(x->shape(), y->shape());
+    CHECK_GE(axis, 0);
+    CHECK_LT(axis, x->shape().NumAxes());
+    const NormalizationShape shape(x->shape(), axis);
+    CheckParamTensor(gamma, shape.channel_size, x->data_type());
+    CheckParamTensor(beta, shape.channel_size, x->data_type());
+    CheckParamTensor(moving_mean, shape.channel_size, x->data_type());
+    CheckParamTensor(moving_variance, shape.channel_size, x->data_type());
+    CheckParamTensor(mean, shape.channel_size, x->data_type());
+    CheckParamTensor(inv_variance, shape.channel_size, x->data_type());
+
+    const T* add_to_output = GetAddToOutputPtr<T>(ctx, y);
+    FOR_RANGE(int64_t, c, 0, shape.channel_size) {
+      const WelfordStats stats = ComputeChannelStats<T>(x->dptr<T>(), shape, c);
+      CHECK_GT(stats.count, 0);
+      const double variance = stats.m2 / stats.count;
+      const double inv_std = 1.0 / std::sqrt(variance + epsilon);
+      mean->mut_dptr<T>()[c] = static_cast<T>(stats.mean);
+      inv_variance->mut_dptr<T>()[c] = static_cast<T>(inv_std);
+      // same as cudnn, the moving variance is updated by the unbiased variance
+      const double unbiased_variance = stats.count > 1 ? stats.m2 / (stats.count - 1) : variance;
+      T* moving_mean_ptr = moving_mean->mut_dptr<T>() + c;
+      T* moving_variance_ptr = moving_variance->mut_dptr<T>() + c;
+      *moving_mean_ptr = static_cast<T>(momentum * *moving_mean_ptr + (1 - momentum) * stats.mean);
+      *moving_variance_ptr =
+          static_cast<T>(momentum * *moving_variance_ptr + (1 - momentum) * unbiased_variance);
+
+      const double scale = gamma->dptr<T>()[c] * inv_std;
+      const double shift = beta->dptr<T>()[c] - stats.mean * scale;
+      ApplyChannelScaleShift<T>(x->dptr<T>(), add_to_output, y->mut_dptr<T>(), shape, c,
+                                static_cast<T>(scale), static_cast<T>(shift));
+    }
+  }
+
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_BN_TRAIN_CPU_KERNEL(dtype)                                         \
+  REGISTER_USER_KERNEL("normalization")                                             \
+      .SetCreateFn<NormalizationTrainCpuKernel<dtype>>()                            \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == "cpu")                           \
+                       & (user_op::HobDataType("y", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobAttr<bool>("training") == true));
+
+REGISTER_BN_TRAIN_CPU_KERNEL(float)
+REGISTER_BN_TRAIN_CPU_KERNEL(double)
+
+#undef REGISTER_BN_TRAIN_CPU_KERNEL
+
+// dx = gamma * inv_variance / n * (n * dy - sum(dy) - x_hat * sum(dy * x_hat)),
+// where x_hat = (x - mean) * inv_variance
+template<typename T>
+class NormalizationGradCpuKernel final : public user_op::OpKernel {
+ public:
+  NormalizationGradCpuKernel() = default;
+  ~NormalizationGradCpuKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const auto* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const auto* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const auto* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    const auto* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    const auto* gamma = ctx->Tensor4ArgNameAndIndex("gamma", 0);
+    auto* gamma_diff = ctx->Tensor4ArgNameAndIndex("gamma_diff", 0);
+    auto* beta_diff = ctx->Tensor4ArgNameAndIndex("beta_diff", 0);
+    auto* dx = ctx->Tensor4ArgNameAndIndex("dx", 0);
+    const auto axis = ctx->Attr<int32_t>("axis");
+    CHECK_EQ(dy->shape(), x->shape());
+    CHECK_EQ(dx->shape(), x->shape());
+    CHECK_GE(axis, 0);
+    CHECK_LT(axis, x->shape().NumAxes());
+    const NormalizationShape shape(x->shape(), axis);
+    CheckParamTensor(mean, shape.channel_size, x->data_type());
+    CheckParamTensor(inv_variance, shape.channel_size, x->data_type());
+    CheckParamTensor(gamma, shape.channel_size, x->data_type());
+    CheckParamTensor(gamma_diff, shape.channel_size, x->data_type());
+    CheckParamTensor(beta_diff, shape.channel_size, x->data_type());
+
+    const int64_t count = shape.outer_size * shape.inner_size;
+    FOR_RANGE(int64_t, c, 0, shape.channel_size) {
+      const double channel_mean = mean->dptr<T>()[c];
+      const double channel_inv_variance = inv_variance->dptr<T>()[c];
+      double sum_dy = 0;
+      double sum_dy_x_hat = 0;
+      for (int64_t o = 0; o < shape.outer_size; ++o) {
+        const int64_t offset = (o * shape.channel_size + c) * shape.inner_size;
+        const T* x_row = x->dptr<T>() + offset;
+        const T* dy_row = dy->dptr<T>() + offset;
+        for (int64_t i = 0; i < shape.inner_size; ++i) {
+          sum_dy += dy_row[i];
+          sum_dy_x_hat += dy_row[i] * (x_row[i] - channel_mean) * channel_inv_variance;
+        }
+      }
+      gamma_diff->mut_dptr<T>()[c] = static_cast<T>(sum_dy_x_hat);
+      beta_diff->mut_dptr<T>()[c] = static_cast<T>(sum_dy);
+
+      const double scale = gamma->dptr<T>()[c] * channel_inv_variance;
+      const double mean_dy = sum_dy / count;
+      const double mean_dy_x_hat = sum_dy_x_hat / count;
+      for (int64_t o = 0; o < shape.outer_size; ++o) {
+        const int64_t offset = (o * shape.channel_size + c) * shape.inner_size;
+        const T* x_row = x->dptr<T>() + offset;
+        const T* dy_row = dy->dptr<T>() + offset;
+        T* dx_row = dx->mut_dptr<T>() + offset;
+        for (int64_t i = 0; i < shape.inner_size; ++i) {
+          const double x_hat = (x_row[i] - channel_mean) * channel_inv_variance;
+          dx_row[i] = static_cast<T>(scale * (dy_row[i] - mean_dy - x_hat * mean_dy_x_hat));
+        }
+      }
+    }
+  }
+
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_BN_GRAD_CPU_KERNEL(dtype)                \
+  REGISTER_USER_KERNEL("normalization_grad")              \
+      .SetCreateFn<NormalizationGradCpuKernel<dtype>>()   \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == "cpu") \
+                       & (user_op::HobDataType("dx", 0) == GetDataType<dtype>::value));
+
+REGISTER_BN_GRAD_CPU_KERNEL(float)
+REGISTER_BN_GRAD_CPU_KERNEL(double)
+
+#undef REGISTER_BN_GRAD_CPU_KERNEL
+
+}  // namespace oneflow
@@ -14,7 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/user/kernels/softmax_kernel_util.h"
-#include "oneflow/core/ndarray/ndarray_util.h"
+#include "oneflow/core/thread/parallel_for.h"
 
 namespace oneflow {
 
@@ -49,58 +49,47 @@ struct SoftmaxKernelUtil<DeviceType::kCPU, T> {
 
   static void ComputeProb(DeviceCtx* ctx, const int64_t n, const int64_t w, const T* in, T* prob,
                           void* temp_storage, const size_t temp_storage_bytes) {
-    auto Val = NdarrayUtil<DeviceType::kCPU, T>::GetValNdarrayBuilder();
-    auto Var = NdarrayUtil<DeviceType::kCPU, T>::GetVarNdarrayBuilder();
     const size_t min_temp_storage_bytes =
         SoftmaxKernelUtil<DeviceType::kCPU, T>::GetComputeProbTempStorageSizeInBytes(n, w);
     CHECK_GE(temp_storage_bytes, min_temp_storage_bytes);
-    const size_t reduce_temp_storage_bytes = GetReduceTempStorageSize<T>(n, w);
-    T* reduce_storage = reinterpret_cast<T*>(temp_storage);
-    auto reduce_storage_var =
-        Var({static_cast<int64_t>(reduce_temp_storage_bytes / sizeof(T))}, reduce_storage);
-    T* tmp = reinterpret_cast<T*>(reinterpret_cast<unsigned char*>(temp_storage)
-                                  + reduce_temp_storage_bytes);
-    // max | tmp[i] = Max_j(in[i][j])
-    NdarrayUtil<DeviceType::kCPU, T>::ReduceMax(ctx, Var({n, 1}, tmp), Val({n, w}, in),
-                                                reduce_storage_var);
-    // sub | prob[i][j] = in[i][j] - tmp[i]
-    NdarrayUtil<DeviceType::kCPU, T>::BroadcastSub(ctx, Var({n, w}, prob), Val({n, w}, in),
-                                                   Val({n, 1}, tmp));
-    // exp | prob[i][j] = exp(prob[i][j])
-    NdarrayUtil<DeviceType::kCPU, T>::InplaceExp(ctx, Var({n, w}, prob));
-    // sum | tmp[i] = Sum_j(prob[i][j])
-    NdarrayUtil<DeviceType::kCPU, T>::ReduceSum(ctx, Var({n, 1}, tmp), Val({n, w}, prob),
-                                                reduce_storage_var);
-    // div | prob[i][j] /= tmp[i]
-    NdarrayUtil<DeviceType::kCPU, T>::InplaceBroadcastDiv(ctx, Var({n, w}, prob), Val({n, 1}, tmp));
+    // the rows are computed in parallel, and a row is done in three passes over it
+    ParallelFor(0, n, ParallelForGrainSize(4 * w), [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) {
+        const T* in_row = in + i * w;
+        T* prob_row = prob + i * w;
+        // max | max_val = Max_j(in[i][j])
+        T max_val = in_row[0];
+        for (int64_t j = 1; j < w; ++j) { max_val = std::max(max_val, in_row[j]); }
+        // exp and sum | prob[i][j] = exp(in[i][j] - max_val), sum = Sum_j(prob[i][j])
+        T sum = GetZeroVal<T>();
+        for (int64_t j = 0; j < w; ++j) {
+          prob_row[j] = std::exp(in_row[j] - max_val);
+          sum += prob_row[j];
+        }
+        // div | prob[i][j] /= sum
+        for (int64_t j = 0; j < w; ++j) { prob_row[j] /= sum; }
+      }
+    });
   }
 
   static void ComputeDiff(DeviceCtx* ctx, const int64_t n, const int64_t w, const T* dy,
                           const T* out, T* dx, void* temp_storage,
                           const size_t temp_storage_bytes) {
-    auto Val = NdarrayUtil<DeviceType::kCPU, T>::GetValNdarrayBuilder();
-    auto Var = NdarrayUtil<DeviceType::kCPU, T>::GetVarNdarrayBuilder();
     const size_t min_temp_storage_bytes =
         SoftmaxKernelUtil<DeviceType::kCPU, T>::GetComputeProbTempStorageSizeInBytes(n, w);
     CHECK_GE(temp_storage_bytes, min_temp_storage_bytes);
-    const size_t reduce_temp_storage_bytes = GetReduceTempStorageSize<T>(n, w);
-    T* reduce_storage = reinterpret_cast<T*>(temp_storage);
-    auto reduce_storage_var =
-        Var({static_cast<int64_t>(reduce_temp_storage_bytes / sizeof(T))}, reduce_storage);
-    T* sum_vec = reinterpret_cast<T*>(reinterpret_cast<unsigned char*>(temp_storage)
-                                      + reduce_temp_storage_bytes);
-    // it's safe to use dx as tmp
-    // dot product | get dot product sum_vec[i] from out[i] * dy[i]
-    T* tmp = dx;
-    NdarrayUtil<DeviceType::kCPU, T>::Mul(ctx, Var({n * w}, tmp), Val({n * w}, out),
-                                          Val({n * w}, dy));
-    NdarrayUtil<DeviceType::kCPU, T>::ReduceSum(ctx, Var({n, 1}, sum_vec), Val({n, w}, tmp),
-                                                reduce_storage_var);
-    // sub | dx[i][j] = dy[i][j] - sum_vec[i]
-    NdarrayUtil<DeviceType::kCPU, T>::BroadcastSub(ctx, Var({n, w}, dx), Val({n, w}, dy),
-                                                   Val({n, 1}, sum_vec));
-    // elementwise multiplication | dx[i][j] *= out[i][j]
-    NdarrayUtil<DeviceType::kCPU, T>::InplaceMul(ctx, Var({n * w}, dx), Val({n * w}, out));
+    ParallelFor(0, n, ParallelForGrainSize(2 * w), [&](int64_t begin, int64_t end) {
+      for (int64_t i = begin; i < end; ++i) {
+        const T* dy_row = dy + i * w;
+        const T* out_row = out + i * w;
+        T* dx_row = dx + i * w;
+        // dot product | dot = Sum_j(out[i][j] * dy[i][j])
+        T dot = GetZeroVal<T>();
+        for (int64_t j = 0; j < w; ++j) { dot += out_row[j] * dy_row[j]; }
+        // dx[i][j] = (dy[i][j] - dot) * out[i][j]
+        for (int64_t j = 0; j < w; ++j) { dx_row[j] = (dy_row[j] - dot) * out_row[j]; }
+      }
+    });
   }
 };
 
@@ -292,6 +292,78 @@ void LambInputArgModifyFn(const user_op::GetInputArgModifier& GetInputArgModifie
   SetInputArgModifierMutable(GetInputArgModifierFn, "beta2_t", 0);
 }
 
+Maybe<void> CheckMultiTensorArgsLike(user_op::InferContext* ctx,
+                                     const std::vector<std::string>& arg_names,
+                                     bool check_data_type) {
+  const int32_t num_tensors = ctx->input_size("model");
+  for (const std::string& arg_name : arg_names) {
+    if (!ctx->has_input(arg_name, 0)) { continue; }
+    CHECK_EQ_OR_RETURN(ctx->input_size(arg_name), num_tensors) << arg_name;
+    FOR_RANGE(int32_t, i, 0, num_tensors) {
+      const user_op::TensorDesc* model = ctx->TensorDesc4ArgNameAndIndex("model", i);
+      const user_op::TensorDesc* like = ctx->TensorDesc4ArgNameAndIndex(arg_name, i);
+      if (check_data_type) {
+        JUST(CheckDataTypeLike(like, model));
+      } else {
+        JUST(CheckShapeLike(like, model));
+      }
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+user_op::TensorDescInferFn MakeInferMultiTensorUpdateTensorDescFn(
+    const std::vector<std::string>& state_names) {
+  return [state_names](user_op::InferContext* ctx) -> Maybe<void> {
+    std::vector<std::string> arg_names{"model_diff"};
+    arg_names.insert(arg_names.end(), state_names.begin(), state_names.end());
+    JUST(CheckMultiTensorArgsLike(ctx, arg_names, false));
+    JUST(CheckLearningRateShape(ctx));
+    return Maybe<void>::Ok();
+  };
+}
+
+user_op::DataTypeInferFn MakeInferMultiTensorUpdateDataTypeFn(
+    const std::vector<std::string>& state_names) {
+  return [state_names](user_op::InferContext* ctx) -> Maybe<void> {
+    const DataType data_type = ctx->TensorDesc4ArgNameAndIndex("model", 0)->data_type();
+    FOR_RANGE(int32_t, i, 1, ctx->input_size("model")) {
+      CHECK_EQ_OR_RETURN(ctx->TensorDesc4ArgNameAndIndex("model", i)->data_type(), data_type);
+    }
+    const DataType diff_data_type = ctx->TensorDesc4ArgNameAndIndex("model_diff", 0)->data_type();
+    FOR_RANGE(int32_t, i, 1, ctx->input_size("model_diff")) {
+      CHECK_EQ_OR_RETURN(ctx->TensorDesc4ArgNameAndIndex("model_diff", i)->data_type(),
+                         diff_data_type);
+    }
+    JUST(CheckMultiTensorArgsLike(ctx, state_names, true));
+    JUST(CheckLearningRateDataType(ctx));
+    return Maybe<void>::Ok();
+  };
+}
+
+user_op::InputArgModifyFn MakeMultiTensorUpdateInputArgModifyFn(
+    const std::vector<std::string>& state_names) {
+  return [state_names](const user_op::GetInputArgModifier& GetInputArgModifierFn,
+                       const user_op::UserOpConfWrapper& conf) -> void {
+    FOR_RANGE(int32_t, i, 0, conf.input_size("model")) {
+      SetInputArgModifierMutable(GetInputArgModifierFn, "model", i);
+    }
+    for (const std::string& state_name : state_names) {
+      if (!conf.has_input(state_name, 0)) { continue; }
+      FOR_RANGE(int32_t, i, 0, conf.input_size(state_name)) {
+        SetInputArgModifierMutable(GetInputArgModifierFn, state_name, i);
+      }
+    }
+  };
+}
+
+// multi tensor update ops apply the same hyper-parameters to a bucket of models of the same
+// data type on the same device, tensors of different shapes can not share a split axis
+Maybe<void> GetMultiTensorUpdateSbpSignatures(user_op::SbpContext* ctx) {
+  ctx->NewBuilder().Broadcast(ctx->inputs()).Build();
+  return Maybe<void>::Ok();
+}
+
 Maybe<void> InferRmsPropUpdateTensorDesc(user_op::InferContext* ctx) {
   const user_op::TensorDesc* model = ctx->TensorDesc4ArgNameAndIndex("model", 0);
 
@@ -691,6 +763,75 @@ REGISTER_USER_OP("lars_update")
     })
     .SetDataTypeInferFn(InferLarsUpdateDataType);
 
+REGISTER_USER_OP("multi_sgd_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .OptionalInput("learning_rate")
+    .Attr<float>("learning_rate_val", 0.0)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn(MakeInferMultiTensorUpdateTensorDescFn({}))
+    .SetGetSbpFn(GetMultiTensorUpdateSbpSignatures)
+    .SetInputArgModifyFn(MakeMultiTensorUpdateInputArgModifyFn({}))
+    .SetDataTypeInferFn(MakeInferMultiTensorUpdateDataTypeFn({}));
+
+REGISTER_USER_OP("multi_momentum_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .InputWithMinimum("momentum", 1)
+    .OptionalInput("learning_rate")
+    .Attr<float>("learning_rate_val", 0.0)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<float>("beta", 0.9)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn(MakeInferMultiTensorUpdateTensorDescFn({"momentum"}))
+    .SetGetSbpFn(GetMultiTensorUpdateSbpSignatures)
+    .SetInputArgModifyFn(MakeMultiTensorUpdateInputArgModifyFn({"momentum"}))
+    .SetDataTypeInferFn(MakeInferMultiTensorUpdateDataTypeFn({"momentum"}));
+
+REGISTER_USER_OP("multi_adam_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .Input("learning_rate")
+    .InputWithMinimum("m", 1)
+    .InputWithMinimum("v", 1)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<float>("beta1", 0.9)
+    .Attr<float>("beta2", 0.999)
+    .Attr<float>("epsilon", 1e-8)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn(MakeInferMultiTensorUpdateTensorDescFn({"m", "v"}))
+    .SetGetSbpFn(GetMultiTensorUpdateSbpSignatures)
+    .SetInputArgModifyFn(MakeMultiTensorUpdateInputArgModifyFn({"m", "v"}))
+    .SetDataTypeInferFn(MakeInferMultiTensorUpdateDataTypeFn({"m", "v"}));
+
+REGISTER_USER_OP("multi_rmsprop_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .Input("learning_rate")
+    .InputWithMinimum("mean_square", 1)
+    .OptionalInputWithMinimum("mean_gradient", 1)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<bool>("centered", false)
+    .Attr<float>("epsilon", 1e-8)
+    .Attr<float>("decay_rate", 0.99)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      if (ctx->Attr<bool>("centered")) { CHECK_OR_RETURN(ctx->has_input("mean_gradient", 0)); }
+      return MakeInferMultiTensorUpdateTensorDescFn({"mean_square", "mean_gradient"})(ctx);
+    })
+    .SetGetSbpFn(GetMultiTensorUpdateSbpSignatures)
+    .SetInputArgModifyFn(MakeMultiTensorUpdateInputArgModifyFn({"mean_square", "mean_gradient"}))
+    .SetDataTypeInferFn(MakeInferMultiTensorUpdateDataTypeFn({"mean_square", "mean_gradient"}));
+
 }  // namespace
 
 }  // namespace oneflow
@@ -0,0 +1,170 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/operator/reduce_sbp_util.h"
+
+namespace oneflow {
+
+namespace {
+
+Maybe<void> InferMomentsTensorDesc(user_op::InferContext* ctx) {
+  const Shape* x_shape = ctx->Shape4ArgNameAndIndex("x", 0);
+  const auto& reduce_axes = ctx->Attr<std::vector<int32_t>>("axis");
+  CHECK_OR_RETURN(!reduce_axes.empty());
+  const AxisVector reduce_axes_vec = {reduce_axes.begin(), reduce_axes.end()};
+  const Shape& reduce_shape = CreateReducedShape(*x_shape, reduce_axes_vec);
+  const Shape& out_shape =
+      ctx->Attr<bool>("keepdims") ? reduce_shape : reduce_shape.RemoveOnes(reduce_axes_vec);
+  *ctx->Shape4ArgNameAndIndex("mean", 0) = out_shape;
+  *ctx->Shape4ArgNameAndIndex("variance", 0) = out_shape;
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> InferMomentsDataType(user_op::InferContext* ctx) {
+  const DataType data_type = *ctx->Dtype4ArgNameAndIndex("x", 0);
+  *ctx->Dtype4ArgNameAndIndex("mean", 0) = data_type;
+  *ctx->Dtype4ArgNameAndIndex("variance", 0) = data_type;
+  return Maybe<void>::Ok();
+}
+
+// the variance is not linear in x, so only the kept axes are split
+Maybe<void> GetMomentsSbp(user_op::SbpContext* ctx) {
+  const auto& x = ctx->LogicalTensorDesc4InputArgNameAndIndex("x", 0);
+  const int64_t num_axes = x.shape().NumAxes();
+  const bool keepdims = ctx->Attr<bool>("keepdims");
+  HashSet<int32_t> conf_axes;
+  ReduceSbpUtil::GetRegularAxes(num_axes, ctx->Attr<std::vector<int32_t>>("axis"), &conf_axes);
+  auto IsReducedAxis = ReduceSbpUtil::MakePredicatorIsReducedAxis(conf_axes, num_axes);
+  int32_t num_reduced_axes = 0;
+  FOR_RANGE(int64_t, i, 0, num_axes) {
+    if (IsReducedAxis(i)) {
+      num_reduced_axes += 1;
+    } else {
+      ctx->NewBuilder()
+          .Split(ctx->inputs(), i)
+          .Split(ctx->outputs(), keepdims ? i : i - num_reduced_axes)
+          .Build();
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> InferMomentsGradTensorDesc(user_op::InferContext* ctx) {
+  const Shape* x_shape = ctx->Shape4ArgNameAndIndex("x", 0);
+  const Shape* mean_shape = ctx->Shape4ArgNameAndIndex("mean", 0);
+  CHECK_EQ_OR_RETURN(*ctx->Shape4ArgNameAndIndex("mean_diff", 0), *mean_shape);
+  CHECK_EQ_OR_RETURN(*ctx->Shape4ArgNameAndIndex("variance_diff", 0), *mean_shape);
+  *ctx->Shape4ArgNameAndIndex("dx", 0) = *x_shape;
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> InferMomentsGradDataType(user_op::InferContext* ctx) {
+  const DataType data_type = *ctx->Dtype4ArgNameAndIndex("x", 0);
+  CHECK_EQ_OR_RETURN(*ctx->Dtype4ArgNameAndIndex("mean_diff", 0), data_type);
+  CHECK_EQ_OR_RETURN(*ctx->Dtype4ArgNameAndIndex("variance_diff", 0), data_type);
+  *ctx->Dtype4ArgNameAndIndex("dx", 0) = data_type;
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> GetMomentsGradSbp(user_op::SbpContext* ctx) {
+  const auto& x = ctx->LogicalTensorDesc4InputArgNameAndIndex("x", 0);
+  const int64_t num_axes = x.shape().NumAxes();
+  const bool keepdims = ctx->Attr<bool>("keepdims");
+  HashSet<int32_t> conf_axes;
+  ReduceSbpUtil::GetRegularAxes(num_axes, ctx->Attr<std::vector<int32_t>>("axis"), &conf_axes);
+  auto IsReducedAxis = ReduceSbpUtil::MakePredicatorIsReducedAxis(conf_axes, num_axes);
+  int32_t num_reduced_axes = 0;
+  FOR_RANGE(int64_t, i, 0, num_axes) {
+    if (IsReducedAxis(i)) {
+      num_reduced_axes += 1;
+    } else {
+      const int64_t out_axis = keepdims ? i : i - num_reduced_axes;
+      ctx->NewBuilder()
+          .Split(user_op::OpArg("x", 0), i)
+          .Split(user_op::OpArg("mean", 0), out_axis)
+          .Split(user_op::OpArg("mean_diff", 0), out_axis)
+          .Split(user_op::OpArg("variance_diff", 0), out_axis)
+          .Split(user_op::OpArg("dx", 0), i)
+          .Build();
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+std::string GetMomentsOutputGrad(const user_op::UserOpWrapper& op, const std::string& output_name,
+                                 const user_op::AddOpFn& AddOp) {
+  if (op.HasGradTensor4OpOutput(output_name, 0)) {
+    return op.GetGradTensorWithOpOutput(output_name, 0);
+  }
+  auto zero_like_op =
+      user_op::UserOpConfWrapperBuilder(op.op_name() + "_grad_zero_like_" + output_name)
+          .Op("zero_like")
+          .Input("like", op.output(output_name, 0))
+          .Output("out")
+          .Build();
+  AddOp(zero_like_op);
+  return zero_like_op.output("out", 0);
+}
+
+}  // namespace
+
+// Computes the mean and the variance of x over the axes in one pass, unbiased divides the sum of
+// the squared deviations by n - 1 instead of n.
+REGISTER_USER_OP("moments")
+    .Input("x")
+    .Output("mean")
+    .Output("variance")
+    .Attr<std::vector<int32_t>>("axis")
+    .Attr<bool>("keepdims", false)
+    .Attr<bool>("unbiased", false)
+    .SetTensorDescInferFn(InferMomentsTensorDesc)
+    .SetGetSbpFn(GetMomentsSbp)
+    .SetDataTypeInferFn(InferMomentsDataType);
+
+REGISTER_USER_OP("moments_grad")
+    .Input("x")
+    .Input("mean")
+    .Input("mean_diff")
+    .Input("variance_diff")
+    .Output("dx")
+    .Attr<std::vector<int32_t>>("axis")
+    .Attr<bool>("keepdims", false)
+    .Attr<bool>("unbiased", false)
+    .SetTensorDescInferFn(InferMomentsGradTensorDesc)
+    .SetGetSbpFn(GetMomentsGradSbp)
+    .SetDataTypeInferFn(InferMomentsGradDataType);
+
+REGISTER_USER_OP_GRAD("moments")
+    .SetGenBackwardOpConfFn([](const user_op::UserOpWrapper& op, user_op::AddOpFn AddOp) {
+      if (op.NeedGenGradTensor4OpInput("x", 0)) {
+        user_op::UserOpConfWrapper grad_op =
+            user_op::UserOpConfWrapperBuilder(op.op_name() + "_grad")
+                .Op("moments_grad")
+                .Input("x", op.input("x", 0))
+                .Input("mean", op.output("mean", 0))
+                .Input("mean_diff", GetMomentsOutputGrad(op, "mean", AddOp))
+                .Input("variance_diff", GetMomentsOutputGrad(op, "variance", AddOp))
+                .Output("dx")
+                .Attr("axis", op.attr<std::vector<int32_t>>("axis"))
+                .Attr("keepdims", op.attr<bool>("keepdims"))
+                .Attr("unbiased", op.attr<bool>("unbiased"))
+                .Build();
+        op.BindGradTensorWithOpInput(grad_op.output("dx", 0), "x", 0);
+        AddOp(grad_op);
+      }
+    });
+
+}  // namespace oneflow
@@ -28,6 +28,8 @@ REGISTER_CPU_ONLY_USER_OP("OFRecordReader")
     .Attr<int64_t>("seed", -1)
     .Attr<int32_t>("shuffle_buffer_size", 1024)
     .Attr<bool>("shuffle_after_epoch", false)
+    .Attr<bool>("use_index", false)
+    .Attr<int64_t>("sample_offset", 0)
     .SetPhysicalTensorDescInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
       user_op::TensorDesc* out_tensor = ctx->TensorDesc4ArgNameAndIndex("out", 0);
       int32_t local_batch_size = ctx->Attr<int32_t>("batch_size");